@@ -143,6 +143,25 @@ class AnimationController(wx.EvtHandler):
         else:
             win.DrawBitmap(bitmap)
         self.slider.UpdateFrame(index)
+        if self.timer.IsRunning():
+            # load next frames while waiting for the next tick
+            wx.CallAfter(self._prefetchFrames, index)
+
+    def _prefetchFrames(self, index):
+        """Loads bitmaps of frames following the given frame index."""
+        count = UserSettings.Get(group='animation', key='prefetch',
+                                 subkey='value')
+        dataIds = []
+        for step in range(1, count + 1):
+            for anim in self.animations:
+                if not anim.IsActive() or not anim.GetCount():
+                    continue
+                if anim.GetOrientation() == Orientation.BACKWARD:
+                    frameIndex = index - step
+                else:
+                    frameIndex = index + step
+                dataIds.append(anim.GetFrame(frameIndex % anim.GetCount()))
+        self.bitmapProvider.Prefetch(dataIds)
 
     def SliderChanging(self, index):
         if self.runAfterReleasingSlider is None:
@@ -403,7 +422,10 @@ class AnimationController(wx.EvtHandler):
             group='animation',
             key='nprocs',
             subkey='value')
-        self.bitmapProvider.Load(nprocs=cpus, bgcolor=color)
+        self.bitmapPool.maxMemory = UserSettings.Get(
+            group='animation', key='memory', subkey='value') * 1024 * 1024
+        self.bitmapProvider.Load(
+            nprocs=cpus if cpus > 0 else getCpuCount(), bgcolor=color)
         # clear pools
         self.bitmapPool.Clear()
         self.mapFilesPool.Clear()
@@ -495,7 +517,9 @@ class AnimationController(wx.EvtHandler):
             group='animation',
             key='nprocs',
             subkey='value')
-        self.bitmapProvider.Load(nprocs=cpus, bgcolor=color, force=True)
+        self.bitmapProvider.Load(
+            nprocs=cpus if cpus > 0 else getCpuCount(), bgcolor=color,
+            force=True)
 
         self.EndAnimation()
 
@@ -536,90 +560,86 @@ class AnimationController(wx.EvtHandler):
                 animWinSize.append(win.GetSize())
                 animWinIndex.append(i)
 
-        images = []
-        busy = wx.BusyInfo(
-            _("Preparing export, please wait..."),
-            parent=self.frame)
-        wx.Yield()
-        lastBitmaps = {}
-        fgcolor = UserSettings.Get(
-            group='animation',
-            key='font',
-            subkey='fgcolor')
-        bgcolor = UserSettings.Get(
-            group='animation',
-            key='font',
-            subkey='bgcolor')
-        for frameIndex in range(frameCount):
-            image = wx.EmptyImage(*size)
-            image.Replace(0, 0, 0, 255, 255, 255)
-            # collect bitmaps of all windows and paste them into the one
-            for i in animWinIndex:
-                frameId = self.animations[i].GetFrame(frameIndex)
-                if not UserSettings.Get(group='animation', key='temporal',
-                                        subkey=['nodata', 'enable']):
-                    if frameId is not None:
+        def createImages():
+            """Yields exported frames one by one"""
+            lastBitmaps = {}
+            fgcolor = UserSettings.Get(
+                group='animation',
+                key='font',
+                subkey='fgcolor')
+            bgcolor = UserSettings.Get(
+                group='animation',
+                key='font',
+                subkey='bgcolor')
+            for frameIndex in range(frameCount):
+                image = wx.EmptyImage(*size)
+                image.Replace(0, 0, 0, 255, 255, 255)
+                # collect bitmaps of all windows and paste them into the one
+                for i in animWinIndex:
+                    frameId = self.animations[i].GetFrame(frameIndex)
+                    if not UserSettings.Get(group='animation', key='temporal',
+                                            subkey=['nodata', 'enable']):
+                        if frameId is not None:
+                            bitmap = self.bitmapProvider.GetBitmap(frameId)
+                            lastBitmaps[i] = bitmap
+                        else:
+                            if i not in lastBitmaps:
+                                lastBitmaps[i] = wx.NullBitmap()
+                    else:
                         bitmap = self.bitmapProvider.GetBitmap(frameId)
                         lastBitmaps[i] = bitmap
-                    else:
-                        if i not in lastBitmaps:
-                            lastBitmaps[i] = wx.NullBitmap()
-                else:
-                    bitmap = self.bitmapProvider.GetBitmap(frameId)
-                    lastBitmaps[i] = bitmap
-
-                im = wx.ImageFromBitmap(lastBitmaps[i])
-
-                # add legend if used
-                legend = legends[i]
-                if legend:
-                    legendBitmap = self.bitmapProvider.LoadOverlay(legend)
-                    x, y = self.mapwindows[i].GetOverlayPos()
-                    legImage = wx.ImageFromBitmap(legendBitmap)
-                    # not so nice result, can we handle the transparency
-                    # otherwise?
-                    legImage.ConvertAlphaToMask()
-                    im.Paste(legImage, x, y)
-
-                if im.GetSize() != animWinSize[i]:
-                    im.Rescale(*animWinSize[i])
-                image.Paste(im, *animWinPos[i])
-            # paste decorations
-            for decoration in decorations:
-                # add image
-                x = decoration['pos'][0] / 100. * size[0]
-                y = decoration['pos'][1] / 100. * size[1]
-                if decoration['name'] == 'image':
-                    decImage = wx.Image(decoration['file'])
-                elif decoration['name'] == 'time':
-                    timeLabel = timeLabels[frameIndex]
-                    if timeLabel[1]:  # interval
-                        text = _("%(from)s %(dash)s %(to)s") % {
-                            'from': timeLabel[0],
-                            'dash': u"\u2013", 'to': timeLabel[1]}
-                    else:
-                        if self.temporalManager.GetTemporalType() == TemporalType.ABSOLUTE:
-                            text = timeLabel[0]
-                        else:
-                            text = _("%(start)s %(unit)s") % \
-                                {'start': timeLabel[0], 'unit': timeLabel[2]}
-
-                    decImage = RenderText(
-                        text, decoration['font'],
-                        bgcolor, fgcolor).ConvertToImage()
-                elif decoration['name'] == 'text':
-                    text = decoration['text']
-                    decImage = RenderText(
-                        text, decoration['font'],
-                        bgcolor, fgcolor).ConvertToImage()
-
-                image.Paste(decImage, x, y)
 
-            images.append(image)
-        del busy
-
-        # export
-        pilImages = [WxImageToPil(image) for image in images]
+                    im = wx.ImageFromBitmap(lastBitmaps[i])
+
+                    # add legend if used
+                    legend = legends[i]
+                    if legend:
+                        legendBitmap = self.bitmapProvider.LoadOverlay(legend)
+                        x, y = self.mapwindows[i].GetOverlayPos()
+                        legImage = wx.ImageFromBitmap(legendBitmap)
+                        # not so nice result, can we handle the transparency
+                        # otherwise?
+                        legImage.ConvertAlphaToMask()
+                        im.Paste(legImage, x, y)
+
+                    if im.GetSize() != animWinSize[i]:
+                        im.Rescale(*animWinSize[i])
+                    image.Paste(im, *animWinPos[i])
+                # paste decorations
+                for decoration in decorations:
+                    # add image
+                    x = decoration['pos'][0] / 100. * size[0]
+                    y = decoration['pos'][1] / 100. * size[1]
+                    if decoration['name'] == 'image':
+                        decImage = wx.Image(decoration['file'])
+                    elif decoration['name'] == 'time':
+                        timeLabel = timeLabels[frameIndex]
+                        if timeLabel[1]:  # interval
+                            text = _("%(from)s %(dash)s %(to)s") % {
+                                'from': timeLabel[0],
+                                'dash': u"\u2013", 'to': timeLabel[1]}
+                        else:
+                            if self.temporalManager.GetTemporalType() == TemporalType.ABSOLUTE:
+                                text = timeLabel[0]
+                            else:
+                                text = _("%(start)s %(unit)s") % \
+                                    {'start': timeLabel[0], 'unit': timeLabel[2]}
+
+                        decImage = RenderText(
+                            text, decoration['font'],
+                            bgcolor, fgcolor).ConvertToImage()
+                    elif decoration['name'] == 'text':
+                        text = decoration['text']
+                        decImage = RenderText(
+                            text, decoration['font'],
+                            bgcolor, fgcolor).ConvertToImage()
+
+                    image.Paste(decImage, x, y)
+
+                yield WxImageToPil(image)
+
+        # export, frames are created while writing
+        pilImages = createImages()
         busy = wx.BusyInfo(_("Exporting animation, please wait..."),
                            parent=self.frame)
         wx.Yield()
@@ -632,8 +652,11 @@ class AnimationController(wx.EvtHandler):
                     exportInfo['format'].lower())
                 writeIms(filename=filename, images=pilImages)
             elif exportInfo['method'] == 'gif':
+                cpus = UserSettings.Get(group='animation', key='nprocs',
+                                        subkey='value')
                 writeGif(filename=exportInfo['file'], images=pilImages,
-                         duration=self.timeTick / float(1000), repeat=True)
+                         duration=self.timeTick / float(1000), repeat=True,
+                         nprocs=cpus if cpus > 0 else getCpuCount())
             elif exportInfo['method'] == 'swf':
                 writeSwf(filename=exportInfo['file'], images=pilImages,
                          duration=self.timeTick / float(1000), repeat=True)
@@ -1920,6 +1920,46 @@ class PreferencesDialog(PreferencesBaseDialog):
 
         gridSizer.Add(nprocs, pos=(row, 1), flag=wx.ALIGN_RIGHT)
 
+        row += 1
+        gridSizer.Add(
+            StaticText(
+                parent=panel,
+                label=_("Memory for loaded frames (MB):")),
+            flag=wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL,
+            pos=(
+                row,
+                0))
+        memory = SpinCtrl(
+            parent=panel, min=10, max=100000,
+            initial=UserSettings.Get(
+                group='animation',
+                key='memory',
+                subkey='value'))
+        memory.SetName('GetValue')
+        self.winId['animation:memory:value'] = memory.GetId()
+
+        gridSizer.Add(memory, pos=(row, 1), flag=wx.ALIGN_RIGHT)
+
+        row += 1
+        gridSizer.Add(
+            StaticText(
+                parent=panel,
+                label=_("Number of frames to load in advance:")),
+            flag=wx.ALIGN_LEFT | wx.ALIGN_CENTER_VERTICAL,
+            pos=(
+                row,
+                0))
+        prefetch = SpinCtrl(
+            parent=panel, min=0, max=1000,
+            initial=UserSettings.Get(
+                group='animation',
+                key='prefetch',
+                subkey='value'))
+        prefetch.SetName('GetValue')
+        self.winId['animation:prefetch:value'] = prefetch.GetId()
+
+        gridSizer.Add(prefetch, pos=(row, 1), flag=wx.ALIGN_RIGHT)
+
         row += 1
         gridSizer.Add(
             StaticText(
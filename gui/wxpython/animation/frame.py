@@ -30,6 +30,7 @@ from core import globalvar
 from gui_core.widgets import IntegerValidator
 from gui_core.wrap import StaticText, TextCtrl
 from core.gcmd import RunCommand
+from core.settings import UserSettings
 
 from animation.mapwindow import AnimationWindow
 from animation.provider import BitmapProvider, BitmapPool, \
@@ -76,7 +77,10 @@ class AnimationFrame(wx.Frame):
         self.windows = []
         self.animationPanel = AnimationsPanel(
             self, self.windows, initialCount=MAX_COUNT)
-        bitmapPool = BitmapPool()
+        # limit of memory for loaded frames in MB
+        memory = UserSettings.Get(group='animation', key='memory',
+                                  subkey='value')
+        bitmapPool = BitmapPool(maxMemory=memory * 1024 * 1024)
         mapFilesPool = MapFilesPool()
 
         self._progressDlg = None
@@ -24,7 +24,14 @@ import os
 import sys
 import wx
 import tempfile
-from multiprocessing import Process, Queue
+from collections import OrderedDict
+from multiprocessing import Process, Queue, Pool
+
+try:
+    import numpy as np
+except ImportError:
+    # composition falls back to g.pnmcomp
+    np = None
 
 from core.gcmd import RunCommand, GException
 from core.settings import UserSettings
@@ -184,8 +191,8 @@ class BitmapProvider:
         count = 0
         for cmdList, region in zip(cmdLists, regions):
             if not force and HashCmds(
-                    cmdList, region) in self._bitmapPool and self._bitmapPool[
-                    HashCmds(cmdList, region)].GetSize() == (
+                    cmdList, region) in self._bitmapPool and self._bitmapPool.GetSize(
+                    HashCmds(cmdList, region)) == (
                     self.imageWidth, self.imageHeight):
                 continue
             count += 1
@@ -253,8 +260,11 @@ class BitmapProvider:
             self.compositionFinished.emit()
         if self._cmds3D:
             for cmd in self._cmds3D:
-                self._bitmapPool[HashCmds([cmd], None)] = \
-                    wx.Bitmap(GetFileFromCmd(self._tempDir, cmd, None))
+                # file is owned by map files pool
+                self._bitmapPool.SetFile(
+                    HashCmds([cmd], None),
+                    GetFileFromCmd(self._tempDir, cmd, None),
+                    (self.imageWidth, self.imageHeight), remove=False)
 
         self.mapsLoaded.emit()
 
@@ -276,6 +286,14 @@ class BitmapProvider:
             bitmap = self._bitmapPool[None]
         return bitmap
 
+    def Prefetch(self, dataIds):
+        """Loads bitmaps which will be needed soon (e.g. next frames).
+
+        :param dataIds: list of bitmap names ordered by priority
+        """
+        self._bitmapPool.Preload([dataId for dataId in dataIds
+                                  if dataId in self._bitmapPool])
+
     def WindowSizeChanged(self, width, height):
         """Sets size when size of related window changes."""
         Debug.msg(
@@ -457,6 +475,60 @@ class BitmapComposer:
         """
         Debug.msg(3, "BitmapComposer.Compose")
 
+        filteredCmdLists = []
+        for cmdList, region in zip(cmdLists, regions):
+            if not force and HashCmds(
+                    cmdList, region) in self._bitmapPool and self._bitmapPool.GetSize(
+                    HashCmds(cmdList, region)) == (
+                    self.imageWidth, self.imageHeight):
+                # for reference counting
+                self._bitmapPool.AddReference(HashCmds(cmdList, region))
+                continue
+            filteredCmdLists.append((cmdList, region))
+
+        self._isComposing = True
+        if np is not None:
+            self._composeNumPy(filteredCmdLists, opacityList, bgcolor, nprocs)
+        else:
+            self._composePnmcomp(filteredCmdLists, opacityList, bgcolor,
+                                 nprocs)
+        self._isComposing = False
+
+    def _storeComposite(self, cmdList, region, filename):
+        """Stores composed image file (or failure) in bitmap pool"""
+        key = HashCmds(cmdList, region)
+        if filename is None:
+            self._bitmapPool[key] = createNoDataBitmap(
+                self.imageWidth, self.imageHeight, text="Failed to render")
+        else:
+            # loaded when needed, pool keeps limited number of bitmaps
+            self._bitmapPool.SetFile(key, filename,
+                                     (self.imageWidth, self.imageHeight))
+
+    def _composeNumPy(self, filteredCmdLists, opacityList, bgcolor, nprocs):
+        """Composes images with NumPy in a pool of worker processes."""
+        args = [(self.imageWidth, self.imageHeight, self._tempDir,
+                 cmdList, region, opacityList, bgcolor)
+                for cmdList, region in filteredCmdLists]
+        pool = Pool(processes=max(1, nprocs))
+        try:
+            # results come in the order of frames
+            results = pool.imap(_compositeWorker, args)
+            for count, ((cmdList, region), filename) in enumerate(
+                    zip(filteredCmdLists, results), start=1):
+                self._storeComposite(cmdList, region, filename)
+                self.compositionContinues.emit(
+                    current=count, text=_("Overlaying map layers"))
+                if self._stopComposing:
+                    self._stopComposing = False
+                    pool.terminate()
+                    break
+        finally:
+            pool.close()
+            pool.join()
+
+    def _composePnmcomp(self, filteredCmdLists, opacityList, bgcolor, nprocs):
+        """Composes images with g.pnmcomp in separate processes."""
         count = 0
 
         # Variables for parallel rendering
@@ -465,27 +537,8 @@ class BitmapComposer:
         queue_list = []
         cmd_lists = []
 
-        filteredCmdLists = []
-        for cmdList, region in zip(cmdLists, regions):
-            if not force and HashCmds(
-                    cmdList, region) in self._bitmapPool and self._bitmapPool[
-                    HashCmds(cmdList, region)].GetSize() == (
-                    self.imageWidth, self.imageHeight):
-                # TODO: find a better way than to assign the same to increase
-                # the reference
-                self._bitmapPool[
-                    HashCmds(
-                        cmdList,
-                        region)] = self._bitmapPool[
-                    HashCmds(
-                        cmdList,
-                        region)]
-                continue
-            filteredCmdLists.append((cmdList, region))
-
         num = len(filteredCmdLists)
 
-        self._isComposing = True
         for cmdList, region in filteredCmdLists:
             count += 1
             # Queue object for interprocess communication
@@ -507,21 +560,8 @@ class BitmapComposer:
                 for i in range(len(cmd_lists)):
                     proc_list[i].join()
                     filename = queue_list[i].get()
-                    if filename is None:
-                        self._bitmapPool[
-                            HashCmds(
-                                cmd_lists[i][0],
-                                cmd_lists[i][1])] = createNoDataBitmap(
-                            self.imageWidth,
-                            self.imageHeight,
-                            text="Failed to render")
-                    else:
-                        self._bitmapPool[
-                            HashCmds(
-                                cmd_lists[i][0],
-                                cmd_lists[i][1])] = BitmapFromImage(
-                            wx.Image(filename))
-                        os.remove(filename)
+                    self._storeComposite(cmd_lists[i][0], cmd_lists[i][1],
+                                         filename)
                 proc_count = 0
                 proc_list = []
                 queue_list = []
@@ -533,8 +573,6 @@ class BitmapComposer:
                 self._stopComposing = False
                 break
 
-        self._isComposing = False
-
     def RequestStopComposing(self):
         """Requests to stop the composition."""
         if self._isComposing:
@@ -660,6 +698,81 @@ def CompositeProcess(imageWidth, imageHeight, tempDir,
     fileQueue.put(filename)
 
 
+def _readPNM(filename):
+    """Reads binary PPM (P6) or PGM (P5) file as memory-mapped array.
+
+    :return: array of shape (rows, cols, 3) for PPM or (rows, cols) for PGM
+    """
+    with open(filename, 'rb') as f:
+        tokens = []
+        while len(tokens) < 4:
+            line = f.readline()
+            if not line:
+                raise IOError("Incomplete header in <%s>" % filename)
+            tokens.extend(line.split(b'#')[0].split())
+        offset = f.tell()
+    magic, cols, rows = tokens[0], int(tokens[1]), int(tokens[2])
+    shape = (rows, cols, 3) if magic == b'P6' else (rows, cols)
+    return np.memmap(filename, dtype=np.uint8, mode='r', offset=offset,
+                     shape=shape)
+
+
+def _writePPM(filename, image):
+    """Writes array of shape (rows, cols, 3) as binary PPM file."""
+    with open(filename, 'wb') as f:
+        f.write('P6\n{c} {r}\n255\n'.format(
+            r=image.shape[0], c=image.shape[1]).encode())
+        f.write(np.ascontiguousarray(image, dtype=np.uint8).tobytes())
+
+
+def CompositeNumPy(imageWidth, imageHeight, tempDir,
+                   cmdList, region, opacities, bgcolor):
+    """Composes image ppm files with NumPy alpha blending.
+
+    Layers are drawn over the background color from the last to the
+    first one, so the first layer is on top (as in CompositeProcess,
+    which passes the layers to g.pnmcomp in reversed order). Transparency
+    is given by the mask (pgm) file and the opacity of the layer.
+
+    :param imageWidth: image width
+    :param imageHeight: image height
+    :param tempDir: directory for rendering
+    :param cmdList: list of d.rast/d.vect commands
+    :param region: region as a dict or None
+    :param opacites: list of opacities
+    :param bgcolor: background color as a tuple of 3 values 0 to 255
+
+    :return: file name of the composed ppm image or None on error
+    """
+    filename = GetFileFromCmds(tempDir, cmdList, region)
+    result = np.empty((imageHeight, imageWidth, 3), dtype=np.float32)
+    result[:] = bgcolor[:3]
+    try:
+        for cmd, opacity in reversed(list(zip(cmdList, opacities))):
+            image = _readPNM(GetFileFromCmd(tempDir, cmd, region))
+            if image.shape[:2] != result.shape[:2]:
+                raise IOError("Unexpected size of <%s>" % cmd)
+            maskFile = GetFileFromCmd(tempDir, cmd, region, 'pgm')
+            if os.path.exists(maskFile):
+                alpha = _readPNM(maskFile).astype(np.float32)
+                alpha *= opacity / 255.
+                alpha = alpha[:, :, np.newaxis]
+            else:
+                alpha = float(opacity)
+            result *= 1 - alpha
+            result += image * alpha
+    except (IOError, ValueError) as e:
+        Debug.msg(1, "CompositeNumPy: {e}".format(e=e))
+        return None
+    _writePPM(filename, np.rint(result))
+    return filename
+
+
+def _compositeWorker(args):
+    """Unpacks arguments for CompositeNumPy in a worker process"""
+    return CompositeNumPy(*args)
+
+
 class DictRefCounter:
     """Base class storing map files/bitmaps (emulates dictionary).
     Counts the references to know which files/bitmaps to delete.
@@ -692,10 +805,14 @@ class DictRefCounter:
     def keys(self):
         return self.dictionary.keys()
 
+    def AddReference(self, key):
+        """Increases reference count of an existing item."""
+        self.referenceCount[key] += 1
+
     def Clear(self):
         """Clears items which are not needed any more."""
         Debug.msg(4, 'DictRefCounter.Clear')
-        for key in self.dictionary.keys():
+        for key in list(self.dictionary.keys()):
             if key is not None:
                 if self.referenceCount[key] <= 0:
                     del self.dictionary[key]
@@ -721,7 +838,7 @@ class MapFilesPool(DictRefCounter):
         """
         Debug.msg(4, 'MapFilesPool.Clear')
 
-        for key in self.dictionary.keys():
+        for key in list(self.dictionary.keys()):
             if self.referenceCount[key] <= 0:
                 name, ext = os.path.splitext(self.dictionary[key])
                 os.remove(self.dictionary[key])
@@ -733,10 +850,111 @@ class MapFilesPool(DictRefCounter):
 
 
 class BitmapPool(DictRefCounter):
-    """Class storing bitmaps (emulates dictionary)"""
+    """Class storing bitmaps (emulates dictionary)
 
-    def __init__(self):
+    Bitmaps are either stored directly or as image files
+    (see SetFile()). Bitmaps of image files are loaded when needed
+    and only the recently used ones are kept in memory, so that
+    the pool does not grow with the number of frames.
+    """
+
+    def __init__(self, maxMemory=None):
+        """
+
+        :param maxMemory: maximal size of loaded bitmaps in bytes
+                          (None for no limit)
+        """
         DictRefCounter.__init__(self)
+        self.maxMemory = maxMemory
+        self.size = {}
+        self._files = {}
+        self._loaded = OrderedDict()
+        self._memory = 0
+
+    def __setitem__(self, key, value):
+        self._unload(key)
+        self._files.pop(key, None)
+        DictRefCounter.__setitem__(self, key, value)
+        self.size[key] = tuple(value.GetSize())
+
+    def __getitem__(self, key):
+        if key not in self._files:
+            return self.dictionary[key]
+        if key in self._loaded:
+            # mark as recently used
+            bitmap = self._loaded.pop(key)
+            self._loaded[key] = bitmap
+            return bitmap
+        bitmap = BitmapFromImage(wx.Image(self._files[key][0]))
+        self._loaded[key] = bitmap
+        width, height = self.size[key]
+        self._memory += width * height * 4
+        self._release(keep=key)
+        return bitmap
+
+    def SetFile(self, key, filename, size, remove=True):
+        """Stores image file which is loaded as bitmap when needed.
+
+        :param key: bitmap key
+        :param filename: path to image file
+        :param size: image size as tuple (width, height)
+        :param remove: remove the file when not needed any more
+        """
+        self._unload(key)
+        DictRefCounter.__setitem__(self, key, filename)
+        self._files[key] = (filename, remove)
+        self.size[key] = tuple(size)
+
+    def GetSize(self, key):
+        """Returns size of bitmap without loading it"""
+        return self.size[key]
+
+    def Preload(self, keys):
+        """Loads bitmaps of given keys in advance (e.g. next frames).
+
+        Stops when the memory limit would release bitmaps which were
+        just loaded.
+        """
+        for i, key in enumerate(keys):
+            if key not in self._files or key in self._loaded:
+                continue
+            if self.maxMemory is not None and i:
+                width, height = self.size[key]
+                if self._memory + width * height * 4 > self.maxMemory and \
+                        list(self._loaded.keys())[0] in keys[:i]:
+                    break
+            self[key]
+
+    def _unload(self, key):
+        if key in self._loaded:
+            del self._loaded[key]
+            width, height = self.size[key]
+            self._memory -= width * height * 4
+
+    def _release(self, keep):
+        """Releases least recently used bitmaps above memory limit"""
+        if self.maxMemory is None:
+            return
+        while self._memory > self.maxMemory and len(self._loaded) > 1:
+            key = next(iter(self._loaded))
+            if key == keep:
+                break
+            self._unload(key)
+
+    def Clear(self):
+        """Clears items which are not needed any more.
+        Removes also image files of these items."""
+        Debug.msg(4, 'BitmapPool.Clear')
+        for key in list(self.dictionary.keys()):
+            if key is not None and self.referenceCount[key] <= 0:
+                self._unload(key)
+                if key in self._files:
+                    filename, remove = self._files.pop(key)
+                    if remove and os.path.exists(filename):
+                        os.remove(filename)
+                del self.dictionary[key]
+                del self.referenceCount[key]
+                del self.size[key]
 
 
 class CleanUp:
@@ -0,0 +1,93 @@
+"""Tests of composition of animation frames
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import shutil
+import tempfile
+from multiprocessing import Queue
+
+import numpy as np
+
+from grass.script.setup import set_gui_path
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+
+set_gui_path()
+
+from animation.provider import (CompositeNumPy, CompositeProcess,
+                                _readPNM, _writePPM)
+from animation.utils import GetFileFromCmd
+
+
+def write_pgm(filename, mask):
+    with open(filename, 'wb') as output:
+        output.write('P5\n{c} {r}\n255\n'.format(
+            r=mask.shape[0], c=mask.shape[1]).encode())
+        output.write(np.ascontiguousarray(mask, dtype=np.uint8).tobytes())
+
+
+class TestComposite(TestCase):
+
+    width = 20
+    height = 10
+    cmds = [['d.rast', 'map=top'], ['d.rast', 'map=bottom']]
+    bgcolor = (255, 255, 255)
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        shape = (self.height, self.width)
+        # top layer: red, transparent on the left half
+        top = np.zeros(shape + (3, ), dtype=np.uint8)
+        top[:, :, 0] = 255
+        top_mask = np.full(shape, 255, dtype=np.uint8)
+        top_mask[:, :self.width // 2] = 0
+        # bottom layer: blue, semi-transparent in the bottom half
+        bottom = np.zeros(shape + (3, ), dtype=np.uint8)
+        bottom[:, :, 2] = 255
+        bottom_mask = np.full(shape, 255, dtype=np.uint8)
+        bottom_mask[self.height // 2:] = 100
+        for cmd, image, mask in zip(self.cmds, (top, bottom),
+                                    (top_mask, bottom_mask)):
+            _writePPM(GetFileFromCmd(self.tempdir, cmd, None), image)
+            write_pgm(GetFileFromCmd(self.tempdir, cmd, None, 'pgm'), mask)
+
+    def tearDown(self):
+        shutil.rmtree(self.tempdir)
+
+    def compose_numpy(self, opacities):
+        filename = CompositeNumPy(self.width, self.height, self.tempdir,
+                                  self.cmds, None, opacities, self.bgcolor)
+        self.assertIsNotNone(filename)
+        return np.array(_readPNM(filename))
+
+    def compose_pnmcomp(self, opacities):
+        queue = Queue()
+        CompositeProcess(self.width, self.height, self.tempdir, self.cmds,
+                         None, opacities, self.bgcolor, queue)
+        filename = queue.get()
+        self.assertIsNotNone(filename)
+        return np.array(_readPNM(filename))
+
+    def test_order(self):
+        """First layer is on top"""
+        image = self.compose_numpy([1, 1])
+        self.assertEqual(tuple(image[0, -1]), (255, 0, 0))
+        self.assertEqual(tuple(image[0, 0]), (0, 0, 255))
+
+    def test_same_as_pnmcomp(self):
+        """NumPy composition gives the same image as g.pnmcomp"""
+        for opacities in ([1, 1], [0.5, 0.8]):
+            numpy_image = self.compose_numpy(opacities).astype(int)
+            pnmcomp_image = self.compose_pnmcomp(opacities).astype(int)
+            # g.pnmcomp uses integer arithmetic
+            self.assertLessEqual(
+                np.abs(numpy_image - pnmcomp_image).max(), 2,
+                msg="opacities %s" % opacities)
+
+
+if __name__ == '__main__':
+    test()
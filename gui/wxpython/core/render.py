@@ -10,6 +10,7 @@ Classes:
  - render::Map
  - render::RenderLayerMgr
  - render::RenderMapMgr
+ - render::RenderCache
 
 (C) 2006-2015 by the GRASS Development Team
 
@@ -26,9 +27,13 @@ import sys
 import glob
 import math
 import copy
+import shutil
+import hashlib
 import tempfile
 import types
 import time
+import multiprocessing
+from collections import OrderedDict
 
 import wx
 
@@ -469,6 +474,218 @@ class RenderLayerMgr(wx.EvtHandler):
         self.updateProgress.emit(layer=self.layer)
 
 
+class RenderCache(object):
+    """Cache of rendered layer images
+
+    Rendered image of a layer depends only on the display command,
+    computational region, display size and on the rendered maps.
+    Images are stored in a temporary directory under a key composed
+    from these and restored instead of running the display command again.
+    Least recently used images are removed when the cache is full.
+
+    The cache does not depend on wx, so it can be used and tested
+    without a display.
+    """
+    #: layer types which can be cached and their options with maps
+    #: (element type and option names), other types are always rendered
+    cacheable = {'raster': ('raster', ('map',)),
+                 'rgb': ('raster', ('red', 'green', 'blue')),
+                 'his': ('raster', ('hue', 'intensity', 'saturation')),
+                 'shaded': ('raster', ('shade', 'color')),
+                 'rastarrow': ('raster', ('map', 'magnitude_map')),
+                 'rastnum': ('raster', ('map',)),
+                 'vector': ('vector', ('map',)),
+                 'thememap': ('vector', ('map',)),
+                 'themechart': ('vector', ('map',)),
+                 'grid': (None, ()),
+                 'geodesic': (None, ()),
+                 'rhumb': (None, ())}
+
+    #: environmental variables which influence the rendered image
+    renderVariables = ('GRASS_REGION', 'GRASS_RENDER_WIDTH',
+                       'GRASS_RENDER_HEIGHT', 'GRASS_RENDER_IMMEDIATE',
+                       'GRASS_RENDER_BACKGROUNDCOLOR',
+                       'GRASS_RENDER_TRANSPARENT', 'GRASS_RENDER_TRUECOLOR')
+
+    #: files in mapset which define how a raster map is rendered
+    rasterElements = ('cell', 'fcell', 'cellhd', 'colr', 'cats')
+
+    def __init__(self, size=50):
+        """
+
+        :param int size: maximal number of cached images
+        """
+        self.size = size
+        self._items = OrderedDict()
+        self._dir = None
+
+    def _getDir(self):
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix='render_cache_')
+        return self._dir
+
+    def _readGisrc(self, env):
+        gisrc = env.get('GISRC')
+        gisenv = {}
+        if not gisrc or not os.path.isfile(gisrc):
+            return gisenv
+        with open(gisrc) as f:
+            for line in f:
+                if ':' in line:
+                    key, value = line.split(':', 1)
+                    gisenv[key.strip()] = value.strip()
+        return gisenv
+
+    def _getMapsets(self, location, mapset):
+        """Get mapsets in search path of the current mapset"""
+        mapsets = []
+        path = os.path.join(location, mapset, 'SEARCH_PATH')
+        if os.path.isfile(path):
+            with open(path) as f:
+                mapsets = [line.strip() for line in f if line.strip()]
+        if mapset not in mapsets:
+            mapsets.insert(0, mapset)
+        if 'PERMANENT' not in mapsets:
+            mapsets.append('PERMANENT')
+        return mapsets
+
+    def _mtime(self, path):
+        """Get modification time of a file or of the newest file
+        in a directory, None if it does not exist"""
+        if os.path.isdir(path):
+            mtimes = [os.path.getmtime(path)]
+            for name in os.listdir(path):
+                mtimes.append(os.path.getmtime(os.path.join(path, name)))
+            return max(mtimes)
+        if os.path.isfile(path):
+            return os.path.getmtime(path)
+        return None
+
+    def _getMapState(self, element, name, location, mapset):
+        """Get modification times of files of a map
+
+        :return: tuple with modification times or None if map not found
+        """
+        if '@' in name:
+            name, mapsets = name.split('@', 1)
+            mapsets = [mapsets]
+        else:
+            mapsets = self._getMapsets(location, mapset)
+
+        for mset in mapsets:
+            mapsetDir = os.path.join(location, mset)
+            if element == 'vector':
+                mtime = self._mtime(os.path.join(mapsetDir, 'vector', name))
+                if mtime is None:
+                    continue
+                # attributes are used by thematic display
+                return (mset, mtime,
+                        self._mtime(os.path.join(mapsetDir, 'sqlite',
+                                                 'sqlite.db')))
+            if not os.path.isfile(os.path.join(mapsetDir, 'cellhd', name)):
+                continue
+            state = [mset]
+            for elem in self.rasterElements:
+                state.append(self._mtime(os.path.join(mapsetDir, elem, name)))
+            # color table in the current mapset for map from another mapset
+            state.append(self._mtime(os.path.join(location, mapset, 'colr2',
+                                                  mset, name)))
+            return tuple(state)
+        return None
+
+    def GetKey(self, ltype, cmd, env):
+        """Get cache key for a layer
+
+        :param ltype: layer type
+        :param cmd: display command given as tuple
+        :param dict env: environmental variables used for rendering
+
+        :return: key as string or None when the layer cannot be cached
+        """
+        if ltype not in self.cacheable:
+            return None
+        element, options = self.cacheable[ltype]
+        gisenv = self._readGisrc(env)
+        try:
+            location = os.path.join(gisenv['GISDBASE'],
+                                    gisenv['LOCATION_NAME'])
+            mapset = gisenv['MAPSET']
+        except KeyError:
+            return None
+
+        state = [location, mapset, cmd[0], sorted(cmd[1].items())]
+        for variable in self.renderVariables:
+            state.append(env.get(variable))
+        for option in options:
+            name = cmd[1].get(option)
+            if not name:
+                continue
+            mapState = self._getMapState(element, name, location, mapset)
+            if mapState is None:
+                # map does not exist (yet), let the module report it
+                return None
+            state.append(mapState)
+        if element == 'raster':
+            state.append(self._mtime(os.path.join(location, mapset,
+                                                  'cell', 'MASK')))
+        return hashlib.md5(repr(state).encode('utf-8')).hexdigest()
+
+    def Restore(self, key, files):
+        """Copy cached images to given files
+
+        :param key: cache key from GetKey()
+        :param list files: paths to image, mask and other files
+                           in the same order as when stored
+
+        :return: True if restored, False if not cached
+        """
+        if key is None or key not in self._items:
+            return False
+        cached = self._items.pop(key)
+        for src, dst in zip(cached, files):
+            if not dst:
+                continue
+            if src is None:
+                try_remove(dst)
+            else:
+                shutil.copyfile(src, dst)
+        # mark as recently used
+        self._items[key] = cached
+        Debug.msg(3, "RenderCache.Restore(): key=%s" % key)
+        return True
+
+    def Store(self, key, files):
+        """Store copies of rendered images in the cache
+
+        :param key: cache key from GetKey()
+        :param list files: paths to image, mask and other files
+        """
+        if key is None or self.size < 1:
+            return
+        cached = []
+        for i, path in enumerate(files):
+            if path and os.path.isfile(path):
+                dst = os.path.join(self._getDir(), '%s_%d' % (key, i))
+                shutil.copyfile(path, dst)
+                cached.append(dst)
+            else:
+                cached.append(None)
+        self._items.pop(key, None)
+        self._items[key] = cached
+        while len(self._items) > self.size:
+            unused, oldest = self._items.popitem(last=False)
+            for path in oldest:
+                if path:
+                    try_remove(path)
+
+    def Clear(self):
+        """Remove all cached images"""
+        self._items.clear()
+        if self._dir:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+
 class RenderMapMgr(wx.EvtHandler):
 
     def __init__(self, Map):
@@ -494,6 +711,12 @@ class RenderMapMgr(wx.EvtHandler):
                             "GRASS_LEGEND_FILE": text_to_string(self.Map.legfile)
                             }
 
+        self._cache = RenderCache(
+            size=UserSettings.Get(group='display', key='renderCache',
+                                  subkey='size'))
+        # maximal number of layers rendered at the same time
+        self.maxJobs = multiprocessing.cpu_count()
+
         self._init()
         self._rendering = False
         self._old_legend = []
@@ -507,6 +730,10 @@ class RenderMapMgr(wx.EvtHandler):
         self.progressInfo = None
         self._env = env
         self.layers = []
+        # layers waiting for rendering, being rendered and their cache keys
+        self._pending = []
+        self._running = []
+        self._cacheKeys = {}
 
         # re-render from scratch
         if os.path.exists(self.Map.mapfile):
@@ -533,21 +760,56 @@ class RenderMapMgr(wx.EvtHandler):
         # reset progress
         self.ReportProgress()
 
+        useCache = UserSettings.Get(group='display', key='renderCache',
+                                    subkey='enabled')
         # render map layers if forced
         nlayers = 0
+        ncached = 0
         for layer in self.layers:
             if force or layer.forceRender:
                 nlayers += 1
-                layer.Render(env)
+                key = None
+                if useCache:
+                    key = self._cache.GetKey(layer.GetType(),
+                                             layer.GetCmd(), env)
+                if self._cache.Restore(key, self._getCacheFiles(layer)):
+                    ncached += 1
+                    layer.forceRender = False
+                    layer.GetRenderMgr().updateProgress.emit(layer=layer)
+                    continue
+                if key:
+                    self._cacheKeys[layer] = key
+                if layer.GetType() == 'wms':
+                    # downloading is not limited by local resources
+                    layer.Render(env)
+                else:
+                    self._pending.append(layer)
             else:
                 layer.GetRenderMgr().updateProgress.emit(layer=layer)
+        self._renderPending(env)
 
         Debug.msg(1, "RenderMapMgr.Render(): %d layers to be rendered "
-                  "(force=%d, all active layers -> %d)" % (nlayers, force,
-                                                           len(self.layers)))
+                  "(force=%d, all active layers -> %d, from cache -> %d)" %
+                  (nlayers, force, len(self.layers), ncached))
 
         return nlayers
 
+    def _renderPending(self, env):
+        """Start rendering of waiting layers up to the limit of jobs"""
+        while self._pending and len(self._running) < self.maxJobs:
+            layer = self._pending.pop(0)
+            self._running.append(layer)
+            layer.Render(env)
+
+    def _getCacheFiles(self, layer):
+        """Get files produced by rendering of a layer"""
+        return [layer.mapfile, layer.maskfile,
+                getattr(layer, '_legrow', None)]
+
+    def ClearCache(self):
+        """Remove all cached layer images"""
+        self._cache.Clear()
+
     def GetRenderEnv(self, windres=False):
         env = os.environ.copy()
         env.update(self._render_env)
@@ -683,6 +945,7 @@ class RenderMapMgr(wx.EvtHandler):
     def Abort(self):
         """Abort all rendering processes"""
         Debug.msg(1, "RenderMapMgr.Abort()")
+        self._pending = []
         for layer in self.layers:
             layer.GetRenderMgr().Abort()
 
@@ -699,6 +962,12 @@ class RenderMapMgr(wx.EvtHandler):
 
         :param layer: Layer to be processed or None to reset
         """
+        if layer in self._running:
+            self._running.remove(layer)
+            key = self._cacheKeys.pop(layer, None)
+            if key and os.path.isfile(layer.mapfile):
+                self._cache.Store(key, self._getCacheFiles(layer))
+            self._renderPending(self._env)
         if self.progressInfo is None or layer is None:
             self.progressInfo = {'progresVal': 0,   # current progress value
                                  'downloading': [],  # layers, which are downloading data
@@ -1606,6 +1875,7 @@ class Map(object):
         self._clean(self.overlays)
         try_remove(self.mapfile)
         try_remove(self.legfile)
+        self.renderMgr.ClearCache()
 
     def ReverseListOfLayers(self):
         """Reverse list of layers"""
@@ -187,6 +187,10 @@ class Settings:
                 'autoRendering': {
                     'enabled': True
                 },
+                'renderCache': {
+                    'enabled': True,
+                    'size': 50
+                },
                 'autoZooming': {
                     'enabled': False
                 },
@@ -836,6 +840,12 @@ class Settings:
                 'nprocs': {
                     'value': -1,
                 },
+                'memory': {
+                    'value': 500,
+                },
+                'prefetch': {
+                    'value': 10,
+                },
                 'font': {
                     'bgcolor': (255, 255, 255, 255),
                     'fgcolor': (0, 0, 0, 255),
@@ -0,0 +1,116 @@
+"""Tests of render cache of layer images
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import os
+import filecmp
+
+import grass.script as gscript
+from grass.script.setup import set_gui_path
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+
+set_gui_path()
+
+from core.render import RenderCache, get_tempfile_name
+
+
+class TestRenderCache(TestCase):
+
+    name = "render_cache_map"
+
+    @classmethod
+    def setUpClass(cls):
+        cls.use_temp_region()
+        cls.runModule("g.region", n=40, s=0, e=40, w=0, res=1)
+        cls.runModule("r.mapcalc", expression="%s = row() + col()" % cls.name,
+                      overwrite=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.runModule("g.remove", flags='f', type='raster', name=cls.name)
+        cls.del_temp_region()
+
+    def setUp(self):
+        self.cache = RenderCache(size=2)
+        self.mapfile = get_tempfile_name(suffix='.ppm')
+        self.cmd = ('d.rast', {'map': self.name})
+
+    def tearDown(self):
+        self.cache.Clear()
+        for path in (self.mapfile, self.mapfile + '.orig'):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def render_env(self, region='n=40;s=0;e=40;w=0;rows=40;cols=40',
+                   width=40):
+        env = os.environ.copy()
+        env['GRASS_RENDER_IMMEDIATE'] = 'cairo'
+        env['GRASS_RENDER_FILE'] = self.mapfile
+        env['GRASS_RENDER_WIDTH'] = str(width)
+        env['GRASS_RENDER_HEIGHT'] = '40'
+        env['GRASS_REGION'] = region
+        return env
+
+    def render(self, env):
+        gscript.run_command(self.cmd[0], quiet=True, env=env, **self.cmd[1])
+
+    def test_restore(self):
+        env = self.render_env()
+        key = self.cache.GetKey('raster', self.cmd, env)
+        self.assertTrue(key)
+        self.assertFalse(self.cache.Restore(key, [self.mapfile]))
+        self.render(env)
+        self.cache.Store(key, [self.mapfile])
+        os.rename(self.mapfile, self.mapfile + '.orig')
+        self.assertTrue(self.cache.Restore(key, [self.mapfile]))
+        self.assertTrue(filecmp.cmp(self.mapfile, self.mapfile + '.orig',
+                                    shallow=False))
+
+    def test_key_changes(self):
+        env = self.render_env()
+        key = self.cache.GetKey('raster', self.cmd, env)
+        self.assertEqual(key, self.cache.GetKey('raster', self.cmd, env))
+        self.assertNotEqual(
+            key, self.cache.GetKey('raster', self.cmd,
+                                   self.render_env(width=20)))
+        self.assertNotEqual(
+            key, self.cache.GetKey('raster', self.cmd, self.render_env(
+                region='n=20;s=0;e=20;w=0;rows=20;cols=20')))
+        self.assertNotEqual(
+            key, self.cache.GetKey('raster', ('d.rast', {'map': self.name,
+                                                         'values': '1-10'}),
+                                   env))
+        # changed color table means changed map
+        os.utime(os.path.join(gscript.gisenv()['GISDBASE'],
+                              gscript.gisenv()['LOCATION_NAME'],
+                              gscript.gisenv()['MAPSET'],
+                              'colr', self.name), (0, 0))
+        self.assertNotEqual(key, self.cache.GetKey('raster', self.cmd, env))
+
+    def test_not_cacheable(self):
+        env = self.render_env()
+        self.assertIsNone(self.cache.GetKey('wms', self.cmd, env))
+        self.assertIsNone(self.cache.GetKey(
+            'raster', ('d.rast', {'map': 'does_not_exist'}), env))
+
+    def test_size(self):
+        env = self.render_env()
+        self.render(env)
+        keys = []
+        for width in (10, 20, 30):
+            key = self.cache.GetKey('raster', self.cmd,
+                                    self.render_env(width=width))
+            self.cache.Store(key, [self.mapfile])
+            keys.append(key)
+        # the least recently used one was removed
+        self.assertFalse(self.cache.Restore(keys[0], [self.mapfile]))
+        self.assertTrue(self.cache.Restore(keys[2], [self.mapfile]))
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,159 @@
+"""
+@package datacatalog::index
+
+@brief Index of maps in GRASS database for data catalog
+
+Classes:
+ - index::CatalogIndex
+
+(C) 2020 by the GRASS Development Team
+
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+import os
+import re
+from collections import OrderedDict
+
+
+# map types and mapset directories where the maps are stored
+ELEMENTS = OrderedDict([('raster', 'cell'),
+                        ('raster_3d', 'grid3'),
+                        ('vector', 'vector')])
+
+
+def _sortLower(names):
+    return sorted(names, key=lambda name: name.lower())
+
+
+class CatalogIndex(object):
+    """Lists of maps in mapsets of a GRASS database.
+
+    Maps are listed by reading mapset directories directly (no modules
+    are executed). Listing of each mapset is cached together with
+    modification times of its directories, so that only changed
+    mapsets are listed again. Names of all listed maps are kept
+    in one flat index used for searching. Does not depend on wx.
+    """
+
+    def __init__(self, gisdbase):
+        self.gisdbase = gisdbase
+        # (location, mapset) -> (modification times, maps)
+        self._mapsets = {}
+        # list of (name, element, location, mapset), None when outdated
+        self._names = None
+
+    def _path(self, *args):
+        return os.path.join(self.gisdbase, *args)
+
+    def GetLocations(self):
+        """Returns sorted list of locations in the database"""
+        try:
+            names = os.listdir(self.gisdbase)
+        except OSError:
+            return []
+        return _sortLower([name for name in names if os.path.isdir(
+            self._path(name, 'PERMANENT'))])
+
+    def GetMapsets(self, location):
+        """Returns sorted list of mapsets in the location"""
+        names = os.listdir(self._path(location))
+        return _sortLower([name for name in names if os.path.isfile(
+            self._path(location, name, 'WIND'))])
+
+    def _getStamp(self, path):
+        """Returns modification times of mapset and its map directories
+        (directories change when maps are added, removed or renamed)"""
+        stamp = []
+        for directory in [path] + [os.path.join(path, element)
+                                   for element in ELEMENTS.values()]:
+            try:
+                stamp.append(os.stat(directory).st_mtime)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _listMapset(self, path):
+        maps = OrderedDict()
+        for element, directory in ELEMENTS.items():
+            try:
+                names = os.listdir(os.path.join(path, directory))
+            except OSError:
+                names = []
+            maps[element] = sorted(name for name in names
+                                   if not name.startswith('.'))
+        return maps
+
+    def GetMaps(self, location, mapset):
+        """Returns dictionary of map names in mapset by map type.
+
+        Mapset is listed again only when it changed since the last call.
+        """
+        key = (location, mapset)
+        path = self._path(location, mapset)
+        stamp = self._getStamp(path)
+        cached = self._mapsets.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        maps = self._listMapset(path)
+        self._mapsets[key] = (stamp, maps)
+        self._names = None
+        return maps
+
+    def GetLocationMaps(self, location):
+        """Returns dictionary of maps by mapsets in the location
+
+        :raises OSError: when the location cannot be read
+        """
+        mapsets = self.GetMapsets(location)
+        # forget removed mapsets
+        for key in list(self._mapsets.keys()):
+            if key[0] == location and key[1] not in mapsets:
+                del self._mapsets[key]
+                self._names = None
+        return OrderedDict((mapset, self.GetMaps(location, mapset))
+                           for mapset in mapsets)
+
+    def Refresh(self):
+        """Lists again mapsets which changed since they were listed"""
+        for location, mapset in list(self._mapsets.keys()):
+            if os.path.isdir(self._path(location, mapset)):
+                self.GetMaps(location, mapset)
+            else:
+                del self._mapsets[(location, mapset)]
+                self._names = None
+
+    def _getNames(self):
+        if self._names is None:
+            self._names = []
+            for location, mapset in sorted(
+                    self._mapsets.keys(),
+                    key=lambda key: (key[0].lower(), key[1].lower())):
+                maps = self._mapsets[(location, mapset)][1]
+                for element, names in maps.items():
+                    self._names.extend((name, element, location, mapset)
+                                       for name in names)
+        return self._names
+
+    def Search(self, name=None, element=None):
+        """Searches listed maps by name (regular expression) and type.
+
+        Only mapsets listed before (by GetMaps, GetLocationMaps) are
+        searched, use Refresh to update them.
+
+        :raises re.error: for invalid regular expression
+
+        :return: nested dictionaries location -> mapset -> type -> names
+        """
+        regex = re.compile(name) if name else None
+        found = OrderedDict()
+        for mapName, mapElement, location, mapset in self._getNames():
+            if element and mapElement != element:
+                continue
+            if regex and regex.search(mapName) is None:
+                continue
+            found.setdefault(location, OrderedDict()).setdefault(
+                mapset, OrderedDict()).setdefault(
+                mapElement, []).append(mapName)
+        return found
@@ -0,0 +1,94 @@
+"""Tests of data catalog index
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import os
+import shutil
+import tempfile
+
+from grass.script.setup import set_gui_path
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+
+set_gui_path()
+
+from datacatalog.index import CatalogIndex
+
+
+class TestCatalogIndex(TestCase):
+
+    def setUp(self):
+        self.gisdbase = tempfile.mkdtemp()
+        for location, mapset in (('loc1', 'PERMANENT'), ('loc1', 'user'),
+                                 ('loc2', 'PERMANENT')):
+            os.makedirs(os.path.join(self.gisdbase, location, mapset))
+            self.touch(location, mapset, 'WIND')
+        self.addRaster('loc1', 'PERMANENT', 'elevation')
+        self.addRaster('loc1', 'user', 'slope')
+        self.addVector('loc2', 'PERMANENT', 'roads')
+        # not a location
+        os.makedirs(os.path.join(self.gisdbase, 'other'))
+        self.index = CatalogIndex(self.gisdbase)
+
+    def tearDown(self):
+        shutil.rmtree(self.gisdbase)
+
+    def touch(self, *path):
+        open(os.path.join(self.gisdbase, *path), 'w').close()
+
+    def addRaster(self, location, mapset, name):
+        directory = os.path.join(self.gisdbase, location, mapset, 'cell')
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.touch(location, mapset, 'cell', name)
+
+    def addVector(self, location, mapset, name):
+        os.makedirs(os.path.join(self.gisdbase, location, mapset,
+                                 'vector', name))
+
+    def test_listing(self):
+        self.assertEqual(self.index.GetLocations(), ['loc1', 'loc2'])
+        maps = self.index.GetLocationMaps('loc1')
+        self.assertEqual(list(maps.keys()), ['PERMANENT', 'user'])
+        self.assertEqual(maps['PERMANENT']['raster'], ['elevation'])
+        self.assertEqual(maps['PERMANENT']['vector'], [])
+        self.assertEqual(self.index.GetMaps('loc2', 'PERMANENT')['vector'],
+                         ['roads'])
+
+    def test_cache(self):
+        maps = self.index.GetMaps('loc1', 'user')
+        # unchanged mapset is not listed again
+        self.assertIs(self.index.GetMaps('loc1', 'user'), maps)
+        self.addRaster('loc1', 'user', 'aspect')
+        # make sure modification time differs
+        directory = os.path.join(self.gisdbase, 'loc1', 'user', 'cell')
+        os.utime(directory, (0, 0))
+        self.assertEqual(self.index.GetMaps('loc1', 'user')['raster'],
+                         ['aspect', 'slope'])
+
+    def test_search(self):
+        for location in self.index.GetLocations():
+            self.index.GetLocationMaps(location)
+        found = self.index.Search(name='^s')
+        self.assertEqual(dict(found), {'loc1': {'user': {'raster': ['slope']}}})
+        found = self.index.Search(element='vector')
+        self.assertEqual(list(found.keys()), ['loc2'])
+        self.assertEqual(len(self.index.Search()), 2)
+
+    def test_refresh(self):
+        self.index.GetLocationMaps('loc1')
+        self.addVector('loc1', 'user', 'streams')
+        self.assertFalse(self.index.Search(name='streams'))
+        self.index.Refresh()
+        self.assertTrue(self.index.Search(name='streams'))
+        shutil.rmtree(os.path.join(self.gisdbase, 'loc1', 'user'))
+        self.index.Refresh()
+        self.assertFalse(self.index.Search(name='slope'))
+
+
+if __name__ == '__main__':
+    test()
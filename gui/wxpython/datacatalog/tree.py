@@ -18,13 +18,10 @@ for details.
 """
 import os
 import re
-import copy
-from multiprocessing import Process, Queue, cpu_count
 
 import wx
 
 from core.gcmd import RunCommand, GError, GMessage, GWarning
-from core.utils import GetListOfLocations
 from core.debug import Debug
 from gui_core.dialogs import TextEntryDialog
 from core.giface import StandaloneGrassInterface
@@ -32,6 +29,7 @@ from core.treemodel import TreeModel, DictNode
 from gui_core.treeview import TreeView
 from gui_core.wrap import Menu
 from datacatalog.dialogs import CatalogReprojectionDialog
+from datacatalog.index import CatalogIndex
 
 from grass.pydispatch.signal import Signal
 
@@ -40,125 +38,6 @@ from grass.script import gisenv
 from grass.exceptions import CalledModuleError
 
 
-def filterModel(model, element=None, name=None):
-    """Filter tree model based on type or name of map using regular expressions.
-    Copies tree and remove nodes which don't match."""
-    fmodel = copy.deepcopy(model)
-    nodesToRemove = []
-    if name:
-        try:
-            regex = re.compile(name)
-        except:
-            return fmodel
-    for gisdbase in fmodel.root.children:
-        for location in gisdbase.children:
-            for mapset in location.children:
-                for elem in mapset.children:
-                    if element and elem.label != element:
-                        nodesToRemove.append(elem)
-                        continue
-                    for node in elem.children:
-                        if name and regex.search(node.label) is None:
-                            nodesToRemove.append(node)
-
-    for node in reversed(nodesToRemove):
-        fmodel.RemoveNode(node)
-
-    cleanUpTree(fmodel)
-    return fmodel
-
-
-def cleanUpTree(model):
-    """Removes empty element/mapsets/locations nodes.
-    It first removes empty elements, then mapsets, then locations"""
-    # removes empty elements
-    nodesToRemove = []
-    for gisdbase in model.root.children:
-        for location in gisdbase.children:
-            for mapset in location.children:
-                for element in mapset.children:
-                    if not element.children:
-                        nodesToRemove.append(element)
-    for node in reversed(nodesToRemove):
-        model.RemoveNode(node)
-    # removes empty mapsets
-    nodesToRemove = []
-    for gisdbase in model.root.children:
-        for location in gisdbase.children:
-            for mapset in location.children:
-                if not mapset.children:
-                    nodesToRemove.append(mapset)
-    for node in reversed(nodesToRemove):
-        model.RemoveNode(node)
-    # removes empty locations
-    nodesToRemove = []
-    for gisdbase in model.root.children:
-        for location in gisdbase.children:
-            if not location.children:
-                nodesToRemove.append(location)
-    for node in reversed(nodesToRemove):
-        model.RemoveNode(node)
-
-
-def getLocationTree(gisdbase, location, queue, mapsets=None):
-    """Creates dictionary with mapsets, elements, layers for given location.
-    Returns tuple with the dictionary and error (or None)"""
-    tmp_gisrc_file, env = gscript.create_environment(gisdbase, location, 'PERMANENT')
-    env['GRASS_SKIP_MAPSET_OWNER_CHECK'] = '1'
-
-    maps_dict = {}
-    elements = ['raster', 'raster_3d', 'vector']
-    try:
-        if not mapsets:
-            mapsets = gscript.read_command(
-                'g.mapsets',
-                flags='l',
-                separator='comma',
-                quiet=True,
-                env=env).strip()
-    except CalledModuleError:
-        queue.put(
-            (maps_dict,
-             _("Failed to read mapsets from location <{l}>.").format(
-                 l=location)))
-        gscript.try_remove(tmp_gisrc_file)
-        return
-    else:
-        listOfMapsets = mapsets.split(',')
-        Debug.msg(
-            4, "Location <{0}>: {1} mapsets found".format(
-                location, len(listOfMapsets)))
-        for each in listOfMapsets:
-            maps_dict[each] = {}
-            for elem in elements:
-                maps_dict[each][elem] = []
-    try:
-        maplist = gscript.read_command(
-            'g.list', flags='mt', type=elements,
-            mapset=','.join(listOfMapsets),
-            quiet=True, env=env).strip()
-    except CalledModuleError:
-        queue.put(
-            (maps_dict,
-             _("Failed to read maps from location <{l}>.").format(
-                 l=location)))
-        gscript.try_remove(tmp_gisrc_file)
-        return
-    else:
-        # fill dictionary
-        listOfMaps = maplist.splitlines()
-        Debug.msg(
-            4, "Location <{0}>: {1} maps found".format(
-                location, len(listOfMaps)))
-        for each in listOfMaps:
-            ltype, wholename = each.split('/')
-            name, mapset = wholename.split('@')
-            maps_dict[mapset][ltype].append(name)
-
-    queue.put((maps_dict, None))
-    gscript.try_remove(tmp_gisrc_file)
-
-
 def map_exists(name, element, env, mapset=None):
     """Check is map is present in the mapset given in the environment
 
@@ -272,78 +151,50 @@ class LocationMapTree(TreeView):
         self.parent = parent
         self.contextMenu.connect(self.OnRightClick)
         self.itemActivated.connect(self.OnDoubleClick)
+        self._index = None
+        self._filterText = ''
 
         self._initVariables()
 
     def _initTreeItems(self, locations=None, mapsets=None):
         """Add locations, mapsets and layers to the tree.
-        Runs in multiple processes. Saves resulting data and error."""
+        Maps are listed by catalog index, which lists again only
+        mapsets changed since the last time."""
         # mapsets param currently unused
         genv = gisenv()
+        if self._index is None or self._index.gisdbase != genv['GISDBASE']:
+            self._index = CatalogIndex(genv['GISDBASE'])
         if not locations:
-            locations = GetListOfLocations(genv['GISDBASE'])
-
-        loc_count = proc_count = 0
-        queue_list = []
-        proc_list = []
-        loc_list = []
-        nprocs = 4
-        try:
-            nprocs = cpu_count()
-        except NotImplementedError:
-            nprocs = 4
+            locations = self._index.GetLocations()
 
-        results = dict()
         errors = []
-        location_nodes = []
         nlocations = len(locations)
         grassdata_node = self._model.AppendNode(
             parent=self._model.root, label=_('GRASS locations in {0}').format(
                 genv['GISDBASE']), data=dict(
                 type='grassdata'))
-        for location in locations:
-            results[location] = dict()
+        for loc_count, location in enumerate(locations, start=1):
             varloc = self._model.AppendNode(
                 parent=grassdata_node, label=location, data=dict(
                     type='location', name=location))
-            location_nodes.append(varloc)
-            loc_count += 1
 
             Debug.msg(
                 3, "Scanning location <{0}> ({1}/{2})".format(location, loc_count, nlocations))
+            try:
+                maps = self._index.GetLocationMaps(location)
+            except OSError:
+                errors.append(
+                    _("Failed to read mapsets from location <{l}>.").format(
+                        l=location))
+                continue
+            for key, mapsetMaps in maps.items():
+                mapset_node = self._model.AppendNode(
+                    parent=varloc,
+                    label=key, data=dict(
+                        type='mapset', name=key))
+                self._populateMapsetItem(mapset_node, mapsetMaps)
 
-            q = Queue()
-            p = Process(target=getLocationTree,
-                        args=(genv['GISDBASE'], location, q))
-            p.start()
-
-            queue_list.append(q)
-            proc_list.append(p)
-            loc_list.append(location)
-
-            proc_count += 1
-            # Wait for all running processes
-            if proc_count == nprocs or loc_count == nlocations:
-                Debug.msg(4, "Process subresults")
-                for i in range(len(loc_list)):
-                    maps, error = queue_list[i].get()
-                    proc_list[i].join()
-                    if error:
-                        errors.append(error)
-
-                    for key in sorted(maps.keys()):
-                        mapset_node = self._model.AppendNode(
-                            parent=location_nodes[i],
-                            label=key, data=dict(
-                                type='mapset', name=key))
-                        self._populateMapsetItem(mapset_node, maps[key])
-
-                proc_count = 0
-                proc_list = []
-                queue_list = []
-                loc_list = []
-                location_nodes = []
-
+        self._orig_model = self._model
         if errors:
             wx.CallAfter(GWarning, '\n'.join(errors))
         Debug.msg(1, "Tree filled")
@@ -355,7 +206,7 @@ class LocationMapTree(TreeView):
 
     def ReloadTreeItems(self):
         """Reload locations, mapsets and layers in the tree."""
-        self._orig_model = self._model
+        self._model = self._orig_model
         self._model.RemoveNode(self._model.root)
         self.InitTreeItems()
 
@@ -368,7 +219,9 @@ class LocationMapTree(TreeView):
                 child = None
             return child
 
-        genv = gisenv()
+        # reload in the whole tree, filter is applied again
+        filtered = self._model is not self._orig_model
+        self._model = self._orig_model
         locationItem, mapsetItem = self.GetCurrentLocationMapsetNode()
         if not locationItem or not mapsetItem:
             return
@@ -379,33 +232,48 @@ class LocationMapTree(TreeView):
                 self._model.RemoveNode(node)
                 node = get_first_child(mapsetItem)
 
-        q = Queue()
-        p = Process(
-            target=getLocationTree,
-            args=(
-                genv['GISDBASE'],
-                locationItem.data['name'],
-                q,
-                mapsetItem.data['name']))
-        p.start()
-        maps, error = q.get()
-        if error:
-            raise CalledModuleError(error)
-
-        self._populateMapsetItem(mapsetItem, maps[mapsetItem.data['name']])
-        self._orig_model = copy.deepcopy(self._model)
+        try:
+            maps = self._index.GetMaps(locationItem.data['name'],
+                                       mapsetItem.data['name'])
+        except OSError as error:
+            raise CalledModuleError(str(error))
+
+        self._populateMapsetItem(mapsetItem, maps)
+        if filtered:
+            self.Filter(self._filterText)
+            return
         self.RefreshNode(mapsetItem)
         self.RefreshItems()
 
-    def _populateMapsetItem(self, mapset_node, data):
+    def _populateMapsetItem(self, mapset_node, data, model=None):
+        if model is None:
+            model = self._model
         for elem in data:
             if data[elem]:
-                element_node = self._model.AppendNode(
+                element_node = model.AppendNode(
                     parent=mapset_node, label=elem,
                     data=dict(type='element', name=elem))
                 for layer in data[elem]:
-                    self._model.AppendNode(parent=element_node, label=layer,
-                                           data=dict(type=elem, name=layer))
+                    model.AppendNode(parent=element_node, label=layer,
+                                     data=dict(type=elem, name=layer))
+
+    def _createFilteredModel(self, found):
+        """Create tree model from catalog index search result"""
+        model = TreeModel(DataCatalogNode)
+        grassdata_node = model.AppendNode(
+            parent=model.root, label=_('GRASS locations in {0}').format(
+                self._index.gisdbase), data=dict(
+                type='grassdata'))
+        for location, mapsets in found.items():
+            location_node = model.AppendNode(
+                parent=grassdata_node, label=location, data=dict(
+                    type='location', name=location))
+            for mapset, maps in mapsets.items():
+                mapset_node = model.AppendNode(
+                    parent=location_node, label=mapset, data=dict(
+                        type='mapset', name=mapset))
+                self._populateMapsetItem(mapset_node, maps, model=model)
+        return model
 
     def _popupMenuLayer(self):
         """Create popup menu for layers"""
@@ -943,7 +811,20 @@ class DataCatalogTree(LocationMapTree):
             element = None
             name = text.strip()
 
-        self._model = filterModel(self._orig_model, name=name, element=element)
+        self._filterText = text
+        if not name and not element:
+            self._model = self._orig_model
+        elif self._index is None:
+            # tree not loaded yet
+            return
+        else:
+            # maps changed by other programs are listed again
+            self._index.Refresh()
+            try:
+                found = self._index.Search(name=name, element=element)
+            except re.error:
+                return
+            self._model = self._createFilteredModel(found)
         self.RefreshItems()
         self.ExpandCurrentMapset()
 
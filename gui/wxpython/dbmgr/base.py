@@ -37,6 +37,7 @@ import copy
 import types
 import math
 import functools
+import sqlite3
 
 from core import globalvar
 import wx
@@ -53,12 +54,14 @@ import wx.lib.scrolledpanel as scrolled
 
 import grass.script as grass
 from grass.script.utils import decode
+from grass.exceptions import CalledModuleError
 
 from dbmgr.sqlbuilder import SQLBuilderSelect, SQLBuilderUpdate
 from core.gcmd import RunCommand, GException, GError, GMessage, GWarning
 from core.utils import ListOfCatsToRange
 from gui_core.dialogs import CreateNewVector
 from dbmgr.vinfo import VectorDBInfo, GetUnicodeValue, CreateDbInfoDesc
+from dbmgr.datasource import PagedTable
 from core.debug import Debug
 from dbmgr.dialogs import ModifyTableRecord, AddColumnDialog
 from core.settings import UserSettings
@@ -102,6 +105,8 @@ class VirtualAttributeList(ListCtrl,
         self.fieldCalc = None
         self.fieldStats = None
         self.columns = {}  # <- LoadData()
+        # rows read from database when needed (see LoadData)
+        self.pagedTable = None
 
         self.sqlFilter = {}
 
@@ -194,44 +199,58 @@ class VirtualAttributeList(ListCtrl,
         except:
             keyId = -1
 
-        # read data
-        # FIXME: Max. number of rows, while the GUI is still usable
+        if self.pagedTable:
+            self.pagedTable.Close()
+            self.pagedTable = None
+        driver = self.mapDBInfo.layers[layer]['driver']
+        if not sql and keyColumn != 'OGC_FID' and \
+                PagedTable.IsSupported(driver):
+            # rows are read from database only when displayed
+            self.pagedTable = PagedTable(
+                table=tableName, columns=columns, key=keyColumn,
+                driver=driver,
+                database=self.mapDBInfo.layers[layer]['database'],
+                where=where)
+            self.sqlFilter = {"where": where}
+        else:
+            # read data
+            # FIXME: Max. number of rows, while the GUI is still usable
 
-        # stdout can be very large, do not use PIPE, redirect to temp file
-        # TODO: more effective way should be implemented...
+            # stdout can be very large, do not use PIPE, redirect to temp file
+            # TODO: more effective way should be implemented...
 
-        # split on field sep breaks if varchar() column contains the
-        # values, so while sticking with ASCII we make it something
-        # highly unlikely to exist naturally.
-        fs = '{_sep_}'
+            # split on field sep breaks if varchar() column contains the
+            # values, so while sticking with ASCII we make it something
+            # highly unlikely to exist naturally.
+            fs = '{_sep_}'
 
-        outFile = tempfile.NamedTemporaryFile(mode='w+b')
+            outFile = tempfile.NamedTemporaryFile(mode='w+b')
 
-        cmdParams = dict(quiet=True,
-                         parent=self,
-                         flags='c',
-                         separator=fs)
-
-        if sql:
-            cmdParams.update(dict(sql=sql,
-                                  output=outFile.name,
-                                  overwrite=True))
-            ret = RunCommand('db.select',
-                             **cmdParams)
-            self.sqlFilter = {"sql": sql}
-        else:
-            cmdParams.update(dict(map=self.mapDBInfo.map,
-                                  layer=layer,
-                                  where=where,
-                                  stdout=outFile))
+            cmdParams = dict(quiet=True,
+                             parent=self,
+                             flags='c',
+                             separator=fs)
+
+            if sql:
+                cmdParams.update(dict(sql=sql,
+                                      output=outFile.name,
+                                      overwrite=True))
+                ret = RunCommand('db.select',
+                                 **cmdParams)
+                self.sqlFilter = {"sql": sql}
+            else:
+                cmdParams.update(dict(map=self.mapDBInfo.map,
+                                      layer=layer,
+                                      where=where,
+                                      stdout=outFile))
 
-            self.sqlFilter = {"where": where}
+                self.sqlFilter = {"where": where}
 
-            if columns:
-                cmdParams.update(dict(columns=','.join(columns)))
+                if columns:
+                    cmdParams.update(dict(columns=','.join(columns)))
 
-            ret = RunCommand('v.db.select',
-                             **cmdParams)
+                ret = RunCommand('v.db.select',
+                                 **cmdParams)
 
         # These two should probably be passed to init more cleanly
         # setting the numbers of items = number of elements in the dictionary
@@ -266,37 +285,45 @@ class VirtualAttributeList(ListCtrl,
             if i >= 256:
                     self.log.write(_("Can display only 256 columns."))
 
-        i = 0
-        outFile.seek(0)
+        if self.pagedTable:
+            try:
+                self.SetItemCount(self.pagedTable.GetCount())
+            except (sqlite3.Error, CalledModuleError) as e:
+                raise GException(_("Unable to read attribute table "
+                                   "<%(table)s>: %(error)s") %
+                                 {'table': tableName, 'error': e})
+        else:
+            i = 0
+            outFile.seek(0)
 
-        while True:
-            # os.linesep doesn't work here (MSYS)
-            # not sure what the replace is for?
-            # but we need strip to get rid of the ending newline
-            # which on windows leaves \r in a last empty attribute table cell
-            # and causes error
-            record = decode(outFile.readline().strip()).replace('\n', '')
-
-            if not record:
-                break
+            while True:
+                # os.linesep doesn't work here (MSYS)
+                # not sure what the replace is for?
+                # but we need strip to get rid of the ending newline
+                # which on windows leaves \r in a last empty attribute table cell
+                # and causes error
+                record = decode(outFile.readline().strip()).replace('\n', '')
+
+                if not record:
+                    break
 
-            record = record.split(fs)
-            if len(columns) != len(record):
-                GError(parent=self,
-                       message=_("Inconsistent number of columns "
-                                 "in the table <%(table)s>.") %
-                       {'table': tableName})
-                self.columns = {}  # because of IsEmpty method
-                return
+                record = record.split(fs)
+                if len(columns) != len(record):
+                    GError(parent=self,
+                           message=_("Inconsistent number of columns "
+                                     "in the table <%(table)s>.") %
+                           {'table': tableName})
+                    self.columns = {}  # because of IsEmpty method
+                    return
 
-            self.AddDataRow(i, record, columns, keyId)
+                self.AddDataRow(i, record, columns, keyId)
 
-            i += 1
-            if i >= 100000:
-                self.log.write(_("Viewing limit: 100000 records."))
-                break
+                i += 1
+                if i >= 100000:
+                    self.log.write(_("Viewing limit: 100000 records."))
+                    break
 
-        self.SetItemCount(i)
+            self.SetItemCount(i)
 
         if where:
             item = -1
@@ -421,8 +448,30 @@ class VirtualAttributeList(ListCtrl,
         """Returt list"""
         return self
 
+    def GetItemCat(self, item):
+        """Return category of item"""
+        if self.pagedTable:
+            return self.pagedTable.GetKey(item)
+        return self.itemCatsMap[self.itemIndexMap[item]]
+
+    def GetMaxCat(self):
+        """Return maximal category in the table"""
+        if self.pagedTable:
+            return self.pagedTable.GetMaxKey()
+        if len(self.itemCatsMap.values()) > 0:
+            return max(self.itemCatsMap.values())
+        return 0
+
+    def HasCat(self, cat):
+        """Check if there is a record with given category"""
+        if self.pagedTable:
+            return self.pagedTable.HasKey(cat)
+        return cat in self.itemCatsMap.values()
+
     def OnGetItemText(self, item, col):
         """Get item text"""
+        if self.pagedTable:
+            return GetUnicodeValue(self.pagedTable.GetValue(item, col))
         index = self.itemIndexMap[item]
         s = self.itemDataMap[index][col]
         return s
@@ -647,6 +696,14 @@ class VirtualAttributeList(ListCtrl,
     def SortItems(self, sorter=cmp):
         """Sort items"""
         wx.BeginBusyCursor()
+        if self.pagedTable:
+            # sorted by database
+            self.pagedTable.SetOrder(
+                self.GetColumn(self._col).GetText(),
+                ascending=self._colSortFlag[self._col])
+            self.Refresh()
+            wx.EndBusyCursor()
+            return
         items = list(self.itemDataMap.keys())
         items.sort(key=functools.cmp_to_key(self.Sorter))
         self.itemIndexMap = items
@@ -1464,7 +1521,7 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
             return
         table = self.dbMgrData['mapDBInfo'].layers[self.selLayer]['table']
         keyColumn = self.dbMgrData['mapDBInfo'].layers[self.selLayer]['key']
-        cat = tlist.itemCatsMap[tlist.itemIndexMap[item]]
+        cat = tlist.GetItemCat(item)
 
         # (column name, value)
         data = []
@@ -1524,10 +1581,11 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
                                 idx = i
 
                             if column['ctype'] != types.StringType:
-                                tlist.itemDataMap[item][
-                                    idx] = column['ctype'](values[i])
+                                value = column['ctype'](values[i])
                             else:  # -> string
-                                tlist.itemDataMap[item][idx] = values[i]
+                                value = values[i]
+                            if not tlist.pagedTable:
+                                tlist.itemDataMap[item][idx] = value
                         except ValueError:
                             raise ValueError(_("Value '%(value)s' needs to be entered as %(type)s.") %
                                              {'value': str(values[i]),
@@ -1578,11 +1636,8 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
         for i in range(tlist.GetColumnCount()):
             columnName.append(tlist.GetColumn(i).GetText())
 
-        # maximal category number
-        if len(tlist.itemCatsMap.values()) > 0:
-            maxCat = max(tlist.itemCatsMap.values())
-        else:
-            maxCat = 0  # starting category '1'
+        # maximal category number, starting category '1'
+        maxCat = tlist.GetMaxCat()
 
         # key column must be always presented
         if keyColumn not in columnName:
@@ -1619,7 +1674,7 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
                 cat = -1
 
             try:
-                if cat in tlist.itemCatsMap.values():
+                if tlist.HasCat(cat):
                     raise ValueError(_("Record with category number %d "
                                        "already exists in the table.") % cat)
 
@@ -1664,15 +1719,16 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
                 del values[0]
 
             # add new item to the tlist
-            if len(tlist.itemIndexMap) > 0:
-                index = max(tlist.itemIndexMap) + 1
-            else:
-                index = 0
+            if not tlist.pagedTable:
+                if len(tlist.itemIndexMap) > 0:
+                    index = max(tlist.itemIndexMap) + 1
+                else:
+                    index = 0
 
-            tlist.itemIndexMap.append(index)
-            tlist.itemDataMap[index] = values
-            tlist.itemCatsMap[index] = cat
-            tlist.SetItemCount(tlist.GetItemCount() + 1)
+                tlist.itemIndexMap.append(index)
+                tlist.itemDataMap[index] = values
+                tlist.itemCatsMap[index] = cat
+                tlist.SetItemCount(tlist.GetItemCount() + 1)
 
             self.listOfSQLStatements.append('INSERT INTO %s (%s) VALUES(%s)' %
                                             (table,
@@ -1680,6 +1736,8 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
                                              valuesString.rstrip(',')))
 
             self.ApplyCommands(self.listOfCommands, self.listOfSQLStatements)
+            if tlist.pagedTable:
+                tlist.Update()
 
     def OnDataItemDelete(self, event):
         """Delete selected item(s) from the tlist (layer/category pair)"""
@@ -1692,10 +1750,10 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
         indices = []
         # collect SQL statements
         while item != -1:
-            index = dlist.itemIndexMap[item]
-            indices.append(index)
+            if not dlist.pagedTable:
+                indices.append(dlist.itemIndexMap[item])
 
-            cat = dlist.itemCatsMap[index]
+            cat = dlist.GetItemCat(item)
 
             self.listOfSQLStatements.append('DELETE FROM %s WHERE %s=%d' %
                                             (table, key, cat))
@@ -1716,6 +1774,18 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
                 self.listOfSQLStatements = []
                 return False
 
+        if dlist.pagedTable:
+            # deselect items
+            item = dlist.GetFirstSelected()
+            while item != -1:
+                dlist.SetItemState(
+                    item, 0, wx.LIST_STATE_SELECTED | wx.LIST_STATE_FOCUSED)
+                item = dlist.GetNextSelected(item)
+            # submit SQL statements and read rows again
+            self.ApplyCommands(self.listOfCommands, self.listOfSQLStatements)
+            dlist.Update()
+            return True
+
         # restore maps
         i = 0
         indexTemp = copy.copy(dlist.itemIndexMap)
@@ -1759,7 +1829,7 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
                 message=_(
                     "All data records (%d) will be permanently deleted "
                     "from table. Do you want to delete them?") %
-                (len(dlist.itemIndexMap)),
+                (dlist.GetItemCount()),
                 caption=_("Delete records"),
                 style=wx.YES_NO | wx.CENTRE)
             if deleteDialog != wx.YES:
@@ -1769,6 +1839,8 @@ class DbMgrBrowsePage(DbMgrNotebookBase):
         dlist.itemDataMap = {}
         dlist.itemIndexMap = []
         dlist.SetItemCount(0)
+        if dlist.pagedTable:
+            dlist.pagedTable.Reset()
 
         table = self.dbMgrData['mapDBInfo'].layers[self.selLayer]["table"]
         self.listOfSQLStatements.append('DELETE FROM %s' % table)
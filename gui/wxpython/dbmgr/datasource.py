@@ -0,0 +1,203 @@
+"""
+@package dbmgr.datasource
+
+@brief Paged access to rows of attribute tables
+
+List of classes:
+ - datasource::PagedTable
+
+(C) 2020 by the GRASS Development Team
+
+This program is free software under the GNU General Public License
+(>=v2). Read the file COPYING that comes with GRASS for details.
+"""
+
+import sqlite3
+from collections import OrderedDict
+
+import grass.script as grass
+from grass.script.utils import decode
+
+
+class PagedTable(object):
+    """Rows of an attribute table read page by page.
+
+    Only pages which are requested (e.g. visible in a list) are read
+    from the database, together with a few following pages. Sorting
+    and filtering is done by the database (ORDER BY, WHERE), so
+    the table is never loaded as a whole. Does not depend on wx.
+
+    >>> table = PagedTable('mytable', ['cat', 'name'], key='cat',
+    ...                    driver='sqlite', database='/path/to/db')
+    >>> table.GetCount()  # doctest: +SKIP
+    2000000
+    >>> table.SetOrder('name', ascending=False)
+    >>> table.GetValue(100000, 1)  # doctest: +SKIP
+    'Zurich'
+    """
+    #: drivers supporting LIMIT and OFFSET
+    drivers = ('sqlite', 'pg', 'mysql')
+
+    def __init__(self, table, columns, key, driver, database, where=None,
+                 pageSize=500, readAhead=1, maxPages=20):
+        """
+
+        :param table: table name
+        :param columns: list of columns
+        :param key: key column (used to order rows with same values)
+        :param driver: database driver
+        :param database: database name
+        :param where: WHERE condition without WHERE keyword
+        :param pageSize: number of rows read at once
+        :param readAhead: number of pages read after the requested one
+        :param maxPages: number of pages kept in memory
+        """
+        self.table = table
+        self.columns = list(columns)
+        self.key = key
+        self.driver = driver
+        self.database = database
+        self.pageSize = pageSize
+        self.readAhead = readAhead
+        self.maxPages = maxPages
+
+        # key column is read always to get categories
+        self._selected = list(self.columns)
+        if key not in self._selected:
+            self._selected.append(key)
+        self._keyIndex = self._selected.index(key)
+
+        self._where = where
+        self._orderBy = None
+        self._ascending = True
+        self._pages = OrderedDict()
+        self._count = None
+        self._connection = None
+
+    @classmethod
+    def IsSupported(cls, driver):
+        """Checks if rows can be read by pages with given driver"""
+        return driver in cls.drivers
+
+    def _toString(self, value):
+        """Formats value as db.select does"""
+        if value is None:
+            return ''
+        if isinstance(value, float):
+            return '%.15g' % value
+        if isinstance(value, bytes):
+            return decode(value)
+        return value if isinstance(value, type(u'')) else u'%s' % value
+
+    def _execute(self, sql):
+        """Executes SELECT statement
+
+        :return: list of rows, values as strings
+        """
+        if self.driver == 'sqlite':
+            if self._connection is None:
+                self._connection = sqlite3.connect(self.database)
+            return [[self._toString(value) for value in row]
+                    for row in self._connection.execute(sql)]
+        return [list(row) for row in grass.db_select(
+            sql=sql, driver=self.driver, database=self.database,
+            sep='{_sep_}')]
+
+    def _getWhereClause(self):
+        if self._where:
+            return ' WHERE %s' % self._where
+        return ''
+
+    def _getOrderClause(self):
+        direction = 'ASC' if self._ascending else 'DESC'
+        if self._orderBy in (None, self.key):
+            return ' ORDER BY %s %s' % (self.key, direction)
+        # key makes order of rows with the same values stable
+        return ' ORDER BY %s %s, %s ASC' % (self._orderBy, direction,
+                                            self.key)
+
+    def _readPages(self, first, count):
+        """Reads count pages starting with page first"""
+        rows = self._execute('SELECT %s FROM %s%s%s LIMIT %d OFFSET %d' % (
+            ','.join(self._selected), self.table, self._getWhereClause(),
+            self._getOrderClause(), count * self.pageSize,
+            first * self.pageSize))
+        for i in range(count):
+            self._pages[first + i] = \
+                rows[i * self.pageSize:(i + 1) * self.pageSize]
+        while len(self._pages) > self.maxPages:
+            self._pages.popitem(last=False)
+
+    def GetCount(self):
+        """Returns number of rows (counted by the database)"""
+        if self._count is None:
+            rows = self._execute('SELECT COUNT(*) FROM %s%s' % (
+                self.table, self._getWhereClause()))
+            self._count = int(rows[0][0]) if rows else 0
+        return self._count
+
+    def GetRow(self, index):
+        """Returns values of row with given index as list of strings"""
+        if not 0 <= index < self.GetCount():
+            raise IndexError(index)
+        page = index // self.pageSize
+        if page in self._pages:
+            # mark as recently used
+            self._pages[page] = self._pages.pop(page)
+        else:
+            count = 1
+            while count <= self.readAhead and \
+                    page + count not in self._pages and \
+                    (page + count) * self.pageSize < self.GetCount():
+                count += 1
+            self._readPages(page, count)
+        rows = self._pages[page]
+        offset = index % self.pageSize
+        if offset >= len(rows):
+            # table changed since counting
+            return [''] * len(self._selected)
+        return rows[offset]
+
+    def GetValue(self, index, column):
+        """Returns value in row index and column index column"""
+        return self.GetRow(index)[column]
+
+    def GetKey(self, index):
+        """Returns key (category) of row with given index"""
+        value = self.GetRow(index)[self._keyIndex]
+        return int(value) if value else None
+
+    def GetMaxKey(self):
+        """Returns maximal key in the table (0 for empty table)"""
+        rows = self._execute('SELECT MAX(%s) FROM %s' % (self.key,
+                                                         self.table))
+        return int(rows[0][0]) if rows and rows[0][0] else 0
+
+    def HasKey(self, key):
+        """Checks if there is a row with given key in the table"""
+        rows = self._execute('SELECT COUNT(*) FROM %s WHERE %s = %d' % (
+            self.table, self.key, key))
+        return bool(rows and int(rows[0][0]))
+
+    def SetOrder(self, column, ascending=True):
+        """Sets column used for sorting rows"""
+        self._orderBy = column
+        self._ascending = ascending
+        self._pages.clear()
+
+    def SetWhere(self, where):
+        """Sets filter (WHERE condition without WHERE keyword)"""
+        self._where = where
+        self.Reset()
+
+    def Reset(self):
+        """Forgets read rows and count, e.g. when the table changed"""
+        self._pages.clear()
+        self._count = None
+
+    def Close(self):
+        """Closes database connection"""
+        self._pages.clear()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,96 @@
+"""Tests of paged reading of attribute tables
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from grass.script.setup import set_gui_path
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+
+set_gui_path()
+
+from dbmgr.datasource import PagedTable
+
+
+class TestPagedTable(TestCase):
+
+    count = 1050
+
+    @classmethod
+    def setUpClass(cls):
+        fd, cls.database = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        connection = sqlite3.connect(cls.database)
+        connection.execute(
+            "CREATE TABLE points (cat INTEGER, name TEXT, value DOUBLE)")
+        connection.executemany(
+            "INSERT INTO points VALUES (?, ?, ?)",
+            [(i, 'name%d' % (i % 10), i / 4. if i % 7 else None)
+             for i in range(1, cls.count + 1)])
+        connection.commit()
+        connection.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.database)
+
+    def setUp(self):
+        self.table = PagedTable('points', ['cat', 'name', 'value'],
+                                key='cat', driver='sqlite',
+                                database=self.database, pageSize=100,
+                                maxPages=3)
+
+    def tearDown(self):
+        self.table.Close()
+
+    def test_count(self):
+        self.assertEqual(self.table.GetCount(), self.count)
+        self.table.SetWhere("name = 'name1'")
+        self.assertEqual(self.table.GetCount(), 105)
+
+    def test_values(self):
+        self.assertEqual(self.table.GetRow(0), ['1', 'name1', '0.25'])
+        self.assertEqual(self.table.GetRow(1048), ['1049', 'name9', '262.25'])
+        # NULL
+        self.assertEqual(self.table.GetValue(6, 2), '')
+        self.assertEqual(self.table.GetKey(500), 501)
+        self.assertRaises(IndexError, self.table.GetRow, self.count)
+
+    def test_pages(self):
+        self.table.GetRow(250)
+        # requested page and one page ahead
+        self.assertEqual(sorted(self.table._pages.keys()), [2, 3])
+        self.table.GetRow(0)
+        self.table.GetRow(800)
+        self.assertLessEqual(len(self.table._pages), 3)
+        self.assertNotIn(2, self.table._pages)
+
+    def test_order(self):
+        self.table.SetOrder('name', ascending=False)
+        self.assertEqual(self.table.GetRow(0)[:2], ['9', 'name9'])
+        self.assertEqual(self.table.GetRow(1)[:2], ['19', 'name9'])
+        self.table.SetOrder('cat', ascending=False)
+        self.assertEqual(self.table.GetKey(0), self.count)
+
+    def test_key_not_displayed(self):
+        table = PagedTable('points', ['name'], key='cat', driver='sqlite',
+                           database=self.database)
+        self.assertEqual(table.GetRow(2), ['name3', '3'])
+        self.assertEqual(table.GetKey(2), 3)
+        table.Close()
+
+    def test_keys(self):
+        self.assertEqual(self.table.GetMaxKey(), self.count)
+        self.assertTrue(self.table.HasKey(10))
+        self.assertFalse(self.table.HasKey(self.count + 1))
+
+
+if __name__ == '__main__':
+    test()
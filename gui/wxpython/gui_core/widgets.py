@@ -83,6 +83,7 @@ else:
     from wx import PyValidator as Validator
 
 from grass.script import core as grass
+from grass.script.module_index import get_index as get_module_index
 
 from grass.pydispatch.signal import Signal
 
@@ -1062,6 +1063,7 @@ class SearchModuleWidget(wx.Panel):
         self._resultIndex = -1
         self._searchKeys = ['description', 'keywords', 'command']
         self._oldValue = ''
+        self._moduleIndex = None
 
         self.moduleSelected = Signal('SearchModuleWidget.moduleSelected')
         self.showSearchResult = Signal('SearchModuleWidget.showSearchResult')
@@ -1176,8 +1178,23 @@ class SearchModuleWidget(wx.Panel):
         for key in keys:
             nodes.update(self._model.SearchNodes(key=key, value=value))
 
+        scores = {}
+        if value and 'keywords' in keys and self._getModuleIndex():
+            # modules found in the index (also by manual pages), other
+            # items (without module) as before
+            scores = self._moduleIndex.search(
+                value, fields=('name', 'description', 'keywords', 'manual'))
+            nodes = set(node for node in nodes
+                        if not self._getModuleName(node))
+            nodes.update(node for node in
+                         self._model.SearchNodes(key='command', value='*')
+                         if self._getModuleName(node) in scores)
+
         nodes = list(nodes)
-        nodes.sort(key=lambda node: self._model.GetIndexOfNode(node))
+        # most relevant first, then in the order of the tree
+        nodes.sort(key=lambda node: (
+            -scores.get(self._getModuleName(node), 0),
+            self._model.GetIndexOfNode(node)))
         self._results = nodes
         self._resultIndex = -1
         commands = sorted([node.data['command']
@@ -1185,6 +1202,26 @@ class SearchModuleWidget(wx.Panel):
 
         return commands
 
+    def _getModuleIndex(self):
+        """Get full-text index of modules, loaded on first use
+
+        :return: index or None when it is not available
+        """
+        if self._moduleIndex is None:
+            try:
+                self._moduleIndex = get_module_index()
+            except (IOError, OSError, SyntaxError) as error:
+                Debug.msg(1, "SearchModuleWidget: index of modules not "
+                          "available: %s" % error)
+                self._moduleIndex = False
+        return self._moduleIndex or None
+
+    def _getModuleName(self, node):
+        """Get name of module of a node (None for other nodes)"""
+        if not node.data or not node.data.get('command'):
+            return None
+        return node.data['command'].split()[0]
+
     def OnSelectModule(self, event):
         """Module selected from choice, update command prompt"""
         cmd = self._searchChoice.GetStringSelection()
@@ -239,19 +239,18 @@ class WrapperPrinter:
     def print_fixed_function(self, function):
         self.srcinfo(function.src)
 
-        # If we know what library the function lives in, look there.
-        # Otherwise, check all the libraries.
+        # If we know what library the function lives in, the prototype is
+        # set when the function is called for the first time.
         if function.source_library:
-            print("if hasattr(_libs[%r], %r):" %
-                  (function.source_library, function.c_name()), file=self.file)
-            print("    %s = _libs[%r].%s" %
-                  (function.py_name(), function.source_library, function.c_name()), file=self.file)
-        else:
-            print("for _lib in six.itervalues(_libs):", file=self.file)
-            print("    if not hasattr(_lib, %r):" % function.c_name(), file=self.file)
-            print("        continue", file=self.file)
-            print("    %s = _lib.%s" %
-                  (function.py_name(), function.c_name()), file=self.file)
+            self.print_lazy_function(function)
+            return
+
+        # Otherwise, check all the libraries.
+        print("for _lib in six.itervalues(_libs):", file=self.file)
+        print("    if not hasattr(_lib, %r):" % function.c_name(), file=self.file)
+        print("        continue", file=self.file)
+        print("    %s = _lib.%s" %
+              (function.py_name(), function.c_name()), file=self.file)
 
         # Argument types
         print("    %s.argtypes = [%s]" % (function.py_name(),
@@ -274,8 +273,27 @@ class WrapperPrinter:
                 print ("    %s.errcheck = %s" %
                        (function.py_name(), function.errcheck.py_string()), file=self.file)
 
-        if not function.source_library:
-            print("    break", file=self.file)
+        print("    break", file=self.file)
+
+    def print_lazy_function(self, function):
+        argtypes = ', '.join([a.py_string() for a in function.argtypes])
+        if function.restype.py_string() == "String":
+            restype = "ReturnString if sizeof(c_int) == sizeof(c_void_p) " \
+                "else String"
+            errcheck = "None if sizeof(c_int) == sizeof(c_void_p) " \
+                "else ReturnString"
+        else:
+            restype = function.restype.py_string()
+            errcheck = function.errcheck.py_string() if function.errcheck \
+                else "None"
+        py_name = ""
+        if function.py_name() != function.c_name():
+            py_name = ", %r" % function.py_name()
+        print("%s = _lazy_function(_libs[%r], %r," %
+              (function.py_name(), function.source_library,
+               function.c_name()), file=self.file)
+        print("    lambda: ([%s], %s, %s), globals()%s)" %
+              (argtypes, restype, errcheck, py_name), file=self.file)
 
     def print_variadic_function(self, function):
         self.srcinfo(function.src)
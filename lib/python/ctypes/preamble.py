@@ -383,3 +383,44 @@ class _variadic_function(object):
             fixed_args.append(argtype.from_param(args[i]))
             i += 1
         return self.func(*fixed_args + list(args[i:]))
+
+# Setting argument and return types of all functions takes most of the
+# time needed to import the module, so the prototype of a function is set
+# when the function is used for the first time
+
+
+class _lazy_function(object):
+
+    def __init__(self, lib, name, prototype, namespace=None, py_name=None):
+        self.lib = lib
+        self.name = name
+        # function returning (argtypes, restype, errcheck)
+        self.prototype = prototype
+        self.namespace = namespace
+        self.py_name = py_name or name
+        self.func = None
+
+    def bind(self):
+        if self.func is None:
+            func = getattr(self.lib, self.name)
+            argtypes, restype, errcheck = self.prototype()
+            func.argtypes = argtypes
+            func.restype = restype
+            if errcheck:
+                func.errcheck = errcheck
+            self.func = func
+            if self.namespace is not None:
+                # replace the wrapper in the module by the function itself
+                self.namespace[self.py_name] = func
+        return self.func
+
+    def __call__(self, *args):
+        return self.bind()(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.bind(), name)
+
+    @property
+    def _as_parameter_(self):
+        # So we can pass this function as a function pointer
+        return self.bind()
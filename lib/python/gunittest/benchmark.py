@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+"""GRASS Python testing framework benchmarks
+
+Benchmark cases are test cases which measure how long some code runs
+instead of (or in addition to) checking its results. They are written
+as any other test file but they are placed in a ``benchmark`` directory
+(instead of ``testsuite``) so that they do not slow down standard test
+runs. To run them use::
+
+    python -m grass.gunittest.main --location nc_spm_grass7 \\
+        --location-type nc --benchmarks
+
+Each benchmark file stores its measurements into a JSON file in its
+report directory. The results can be collected into a store keyed by
+the source code revision and compared with a baseline::
+
+    python -m grass.gunittest.benchmark collect testreport \\
+        --store benchmarks.json
+    python -m grass.gunittest.benchmark compare benchmarks.json \\
+        --baseline <revision> --tolerance 0.1
+
+Copyright (C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS GIS
+for details.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import gc
+import json
+import time
+import datetime
+import argparse
+import subprocess
+
+try:
+    import resource
+except ImportError:
+    # not available on MS Windows
+    resource = None
+
+from .case import TestCase
+
+
+BENCHMARK_RESULT_FILE = 'benchmark_result.json'
+BENCHMARK_DIR = 'benchmark'
+
+try:
+    # high resolution clock, available in Python 3
+    _wall_clock = time.perf_counter
+except AttributeError:
+    _wall_clock = time.time
+
+
+def get_git_revision(path='.'):
+    """Get Git revision (commit hash) of the source code
+
+    The environmental variable ``GRASS_BENCHMARK_REVISION``
+    takes precedence over the revision obtained from Git.
+
+    :param path: directory inside the Git repository
+    :returns: revision as string or None if it is not possible to get
+    """
+    revision = os.environ.get('GRASS_BENCHMARK_REVISION')
+    if revision:
+        return revision
+    try:
+        p = subprocess.Popen(['git', 'rev-parse', '--short', 'HEAD'],
+                             cwd=path,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError:
+        # git is not installed
+        return None
+    stdout, stderr = p.communicate()
+    if p.returncode:
+        return None
+    return stdout.decode().strip()
+
+
+def cpu_time():
+    """Get user and system CPU time of this process and its children
+
+    Children are included because most benchmarks run GRASS modules.
+    Children are accounted for only after they finished.
+    """
+    times = os.times()
+    return times[0] + times[1] + times[2] + times[3]
+
+
+def peak_rss():
+    """Get peak resident set size of this process or its children in kB
+
+    The value is the maximum reached so far, so it never decreases
+    during the lifetime of the process.
+
+    :returns: size in kB or None if not available on this platform
+    """
+    if resource is None:
+        return None
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    if sys.platform == 'darwin':
+        # bytes on macOS, kB elsewhere
+        rss = rss // 1024
+    return rss
+
+
+def median(values):
+    """Get median of a non-empty sequence of numbers"""
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2.0
+
+
+def measure(function, repeat=5, warmup=1, setup=None):
+    """Measure how long a function runs
+
+    >>> result = measure(lambda: sum(range(100)), repeat=3, warmup=0)
+    >>> result['repeat']
+    3
+    >>> len(result['wall_times'])
+    3
+
+    :param function: function without parameters to be measured
+    :param int repeat: number of measured runs
+    :param int warmup: number of runs before measurement
+        (fills caches, loads libraries)
+    :param setup: function without parameters called before each run,
+        its run time is not measured
+    :returns: dictionary with wall and CPU times in seconds
+        (median and minimum) and peak RSS in kB
+    """
+    if repeat < 1:
+        raise ValueError("Number of repetitions must be at least 1")
+    for unused in range(warmup):
+        if setup:
+            setup()
+        function()
+    wall_times = []
+    cpu_times = []
+    for unused in range(repeat):
+        if setup:
+            setup()
+        # avoid measuring garbage collection of previous runs
+        gc.collect()
+        start_cpu = cpu_time()
+        start_wall = _wall_clock()
+        function()
+        wall_times.append(_wall_clock() - start_wall)
+        cpu_times.append(cpu_time() - start_cpu)
+    return dict(wall=median(wall_times), wall_min=min(wall_times),
+                cpu=median(cpu_times), cpu_min=min(cpu_times),
+                max_rss=peak_rss(), repeat=repeat, warmup=warmup,
+                wall_times=wall_times)
+
+
+def load_results(filename):
+    """Load benchmark results or store from a JSON file
+
+    :returns: dictionary (empty if the file does not exist)
+    """
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r') as json_file:
+        return json.load(json_file)
+
+
+def save_results(filename, results):
+    """Save benchmark results or store to a JSON file"""
+    with open(filename, 'w') as json_file:
+        json.dump(results, json_file, indent=2, sort_keys=True)
+
+
+def collect_results(report_dir):
+    """Collect results of all benchmark files from a test report
+
+    :param report_dir: root directory of a report created by
+        ``grass.gunittest.main``
+    :returns: dictionary with revision, timestamp and all benchmarks
+        (keyed by benchmark name)
+    """
+    collected = dict(revision=None, timestamp=None, benchmarks={})
+    for root, dirs, files in os.walk(report_dir):
+        dirs.sort()  # deterministic order
+        if BENCHMARK_RESULT_FILE not in files:
+            continue
+        result = load_results(os.path.join(root, BENCHMARK_RESULT_FILE))
+        if not collected['revision']:
+            collected['revision'] = result.get('revision')
+        timestamp = result.get('timestamp')
+        if timestamp and (not collected['timestamp']
+                          or timestamp < collected['timestamp']):
+            collected['timestamp'] = timestamp
+        collected['benchmarks'].update(result.get('benchmarks', {}))
+    return collected
+
+
+def add_to_store(store, results, revision=None):
+    """Add collected results to a store keyed by revision
+
+    Results for the same revision are replaced.
+    """
+    if revision is None:
+        revision = results.get('revision') or 'unknown'
+    store[revision] = dict(timestamp=results.get('timestamp'),
+                           benchmarks=results['benchmarks'])
+    return store
+
+
+def latest_revision(store, exclude=None):
+    """Get revision with the newest timestamp from the store"""
+    revisions = [(value.get('timestamp') or '', revision)
+                 for revision, value in store.items()
+                 if revision != exclude]
+    if not revisions:
+        return None
+    return max(revisions)[1]
+
+
+def compare_results(current, baseline, tolerance=0.1, key='wall'):
+    """Compare benchmarks with baseline benchmarks
+
+    >>> compare_results({'a': {'wall': 2.0}, 'b': {'wall': 1.0}},
+    ...                 {'a': {'wall': 1.0}, 'b': {'wall': 1.0}})
+    [('a', 1.0, 2.0, 2.0)]
+
+    :param current: dictionary of benchmarks (name: statistics)
+    :param baseline: dictionary of benchmarks to compare with
+    :param float tolerance: allowed relative slowdown
+        (0.1 means 10 % slower is still fine)
+    :param key: statistic to compare
+    :returns: list of (name, baseline value, current value, ratio)
+        for benchmarks slower than tolerance, sorted by name
+    """
+    regressions = []
+    for name in sorted(current):
+        if name not in baseline:
+            continue
+        old = baseline[name].get(key)
+        new = current[name].get(key)
+        if not old or new is None:
+            continue
+        ratio = float(new) / old
+        if ratio > 1 + tolerance:
+            regressions.append((name, old, new, ratio))
+    return regressions
+
+
+def get_baseline():
+    """Get baseline benchmarks according to environmental variables
+
+    ``GRASS_BENCHMARK_BASELINE`` is a path to a store created by
+    ``collect`` and ``GRASS_BENCHMARK_BASELINE_REVISION`` selects
+    the revision (the newest one is used by default).
+
+    :returns: dictionary of benchmarks or None when not set
+    """
+    filename = os.environ.get('GRASS_BENCHMARK_BASELINE')
+    if not filename:
+        return None
+    store = load_results(filename)
+    revision = os.environ.get('GRASS_BENCHMARK_BASELINE_REVISION')
+    if not revision:
+        revision = latest_revision(store)
+    if revision not in store:
+        return None
+    return store[revision]['benchmarks']
+
+
+class BenchmarkCase(TestCase):
+    """Test case for measuring performance
+
+    Use :meth:`benchmark` method in test methods::
+
+        class TestRasterRead(BenchmarkCase):
+
+            def test_read_rows(self):
+                self.benchmark(read_all_rows, repeat=10)
+
+    When a baseline is set (see :func:`get_baseline`), the test fails
+    if the benchmark is slower than the baseline by more than
+    the tolerance. The tolerance can be set by class attribute or by
+    ``GRASS_BENCHMARK_TOLERANCE`` variable.
+    """
+    repeat = 5
+    warmup = 1
+    tolerance = 0.2
+    _benchmark_results = None
+
+    @classmethod
+    def setUpClass(cls):
+        super(BenchmarkCase, cls).setUpClass()
+        cls._benchmark_results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        super(BenchmarkCase, cls).tearDownClass()
+        if not cls._benchmark_results:
+            return
+        # more classes in one file write to the same file
+        results = load_results(BENCHMARK_RESULT_FILE)
+        if not results:
+            module = sys.modules.get(cls.__module__)
+            source_dir = os.path.dirname(
+                os.path.abspath(getattr(module, '__file__', '.')))
+            results = dict(
+                revision=get_git_revision(source_dir),
+                timestamp=datetime.datetime.now().strftime(
+                    '%Y-%m-%d %H:%M:%S'),
+                benchmarks={})
+        results['benchmarks'].update(cls._benchmark_results)
+        save_results(BENCHMARK_RESULT_FILE, results)
+
+    def benchmark(self, function, name=None, repeat=None, warmup=None,
+                  setup=None, tolerance=None):
+        """Measure a function and compare it with baseline if available
+
+        :param function: function without parameters to be measured
+        :param name: name of the benchmark (test method name by default),
+            it is prefixed by the file and class name
+        :param int repeat: number of measured runs
+        :param int warmup: number of runs before measurement
+        :param setup: function called before each run (not measured)
+        :param float tolerance: allowed relative slowdown
+
+        :returns: dictionary with measured values (see :func:`measure`)
+        """
+        if name is None:
+            name = self._testMethodName
+        # file name is included since class names repeat across files
+        module = sys.modules.get(self.__class__.__module__)
+        file_name = os.path.splitext(
+            os.path.basename(getattr(module, '__file__', '')))[0]
+        name = '{file}.{cls}.{name}'.format(
+            file=file_name, cls=self.__class__.__name__, name=name)
+        result = measure(function,
+                         repeat=self.repeat if repeat is None else repeat,
+                         warmup=self.warmup if warmup is None else warmup,
+                         setup=setup)
+        self._benchmark_results[name] = result
+        baseline = get_baseline()
+        if baseline:
+            if tolerance is None:
+                tolerance = float(os.environ.get('GRASS_BENCHMARK_TOLERANCE',
+                                                 self.tolerance))
+            regressions = compare_results({name: result}, baseline,
+                                          tolerance=tolerance)
+            if regressions:
+                unused, old, new, ratio = regressions[0]
+                self.fail("Benchmark {name} is {per:.0f}% slower than"
+                          " baseline ({new:.4f}s instead of {old:.4f}s)"
+                          .format(name=name, per=(ratio - 1) * 100,
+                                  new=new, old=old))
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Collect and compare benchmark results')
+    subparsers = parser.add_subparsers(dest='command')
+    collect = subparsers.add_parser(
+        'collect', help='Add results from test report to a store')
+    collect.add_argument('report', help='Directory with test report')
+    collect.add_argument('--store', required=True,
+                         help='JSON file with results keyed by revision')
+    collect.add_argument('--revision', default=None,
+                         help='Revision to use as key'
+                              ' (taken from results by default)')
+    compare = subparsers.add_parser(
+        'compare', help='Compare results of two revisions in a store')
+    compare.add_argument('store', help='JSON file with results')
+    compare.add_argument('--baseline', default=None,
+                         help='Baseline revision'
+                              ' (the newest one except current by default)')
+    compare.add_argument('--revision', default=None,
+                         help='Revision to compare (the newest by default)')
+    compare.add_argument('--tolerance', type=float, default=0.1,
+                         help='Allowed relative slowdown (0.1 is 10%%)')
+    args = parser.parse_args()
+
+    if args.command == 'collect':
+        results = collect_results(args.report)
+        if not results['benchmarks']:
+            sys.stderr.write("No benchmark results in <%s>\n" % args.report)
+            return 1
+        store = load_results(args.store)
+        add_to_store(store, results, revision=args.revision)
+        save_results(args.store, store)
+        return 0
+    elif args.command == 'compare':
+        store = load_results(args.store)
+        revision = args.revision or latest_revision(store)
+        baseline = args.baseline or latest_revision(store, exclude=revision)
+        for name in (revision, baseline):
+            if name not in store:
+                sys.stderr.write("Revision <%s> not in the store\n" % name)
+                return 1
+        regressions = compare_results(store[revision]['benchmarks'],
+                                      store[baseline]['benchmarks'],
+                                      tolerance=args.tolerance)
+        for name, old, new, ratio in regressions:
+            print("{name}: {old:.4f}s -> {new:.4f}s ({per:+.0f}%)".format(
+                name=name, old=old, new=new, per=(ratio - 1) * 100))
+        return 1 if regressions else 0
+    parser.print_help()
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -11,8 +11,10 @@ for details.
 
 import os
 import sys
+import time
 import shutil
 import subprocess
+from multiprocessing.pool import ThreadPool
 
 from .checkers import text_to_keyvalue
 
@@ -22,7 +24,7 @@ from .reporters import (GrassTestFilesMultiReporter,
                         TestsuiteDirReporter, GrassTestFilesKeyValueReporter,
                         get_svn_path_authors,
                         NoopFileAnonymizer, keyvalue_to_text)
-from .utils import silent_rmtree, ensure_dir
+from .utils import silent_rmtree, ensure_dir, link_or_copy_tree
 
 from grass.script.utils import decode, encode, _get_encoding
 
@@ -41,7 +43,7 @@ import collections
 
 
 # TODO: this might be more extend then update
-def update_keyval_file(filename, module, returncode):
+def update_keyval_file(filename, module, returncode, wall_time=None):
     if os.path.exists(filename):
         with open(filename, 'r') as keyval_file:
             keyval = text_to_keyvalue(keyval_file.read(), sep='=')
@@ -61,6 +63,9 @@ def update_keyval_file(filename, module, returncode):
         keyval['status'] = 'failed' if returncode else 'passed'
     keyval['returncode'] = returncode
     keyval['test_file_authors'] = test_file_authors
+    if wall_time is not None:
+        # seconds of wall clock time including process start
+        keyval['time'] = wall_time
 
     with open(filename, 'w') as keyval_file:
         keyval_file.write(keyvalue_to_text(keyval))
@@ -76,7 +81,8 @@ class GrassTestFilesInvoker(object):
     # we can also save only failed tests, or generate only if assert fails
     def __init__(self, start_dir,
                  clean_mapsets=True, clean_outputs=True, clean_before=True,
-                 testsuite_dir='testsuite', file_anonymizer=None):
+                 testsuite_dir='testsuite', file_anonymizer=None,
+                 jobs=1, link_data=None):
         """
 
         :param bool clean_mapsets: if the mapsets should be removed
@@ -85,12 +91,19 @@ class GrassTestFilesInvoker(object):
         :param bool clean_before: if mapsets, outputs, and results
             should be removed before the tests start
             (advantageous when the previous run left everything behind)
+        :param int jobs: number of test files executed at the same time
+        :param bool link_data: if test data directories should be linked
+            instead of copied (by default linked when running in parallel)
         """
         self.start_dir = start_dir
         self.clean_mapsets = clean_mapsets
         self.clean_outputs = clean_outputs
         self.clean_before = clean_before
         self.testsuite_dir = testsuite_dir  # TODO: solve distribution of this constant
+        self.jobs = max(1, jobs)
+        if link_data is None:
+            link_data = self.jobs > 1
+        self.link_data = link_data
         # reporter is created for each call of run_in_location()
         self.reporter = None
 
@@ -126,18 +139,19 @@ class GrassTestFilesInvoker(object):
                     os.path.join(mapset_dir, 'WIND'))
         return mapset, mapset_dir
 
-    def _run_test_module(self, module, results_dir, gisdbase, location):
-        """Run one test file."""
-        self.testsuite_dirs[module.tested_dir].append(module.name)
+    def _prepare_test_module(self, module, results_dir, gisdbase, location):
+        """Create directories, mapset and environment for one test file.
+
+        :returns: dictionary with the paths and the environment needed
+            to execute the test file and to clean up after it
+        """
         cwd = os.path.join(results_dir, module.tested_dir, module.name)
+        ensure_dir(os.path.abspath(cwd))
         data_dir = os.path.join(module.file_dir, 'data')
+        data_link = None
         if os.path.exists(data_dir):
-            # TODO: link dir instead of copy tree and remove link afterwads
-            # (removing is good because of testsuite dir in samplecode)
-            # TODO: use different dir name in samplecode and test if it works
-            shutil.copytree(data_dir, os.path.join(cwd, 'data'),
-                            ignore=shutil.ignore_patterns('*.svn*'))
-        ensure_dir(os.path.abspath(cwd))
+            data_link = link_or_copy_tree(
+                data_dir, os.path.join(cwd, 'data'), link=self.link_data)
         # TODO: put this to constructor and copy here again
         env = os.environ.copy()
         mapset, mapset_dir = self._create_mapset(gisdbase, location, module)
@@ -151,12 +165,30 @@ class GrassTestFilesInvoker(object):
         env['GISRC'] = gisrc
         # percentage in plain format is 0...10...20... ...100
         env['GRASS_MESSAGE_FORMAT'] = 'plain'
-
+        if self.jobs > 1:
+            # tests running at the same time should not see each other's
+            # temporary files, mapset is already unique for each test file
+            tmp_dir = os.path.join(mapset_dir, '.tmp', 'gunittest')
+            ensure_dir(tmp_dir)
+            for name in ('TMPDIR', 'TEMP', 'TMP'):
+                env[name] = tmp_dir
+        return dict(cwd=cwd, env=env, gisrc=gisrc, mapset_dir=mapset_dir,
+                    data_link=data_link)
+
+    def _execute_test_module(self, module, cwd, env):
+        """Execute one test file and store its outputs in *cwd*.
+
+        This does not use the reporter, so it can run in parallel
+        with other test files.
+
+        :returns: tuple with return code, paths to stdout and stderr files
+            and the key-value summary of the test file
+        """
         stdout_path = os.path.join(cwd, 'stdout.txt')
         stderr_path = os.path.join(cwd, 'stderr.txt')
 
-        self.reporter.start_file_test(module)
         # TODO: we might clean the directory here before test if non-empty
+        start_time = time.time()
 
         if module.file_type == 'py':
             # ignoring shebang line to use current Python
@@ -193,6 +225,7 @@ class GrassTestFilesInvoker(object):
                                  stderr=subprocess.PIPE)
         stdout, stderr = p.communicate()
         returncode = p.returncode
+        wall_time = time.time() - start_time
         encodings = [_get_encoding(), 'utf8', 'latin-1', 'ascii']
         detected = False
         idx = 0
@@ -228,17 +261,77 @@ class GrassTestFilesInvoker(object):
 
         test_summary = update_keyval_file(
             os.path.join(os.path.abspath(cwd), 'test_keyvalue_result.txt'),
-            module=module, returncode=returncode)
-        self.reporter.end_file_test(module=module, cwd=cwd,
-                                    returncode=returncode,
-                                    stdout=stdout_path, stderr=stderr_path,
-                                    test_summary=test_summary)
+            module=module, returncode=returncode, wall_time=wall_time)
+        return returncode, stdout_path, stderr_path, test_summary
+
+    def _clean_test_module(self, gisrc, mapset_dir, data_link, **kwargs):
+        """Remove what was created for one test file"""
         # TODO: add some try-except or with for better error handling
         os.remove(gisrc)
+        if data_link:
+            # only the link is removed, never the linked data
+            os.remove(data_link)
         # TODO: only if clean up
         if self.clean_mapsets:
             shutil.rmtree(mapset_dir)
 
+    def _run_test_module(self, module, results_dir, gisdbase, location):
+        """Run one test file."""
+        self.testsuite_dirs[module.tested_dir].append(module.name)
+        prepared = self._prepare_test_module(module=module,
+                                             results_dir=results_dir,
+                                             gisdbase=gisdbase,
+                                             location=location)
+        cwd = prepared['cwd']
+        self.reporter.start_file_test(module)
+        returncode, stdout_path, stderr_path, test_summary = \
+            self._execute_test_module(module=module, cwd=cwd,
+                                      env=prepared['env'])
+        self.reporter.end_file_test(module=module, cwd=cwd,
+                                    returncode=returncode,
+                                    stdout=stdout_path, stderr=stderr_path,
+                                    test_summary=test_summary)
+        self._clean_test_module(**prepared)
+
+    def _run_test_modules_parallel(self, modules, results_dir, gisdbase,
+                                   location):
+        """Run test files concurrently in *jobs* worker threads.
+
+        Each test file runs in its own process, mapset and temporary
+        directory. Results are passed to the reporter in the order
+        of discovery, so the reports do not depend on which test file
+        finished first.
+        """
+        def run_one(module):
+            prepared = self._prepare_test_module(module=module,
+                                                 results_dir=results_dir,
+                                                 gisdbase=gisdbase,
+                                                 location=location)
+            try:
+                result = self._execute_test_module(module=module,
+                                                   cwd=prepared['cwd'],
+                                                   env=prepared['env'])
+            finally:
+                self._clean_test_module(**prepared)
+            return prepared['cwd'], result
+
+        pool = ThreadPool(self.jobs)
+        try:
+            # imap keeps the order of the input
+            for module, (cwd, result) in zip(modules,
+                                              pool.imap(run_one, modules)):
+                returncode, stdout_path, stderr_path, test_summary = result
+                self.testsuite_dirs[module.tested_dir].append(module.name)
+                self.reporter.start_file_test(module)
+                self.reporter.end_file_test(module=module, cwd=cwd,
+                                            returncode=returncode,
+                                            stdout=stdout_path,
+                                            stderr=stderr_path,
+                                            test_summary=test_summary)
+        finally:
+            pool.close()
+            pool.join()
+
     def run_in_location(self, gisdbase, location, location_type,
                         results_dir):
         """Run tests in a given location"""
@@ -260,15 +353,21 @@ class GrassTestFilesInvoker(object):
                                    grass_location=location_type,
                                    file_regexp=r'.*\.(py|sh)$',
                                    skip_dirs=GrassTestLoader.skip_dirs,
-                                   testsuite_dir=GrassTestLoader.testsuite_dir,
+                                   testsuite_dir=self.testsuite_dir,
                                    all_locations_value=GrassTestLoader.all_tests_value,
                                    universal_location_value=GrassTestLoader.universal_tests_value,
                                    import_modules=False)
 
         self.reporter.start(results_dir)
-        for module in modules:
-            self._run_test_module(module=module, results_dir=results_dir,
-                                  gisdbase=gisdbase, location=location)
+        if self.jobs > 1:
+            self._run_test_modules_parallel(modules=modules,
+                                            results_dir=results_dir,
+                                            gisdbase=gisdbase,
+                                            location=location)
+        else:
+            for module in modules:
+                self._run_test_module(module=module, results_dir=results_dir,
+                                      gisdbase=gisdbase, location=location)
         self.reporter.finish()
 
         # TODO: move this to some (new?) reporter
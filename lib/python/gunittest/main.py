@@ -20,6 +20,7 @@ from .loader import GrassTestLoader
 from .runner import (GrassTestRunner, MultiTestResult,
                      TextTestResult, KeyValueTestResult)
 from .invoker import GrassTestFilesInvoker
+from .benchmark import BENCHMARK_DIR
 from .utils import silent_rmtree
 from .reporters import FileAnonymizer
 
@@ -135,6 +136,14 @@ def main():
     parser.add_argument('--output', dest='output', action='store',
                         default='testreport',
                         help='Output directory')
+    parser.add_argument('--jobs', '-j', dest='jobs', action='store',
+                        type=int, default=1,
+                        help='Number of test files to run at the same time'
+                             ' (each in its own mapset)')
+    parser.add_argument('--benchmarks', dest='benchmarks',
+                        action='store_true',
+                        help='Run benchmark files (in benchmark directories)'
+                             ' instead of tests (in testsuite directories)')
     args = parser.parse_args()
     gisdbase = args.gisdbase
     if gisdbase is None:
@@ -161,9 +170,14 @@ def main():
 
     start_dir = '.'
     abs_start_dir = os.path.abspath(start_dir)
+    if args.jobs < 1:
+        sys.stderr.write("Number of jobs must be at least 1\n")
+        sys.exit(1)
     invoker = GrassTestFilesInvoker(
         start_dir=start_dir,
-        file_anonymizer=FileAnonymizer(paths_to_remove=[abs_start_dir]))
+        file_anonymizer=FileAnonymizer(paths_to_remove=[abs_start_dir]),
+        jobs=args.jobs,
+        testsuite_dir=BENCHMARK_DIR if args.benchmarks else 'testsuite')
     # TODO: remove also results dir from files
     # as an enhancemnt
     # we can just iterate over all locations available in database
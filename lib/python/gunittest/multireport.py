@@ -28,6 +28,7 @@ from matplotlib.dates import date2num
 from grass.gunittest.checkers import text_to_keyvalue
 from grass.gunittest.utils import ensure_dir
 from grass.gunittest.reporters import success_to_html_percent
+from grass.gunittest.benchmark import collect_results, compare_results
 
 
 class TestResultSummary(object):
@@ -56,6 +57,7 @@ class TestResultSummary(object):
         self.tested_dirs = []
         self.time = []
         self.names = []
+        self.benchmarks = {}
 
         self.report = None
 
@@ -278,9 +280,51 @@ def info_plot(x, xticks, xlabels, results, filename, style):
     fig.savefig(filename)
 
 
+def benchmarks_page(results, filename, tolerance, directory):
+    """Write table of benchmark times for all reports
+
+    Each benchmark is compared with the previous report and values
+    slower by more than *tolerance* are highlighted.
+    """
+    names = sorted(set(name for result in results
+                       for name in result.benchmarks))
+    filename = os.path.join(directory, filename)
+    with open(filename, 'w') as page:
+        page.write(
+            '<html><body>'
+            '<h1>Benchmarks</h1>'
+            '<p>Median wall time in seconds, values slower than'
+            ' in previous report by more than {tol:.0f}% are in red.</p>'
+            '<table>'
+            '<thead><tr><th>Benchmark</th>'
+            .format(tol=tolerance * 100))
+        for result in results:
+            page.write('<th>{time:%Y-%m-%d}<br>{rev}</th>'.format(
+                time=result.timestamp, rev=result.svn_revision))
+        page.write('</tr></thead><tbody>')
+        for name in names:
+            page.write('<tr><td>{name}</td>'.format(name=name))
+            previous = None
+            for result in results:
+                current = result.benchmarks.get(name)
+                if not current:
+                    page.write('<td></td>')
+                    continue
+                color = 'black'
+                if previous and compare_results(
+                        {name: current}, {name: previous},
+                        tolerance=tolerance):
+                    color = 'red'
+                page.write('<td style="color: {color}">{wall:.4f}</td>'
+                           .format(color=color, wall=current['wall']))
+                previous = current
+            page.write('</tr>')
+        page.write('</tbody></table></body></html>')
+
+
 # TODO: solve the directory inconsitencies, implement None
 def main_page(results, filename, images, captions, title='Test reports',
-              directory=None):
+              directory=None, benchmarks_link=None):
     filename = os.path.join(directory, filename)
     with open(filename, 'w') as page:
         page.write(
@@ -322,6 +366,9 @@ def main_page(results, filename, images, captions, title='Test reports',
                 .format(result=result, name=name, report_path=report_path,
                         pfiles=per_file, ptests=per_test))
         page.write('</tbody></table>')
+        if benchmarks_link:
+            page.write('<p><a href="{page}">Benchmarks</a></p>'
+                       .format(page=benchmarks_link))
         for image, caption in itertools.izip(images, captions):
             page.write(
                 '<h3>{caption}<h3>'
@@ -342,6 +389,10 @@ def main():
                         help='Output directory')
     parser.add_argument('--timestamps', dest='timestamps', action='store_true',
                         help='Use file timestamp instead of date in test summary')
+    parser.add_argument('--benchmark-tolerance', dest='benchmark_tolerance',
+                        action='store', type=float, default=0.1,
+                        help='Relative slowdown of benchmarks highlighted'
+                             ' in the report (0.1 is 10%%)')
 
     args = parser.parse_args()
     output = args.output
@@ -385,6 +436,7 @@ def main():
             result.test_files_authors = summary['test_files_authors']
             result.tested_dirs = summary['tested_dirs']
             result.report = report
+            result.benchmarks = collect_results(report)['benchmarks']
 
             # let's consider no location as valid state and use 'unknown'
             result.location = summary.get('location', 'unknown')
@@ -462,6 +514,14 @@ def main():
                   filename=os.path.join(directory, 'info_plot.png'),
                    style=plot_style)
 
+        if any(result.benchmarks for result in results):
+            benchmarks_page(results=results, filename='benchmarks.html',
+                            tolerance=args.benchmark_tolerance,
+                            directory=directory)
+            benchmarks_page_name = 'benchmarks.html'
+        else:
+            benchmarks_page_name = None
+
         main_page(results=results, filename='index.html',
                   images=['tests_successful_plot.png',
                           'files_successful_plot.png',
@@ -478,7 +538,8 @@ def main():
                             'Successes and failures of test files in percents',
                             'Additional information'],
                   directory=directory,
-                  title=title)
+                  title=title,
+                  benchmarks_link=benchmarks_page_name)
 
         files_successes = sum(result.files_successes for result in results)
         files_total = sum(result.files_total for result in results)
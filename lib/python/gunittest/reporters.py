@@ -402,10 +402,16 @@ class GrassTestFilesCountingReporter(object):
         self._start_file_test_called = True
         self.test_files += 1
 
-    def end_file_test(self, returncode, **kwargs):
+    def end_file_test(self, returncode, test_summary=None, **kwargs):
         assert self._start_file_test_called
         self.file_end_time = datetime.datetime.now()
-        self.file_time = self.file_end_time - self.file_start_time
+        if test_summary and test_summary.get('time') is not None:
+            # time measured by invoker is precise also when the files
+            # are executed in parallel and reported afterwards
+            self.file_time = datetime.timedelta(
+                seconds=float(test_summary['time']))
+        else:
+            self.file_time = self.file_end_time - self.file_start_time
         if returncode:
             self.files_fail += 1
         else:
@@ -624,7 +630,8 @@ class GrassTestFilesHtmlReporter(GrassTestFilesCountingReporter):
                       test_summary):
         super(GrassTestFilesHtmlReporter, self).end_file_test(
             module=module, cwd=cwd, returncode=returncode,
-            stdout=stdout, stderr=stderr)
+            stdout=stdout, stderr=stderr,
+            test_summary=test_summary)
         # considering others according to total is OK when we more or less
         # know that input data make sense (total >= errors + failures)
         total = test_summary.get('total', None)
@@ -791,6 +798,7 @@ class GrassTestFilesKeyValueReporter(GrassTestFilesCountingReporter):
         self.names = []
         self.tested_dirs = []
         self.files_returncodes = []
+        self.files_times = []
 
         # sets (no size specified)
         self.modules = set()
@@ -816,6 +824,8 @@ class GrassTestFilesKeyValueReporter(GrassTestFilesCountingReporter):
         # TODO: we don't have a general mechanism for storing any type in text
         summary['files_returncodes'] = [str(item)
                                         for item in self.files_returncodes]
+        summary['files_times'] = ['{:.3f}'.format(item)
+                                  for item in self.files_times]
 
         # let's use seconds as a universal time delta format
         # (there is no standard way how to store time delta as string)
@@ -853,7 +863,8 @@ class GrassTestFilesKeyValueReporter(GrassTestFilesCountingReporter):
                       test_summary):
         super(GrassTestFilesKeyValueReporter, self).end_file_test(
             module=module, cwd=cwd, returncode=returncode,
-            stdout=stdout, stderr=stderr)
+            stdout=stdout, stderr=stderr,
+            test_summary=test_summary)
         # TODO: considering others according to total, OK?
         # here we are using 0 for total but HTML reporter is using None
         total = test_summary.get('total', 0)
@@ -885,6 +896,7 @@ class GrassTestFilesKeyValueReporter(GrassTestFilesCountingReporter):
             self.total += total
 
         self.files_returncodes.append(returncode)
+        self.files_times.append(self.file_time.total_seconds())
 
         self.tested_dirs.append(module.tested_dir)
         self.names.append(module.name)
@@ -906,12 +918,21 @@ class GrassTestFilesKeyValueReporter(GrassTestFilesCountingReporter):
 
 class GrassTestFilesTextReporter(GrassTestFilesCountingReporter):
 
-    def __init__(self, stream):
+    def __init__(self, stream, slowest=10):
+        """
+
+        :param stream: stream to write the report to
+        :param int slowest: number of the slowest test files to list
+            in the summary (0 to not list any)
+        """
         super(GrassTestFilesTextReporter, self).__init__()
         self._stream = stream
+        self._slowest = slowest
+        self._files_times = None
 
     def start(self, results_dir):
         super(GrassTestFilesTextReporter, self).start(results_dir)
+        self._files_times = []
 
     def finish(self):
         super(GrassTestFilesTextReporter, self).finish()
@@ -935,6 +956,15 @@ class GrassTestFilesTextReporter(GrassTestFilesCountingReporter):
                                 nfper=format_percentage(self.file_fail_per)))
         self._stream.write(summary_sentence)
 
+        if self._slowest and self._files_times:
+            # stable sort, files with the same time stay in the run order
+            slowest = sorted(self._files_times, key=lambda item: item[0],
+                             reverse=True)[:self._slowest]
+            self._stream.write('Slowest test files:\n')
+            for file_time, tested_dir, name in slowest:
+                self._stream.write('{t:10.2f}s  {m} from {d}\n'.format(
+                    t=file_time, m=name, d=tested_dir))
+
     def start_file_test(self, module):
         super(GrassTestFilesTextReporter, self).start_file_test(module)
         self._stream.flush()  # to get previous lines to the report
@@ -943,7 +973,10 @@ class GrassTestFilesTextReporter(GrassTestFilesCountingReporter):
                       test_summary):
         super(GrassTestFilesTextReporter, self).end_file_test(
             module=module, cwd=cwd, returncode=returncode,
-            stdout=stdout, stderr=stderr)
+            stdout=stdout, stderr=stderr,
+            test_summary=test_summary)
+        self._files_times.append((self.file_time.total_seconds(),
+                                  module.tested_dir, module.name))
 
         if returncode:
             self._stream.write(
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""
+Tests of benchmark functions
+
+@brief Test of GRASS Python testing framework benchmarks
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+from grass.gunittest.benchmark import (
+    measure, median, compare_results, add_to_store, latest_revision)
+
+
+class TestMeasure(TestCase):
+
+    def test_repetitions(self):
+        calls = []
+        result = measure(lambda: calls.append(1), repeat=4, warmup=2)
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(len(result['wall_times']), 4)
+        self.assertLessEqual(result['wall_min'], result['wall'])
+
+    def test_setup_not_measured(self):
+        calls = []
+        measure(lambda: None, repeat=3, warmup=1,
+                setup=lambda: calls.append(1))
+        self.assertEqual(len(calls), 4)
+
+    def test_zero_repeat(self):
+        with self.assertRaises(ValueError):
+            measure(lambda: None, repeat=0)
+
+    def test_median(self):
+        self.assertEqual(median([3, 1, 2]), 2)
+        self.assertEqual(median([4, 1, 2, 3]), 2.5)
+
+
+class TestCompare(TestCase):
+
+    def test_tolerance(self):
+        baseline = {'a': {'wall': 1.0}, 'b': {'wall': 1.0}}
+        current = {'a': {'wall': 1.15}, 'b': {'wall': 1.3}, 'c': {'wall': 9}}
+        self.assertEqual(compare_results(current, baseline, tolerance=0.2),
+                         [('b', 1.0, 1.3, 1.3)])
+        self.assertEqual(
+            [name for name, old, new, ratio
+             in compare_results(current, baseline, tolerance=0.1)],
+            ['a', 'b'])
+
+    def test_store(self):
+        store = {}
+        add_to_store(store, dict(revision='r1', timestamp='2020-01-01',
+                                 benchmarks={'a': {'wall': 1}}))
+        add_to_store(store, dict(revision='r2', timestamp='2020-02-01',
+                                 benchmarks={'a': {'wall': 2}}))
+        self.assertEqual(latest_revision(store), 'r2')
+        self.assertEqual(latest_revision(store, exclude='r2'), 'r1')
+
+
+if __name__ == '__main__':
+    test()
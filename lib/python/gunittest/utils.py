@@ -32,6 +32,25 @@ def silent_rmtree(filename):
             raise
 
 
+def link_or_copy_tree(src, dst, link=True):
+    """Make directory *src* available as *dst*.
+
+    A symbolic link is created when requested and supported by the
+    platform, otherwise the directory is copied (without SVN files).
+
+    :returns: path to the link if it was created, None if copied
+    """
+    if link and hasattr(os, 'symlink'):
+        try:
+            os.symlink(os.path.abspath(src), dst)
+            return dst
+        except OSError:
+            # e.g. no privileges to create links on MS Windows
+            pass
+    shutil.copytree(src, dst, ignore=shutil.ignore_patterns('*.svn*'))
+    return None
+
+
 def do_doctest_gettext_workaround():
     """Setups environment for doing a doctest with gettext usage.
 
@@ -42,8 +42,16 @@ import os
 import time
 import subprocess
 import shutil
+import shlex
+import tempfile
+from itertools import chain
 from grass.imaging import images2ims
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
 
 def _cleanDir(tempDir):
     for i in range(3):
@@ -57,15 +65,24 @@ def _cleanDir(tempDir):
         print("Oops, could not fully clean up temporary files.")
 
 
+def _toRGBImage(image):
+    """Converts PIL image or numpy array to RGB PIL image"""
+    if not isinstance(image, Image.Image):
+        image = Image.fromarray(images2ims.checkImages([image])[0])
+    return image.convert('RGB')
+
+
 def writeAvi(filename, images, duration=0.1, encoding='mpeg4',
              inputOptions='', outputOptions=''):
     """Export movie to a AVI file, which is encoded with the given
     encoding. Hint for Windows users: the 'msmpeg4v2' codec is
     natively supported on Windows.
 
-    Images should be a list consisting of PIL images or numpy arrays.
+    Images should be a list or an iterable (e.g. generator)
+    consisting of PIL images or numpy arrays of the same size.
     The latter should be between 0 and 255 for integer types, and
-    between 0 and 1 for float types.
+    between 0 and 1 for float types. Frames are piped to ffmpeg
+    one by one, so they are not held in memory.
 
     Requires the "ffmpeg" application:
       * Most linux users can install using their package manager
@@ -85,45 +102,48 @@ def writeAvi(filename, images, duration=0.1, encoding='mpeg4',
     except Exception:
         raise ValueError("Invalid duration parameter for writeAvi.")
 
-    # Determine temp dir and create images
-    tempDir = os.path.join(os.path.expanduser('~'), '.tempIms')
-    images2ims.writeIms(os.path.join(tempDir, 'im*.png'), images)
-
-    # Determine formatter
-    N = len(images)
-    formatter = '%04d'
-    if N < 10:
-        formatter = '%d'
-    elif N < 100:
-        formatter = '%02d'
-    elif N < 1000:
-        formatter = '%03d'
-
-    # Compile command to create avi
-    command = "ffmpeg -r %i %s " % (int(fps), inputOptions)
-    command += "-i im%s.png " % (formatter,)
-    command += "-g 1 -vcodec %s %s " % (encoding, outputOptions)
-    command += "output.avi"
+    # Check PIL
+    if Image is None:
+        raise RuntimeError("Need PIL to write avi files.")
 
-    # Run ffmpeg
-    S = subprocess.Popen(command, shell=True, cwd=tempDir,
-                         stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-    # Show what ffmpeg has to say
-    outPut = S.stdout.read()
+    frames = iter(images)
+    try:
+        first = _toRGBImage(next(frames))
+    except StopIteration:
+        raise ValueError("No images to write.")
+    size = first.size
+
+    # Compile command to create avi from raw frames on standard input
+    command = ["ffmpeg", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+               "-s", "%ix%i" % size, "-r", "%g" % fps]
+    command += shlex.split(inputOptions)
+    command += ["-i", "-", "-g", "1", "-vcodec", encoding]
+    command += shlex.split(outputOptions)
+    command += [os.path.abspath(filename)]
+
+    # Run ffmpeg, its output goes to a file to not block it
+    log = tempfile.TemporaryFile()
+    S = subprocess.Popen(command, stdin=subprocess.PIPE,
+                         stdout=log, stderr=log)
+    try:
+        for image in chain([first], frames):
+            image = _toRGBImage(image)
+            if image.size != size:
+                raise ValueError("All images must have the same size.")
+            S.stdin.write(image.tobytes())
+    except IOError:
+        # ffmpeg ended, reported below
+        pass
+    finally:
+        S.stdin.close()
 
     if S.wait():
         # An error occurred, show
-        print(outPut)
-        print(S.stderr.read())
-        # Clean up
-        _cleanDir(tempDir)
+        log.seek(0)
+        print(log.read())
+        log.close()
         raise RuntimeError("Could not write avi.")
-    else:
-        # Copy avi
-        shutil.copy(os.path.join(tempDir, 'output.avi'), filename)
-        # Clean up
-        _cleanDir(tempDir)
+    log.close()
 
 
 def readAvi(filename, asNumpy=True):
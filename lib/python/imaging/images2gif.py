@@ -67,6 +67,8 @@ Useful links:
 
 import os
 import time
+import struct
+from itertools import chain, islice
 
 try:
     import PIL
@@ -86,6 +88,12 @@ except ImportError:
     np = None
 
 
+if np is not None:
+    from grass.imaging import quantize as quantization
+else:
+    quantization = None
+
+
 def get_cKDTree():
     try:
         from scipy.spatial import cKDTree
@@ -479,8 +487,8 @@ class GifWriter:
 
 def writeGif(filename, images, duration=0.1, repeat=True, **kwargs):
     """Write an animated gif from the specified images.
-    Depending on which PIL library is used, either writeGifVisvis or writeGifPillow
-    is used here.
+    When Numpy is available, writeGifFast is used, otherwise either
+    writeGifVisvis or writeGifPillow depending on which PIL library is used.
 
     :param str filename: the name of the file to write the image to.
     :param list images: should be a list consisting of PIL images or numpy
@@ -489,9 +497,14 @@ def writeGif(filename, images, duration=0.1, repeat=True, **kwargs):
     :param duration: scalar or list of scalars The duration for all frames, or
                      (if a list) for each frame.
     :param repeat: bool or integer The amount of loops. If True, loops infinitetel
-    :param kwargs: additional parameters for writeGifVisvis
+    :param kwargs: additional parameters for writeGifFast
+                   (subRectangles, nprocs) or writeGifVisvis
 
     """
+    if PIL and np is not None and \
+            not set(kwargs) - set(['subRectangles', 'nprocs']):
+        writeGifFast(filename, images, duration, repeat, **kwargs)
+        return
     if pillow:
         # Pillow >= 3.4.0 has animated GIF writing
         version = [int(i) for i in PILLOW_VERSION.split('.')]
@@ -502,6 +515,108 @@ def writeGif(filename, images, duration=0.1, repeat=True, **kwargs):
     writeGifVisvis(filename, images, duration, repeat, **kwargs)
 
 
+def _getSampleFrames(images, sample):
+    """Returns frames for computing the palette and an iterator
+    over all frames. Sequences are sampled evenly, otherwise
+    the first frames are used."""
+    if hasattr(images, '__len__') and hasattr(images, '__getitem__'):
+        count = len(images)
+        indices = np.unique(np.linspace(0, count - 1, min(count, sample))
+                            .astype(int))
+        return [quantization.toRGBArray(images[i]) for i in indices], \
+            iter(images)
+    images = iter(images)
+    first = [quantization.toRGBArray(image)
+             for image in islice(images, sample)]
+    return first, chain(first, images)
+
+
+def writeGifFast(filename, images, duration=0.1, repeat=True,
+                 subRectangles=True, nprocs=None, sample=16):
+    """Write an animated gif from the specified images.
+    All frames share one palette computed from a sample of frames
+    (see grass.imaging.quantize). Frames are quantized in worker
+    processes and written as soon as they are ready, so images can be
+    a generator and are not held in memory.
+
+    :param str filename: the name of the file to write the image to.
+    :param images: sequence or iterable of PIL images or numpy arrays
+                   of the same size. The latter should be between 0 and
+                   255 for integer types, and between 0 and 1 for float
+                   types.
+    :param duration: scalar or list of scalars The duration for all frames, or
+                     (if a list) for each frame.
+    :param repeat: bool or integer The amount of loops. If True, loops infinitetely.
+    :param bool subRectangles: write only the rectangle which changed
+                               from the previous frame
+    :param int nprocs: number of processes (None for number of CPUs)
+    :param int sample: number of frames used to compute the palette
+
+    :return: number of written frames
+    """
+    if PIL is None or np is None:
+        raise RuntimeError("Need PIL and Numpy to write animated gif files.")
+
+    sampleFrames, frames = _getSampleFrames(images, sample)
+    if not sampleFrames:
+        raise ValueError("No images to write.")
+    palette = quantization.computePalette(sampleFrames)
+    lookup = quantization.buildLookup(palette)
+    del sampleFrames
+
+    if hasattr(duration, '__len__'):
+        durations = iter(duration)
+    else:
+        durations = None
+    height = width = None
+    count = 0
+    previous = None
+    with open(filename, 'wb') as fp:
+        for frame in quantization.quantizeFrames(frames, lookup, nprocs):
+            if previous is None:
+                height, width = frame.shape
+                _writeGifHeader(fp, width, height, palette, repeat)
+            elif frame.shape != (height, width):
+                raise ValueError("All images must have the same size.")
+            x0, y0 = 0, 0
+            data = frame
+            if subRectangles and previous is not None:
+                changed = frame != previous
+                rows = np.flatnonzero(changed.any(axis=1))
+                cols = np.flatnonzero(changed.any(axis=0))
+                if rows.size:
+                    y0, x0 = rows[0], cols[0]
+                    data = frame[y0:rows[-1] + 1, x0:cols[-1] + 1]
+                else:
+                    # no change, write one pixel
+                    data = frame[:1, :1]
+            previous = frame
+            frameDuration = next(durations) if durations else duration
+            # graphics control extension, do not dispose
+            fp.write(b'\x21\xF9\x04' + struct.pack(
+                '<BHBB', 1 << 2, int(round(frameDuration * 100)), 0, 0))
+            image = Image.frombytes('P', (data.shape[1], data.shape[0]),
+                                    np.ascontiguousarray(data).tobytes())
+            for chunk in getdata(image, (int(x0), int(y0))):
+                fp.write(chunk)
+            count += 1
+        fp.write(b';')
+    return count
+
+
+def _writeGifHeader(fp, width, height, palette, repeat):
+    """Writes GIF header with global color table and loop extension"""
+    table = np.zeros((256, 3), dtype=np.uint8)
+    table[:len(palette)] = palette
+    # global color table of 256 colors
+    fp.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0xF7, 0, 0))
+    fp.write(table.tobytes())
+    if repeat is not False:
+        loops = 0 if repeat is True else int(repeat)
+        fp.write(b'\x21\xFF\x0BNETSCAPE2.0\x03\x01' +
+                 struct.pack('<H', loops) + b'\x00')
+
+
 def writeGifPillow(filename, images, duration=0.1, repeat=True):
     """Write an animated gif from the specified images.
     Uses native Pillow implementation, which is available since Pillow 3.4.0.
@@ -0,0 +1,172 @@
+"""
+Fast color quantization of image sequences
+
+Computes one palette shared by all frames of an animation and maps
+frames to it with a lookup table, so that quantization of a frame is
+a few NumPy operations. The palette is computed by Pillow (median cut)
+when available, otherwise by a NumPy popularity algorithm.
+
+Usage:
+
+>>> import numpy as np
+>>> frame = np.zeros((4, 4, 3), dtype=np.uint8)
+>>> frame[:2] = (255, 0, 0)
+>>> palette = computePalette([frame], method='numpy')
+>>> len(palette)
+2
+>>> lookup = buildLookup(palette)
+>>> indices = quantize(frame, lookup)
+>>> palette[indices[0, 0]].tolist(), palette[indices[3, 3]].tolist()
+([255, 0, 0], [0, 0, 0])
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+from itertools import islice
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+#: number of significant bits of each color channel used for lookup
+BITS = 5
+
+
+def toRGBArray(image):
+    """Converts PIL image or NumPy array to RGB array of uint8
+
+    Float arrays are expected to be between 0 and 1 (as in
+    :func:`grass.imaging.images2gif.checkImages`).
+    """
+    if Image and isinstance(image, Image.Image):
+        return np.asarray(image.convert('RGB'))
+    array = np.asarray(image)
+    if array.dtype in (np.float32, np.float64):
+        array = (np.clip(array, 0, 1) * 255).astype(np.uint8)
+    elif array.dtype != np.uint8:
+        array = array.astype(np.uint8)
+    if array.ndim == 2:
+        array = np.repeat(array[:, :, np.newaxis], 3, axis=2)
+    elif array.ndim != 3 or array.shape[2] not in (3, 4):
+        raise ValueError("This array can not represent an image.")
+    return array[:, :, :3]
+
+
+def reduceColors(image):
+    """Returns color codes of RGB array with BITS bits per channel"""
+    reduced = (image >> (8 - BITS)).astype(np.uint16)
+    return (reduced[..., 0] << 2 * BITS) | (reduced[..., 1] << BITS) | \
+        reduced[..., 2]
+
+
+def computePalette(images, colors=256, method=None):
+    """Computes one palette for all given images
+
+    :param images: list of RGB arrays
+    :param colors: maximal number of colors
+    :param method: 'pillow' for median cut, 'numpy' for popularity
+                   algorithm, None for Pillow when available
+
+    :return: array of shape (n, 3), n <= colors
+    """
+    pixels = np.concatenate([image.reshape(-1, 3) for image in images])
+    if method is None:
+        method = 'pillow' if Image else 'numpy'
+    if method == 'pillow':
+        mosaic = Image.fromarray(np.ascontiguousarray(
+            pixels.reshape(-1, 1, 3)), 'RGB')
+        quantized = mosaic.quantize(colors=colors)
+        palette = np.array(quantized.getpalette(), dtype=np.uint8)
+        used = np.unique(np.asarray(quantized))
+        return palette.reshape(-1, 3)[used]
+    # the most frequent colors, each one averaged over its bin
+    codes = reduceColors(pixels)
+    counts = np.bincount(codes, minlength=1 << 3 * BITS)
+    top = np.argsort(counts)[::-1][:colors]
+    top = top[counts[top] > 0]
+    sums = np.column_stack(
+        [np.bincount(codes, weights=pixels[:, i],
+                     minlength=1 << 3 * BITS)[top] for i in range(3)])
+    return np.rint(sums / counts[top][:, np.newaxis]).astype(np.uint8)
+
+
+def buildLookup(palette):
+    """Returns palette index of the nearest color for every color code
+
+    :param palette: array of shape (n, 3)
+    """
+    shift = 8 - BITS
+    # centers of color bins
+    levels = (np.arange(1 << BITS) << shift) + (1 << (shift - 1))
+    red, green, blue = np.meshgrid(levels, levels, levels, indexing='ij')
+    colors = np.column_stack((red.ravel(), green.ravel(), blue.ravel()))
+    palette = palette.astype(np.int32)
+    lookup = np.empty(len(colors), dtype=np.uint8)
+    step = 4096
+    for start in range(0, len(colors), step):
+        diff = colors[start:start + step, np.newaxis, :] - palette
+        lookup[start:start + step] = (diff * diff).sum(axis=2).argmin(axis=1)
+    return lookup
+
+
+def quantize(image, lookup):
+    """Returns array of palette indices for RGB array"""
+    return lookup[reduceColors(image)]
+
+
+_lookup = None
+
+
+def _initWorker(lookup):
+    global _lookup
+    _lookup = lookup
+
+
+def _quantizeWorker(image):
+    return quantize(image, _lookup)
+
+
+def quantizeFrames(images, lookup, nprocs=None, bufferSize=None):
+    """Quantizes frames in worker processes
+
+    Frames are read from the iterable in chunks, so that only a limited
+    number of frames is in memory. Quantized frames are yielded
+    in the original order.
+
+    :param images: iterable of PIL images or NumPy arrays
+    :param lookup: lookup table from :func:`buildLookup`
+    :param nprocs: number of processes (None for number of CPUs)
+    :param bufferSize: number of frames read at once (4 per process
+                       by default)
+    """
+    if nprocs is None:
+        nprocs = cpu_count()
+    if nprocs <= 1:
+        for image in images:
+            yield quantize(toRGBArray(image), lookup)
+        return
+    if bufferSize is None:
+        bufferSize = 4 * nprocs
+    images = iter(images)
+    pool = Pool(nprocs, initializer=_initWorker, initargs=(lookup,))
+    try:
+        chunk = [toRGBArray(image) for image in islice(images, bufferSize)]
+        pending = pool.map_async(_quantizeWorker, chunk)
+        while chunk:
+            # read next frames while workers quantize the current ones
+            chunk = [toRGBArray(image)
+                     for image in islice(images, bufferSize)]
+            following = pool.map_async(_quantizeWorker, chunk)
+            for frame in pending.get():
+                yield frame
+            pending = following
+    finally:
+        pool.terminate()
+        pool.join()
@@ -5,7 +5,9 @@ from grass.exceptions import (FlagError, ParameterError, DBError,
                               GrassError, OpenError)
 
 from grass.pygrass.messages import get_msgr
-import grass.lib.gis as libgis
+from grass.script.utils import lazy_import
+
+libgis = lazy_import('grass.lib.gis')
 
 
 def must_be_open(method):
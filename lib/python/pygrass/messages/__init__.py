@@ -16,9 +16,11 @@ for details.
 import sys
 from multiprocessing import Process, Lock, Pipe
 
-import grass.lib.gis as libgis
-
 from grass.exceptions import FatalError
+from grass.script.utils import lazy_import
+
+# used only by the server process
+libgis = lazy_import('grass.lib.gis')
 
 
 def message_server(lock, conn):
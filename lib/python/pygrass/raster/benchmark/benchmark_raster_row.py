@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of raster row reading and writing using pygrass
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+from grass.gunittest.benchmark import BenchmarkCase
+from grass.gunittest.main import test
+
+from grass.pygrass.raster import RasterRow
+
+
+class RasterRowBenchmark(BenchmarkCase):
+
+    name = "RasterRowBenchmark_map"
+    output = "RasterRowBenchmark_output"
+
+    @classmethod
+    def setUpClass(cls):
+        """Create test raster map and region"""
+        super(RasterRowBenchmark, cls).setUpClass()
+        cls.use_temp_region()
+        cls.runModule("g.region", n=1000, s=0, e=1000, w=0, res=1)
+        cls.runModule("r.mapcalc",
+                      expression="%s = row() + (10.0 * col())" % (cls.name),
+                      overwrite=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the generated raster maps"""
+        cls.runModule("g.remove", flags='f', type='raster',
+                      name=[cls.name, cls.output])
+        cls.del_temp_region()
+        super(RasterRowBenchmark, cls).tearDownClass()
+
+    def test_read_rows(self):
+        def read_rows():
+            with RasterRow(self.name) as r:
+                for row in r:
+                    pass
+        self.benchmark(read_rows)
+
+    def test_copy_rows(self):
+        def copy_rows():
+            with RasterRow(self.name) as r:
+                out = RasterRow(self.output)
+                out.open(mode='w', mtype=r.mtype, overwrite=True)
+                for row in r:
+                    out.put_row(row)
+                out.close()
+        self.benchmark(copy_rows)
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Univariate statistics and correlation matrix of raster maps in one pass
+
+All raster maps are read row by row at once, so each map is read only
+once. Rows are processed in bands, each band gives mergeable partial
+moments (counts, means and sums of squared differences from the mean,
+Chan et al.), so bands can be processed in parallel. The standard
+deviations are the same as computed by r.univar, the covariance and
+correlation matrices as computed by r.covar (only cells which are not
+null in any map are used).
+
+Usage:
+
+    >>> stats = covariance_statistics(['lsat7_2002_10', 'lsat7_2002_20',
+    ...                                'lsat7_2002_30'])  # doctest: +SKIP
+    >>> stats['stddev']  # doctest: +SKIP
+    array([ 9.4, 10.3, 16.1])
+    >>> stats['correlation'][0, 1]  # doctest: +SKIP
+    0.9518
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        with_statement, print_function, unicode_literals)
+from multiprocessing import Pool
+
+import numpy as np
+
+import grass.lib.raster as libraster
+from grass.pygrass.raster.zonal import _read_band, _null_mask
+
+#: number of values read in a band of rows (of all maps together)
+BAND_VALUES = 4000000
+
+
+def block_moments(blocks):
+    """Returns partial moments of blocks of raster maps
+
+    :param blocks: list of arrays of the same shape, one for each map
+
+    :return: dictionary with number of values (n), mean and m2 (sum of
+             squared differences from the mean) of each map, and number
+             of cells without null values in any map (joint_n), their
+             means (joint_mean) and co-moment matrix (comoment)
+    """
+    values = np.stack([block.ravel() for block in blocks]).astype(np.float64)
+    null = np.stack([_null_mask(block.ravel()) for block in blocks])
+    result = {}
+    result['n'] = (~null).sum(axis=1).astype(np.float64)
+    masked = np.where(null, 0, values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = masked.sum(axis=1) / result['n']
+    result['mean'] = np.where(result['n'] > 0, mean, 0)
+    result['m2'] = np.where(null, 0,
+                            values - result['mean'][:, np.newaxis]) ** 2
+    result['m2'] = result['m2'].sum(axis=1)
+    joint = values[:, ~null.any(axis=0)]
+    result['joint_n'] = float(joint.shape[1])
+    if joint.shape[1]:
+        result['joint_mean'] = joint.mean(axis=1)
+        joint = joint - result['joint_mean'][:, np.newaxis]
+        result['comoment'] = np.dot(joint, joint.T)
+    else:
+        result['joint_mean'] = np.zeros(len(blocks))
+        result['comoment'] = np.zeros((len(blocks), len(blocks)))
+    return result
+
+
+def merge_moments(first, second):
+    """Merges partial moments computed by :func:`block_moments`"""
+    result = {}
+    count = first['n'] + second['n']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(count > 0, second['n'] / count, 0)
+    delta = second['mean'] - first['mean']
+    result['n'] = count
+    result['mean'] = first['mean'] + delta * weight
+    result['m2'] = (first['m2'] + second['m2'] +
+                    delta ** 2 * first['n'] * weight)
+    count = first['joint_n'] + second['joint_n']
+    if not count:
+        result.update((key, first[key])
+                      for key in ('joint_n', 'joint_mean', 'comoment'))
+        return result
+    weight = second['joint_n'] / count
+    delta = second['joint_mean'] - first['joint_mean']
+    result['joint_n'] = count
+    result['joint_mean'] = first['joint_mean'] + delta * weight
+    result['comoment'] = (first['comoment'] + second['comoment'] +
+                          np.outer(delta, delta) * first['joint_n'] * weight)
+    return result
+
+
+def finish_moments(moments):
+    """Computes final statistics from merged moments
+
+    :return: dictionary with number of values (n), mean, variance and
+             stddev of each map (as r.univar, NaN for maps without
+             values), number of cells without null values in any map
+             (joint_n), covariance and correlation matrices (as r.covar)
+    """
+    result = {'n': moments['n'].astype(np.int64),
+              'joint_n': int(moments['joint_n'])}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        empty = moments['n'] == 0
+        result['mean'] = np.where(empty, np.nan, moments['mean'])
+        result['variance'] = np.where(empty, np.nan,
+                                      moments['m2'] / moments['n'])
+        result['stddev'] = np.sqrt(result['variance'])
+        comoment = moments['comoment']
+        result['covariance'] = comoment / (moments['joint_n'] - 1)
+        diagonal = np.sqrt(np.diag(comoment))
+        result['correlation'] = comoment / np.outer(diagonal, diagonal)
+    return result
+
+
+def _band_worker(args):
+    rasters, start, end = args
+    return block_moments([_read_band(raster, start, end)
+                          for raster in rasters])
+
+
+def covariance_statistics(rasters, nprocs=1, band_rows=None):
+    """Computes statistics and correlation matrix of raster maps
+
+    Rasters are read in the current region.
+
+    :param rasters: list of names of raster maps
+    :param nprocs: number of processes processing bands of rows
+    :param band_rows: number of rows in a band (computed by default)
+
+    :return: dictionary of statistics (see :func:`finish_moments`)
+    """
+    rows = libraster.Rast_window_rows()
+    if band_rows is None:
+        # at least a band for each process, at most BAND_VALUES values
+        cols = max(libraster.Rast_window_cols(), 1)
+        band_rows = max(1, min(rows // nprocs or 1,
+                               BAND_VALUES // (cols * len(rasters))))
+    tasks = [(rasters, start, min(start + band_rows, rows))
+             for start in range(0, rows, band_rows)]
+    moments = block_moments([np.empty(0)] * len(rasters))
+    if nprocs > 1 and len(tasks) > 1:
+        pool = Pool(nprocs)
+        try:
+            for part in pool.imap(_band_worker, tasks):
+                moments = merge_moments(moments, part)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for task in tasks:
+            moments = merge_moments(moments, _band_worker(task))
+    return finish_moments(moments)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Tests of one pass statistics and correlation matrix of raster maps"""
+import numpy as np
+
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+from grass.script import read_command
+from grass.script.utils import parse_key_val
+
+from grass.pygrass.raster.covariance import (covariance_statistics,
+                                             block_moments, merge_moments,
+                                             finish_moments)
+
+
+class CovarianceTestCase(TestCase):
+
+    maps = ['covariance_test_a', 'covariance_test_b', 'covariance_test_c']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.use_temp_region()
+        cls.runModule("g.region", n=40, s=0, e=60, w=0, res=1)
+        cls.runModule("r.mapcalc", expression="%s = row() + 2 * col()"
+                      % cls.maps[0], overwrite=True)
+        cls.runModule("r.mapcalc", expression="%s = if(row() < 5, null(), "
+                      "sin(row() * col()) * 100.0)" % cls.maps[1],
+                      overwrite=True)
+        cls.runModule("r.mapcalc", expression="%s = float(row() * row() - "
+                      "col())" % cls.maps[2], overwrite=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.runModule("g.remove", flags='f', type='raster', name=cls.maps)
+        cls.del_temp_region()
+
+    def check_statistics(self, stats):
+        """Compare statistics with r.univar and r.covar"""
+        for i, name in enumerate(self.maps):
+            univar = parse_key_val(read_command('r.univar', flags='g',
+                                                map=name), val_type=float)
+            self.assertAlmostEqual(stats['stddev'][i], univar['stddev'],
+                                   places=5)
+            self.assertEqual(stats['n'][i], univar['n'])
+        lines = read_command('r.covar', flags='r', map=self.maps,
+                             quiet=True).splitlines()
+        # first line is the number of cells
+        covar = np.array([[float(cell) for cell in line.split()]
+                          for line in lines[1:]])
+        self.assertTrue(np.allclose(stats['correlation'], covar, atol=1e-5))
+
+    def test_statistics(self):
+        self.check_statistics(covariance_statistics(self.maps, band_rows=7))
+
+    def test_parallel(self):
+        self.check_statistics(covariance_statistics(self.maps, nprocs=3,
+                                                    band_rows=3))
+
+    def test_merge(self):
+        """Merged moments of parts are the same as of whole blocks"""
+        values = np.random.RandomState(1).normal(size=(2, 50, 4))
+        values[0, :10, 0] = np.nan
+        whole = finish_moments(merge_moments(
+            block_moments([np.empty(0)] * 2), block_moments(list(values))))
+        parts = block_moments([np.empty(0)] * 2)
+        for start in range(0, 50, 7):
+            parts = merge_moments(parts, block_moments(
+                list(values[:, start:start + 7])))
+        parts = finish_moments(parts)
+        for key in ('stddev', 'mean', 'covariance', 'correlation'):
+            self.assertTrue(np.allclose(whole[key], parts[key]), msg=key)
+        self.assertEqual(parts['joint_n'], 190)
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Zonal statistics of raster maps
+
+Statistics of cells of raster maps are computed for each zone (category)
+of a zone raster map. The zone map and all the value maps are read row
+by row at once, so the zones are read only once. Rows are processed in
+bands, bands can be processed in parallel and their statistics are
+merged. Statistics are the same as computed by r.univar -t (-e).
+
+Usage:
+
+    >>> stats = zonal_statistics('zones', ['elevation', 'slope'],
+    ...                          percentiles=[90])  # doctest: +SKIP
+    >>> stats['elevation']['zone']  # doctest: +SKIP
+    array([1, 2, 3], dtype=int32)
+    >>> stats['elevation']['median']  # doctest: +SKIP
+    array([112.5, 98.2, 130.0])
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+from __future__ import (nested_scopes, generators, division, absolute_import,
+                        with_statement, print_function, unicode_literals)
+from multiprocessing import Pool
+
+import numpy as np
+
+import grass.lib.raster as libraster
+from grass.pygrass.raster import RasterRow
+
+#: null value of CELL maps
+CELL_NULL = np.iinfo(np.int32).min
+#: minimal variance (GRASS_EPSILON), smaller is considered to be zero
+EPSILON = 1.0e-15
+#: names of computed statistics
+STATISTICS = ('number', 'null_cells', 'minimum', 'maximum', 'range',
+              'average', 'mean_of_abs', 'stddev', 'variance', 'coeff_var',
+              'sum', 'sum_abs')
+#: names of statistics computed with percentiles
+EXTENDED_STATISTICS = ('first_quartile', 'median', 'third_quartile')
+
+
+def _read_band(name, start, end):
+    """Reads rows from start to end of raster map to 2D array"""
+    raster = RasterRow(name)
+    raster.open('r')
+    try:
+        row = raster.get_row(start)
+        band = np.empty((end - start, row.shape[0]), dtype=row.dtype)
+        band[0] = row
+        for i in range(1, end - start):
+            band[i] = raster.get_row(start + i, row)
+    finally:
+        raster.close()
+    return band
+
+
+def _null_mask(values):
+    if values.dtype.kind == 'f':
+        return np.isnan(values)
+    return values == CELL_NULL
+
+
+def band_statistics(zones, values, keep_values=False):
+    """Returns statistics of values (array) in zones (array of the same
+    shape) as dictionary of arrays
+
+    Statistics are number of values (n), number of null cells
+    (null_cells), sum, sum_abs, minimum, maximum and m2 (sum of squared
+    differences from mean) for each zone (zone). With *keep_values*,
+    values sorted by zones and then by value (values) and their zones
+    (value_zones) are included.
+    """
+    zones = zones.ravel()
+    values = values.ravel()
+    in_zone = zones != CELL_NULL
+    null = _null_mask(values)
+    selected = in_zone & ~null
+    zone = zones[selected]
+    value = values[selected].astype(np.float64)
+    if keep_values:
+        order = np.lexsort((value, zone))
+    else:
+        order = np.argsort(zone, kind='mergesort')
+    zone = zone[order]
+    value = value[order]
+    # zones with at least one cell (possibly null)
+    all_zones = np.unique(zones[in_zone])
+    result = {'zone': all_zones}
+    null_zones, null_counts = np.unique(zones[in_zone & null],
+                                        return_counts=True)
+    result['null_cells'] = np.zeros(len(all_zones), dtype=np.int64)
+    result['null_cells'][np.searchsorted(all_zones, null_zones)] = \
+        null_counts
+    for key in ('n', 'sum', 'sum_abs', 'm2'):
+        result[key] = np.zeros(len(all_zones))
+    result['minimum'] = np.full(len(all_zones), np.inf)
+    result['maximum'] = np.full(len(all_zones), -np.inf)
+    if len(zone):
+        starts = np.flatnonzero(np.r_[True, zone[1:] != zone[:-1]])
+        index = np.searchsorted(all_zones, zone[starts])
+        count = np.diff(np.r_[starts, len(zone)])
+        total = np.add.reduceat(value, starts)
+        mean = total / count
+        result['n'][index] = count
+        result['sum'][index] = total
+        result['sum_abs'][index] = np.add.reduceat(np.abs(value), starts)
+        result['m2'][index] = np.add.reduceat(
+            (value - np.repeat(mean, count)) ** 2, starts)
+        result['minimum'][index] = np.minimum.reduceat(value, starts)
+        result['maximum'][index] = np.maximum.reduceat(value, starts)
+    if keep_values:
+        result['values'] = value
+        result['value_zones'] = zone
+    return result
+
+
+def merge_statistics(parts):
+    """Merges statistics of bands computed by :func:`band_statistics`"""
+    parts = [part for part in parts if len(part['zone'])]
+    if not parts:
+        return band_statistics(np.empty(0, dtype=np.int32), np.empty(0),
+                               keep_values=True)
+    if len(parts) == 1:
+        return parts[0]
+    zone, index = np.unique(np.concatenate([part['zone'] for part in parts]),
+                            return_inverse=True)
+
+    def concatenate(key):
+        return np.concatenate([part[key] for part in parts])
+
+    def total(key):
+        return np.bincount(index, concatenate(key), minlength=len(zone))
+
+    result = {'zone': zone}
+    result['null_cells'] = total('null_cells').astype(np.int64)
+    for key in ('n', 'sum', 'sum_abs'):
+        result[key] = total(key)
+    result['minimum'] = np.full(len(zone), np.inf)
+    np.minimum.at(result['minimum'], index, concatenate('minimum'))
+    result['maximum'] = np.full(len(zone), -np.inf)
+    np.maximum.at(result['maximum'], index, concatenate('maximum'))
+    # combination of variances of parts (Chan et al.)
+    count = concatenate('n')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = result['sum'] / result['n']
+        part_mean = np.where(count > 0, concatenate('sum') / count, 0)
+    deviation = np.where(count > 0, part_mean - mean[index], 0)
+    result['m2'] = np.bincount(
+        index, concatenate('m2') + count * deviation ** 2,
+        minlength=len(zone))
+    if 'values' in parts[0]:
+        value = concatenate('values')
+        value_zone = concatenate('value_zones')
+        order = np.lexsort((value, value_zone))
+        result['values'] = value[order]
+        result['value_zones'] = value_zone[order]
+    return result
+
+
+def _percentile_values(stats, fractions):
+    """Returns values at positions of fractions as r.univar -e does"""
+    count = stats['n'].astype(np.int64)
+    # first value of each zone
+    first = np.searchsorted(stats['value_zones'], stats['zone'])
+    last = np.maximum(first + count - 1, 0)
+    values = stats['values']
+    if not len(values):
+        return [np.full(len(count), np.nan) for fraction in fractions]
+    result = []
+    for fraction in fractions:
+        # truncated as the integer conversion in C
+        position = (count * fraction - 0.5).astype(np.int64)
+        position = np.minimum(first + np.maximum(position, 0), last)
+        value = values[np.minimum(position, len(values) - 1)]
+        result.append(np.where(count > 0, value, np.nan))
+    return result
+
+
+def finish_statistics(stats, percentiles=None):
+    """Computes final statistics from merged statistics
+
+    :return: dictionary with zone and :data:`STATISTICS` (and
+             :data:`EXTENDED_STATISTICS` and percentile_<p> with
+             percentiles), NaN for zones without values
+    """
+    count = stats['n']
+    result = {'zone': stats['zone'],
+              'number': count.astype(np.int64),
+              'null_cells': stats['null_cells']}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        empty = count == 0
+        result['minimum'] = np.where(empty, np.nan, stats['minimum'])
+        result['maximum'] = np.where(empty, np.nan, stats['maximum'])
+        result['range'] = result['maximum'] - result['minimum']
+        result['average'] = stats['sum'] / count
+        result['mean_of_abs'] = stats['sum_abs'] / count
+        variance = stats['m2'] / count
+        variance[variance < EPSILON] = 0.0
+        variance[empty] = np.nan
+        result['variance'] = variance
+        result['stddev'] = np.sqrt(variance)
+        result['coeff_var'] = result['stddev'] / result['average'] * 100.0
+        result['sum'] = np.where(empty, np.nan, stats['sum'])
+        result['sum_abs'] = np.where(empty, np.nan, stats['sum_abs'])
+    if percentiles is not None:
+        quartiles = _percentile_values(stats, [0.25, 0.75] +
+                                       [p / 100.0 for p in percentiles])
+        result['first_quartile'] = quartiles[0]
+        result['third_quartile'] = quartiles[1]
+        for percentile, values in zip(percentiles, quartiles[2:]):
+            result['percentile_%s' % percentile] = values
+        # mean of two middle values for even number of values
+        count = count.astype(np.int64)
+        if len(stats['values']):
+            first = np.searchsorted(stats['value_zones'], stats['zone'])
+            last = len(stats['values']) - 1
+            upper = stats['values'][np.minimum(first + count // 2, last)]
+            lower = stats['values'][np.clip(first + (count - 1) // 2, 0,
+                                            last)]
+            median = np.where(count % 2, upper, (lower + upper) / 2.0)
+        else:
+            median = np.zeros(len(count))
+        result['median'] = np.where(count > 0, median, np.nan)
+    return result
+
+
+def _band_worker(args):
+    zones, rasters, start, end, keep_values = args
+    zone_band = _read_band(zones, start, end)
+    return [band_statistics(zone_band, _read_band(raster, start, end),
+                            keep_values)
+            for raster in rasters]
+
+
+def zonal_statistics(zones, rasters, percentiles=None, nprocs=1,
+                     band_rows=None):
+    """Computes statistics of raster maps in zones of a zone map
+
+    Rasters are read in the current region.
+
+    :param zones: name of zone raster map (CELL)
+    :param rasters: list of names of raster maps
+    :param percentiles: list of percentiles (0-100) to compute
+                        quartiles, median and percentiles, None
+                        for basic statistics
+    :param nprocs: number of processes processing bands of rows
+    :param band_rows: number of rows in a band (computed by default)
+
+    :return: dictionary of statistics (see :func:`finish_statistics`)
+             for each raster map
+    """
+    rows = libraster.Rast_window_rows()
+    if band_rows is None:
+        # several bands for each process, at most 10^6 cells in a band
+        cols = max(libraster.Rast_window_cols(), 1)
+        band_rows = max(1, min(rows // (4 * nprocs) or 1, 1000000 // cols))
+    keep_values = percentiles is not None
+    tasks = [(zones, rasters, start, min(start + band_rows, rows),
+              keep_values) for start in range(0, rows, band_rows)]
+    if nprocs > 1 and len(tasks) > 1:
+        pool = Pool(nprocs)
+        try:
+            parts = pool.map(_band_worker, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        parts = [_band_worker(task) for task in tasks]
+    result = {}
+    for i, raster in enumerate(rasters):
+        stats = merge_statistics([part[i] for part in parts])
+        result[raster] = finish_statistics(stats, percentiles)
+    return result
@@ -18,14 +18,18 @@ from multiprocessing import Process, Lock, Pipe
 from ctypes import *
 
 from grass.exceptions import FatalError
-from grass.pygrass.vector import *
-from grass.pygrass.raster import *
-import grass.lib.gis as libgis
+from grass.script.utils import lazy_import
 from .base import RPCServerBase
-from grass.pygrass.gis.region import Region
-import grass.pygrass.utils as utils
 import logging
 
+# the libraries are needed only by the server process
+libgis = lazy_import('grass.lib.gis')
+raster = lazy_import('grass.pygrass.raster')
+vector = lazy_import('grass.pygrass.vector')
+basic = lazy_import('grass.pygrass.vector.basic')
+region = lazy_import('grass.pygrass.gis.region')
+utils = lazy_import('grass.pygrass.utils')
+
 ###############################################################################
 ###############################################################################
 
@@ -58,11 +62,11 @@ def _get_raster_image_as_np(lock, conn, data):
         if not mapset:
             raise ValueError("Unable to find raster map <%s>"%(name))
 
-        rast = RasterRow(name, mapset)
+        rast = raster.RasterRow(name, mapset)
 
         if rast.exist():
 
-            reg = Region()
+            reg = region.Region()
             reg.from_rast(name)
 
             if extent is not None:
@@ -80,7 +84,7 @@ def _get_raster_image_as_np(lock, conn, data):
                     reg.cols =  extent["cols"]
                 reg.adjust()
 
-            array = raster2numpy_img(name, reg, color)
+            array = raster.raster2numpy_img(name, reg, color)
     except:
         raise
     finally:
@@ -105,7 +109,7 @@ def _get_vector_table_as_dict(lock, conn, data):
         if not mapset:
             raise ValueError("Unable to find vector map <%s>"%(name))
 
-        layer = VectorTopo(name, mapset)
+        layer = vector.VectorTopo(name, mapset)
 
         if layer.exist() is True:
             layer.open("r")
@@ -150,7 +154,7 @@ def _get_vector_features_as_wkb_list(lock, conn, data):
         if not mapset:
             raise ValueError("Unable to find vector map <%s>"%(name))
 
-        layer = VectorTopo(name, mapset)
+        layer = vector.VectorTopo(name, mapset)
 
         if layer.exist() is True:
             if extent is not None:
@@ -212,6 +216,7 @@ def data_provider_server(lock, conn):
 
     cerror_handler = CALLBACK(error_handler)
 
+    libgis.G_gisinit("data_provider_server")
     libgis.G_add_error_handler(cerror_handler, None)
 
     # Crerate the function array
@@ -2,10 +2,13 @@
 from __future__ import print_function
 
 from os.path import join, exists
+from itertools import repeat
+from collections import namedtuple
 import grass.lib.gis as libgis
 libgis.G_gisinit('')
 import grass.lib.vector as libvect
 import ctypes
+import numpy as np
 
 #
 # import pygrass modules
@@ -17,6 +20,8 @@ from grass.pygrass.gis import Location
 from grass.pygrass.vector.geometry import GEOOBJ as _GEOOBJ
 from grass.pygrass.vector.geometry import read_line, read_next_line
 from grass.pygrass.vector.geometry import Area as _Area
+from grass.pygrass.vector.geometry import Attrs, Line, Node, Point
+from grass.pygrass.vector.geometry import GV_TYPE
 from grass.pygrass.vector.abstract import Info
 from grass.pygrass.vector.basic import Bbox, Cats, Ilist
 
@@ -35,6 +40,12 @@ _NUMOF = {"areas": libvect.Vect_get_num_areas,
           "updated_lines": libvect.Vect_get_num_updated_lines,
           "updated_nodes": libvect.Vect_get_num_updated_nodes,
           "volumes": libvect.Vect_get_num_volumes}
+#: feature returned by VectorTopo.viter with astuple='bbox', bbox is a
+#: tuple (north, south, east, west)
+FeatureBbox = namedtuple('FeatureBbox', 'id cat type bbox')
+#: feature returned by VectorTopo.viter with astuple='coords', coords is a
+#: tuple (x, y, z) of numpy arrays, z is None for 2D maps
+FeatureCoords = namedtuple('FeatureCoords', 'id cat type coords')
 
 # For test purposes
 test_vector_name = "vector_doctest_map"
@@ -64,7 +75,10 @@ class Vector(Info):
         self._topo_level = 1
         self._class_name = 'Vector'
         self.overwrite = False
-        self._cats = []
+        self._cats = set()
+        self._last_cat = 0
+        # attribute rows waiting for insert (see buffer_size in open)
+        self._attrs_buffer = []
 
     def __repr__(self):
         if self.exist():
@@ -184,7 +198,6 @@ class Vector(Info):
             >>> new.remove()
 
         """
-        self.n_lines += 1
         if not isinstance(cat, int) and not isinstance(cat, str):
             # likely the case of using 7.0 API
             import warnings
@@ -194,19 +207,81 @@ class Vector(Info):
             # try to accommodate
             attrs = cat
             cat = None
+        self._write(geo_obj, cat, attrs)
+
+    @must_be_open
+    def write_many(self, geo_objs, cats=None, attrs=None):
+        """Write a sequence of geometry features and their attributes.
+
+        Attribute rows are inserted in batches (of *buffer_size* given
+        to ``open`` or of 1000 rows); as with ``write``, they are
+        committed by the user or when the map is closed with buffered
+        writing.
+
+        :param geo_objs: iterable of geometry objects
+        :param cats: iterable of categories (one for each feature),
+                     None to use next categories when attributes are
+                     given or c_cats of the features otherwise
+        :param attrs: iterable of attribute sequences (one for each
+                      feature) or None
+
+        >>> new = VectorTopo('newvect_many')
+        >>> new.open('w', tab_name='newvect_many',
+        ...          tab_cols=[(u'cat', 'INTEGER PRIMARY KEY'),
+        ...                    (u'name', 'TEXT')])
+        >>> from grass.pygrass.vector.geometry import Point
+        >>> new.write_many([Point(0, 0), Point(1, 1)], cats=[1, 2],
+        ...                attrs=[('pub',), ('resturant',)])
+        >>> new.table.conn.commit()
+        >>> new.table.execute().fetchall()
+        [(1, 'pub'), (2, 'resturant')]
+        >>> new.close()
+        >>> new.remove()
+        """
+        cats = iter(cats) if cats is not None else repeat(None)
+        attrs = iter(attrs) if attrs is not None else repeat(None)
+        buffer_size = self.buffer_size
+        if not buffer_size:
+            self.buffer_size = 1000
+        try:
+            for geo_obj in geo_objs:
+                self._write(geo_obj, next(cats), next(attrs))
+        finally:
+            self.buffer_size = buffer_size
+            if not buffer_size:
+                self.flush()
+
+    @must_be_open
+    def flush(self):
+        """Insert buffered attribute rows (without commit)."""
+        if self._attrs_buffer:
+            cur = self.table.conn.cursor()
+            cur.executemany(self.table.columns.insert_str,
+                            self._attrs_buffer)
+            cur.close()
+            self._attrs_buffer = []
+
+    def _write(self, geo_obj, cat, attrs):
+        self.n_lines += 1
         if attrs and cat is None:
             # TODO: this does not work as expected when there are
             # already features in the map when we opened it
-            cat = (self._cats[-1] if self._cats else 0) + 1
+            cat = self._last_cat + 1
 
         if cat is not None and cat not in self._cats:
-            self._cats.append(cat)
+            self._cats.add(cat)
+            self._last_cat = cat
             if self.table is not None and attrs is not None:
                 attr = [cat, ]
                 attr.extend(attrs)
-                cur = self.table.conn.cursor()
-                cur.execute(self.table.columns.insert_str, attr)
-                cur.close()
+                if self.buffer_size:
+                    self._attrs_buffer.append(attr)
+                    if len(self._attrs_buffer) >= self.buffer_size:
+                        self.flush()
+                else:
+                    cur = self.table.conn.cursor()
+                    cur.execute(self.table.columns.insert_str, attr)
+                    cur.close()
 
         if cat is not None:
             cats = Cats(geo_obj.c_cats)
@@ -226,6 +301,18 @@ class Vector(Info):
             # return offset into file where the feature starts (on level 1)
             geo_obj.offset = result
 
+    def close(self, build=False):
+        """Close the vector map, buffered attribute rows are inserted
+        and committed
+
+        :param build: True if the vector map should be build before close it
+        :type build: bool
+        """
+        if self._attrs_buffer and self.is_open() and self.table is not None:
+            self.flush()
+            self.table.conn.commit()
+        super(Vector, self).close(build=build)
+
     @must_be_open
     def has_color_table(self):
         """Return if vector has color table associated in file system;
@@ -396,7 +483,7 @@ class VectorTopo(Vector):
         return output
 
     @must_be_open
-    def viter(self, vtype, idonly=False):
+    def viter(self, vtype, idonly=False, recycle=False, astuple=None):
         """Return an iterator of vector features
 
         :param vtype: the name of type to query; the supported values are:
@@ -407,6 +494,19 @@ class VectorTopo(Vector):
         :param idonly: variable to return only the id of features instead of
                        full features
         :type idonly: bool
+        :param recycle: if True, only one feature object (and its C
+                        structures) is allocated and it is read again and
+                        returned at each step, so it must not be stored
+                        or used after the next step
+        :type recycle: bool
+        :param astuple: return tuples instead of feature objects,
+                        with *bbox* :class:`FeatureBbox` (id, cat, type,
+                        bbox) tuples, the coordinates of lines are not
+                        read; with *coords* :class:`FeatureCoords` (id,
+                        cat, type, coords) tuples, where coords are numpy
+                        arrays sharing memory with C structures reused at
+                        the next step (copy them to keep them)
+        :type astuple: str
 
             >>> test_vect = VectorTopo(test_vector_name, mode='r')
             >>> test_vect.open(mode='r')
@@ -433,6 +533,17 @@ class VectorTopo(Vector):
             3
             3
 
+        to compute something on each feature without allocating a new
+        object for each of them, use: ::
+
+            >>> [area.id for area in test_vect.viter('areas', recycle=True)]
+            [1, 2, 3, 4]
+            >>> for feature in test_vect.viter('lines', astuple='bbox'):
+            ...     print(feature)
+            FeatureBbox(id=1, cat=1, type='point', bbox=(6.0, 6.0, 10.0, 10.0))
+            FeatureBbox(id=2, cat=1, type='point', bbox=(6.0, 6.0, 12.0, 12.0))
+            FeatureBbox(id=3, cat=1, type='point', bbox=(6.0, 6.0, 14.0, 14.0))
+
             >>> test_vect.close()
         """
         if vtype in _GEOOBJ.keys():
@@ -440,6 +551,17 @@ class VectorTopo(Vector):
                 ids = (indx for indx in range(1, self.number_of(vtype) + 1))
                 if idonly:
                     return ids
+                if astuple is not None:
+                    if astuple not in ('bbox', 'coords'):
+                        raise ValueError("astuple not supported, use 'bbox' "
+                                         "or 'coords'")
+                    if vtype not in ('points', 'lines', 'boundaries',
+                                     'areas', 'islands'):
+                        raise ValueError("vtype not supported with astuple: "
+                                         "'%s'" % vtype)
+                    return self._viter_tuples(vtype, ids, astuple)
+                if recycle:
+                    return self._viter_recycled(vtype, ids)
                 return (_GEOOBJ[vtype](v_id=indx, c_mapinfo=self.c_mapinfo,
                                        table=self.table,
                                        writeable=self.writeable)
@@ -448,6 +570,90 @@ class VectorTopo(Vector):
             keys = "', '".join(sorted(_GEOOBJ.keys()))
             raise ValueError("vtype not supported, use one of: '%s'" % keys)
 
+    def _viter_recycled(self, vtype, ids):
+        """Yield the same feature object read again for each id"""
+        if vtype == 'nodes':
+            for indx in ids:
+                # a node has no C structures, it is cheap to create
+                yield Node(v_id=indx, c_mapinfo=self.c_mapinfo)
+            return
+        feature = _GEOOBJ[vtype](c_mapinfo=self.c_mapinfo)
+        feature.is2D = bool(libvect.Vect_is_3d(self.c_mapinfo) != 1)
+        # only points and lines are read by Vect_read_line, areas and
+        # isles are read on request
+        read = isinstance(feature, (Point, Line))
+        attrs = None
+        if self.table is not None:
+            attrs = Attrs(None, self.table, self.writeable)
+        for indx in ids:
+            feature.id = indx
+            if read:
+                feature.read()
+            if attrs is not None:
+                cat = feature.cat
+                attrs.cat = cat
+                feature.attrs = attrs if cat is not None else None
+            yield feature
+
+    def _viter_tuples(self, vtype, ids, astuple):
+        """Yield FeatureBbox or FeatureCoords tuples for each id"""
+        c_mapinfo = self.c_mapinfo
+        # C structures are allocated once and freed by the Line object
+        buffer = Line(c_mapinfo=c_mapinfo)
+        c_points, c_cats = buffer.c_points, buffer.c_cats
+        points = c_points.contents
+        cats = c_cats.contents
+        is3D = libvect.Vect_is_3d(c_mapinfo) == 1
+        bbox = Bbox()
+        c_bbox = bbox.c_bbox
+        with_bbox = astuple == 'bbox'
+
+        def read_cat(line):
+            """Read categories of line, return its first category"""
+            libvect.Vect_read_line(c_mapinfo, None, c_cats, line)
+            return cats.cat[0] if cats.n_cats else None
+
+        def coords():
+            npoints = points.n_points
+            if not npoints:
+                empty = np.empty(0)
+                return empty, empty, (empty if is3D else None)
+            x = np.ctypeslib.as_array(points.x, shape=(npoints, ))
+            y = np.ctypeslib.as_array(points.y, shape=(npoints, ))
+            z = np.ctypeslib.as_array(points.z, shape=(npoints, ))
+            return x, y, (z if is3D else None)
+
+        for indx in ids:
+            if vtype == 'areas':
+                centroid = libvect.Vect_get_area_centroid(c_mapinfo, indx)
+                cat = read_cat(centroid) if centroid else None
+                ftype = 'area'
+                if with_bbox:
+                    libvect.Vect_get_area_box(c_mapinfo, indx, c_bbox)
+                else:
+                    libvect.Vect_get_area_points(c_mapinfo, indx, c_points)
+            elif vtype == 'islands':
+                cat = None
+                ftype = 'isle'
+                if with_bbox:
+                    libvect.Vect_get_isle_box(c_mapinfo, indx, c_bbox)
+                else:
+                    libvect.Vect_get_isle_points(c_mapinfo, indx, c_points)
+            else:
+                if with_bbox:
+                    ftype = libvect.Vect_read_line(c_mapinfo, None, c_cats,
+                                                   indx)
+                    libvect.Vect_get_line_box(c_mapinfo, indx, c_bbox)
+                else:
+                    ftype = libvect.Vect_read_line(c_mapinfo, c_points,
+                                                   c_cats, indx)
+                cat = cats.cat[0] if cats.n_cats else None
+                ftype = GV_TYPE[ftype]['label'] if ftype in GV_TYPE else None
+            if with_bbox:
+                yield FeatureBbox(indx, cat, ftype, bbox.nsewtb(tb=False))
+            else:
+                yield FeatureCoords(indx, cat, ftype, coords())
+
     @must_be_open
     def rewind(self):
         """Rewind vector map to cause reads to start at beginning. ::
@@ -79,6 +79,7 @@ class Info(object):
         self._class_name = 'Vector'
         self._mode = 'r'
         self.overwrite = False
+        self.buffer_size = 0
         self.date_fmt = '%a %b  %d %H:%M:%S %Y'
 
     def __enter__(self):
@@ -298,7 +299,7 @@ class Info(object):
              # parameters valid only if mode == 'w'
              tab_name='', tab_cols=None, link_name=None, link_key='cat',
              link_db='$GISDBASE/$LOCATION_NAME/$MAPSET/sqlite/sqlite.db',
-             link_driver='sqlite'):
+             link_driver='sqlite', buffer_size=0):
         """Open a Vector map.
 
 
@@ -328,6 +329,10 @@ class Info(object):
         :type link_db: str
         :param link_driver: define witch database driver will be used
         :param link_driver: str
+        :param buffer_size: number of attribute rows inserted at once
+                            by ``write``, rows are committed when the map
+                            is closed; 0 to insert each row immediately
+        :type buffer_size: int
 
         Some of the parameters are valid only with mode ``w`` or ``rw``
 
@@ -335,6 +340,7 @@ class Info(object):
         methods
         """
         self.mode = mode if mode else self.mode
+        self.buffer_size = buffer_size
         with_z = libvect.WITH_Z if with_z else libvect.WITHOUT_Z
         # check if map exists or not
         if not self.exist() and self.mode != 'w':
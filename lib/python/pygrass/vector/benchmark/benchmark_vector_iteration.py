@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of vector feature iteration using pygrass
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+from grass.gunittest.benchmark import BenchmarkCase
+from grass.gunittest.main import test
+
+from grass.pygrass.vector import VectorTopo
+
+
+class VectorIterationBenchmark(BenchmarkCase):
+
+    name = "VectorIterationBenchmark_points"
+
+    @classmethod
+    def setUpClass(cls):
+        """Create test vector map and region"""
+        super(VectorIterationBenchmark, cls).setUpClass()
+        cls.use_temp_region()
+        cls.runModule("g.region", n=1000, s=0, e=1000, w=0, res=1)
+        cls.runModule("v.random", output=cls.name, npoints=50000, seed=1,
+                      overwrite=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the generated vector map"""
+        cls.runModule("g.remove", flags='f', type='vector', name=cls.name)
+        cls.del_temp_region()
+        super(VectorIterationBenchmark, cls).tearDownClass()
+
+    def test_viter_points(self):
+        def iterate():
+            with VectorTopo(self.name, mode='r') as vect:
+                for point in vect.viter('points'):
+                    pass
+        self.benchmark(iterate)
+
+    def test_viter_points_recycle(self):
+        def iterate():
+            with VectorTopo(self.name, mode='r') as vect:
+                for point in vect.viter('points', recycle=True):
+                    pass
+        self.benchmark(iterate)
+
+    def test_viter_points_bbox(self):
+        def iterate():
+            with VectorTopo(self.name, mode='r') as vect:
+                for feature in vect.viter('points', astuple='bbox'):
+                    pass
+        self.benchmark(iterate)
+
+    def test_iter_features(self):
+        def iterate():
+            with VectorTopo(self.name, mode='r') as vect:
+                for feature in vect:
+                    pass
+        self.benchmark(iterate)
+
+
+if __name__ == '__main__':
+    test()
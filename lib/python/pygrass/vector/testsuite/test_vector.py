@@ -9,6 +9,7 @@ from grass.gunittest.main import test
 
 from grass.script.core import run_command
 from grass.pygrass.vector import VectorTopo
+from grass.pygrass.vector.geometry import Point
 
 
 class VectorTopoTestCase(TestCase):
@@ -57,6 +58,53 @@ class VectorTopoTestCase(TestCase):
                 
             self.vect.close()
 
+    def test_viter_recycle(self):
+        """Test that recycled features are read as the default ones"""
+        with VectorTopo(self.tmpname, mode="r") as vect:
+            for name in ["points", "lines", "areas", "islands", "nodes"]:
+                features = [(feature.id, feature.cat if name != "nodes" else
+                             None) for feature in vect.viter(name)]
+                recycled = [(feature.id, feature.cat if name != "nodes" else
+                             None)
+                            for feature in vect.viter(name, recycle=True)]
+                self.assertListEqual(features, recycled)
+            coords = [pnt.coords() for pnt in vect.viter("points")]
+            recycled = [pnt.coords()
+                        for pnt in vect.viter("points", recycle=True)]
+            self.assertListEqual(coords, recycled)
+            attrs = [pnt.attrs["name"] for pnt in vect.viter("points")]
+            recycled = [pnt.attrs["name"]
+                        for pnt in vect.viter("points", recycle=True)]
+            self.assertListEqual(attrs, recycled)
+
+    def test_viter_astuple(self):
+        """Test the bbox and coordinates tuples of features"""
+        with VectorTopo(self.tmpname, mode="r") as vect:
+            for name in ["areas", "islands"]:
+                features = list(vect.viter(name))
+                tuples = list(vect.viter(name, astuple="bbox"))
+                self.assertEqual(len(features), len(tuples))
+                for feature, ftuple in zip(features, tuples):
+                    self.assertEqual(feature.id, ftuple.id)
+                    if name == "areas":
+                        self.assertEqual(feature.cat, ftuple.cat)
+                    self.assertTupleEqual(feature.bbox().nsewtb(tb=False),
+                                          ftuple.bbox)
+            for pnt, ftuple in zip(vect.viter("points"),
+                                   vect.viter("points", astuple="bbox")):
+                self.assertEqual(pnt.id, ftuple.id)
+                self.assertEqual(pnt.cat, ftuple.cat)
+                self.assertTupleEqual((pnt.y, pnt.y, pnt.x, pnt.x),
+                                      ftuple.bbox)
+            for pnt, ftuple in zip(vect.viter("points"),
+                                   vect.viter("points", astuple="coords")):
+                x, y, z = ftuple.coords
+                self.assertTupleEqual(pnt.coords(), (x[0], y[0]))
+                self.assertIsNone(z)
+                self.assertEqual(ftuple.type, "point")
+            with self.assertRaises(ValueError):
+                vect.viter("nodes", astuple="bbox")
+
     def test_getitem_raise(self):
         """Test that getitem raise a value error if the key is not
         an integer or a slice"""
@@ -66,5 +114,41 @@ class VectorTopoTestCase(TestCase):
 
             self.vect.close()
 
+
+class VectorWriteTestCase(TestCase):
+
+    tmpname = "VectorWriteTestCase_map"
+    cols = [(u'cat', 'INTEGER PRIMARY KEY'), (u'name', 'TEXT')]
+
+    def tearDown(self):
+        self.runModule("g.remove", flags='f', type='vector',
+                       name=self.tmpname)
+
+    def check_map(self, number):
+        with VectorTopo(self.tmpname, mode="r") as vect:
+            self.assertEqual(vect.number_of("points"), number)
+            self.assertEqual(vect.table.n_rows(), number)
+            self.assertEqual(vect.table_to_dict()[number],
+                             [number, 'point %d' % number])
+
+    def test_buffered_write(self):
+        """Test that buffered attribute rows are written on close"""
+        with VectorTopo(self.tmpname, mode="w", tab_cols=self.cols,
+                        overwrite=True, buffer_size=1000) as vect:
+            for i in range(1, 2501):
+                vect.write(Point(i, i), cat=i, attrs=('point %d' % i,))
+        self.check_map(2500)
+
+    def test_write_many(self):
+        """Test writing of sequences of features"""
+        with VectorTopo(self.tmpname, mode="w", tab_cols=self.cols,
+                        overwrite=True) as vect:
+            vect.write_many((Point(i, i) for i in range(1, 2501)),
+                            attrs=(('point %d' % i,)
+                                   for i in range(1, 2501)))
+            vect.table.conn.commit()
+        self.check_map(2500)
+
+
 if __name__ == '__main__':
     test()
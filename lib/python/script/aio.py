@@ -0,0 +1,475 @@
+"""
+Asynchronous interface to launch GRASS GIS modules in scripts
+
+Coroutine versions of functions from :mod:`grass.script.core` for use
+with :mod:`asyncio`. Modules run as child processes and their output
+is read by the event loop, so that many modules can run at the same
+time and their output can be processed while they run, without threads.
+
+Usage:
+
+::
+
+    import asyncio
+    from grass.script import aio
+
+    async def main():
+        # stream output of one module line by line
+        process = await aio.pipe_command('v.db.select', map='roads')
+        async with process:
+            async for line in process:
+                print(line)
+        # run more modules at the same time
+        return await asyncio.gather(
+            *[aio.parse_command('r.univar', map=name, flags='g')
+              for name in ('elevation', 'slope', 'aspect')])
+
+    asyncio.run(main())
+
+Number of modules running at the same time is limited, see
+:func:`set_max_processes`. When a coroutine is cancelled, the module it
+runs is terminated. Messages printed by modules to standard error are
+parsed to :class:`Message` objects when standard error is captured
+(``stderr=PIPE``, ``on_message`` callback or
+:func:`grass.script.core.set_capture_stderr`).
+
+Requires Python 3.
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import weakref
+from collections import namedtuple
+
+from grass.exceptions import ScriptError, CalledModuleError
+
+from .core import (PIPE, _popen_args, _make_unicode, make_command,
+                   shutil_which, debug_level, get_capture_stderr)
+from .utils import parse_key_val, encode, decode
+
+#: message printed by a module, type is one of 'message', 'warning',
+#: 'error', 'percent', 'progress' or 'text' (other output), value is
+#: a number for 'percent' and 'progress', None otherwise
+Message = namedtuple('Message', ['type', 'text', 'value'])
+
+_message_types = {'GRASS_INFO_MESSAGE': 'message',
+                  'GRASS_INFO_WARNING': 'warning',
+                  'GRASS_INFO_ERROR': 'error'}
+
+_max_processes = os.cpu_count() or 1
+# event loop -> semaphore limiting number of running processes
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def set_max_processes(count):
+    """Sets maximal number of modules running at the same time
+
+    Modules started after the limit is reached wait until other modules
+    end. The limit applies to each event loop separately. Default is
+    the number of CPUs.
+
+    Note that a coroutine which starts a module while it keeps another
+    module running may wait forever when the limit is too low.
+    """
+    global _max_processes
+    if count < 1:
+        raise ValueError(_("Number of processes must be at least 1"))
+    _max_processes = count
+    _semaphores.clear()
+
+
+def get_max_processes():
+    """Returns maximal number of modules running at the same time"""
+    return _max_processes
+
+
+def _get_semaphore():
+    loop = asyncio.get_event_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(_max_processes)
+    return semaphore
+
+
+class MessageParser(object):
+    """Parser of module messages in GUI format (GRASS_MESSAGE_FORMAT=gui)
+
+    >>> parser = MessageParser()
+    >>> parser.feed('GRASS_INFO_WARNING(12,1): Map not found')
+    >>> parser.feed('GRASS_INFO_END(12,1)')
+    Message(type='warning', text='Map not found', value=None)
+    >>> parser.feed('GRASS_INFO_PERCENT: 50')
+    Message(type='percent', text='', value=50)
+    >>> parser.feed('1|Main street')
+    Message(type='text', text='1|Main street', value=None)
+    """
+
+    def __init__(self):
+        self._type = None
+        self._lines = []
+
+    def feed(self, line):
+        """Parses one line (without line end)
+
+        :return: :class:`Message` when the line completes a message,
+                 None otherwise
+        """
+        if not line:
+            return None
+        prefix = line.split('(', 1)[0]
+        if prefix in _message_types:
+            self._type = _message_types[prefix]
+            text = line.split(':', 1)[1] if ':' in line else ''
+            self._lines.append(text[1:] if text.startswith(' ') else text)
+            return None
+        if prefix == 'GRASS_INFO_END':
+            message = Message(self._type or 'message',
+                              '\n'.join(self._lines), None)
+            self._type = None
+            self._lines = []
+            return message
+        for name, type_ in (('GRASS_INFO_PERCENT', 'percent'),
+                            ('GRASS_INFO_PROGRESS', 'progress')):
+            if line.startswith(name + ':'):
+                try:
+                    return Message(type_, '', int(line.split(':', 1)[1]))
+                except ValueError:
+                    break
+        return Message('text', line, None)
+
+
+class Process(object):
+    """Running module started by :func:`start_command`
+
+    Standard output can be read line by line by ``async for``.
+    When the process is used as asynchronous context manager, it is
+    waited for at the end of the block and terminated when the block
+    ends by an exception (including cancellation) or before all the
+    output is read.
+
+    Attributes *messages* (list of :class:`Message`) and *errors*
+    (text of error messages) are available when standard error is
+    captured.
+    """
+
+    def __init__(self, process, args, encoding, on_message, release):
+        self.args = args
+        self.encoding = encoding
+        self.messages = []
+        self._process = process
+        self._on_message = on_message
+        self._release = release
+        self._stderr_task = None
+        if process.stderr is not None:
+            self._stderr_task = asyncio.ensure_future(self._read_messages())
+
+    def __repr__(self):
+        return '<{0} {1} pid={2} returncode={3}>'.format(
+            self.__class__.__name__, self.args[0], self.pid, self.returncode)
+
+    @property
+    def pid(self):
+        return self._process.pid
+
+    @property
+    def returncode(self):
+        return self._process.returncode
+
+    @property
+    def stdin(self):
+        """asyncio.StreamWriter of standard input (or None)"""
+        return self._process.stdin
+
+    @property
+    def stdout(self):
+        """asyncio.StreamReader of standard output (or None)"""
+        return self._process.stdout
+
+    @property
+    def errors(self):
+        """Text of error messages"""
+        return '\n'.join(message.text for message in self.messages
+                         if message.type == 'error')
+
+    def _decode(self, data):
+        return _make_unicode(data, self.encoding)
+
+    async def _read_messages(self):
+        parser = MessageParser()
+        while True:
+            line = await self._process.stderr.readline()
+            if not line:
+                break
+            message = parser.feed(decode(line).rstrip('\r\n'))
+            if message is None:
+                continue
+            self.messages.append(message)
+            if self._on_message:
+                self._on_message(message)
+
+    async def readline(self):
+        """Reads one line of standard output
+
+        :return: line without line end, None at the end of output
+        """
+        line = await self._process.stdout.readline()
+        if not line:
+            return None
+        return self._decode(line.rstrip(b'\r\n'))
+
+    async def lines(self):
+        """Asynchronous iterator over lines of standard output"""
+        while True:
+            line = await self.readline()
+            if line is None:
+                return
+            yield line
+
+    def __aiter__(self):
+        return self.lines()
+
+    async def read(self):
+        """Reads the whole standard output"""
+        return self._decode(await self._process.stdout.read())
+
+    async def write(self, data):
+        """Writes data (string or bytes) to standard input"""
+        if self.encoding is None or self.encoding == 'default':
+            data = encode(data)
+        else:
+            data = encode(data, encoding=self.encoding)
+        self._process.stdin.write(data)
+        await self._process.stdin.drain()
+
+    def close_stdin(self):
+        """Closes standard input, so the module knows the input ended"""
+        if self._process.stdin is not None:
+            self._process.stdin.close()
+
+    async def communicate(self, input=None):
+        """Writes input, reads standard output and waits for the module
+
+        :return: standard output (None when not piped)
+        """
+        stdout = None
+        if input is not None:
+            await self.write(input)
+        self.close_stdin()
+        if self._process.stdout is not None:
+            stdout = await self.read()
+        await self.wait()
+        return stdout
+
+    async def wait(self):
+        """Waits for the module to end
+
+        The module is terminated when waiting is cancelled.
+
+        :return: return code
+        """
+        try:
+            await self._process.wait()
+            if self._stderr_task is not None:
+                await self._stderr_task
+        except asyncio.CancelledError:
+            self.terminate()
+            await self._process.wait()
+            raise
+        finally:
+            if self._process.returncode is not None and self._release:
+                self._release()
+                self._release = None
+        return self._process.returncode
+
+    def terminate(self):
+        """Terminates the module if it is still running"""
+        if self._process.returncode is None:
+            try:
+                self._process.terminate()
+            except ProcessLookupError:
+                pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        stdout = self._process.stdout
+        if exc_type is not None or (stdout is not None and
+                                    not stdout.at_eof()):
+            self.terminate()
+        self.close_stdin()
+        await self.wait()
+        return False
+
+
+async def _create_process(args, **popts):
+    if sys.platform == 'win32':
+        # scripts are started by shell as in grass.script.core.Popen
+        cmd = shutil_which(args[0])
+        if cmd is None:
+            raise OSError(_("Cannot find the executable {0}")
+                          .format(args[0]))
+        args = [cmd] + args[1:]
+        if os.path.splitext(cmd)[1].lower() not in ('.com', '.exe'):
+            return await asyncio.create_subprocess_shell(
+                subprocess.list2cmdline(args), **popts)
+    return await asyncio.create_subprocess_exec(*args, **popts)
+
+
+async def start_command(prog, flags="", overwrite=False, quiet=False,
+                        verbose=False, superquiet=False, on_message=None,
+                        **kwargs):
+    """Starts module asynchronously, returns :class:`Process`
+
+    Waits when the maximal number of running modules is reached.
+    Accepts the same arguments as :func:`grass.script.core.start_command`.
+    Standard streams are always binary, output is decoded according to
+    *encoding*.
+
+    :param on_message: function called with each :class:`Message`
+                       of the module (implies ``stderr=PIPE``)
+    """
+    encoding = kwargs.pop('encoding', 'default')
+    options = {}
+    popts = {}
+    for opt, val in kwargs.items():
+        if opt in _popen_args:
+            popts[opt] = val
+        else:
+            options[opt] = val
+    if popts.pop('universal_newlines', False):
+        raise ScriptError(_("Text mode is not supported, use encoding"))
+    popts.pop('bufsize', None)
+
+    args = make_command(prog, flags, overwrite, quiet, verbose, superquiet,
+                        **options)
+
+    if 'stderr' not in popts and (on_message or get_capture_stderr()):
+        popts['stderr'] = PIPE
+    if popts.get('stderr') == PIPE:
+        # messages in machine readable format
+        env = dict(popts.get('env') or os.environ)
+        env['GRASS_MESSAGE_FORMAT'] = 'gui'
+        popts['env'] = env
+
+    if debug_level() > 0:
+        sys.stderr.write("D1/{}: {}.start_command(): {}\n".format(
+            debug_level(), __name__, ' '.join(args)))
+        sys.stderr.flush()
+
+    semaphore = _get_semaphore()
+    await semaphore.acquire()
+    try:
+        process = await _create_process(args, **popts)
+    except BaseException:
+        semaphore.release()
+        raise
+    return Process(process, args, encoding, on_message, semaphore.release)
+
+
+async def pipe_command(*args, **kwargs):
+    """Starts module with standard output piped, returns :class:`Process`
+
+    ::
+
+        process = await pipe_command('g.list', type='raster')
+        async with process:
+            async for name in process:
+                print(name)
+    """
+    kwargs['stdout'] = PIPE
+    return await start_command(*args, **kwargs)
+
+
+async def feed_command(*args, **kwargs):
+    """Starts module with standard input piped, returns :class:`Process`"""
+    kwargs['stdin'] = PIPE
+    return await start_command(*args, **kwargs)
+
+
+def _handle_errors(process, result, args, kwargs):
+    returncode = process.returncode
+    if returncode == 0:
+        return result
+    handler = kwargs.get('errors', 'raise').lower()
+    if handler == 'ignore':
+        return result
+    elif handler == 'status':
+        return returncode
+    elif handler == 'exit':
+        sys.exit(1)
+    options = dict((key, value) for key, value in kwargs.items()
+                   if key not in ('encoding', 'on_message'))
+    code = ' '.join(make_command(*args, **options))
+    raise CalledModuleError(module=None, code=code, returncode=returncode,
+                            errors=process.errors)
+
+
+async def run_command(*args, **kwargs):
+    """Executes module asynchronously
+
+    See :func:`grass.script.core.run_command` for parameters and return
+    value.
+
+    :raises: ``CalledModuleError`` when module returns non-zero return code
+    """
+    process = await start_command(*args, **kwargs)
+    async with process:
+        await process.wait()
+    return _handle_errors(process, process.returncode, args, kwargs)
+
+
+async def read_command(*args, **kwargs):
+    """Executes module asynchronously and returns its standard output
+
+    See :func:`grass.script.core.read_command`.
+    """
+    process = await pipe_command(*args, **kwargs)
+    async with process:
+        stdout = await process.read()
+    return _handle_errors(process, stdout, args, kwargs)
+
+
+async def parse_command(*args, **kwargs):
+    """Executes module asynchronously and parses its standard output
+
+    Parsing function can be given by *parse* or *delimiter* parameter
+    as in :func:`grass.script.core.parse_command`.
+    """
+    parse = None
+    parse_args = {}
+    if 'parse' in kwargs:
+        if isinstance(kwargs['parse'], tuple):
+            parse = kwargs['parse'][0]
+            parse_args = kwargs['parse'][1]
+        del kwargs['parse']
+
+    if 'delimiter' in kwargs:
+        parse_args = {'sep': kwargs['delimiter']}
+        del kwargs['delimiter']
+
+    if not parse:
+        parse = parse_key_val  # use default fn
+
+    res = await read_command(*args, **kwargs)
+
+    return parse(res, **parse_args)
+
+
+async def write_command(*args, **kwargs):
+    """Executes module asynchronously with standard input given by *stdin*
+
+    See :func:`grass.script.core.write_command`.
+    """
+    stdin = kwargs.pop('stdin')
+    process = await feed_command(*args, **kwargs)
+    async with process:
+        await process.communicate(stdin)
+    return _handle_errors(process, process.returncode, args, kwargs)
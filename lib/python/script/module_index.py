@@ -0,0 +1,378 @@
+"""
+Full-text index of GRASS modules
+
+Names, descriptions, keywords and manual pages of modules are indexed
+in an inverted index (word to modules), which is stored in a JSON file,
+so searching does not need to parse module metadata and manual pages.
+The index of core modules is created at installation, indexes of addons
+are created by g.extension in the addon directory. An addon index which
+is older than its sources is rebuilt (and saved when possible), the
+index of core modules is rebuilt only when it is missing.
+
+Words are matched as substrings of indexed words (as the search worked
+before) and also by their stems, so that e.g. *interpolating* finds
+*interpolation*. Modules are ranked by TF-IDF weighted by the field in
+which the word was found.
+
+Usage:
+
+>>> stem('interpolation'), stem('interpolated'), stem('lines')
+('interpolat', 'interpolat', 'lin')
+>>> index = ModuleIndex()
+>>> index.add_module('r.slope.aspect', 'Generates slope and aspect maps.',
+...                  'raster,terrain,slope')
+>>> index.add_module('v.surf.rst', 'Interpolates points using splines.',
+...                  'vector,surface,interpolation')
+>>> sorted(index.search('interpolating'))
+['v.surf.rst']
+>>> sorted(index.search('slope maps'))
+['r.slope.aspect']
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+from __future__ import absolute_import, division
+
+import json
+import math
+import os
+import re
+import sys
+
+try:
+    import xml.etree.ElementTree as etree
+except ImportError:
+    import elementtree.ElementTree as etree  # Python <= 2.4
+
+try:
+    from html.parser import HTMLParser
+except ImportError:
+    from HTMLParser import HTMLParser
+
+#: version of the file format, indexes of other versions are rebuilt
+INDEX_VERSION = 2
+#: name of index files in the addon directories
+INDEX_FILE = 'module_index.json'
+#: weights of fields in ranking
+FIELD_WEIGHTS = {'name': 4.0, 'keywords': 3.0, 'description': 2.0,
+                 'manual': 1.0}
+#: fields searched by default
+DEFAULT_FIELDS = ('name', 'description', 'keywords')
+
+_WORD = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def tokenize(text):
+    """Split lowercased text to words
+
+    >>> tokenize('Slope (in degrees) of DEM, r.slope.aspect')
+    ['slope', 'in', 'degrees', 'of', 'dem', 'r', 'slope', 'aspect']
+    """
+    return _WORD.findall(text.lower()) if text else []
+
+
+def stem(word):
+    """Return stem of an English word
+
+    This is a light suffix stripping, it only needs to give the same
+    stem for the common forms of a word.
+
+    >>> [stem(word) for word in ('maps', 'mapping', 'mapped', 'map')]
+    ['map', 'map', 'map', 'map']
+    """
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    for suffix, replacement in (('ation', 'at'), ('ing', ''), ('ed', '')):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)] + replacement
+            # mapp(ing) -> map
+            if len(word) > 3 and word[-1] == word[-2] and \
+                    word[-1] not in 'lsz':
+                word = word[:-1]
+            break
+    if word.endswith('e') and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+class _TextExtractor(HTMLParser):
+    """Collects text of HTML document"""
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+        self.text = []
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+
+def html_text(path):
+    """Return text of HTML file (manual page)"""
+    with open(path, 'rb') as html:
+        content = html.read().decode('utf-8', 'replace')
+    parser = _TextExtractor()
+    parser.feed(content)
+    parser.close()
+    return ' '.join(parser.text)
+
+
+class ModuleIndex(object):
+    """Inverted index of module names, descriptions, keywords and manual
+    pages"""
+
+    def __init__(self):
+        #: description and keywords of modules
+        self.modules = {}
+        #: field -> word -> module -> number of occurrences
+        self.fields = dict((field, {}) for field in FIELD_WEIGHTS)
+        #: modification times of sources (metadata file and manual
+        #: directory), paths are not stored, so the index stays current
+        #: when the installation is moved
+        self.sources = []
+        self._stems = None
+
+    def add_module(self, name, description, keywords, manual=None):
+        """Add module to the index
+
+        :param name: module name
+        :param description: module description
+        :param keywords: comma separated keywords
+        :param manual: text of manual page
+        """
+        self.modules[name] = {'description': description or '',
+                              'keywords': keywords or ''}
+        texts = {'name': name, 'description': description,
+                 'keywords': keywords, 'manual': manual}
+        for field, text in texts.items():
+            postings = self.fields[field]
+            for word in tokenize(text):
+                counts = postings.setdefault(word, {})
+                counts[name] = counts.get(name, 0) + 1
+        self._stems = None
+
+    def _words(self, word, fields):
+        """Return indexed words matching word as substring or by stem"""
+        if self._stems is None:
+            self._stems = {}
+            for postings in self.fields.values():
+                for indexed in postings:
+                    self._stems.setdefault(stem(indexed), set()).add(indexed)
+        words = set(self._stems.get(stem(word), ()))
+        for field in fields:
+            words.update(indexed for indexed in self.fields[field]
+                         if word in indexed)
+        return words
+
+    def search(self, text, fields=DEFAULT_FIELDS):
+        """Search modules containing all words of text
+
+        :param text: searched text (word or words)
+        :param fields: fields to search in (name, description,
+                       keywords, manual)
+        :return: dictionary of found module names and their scores
+        """
+        result = None
+        count = max(len(self.modules), 1)
+        # module names contain the whole text as before
+        pattern = text.lower().strip()
+        names = dict((name, FIELD_WEIGHTS['name']) for name in self.modules
+                     if pattern and pattern in name.lower())
+        for word in tokenize(text):
+            scores = {}
+            for indexed in self._words(word, fields):
+                for field in fields:
+                    postings = self.fields[field].get(indexed)
+                    if not postings:
+                        continue
+                    weight = (FIELD_WEIGHTS[field] *
+                              math.log(1 + count / len(postings)))
+                    for name, occurrences in postings.items():
+                        scores[name] = (scores.get(name, 0) + weight *
+                                        (1 + math.log(occurrences)))
+            if result is None:
+                result = scores
+            else:
+                result = dict((name, score + scores[name])
+                              for name, score in result.items()
+                              if name in scores)
+        result = result or {}
+        for name, score in names.items():
+            result[name] = result.get(name, 0) + score
+        return result
+
+    def search_keyword(self, keyword):
+        """Return names of modules having exactly the keyword"""
+        return set(name for name, module in self.modules.items()
+                   if keyword in module['keywords'].split(','))
+
+    def update(self, other):
+        """Add modules of other index"""
+        self.modules.update(other.modules)
+        for field, postings in other.fields.items():
+            own = self.fields[field]
+            for word, counts in postings.items():
+                own.setdefault(word, {}).update(counts)
+        self._stems = None
+
+    def save(self, path):
+        """Write index to a JSON file"""
+        data = {'version': INDEX_VERSION, 'sources': self.sources,
+                'modules': self.modules, 'fields': self.fields}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as output:
+            json.dump(data, output, separators=(',', ':'))
+        if sys.platform == 'win32' and os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read index from a JSON file
+
+        :return: index or None if the file is missing, unreadable or of
+                 another version
+        """
+        try:
+            with open(path) as input_file:
+                data = json.load(input_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if data.get('version') != INDEX_VERSION:
+            return None
+        index = cls()
+        index.sources = data['sources']
+        index.modules = data['modules']
+        index.fields.update(data['fields'])
+        return index
+
+    def is_current(self, sources):
+        """Check that index was built from the current sources"""
+        return self.sources == _modification_times(sources)
+
+
+def _modification_times(paths):
+    times = []
+    for path in paths:
+        try:
+            times.append(os.path.getmtime(path))
+        except OSError:
+            times.append(None)
+    return times
+
+
+def core_sources(gisbase=None):
+    """Return metadata file and manual directory of core modules"""
+    gisbase = gisbase or os.environ['GISBASE']
+    return (os.path.join(gisbase, 'gui', 'wxpython', 'xml',
+                         'module_items.xml'),
+            os.path.join(gisbase, 'docs', 'html'))
+
+
+def addon_sources(prefix):
+    """Return metadata file and manual directory of addons in prefix"""
+    return (os.path.join(prefix, 'modules.xml'),
+            os.path.join(prefix, 'docs', 'html'))
+
+
+def core_index_path(gisbase=None):
+    """Return path to the index of core modules"""
+    gisbase = gisbase or os.environ['GISBASE']
+    return os.path.join(gisbase, 'etc', INDEX_FILE)
+
+
+def build_index(metadata, manual_dir=None):
+    """Build index from modules metadata and manual pages
+
+    :param metadata: module_items.xml of the GUI or modules.xml of
+                     addons
+    :param manual_dir: directory with HTML manual pages
+    """
+    index = ModuleIndex()
+    sources = [metadata]
+    if manual_dir:
+        sources.append(manual_dir)
+    index.sources = _modification_times(sources)
+    if not os.path.isfile(metadata):
+        return index
+    tree = etree.parse(metadata)
+    # module-item in the GUI, task in addons
+    items = tree.findall('module-item') + tree.findall('task')
+    for item in items:
+        name = item.attrib['name']
+        manual = None
+        if manual_dir:
+            path = os.path.join(manual_dir, name + '.html')
+            if os.path.isfile(path):
+                manual = html_text(path)
+        index.add_module(name, item.findtext('description'),
+                         item.findtext('keywords'), manual)
+    return index
+
+
+def open_index(path, metadata, manual_dir=None, check=True):
+    """Load index from path, or build it when it is outdated and try
+    to save it
+
+    :param check: rebuild index when its sources were modified, when
+                  False, the index is rebuilt only when it is missing
+    """
+    index = ModuleIndex.load(path)
+    sources = [metadata] + ([manual_dir] if manual_dir else [])
+    if index is not None and (not check or index.is_current(sources)):
+        return index
+    index = build_index(metadata, manual_dir)
+    try:
+        index.save(path)
+    except (IOError, OSError):
+        # installation directory is usually read-only
+        pass
+    return index
+
+
+def update_addon_index(prefix):
+    """Rebuild index of addons installed in prefix (used by g.extension)
+
+    Manual pages of addons installed to GISBASE are in the directory of
+    core manual pages, so the index of core modules is rebuilt as well.
+    """
+    if os.path.realpath(prefix) == os.path.realpath(
+            os.environ.get('GISBASE', '')):
+        build_index(*core_sources()).save(core_index_path())
+    metadata, manual_dir = addon_sources(prefix)
+    index = build_index(metadata, manual_dir)
+    index.save(os.path.join(prefix, INDEX_FILE))
+    return index
+
+
+def get_index():
+    """Return index of core modules and installed addons"""
+    # index of core modules is created at installation, modification
+    # times change when the installation is copied or packaged
+    index = open_index(core_index_path(), *core_sources(), check=False)
+    prefixes = [os.environ['GISBASE']]
+    if os.getenv('GRASS_ADDON_BASE'):
+        prefixes.append(os.environ['GRASS_ADDON_BASE'])
+    for prefix in prefixes:
+        metadata, manual_dir = addon_sources(prefix)
+        if os.path.isfile(metadata):
+            index.update(open_index(os.path.join(prefix, INDEX_FILE),
+                                    metadata, manual_dir))
+    return index
+
+
+def main():
+    """Build index of core modules (used at installation)"""
+    path = sys.argv[1] if len(sys.argv) > 1 else core_index_path()
+    build_index(*core_sources()).save(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Tests of full-text index of modules (location independent)"""
+
+import os
+import time
+
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+from grass.gunittest.utils import silent_rmtree
+
+from grass.script import module_index
+from grass.script.core import tempdir
+
+MODULES_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<addons version="7">
+    <task name="r.example.flow">
+        <description>Computes water flow accumulation.</description>
+        <keywords>raster,hydrology,flow</keywords>
+    </task>
+    <task name="v.example.interp">
+        <description>Interpolates values of points.</description>
+        <keywords>vector,interpolation</keywords>
+    </task>
+</addons>
+"""
+
+MANUAL = """<h2>DESCRIPTION</h2>
+<p><em>r.example.flow</em> follows the <b>kaprun</b> algorithm.
+"""
+
+
+class TestModuleIndex(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.prefix = tempdir()
+        cls.metadata, cls.manual_dir = module_index.addon_sources(cls.prefix)
+        with open(cls.metadata, 'w') as output:
+            output.write(MODULES_XML)
+        os.makedirs(cls.manual_dir)
+        with open(os.path.join(cls.manual_dir, 'r.example.flow.html'),
+                  'w') as output:
+            output.write(MANUAL)
+
+    @classmethod
+    def tearDownClass(cls):
+        silent_rmtree(cls.prefix)
+
+    def test_search(self):
+        index = module_index.build_index(self.metadata, self.manual_dir)
+        self.assertEqual(set(index.search('water')), {'r.example.flow'})
+        self.assertEqual(set(index.search('example')),
+                         {'r.example.flow', 'v.example.interp'})
+        self.assertEqual(set(index.search('interpolated')),
+                         {'v.example.interp'})
+        self.assertEqual(set(index.search('water points')), set())
+
+    def test_manual(self):
+        index = module_index.build_index(self.metadata, self.manual_dir)
+        self.assertEqual(set(index.search('kaprun')), set())
+        self.assertEqual(
+            set(index.search('kaprun', module_index.DEFAULT_FIELDS +
+                             ('manual', ))), {'r.example.flow'})
+
+    def test_ranking(self):
+        """Match in name and keywords is ranked higher than in manual"""
+        index = module_index.build_index(self.metadata, self.manual_dir)
+        index.add_module('r.other', 'Other module.', 'raster',
+                         manual='Not a flow.')
+        scores = index.search('flow', module_index.FIELD_WEIGHTS.keys())
+        self.assertGreater(scores['r.example.flow'], scores['r.other'])
+
+    def test_exact_keyword(self):
+        index = module_index.build_index(self.metadata, self.manual_dir)
+        self.assertEqual(index.search_keyword('flow'), {'r.example.flow'})
+        self.assertEqual(index.search_keyword('flo'), set())
+
+    def test_save_load(self):
+        index = module_index.update_addon_index(self.prefix)
+        path = os.path.join(self.prefix, module_index.INDEX_FILE)
+        loaded = module_index.ModuleIndex.load(path)
+        self.assertEqual(loaded.modules, index.modules)
+        self.assertEqual(set(loaded.search('interpolation')),
+                         set(index.search('interpolation')))
+        self.assertTrue(loaded.is_current([self.metadata, self.manual_dir]))
+
+    def test_outdated(self):
+        """Index is rebuilt when sources change"""
+        path = os.path.join(self.prefix, 'outdated.json')
+        index = module_index.open_index(path, self.metadata, self.manual_dir)
+        self.assertTrue(os.path.isfile(path))
+        modified = time.time() + 10
+        os.utime(self.metadata, (modified, modified))
+        self.assertFalse(index.is_current([self.metadata, self.manual_dir]))
+        index = module_index.open_index(path, self.metadata, self.manual_dir)
+        self.assertTrue(index.is_current([self.metadata, self.manual_dir]))
+
+    def mark_index(self, path):
+        """Add a module to saved index to detect whether it is rebuilt"""
+        index = module_index.ModuleIndex.load(path)
+        index.add_module('g.marker', 'Not rebuilt.', 'general')
+        index.save(path)
+
+    def test_moved(self):
+        """Index is not rebuilt when the directory is moved"""
+        prefix = tempdir()
+        moved = prefix + '_moved'
+        try:
+            metadata, manual_dir = module_index.addon_sources(prefix)
+            os.makedirs(manual_dir)
+            with open(metadata, 'w') as output:
+                output.write(MODULES_XML)
+            module_index.update_addon_index(prefix)
+            path = os.path.join(prefix, module_index.INDEX_FILE)
+            self.mark_index(path)
+            os.rename(prefix, moved)
+            metadata, manual_dir = module_index.addon_sources(moved)
+            index = module_index.open_index(
+                os.path.join(moved, module_index.INDEX_FILE), metadata,
+                manual_dir)
+            self.assertIn('g.marker', index.modules)
+        finally:
+            silent_rmtree(prefix)
+            silent_rmtree(moved)
+
+    def test_not_checked(self):
+        """Index is not rebuilt when it is not checked (core modules)"""
+        path = os.path.join(self.prefix, 'not_checked.json')
+        module_index.open_index(path, self.metadata, self.manual_dir)
+        self.mark_index(path)
+        modified = time.time() + 20
+        os.utime(self.metadata, (modified, modified))
+        index = module_index.open_index(path, self.metadata, self.manual_dir,
+                                        check=False)
+        self.assertIn('g.marker', index.modules)
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Tests of asynchronous functions running modules (location independent)"""
+
+import asyncio
+import sys
+import time
+
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+from grass.exceptions import CalledModuleError
+
+from grass.script import aio
+from grass.script.core import read_command
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestMessageParser(TestCase):
+
+    def test_multiline_message(self):
+        parser = aio.MessageParser()
+        lines = ['', 'GRASS_INFO_ERROR(10,2): first line',
+                 'GRASS_INFO_ERROR(10,2): second line',
+                 'GRASS_INFO_END(10,2)']
+        messages = [parser.feed(line) for line in lines]
+        self.assertEqual(messages[:-1], [None, None, None])
+        self.assertEqual(messages[-1], aio.Message(
+            'error', 'first line\nsecond line', None))
+
+    def test_percent(self):
+        parser = aio.MessageParser()
+        self.assertEqual(parser.feed('GRASS_INFO_PERCENT: 42'),
+                         aio.Message('percent', '', 42))
+
+    def test_text(self):
+        parser = aio.MessageParser()
+        self.assertEqual(parser.feed('ERROR: Raster map not found'),
+                         aio.Message('text', 'ERROR: Raster map not found',
+                                     None))
+
+
+class TestAsyncCommands(TestCase):
+
+    def test_read_command(self):
+        output = run(aio.read_command('g.gisenv', get='MAPSET'))
+        self.assertEqual(output, read_command('g.gisenv', get='MAPSET'))
+
+    def test_parse_command(self):
+        region = run(aio.parse_command('g.region', flags='g'))
+        self.assertIn('nsres', region)
+
+    def test_lines(self):
+        async def read_lines():
+            process = await aio.pipe_command('g.gisenv', flags='n')
+            async with process:
+                return [line async for line in process]
+        lines = run(read_lines())
+        self.assertTrue(any(line.startswith('MAPSET=') for line in lines))
+
+    def test_gather(self):
+        async def gather():
+            return await asyncio.gather(
+                *[aio.parse_command('g.region', flags='g') for i in range(8)])
+        regions = run(gather())
+        self.assertEqual(len(regions), 8)
+        self.assertEqual(regions[0], regions[-1])
+
+    def test_error_messages(self):
+        messages = []
+        with self.assertRaises(CalledModuleError) as context:
+            run(aio.run_command('g.region', raster='does_not_exist',
+                                on_message=messages.append))
+        self.assertIn('does_not_exist', str(context.exception))
+        self.assertIn('error', [message.type for message in messages])
+
+    def test_errors_status(self):
+        returncode = run(aio.run_command('g.region', raster='does_not_exist',
+                                         errors='status', stderr=aio.PIPE))
+        self.assertEqual(returncode, 1)
+
+    def test_cancel_terminates(self):
+        """Cancelled command is terminated"""
+        async def cancel():
+            # interpreter waiting for script from standard input
+            task = asyncio.ensure_future(
+                aio.run_command(sys.executable, stdin=aio.PIPE))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        start = time.time()
+        run(cancel())
+        self.assertLess(time.time() - start, 10)
+
+
+if __name__ == '__main__':
+    test()
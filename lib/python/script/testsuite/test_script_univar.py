@@ -0,0 +1,111 @@
+"""Tests of one pass univariate statistics (location independent)"""
+
+import random
+import sqlite3
+
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+from grass.gunittest.utils import silent_rmtree
+
+from grass.script import univar
+from grass.script.core import tempdir
+
+
+def random_values(seed, count, distribution, *parameters):
+    """Return values drawn from one seeded random generator"""
+    rng = random.Random(seed)
+    draw = getattr(rng, distribution)
+    return [draw(*parameters) for i in range(count)]
+
+
+class TestUnivarStats(TestCase):
+
+    values = random_values(1, 1000, 'gauss', 1e6, 3)
+
+    def test_welford(self):
+        stats = univar.UnivarStats()
+        stats.update(self.values)
+        mean = sum(self.values) / len(self.values)
+        variance = sum((value - mean) ** 2
+                       for value in self.values) / len(self.values)
+        self.assertEqual(stats.n, len(self.values))
+        self.assertAlmostEqual(stats.mean, mean, places=6)
+        self.assertAlmostEqual(stats.variance, variance, places=6)
+        self.assertEqual(stats.minimum, min(self.values))
+        self.assertEqual(stats.maximum, max(self.values))
+
+    def test_merge(self):
+        stats = univar.UnivarStats()
+        stats.update(self.values)
+        first = univar.UnivarStats()
+        first.update(self.values[:100])
+        second = univar.UnivarStats()
+        second.update(self.values[100:])
+        first.merge(second)
+        self.assertEqual(first.n, stats.n)
+        self.assertAlmostEqual(first.mean, stats.mean, places=6)
+        self.assertAlmostEqual(first.variance, stats.variance, places=6)
+
+
+class TestPercentiles(TestCase):
+
+    values = random_values(2, 20000, 'uniform', 0, 1000)
+    positions = [1, 5000, 10000, 15000, 20000]
+
+    def test_exact(self):
+        percentiles = univar.Percentiles()
+        percentiles.update(self.values)
+        ordered = sorted(self.values)
+        self.assertTrue(percentiles.exact)
+        self.assertEqual(percentiles.values_at(self.positions),
+                         dict((position, ordered[position - 1])
+                              for position in self.positions))
+
+    def test_approximate(self):
+        percentiles = univar.Percentiles(max_values=1000)
+        percentiles.update(self.values)
+        ordered = sorted(self.values)
+        self.assertFalse(percentiles.exact)
+        result = percentiles.values_at(self.positions)
+        for position in self.positions:
+            self.assertAlmostEqual(result[position], ordered[position - 1],
+                                   delta=5)
+
+
+class TestSqlite(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempdir()
+        cls.database = cls.tmp + '/univar.db'
+        connection = sqlite3.connect(cls.database)
+        connection.execute("CREATE TABLE t (cat INTEGER, value INTEGER)")
+        connection.executemany("INSERT INTO t VALUES (?, ?)",
+                               [(i, None if i % 10 == 0 else i)
+                                for i in range(1, 101)])
+        connection.commit()
+        connection.close()
+        cls.values = [i for i in range(1, 101) if i % 10]
+
+    @classmethod
+    def tearDownClass(cls):
+        silent_rmtree(cls.tmp)
+
+    def test_aggregate(self):
+        stats = univar.aggregate('t', 'value', where='cat > 0',
+                                 database=self.database, driver='sqlite')
+        expected = univar.UnivarStats()
+        expected.update(self.values)
+        self.assertEqual(stats.n, expected.n)
+        self.assertEqual(stats.sum, expected.sum)
+        self.assertAlmostEqual(stats.variance, expected.variance)
+
+    def test_sorted_values(self):
+        values = univar.read_values('t', 'value', database=self.database,
+                                    driver='sqlite', order=True)
+        self.assertEqual(univar.pick_positions(values, [1, 45, 90]),
+                         {1: 1.0, 45: 49.0, 90: 99.0})
+
+
+if __name__ == '__main__':
+    test()
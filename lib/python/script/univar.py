@@ -0,0 +1,429 @@
+"""
+Univariate statistics of attribute columns computed in one pass
+
+Statistics are accumulated value by value (Welford's algorithm), so
+that values can be read directly from a database cursor or a module
+output without storing them. Aggregation is done by the database when
+the driver supports SQL aggregate functions. Percentiles are exact up to
+a given number of values and approximate (t-digest) above it.
+
+Usage:
+
+>>> stats = UnivarStats()
+>>> stats.update([1, 2, 3, 4])
+>>> stats.n, stats.mean, stats.variance
+(4, 2.5, 1.25)
+>>> percentiles = Percentiles()
+>>> percentiles.update([4, 1, 3, 2])
+>>> percentiles.values_at([1, 2, 4])
+{1: 1.0, 2: 2.0, 4: 4.0}
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+from __future__ import absolute_import, division
+
+import math
+import os
+import sqlite3
+import string
+from array import array
+
+from .core import gisenv, pipe_command
+from .db import db_connection
+from .utils import decode
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#: drivers supporting SQL aggregate functions and ORDER BY
+SQL_DRIVERS = ('sqlite', 'pg', 'mysql')
+#: number of values up to which percentiles are exact (8 bytes each)
+MAX_EXACT_VALUES = 10000000
+
+
+class UnivarStats(object):
+    """Count, minimum, maximum, sum, mean and variance of values
+
+    Mean and variance are updated for each value by Welford's algorithm,
+    which is numerically stable. Statistics of more parts of data can be
+    merged.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.sum = 0.0
+        self.sum_abs = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    @classmethod
+    def from_aggregates(cls, n, minimum, maximum, sum, sum_abs, m2):
+        """Creates statistics from values aggregated elsewhere (by SQL)
+
+        :param m2: sum of squared differences from mean
+        """
+        stats = cls()
+        stats.n = n
+        if n:
+            stats.minimum = minimum
+            stats.maximum = maximum
+            stats.sum = sum
+            stats.sum_abs = sum_abs
+            stats.mean = sum / n
+            stats.m2 = max(m2, 0.0)
+        return stats
+
+    def add(self, value):
+        """Adds one value"""
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.sum += value
+        self.sum_abs += abs(value)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def update(self, values):
+        """Adds values from iterable"""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other):
+        """Adds statistics of other values"""
+        if not other.n:
+            return
+        if not self.n:
+            self.__dict__.update(other.__dict__)
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+        self.sum += other.sum
+        self.sum_abs += other.sum_abs
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def range(self):
+        return self.maximum - self.minimum
+
+    @property
+    def mean_abs(self):
+        return self.sum_abs / self.n
+
+    @property
+    def variance(self):
+        """Population variance"""
+        return self.m2 / self.n
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def coeff_var(self):
+        return self.stddev / abs(self.mean)
+
+
+class TDigest(object):
+    """Approximate quantiles of values in bounded memory
+
+    Values are summarized by centroids (mean and weight), which are
+    small at the tails and larger in the middle of the distribution
+    (merging t-digest by T. Dunning with k1 scale function). Number
+    of centroids is about *compression*.
+
+    >>> digest = TDigest()
+    >>> for value in range(100001):
+    ...     digest.add(value)
+    >>> abs(digest.quantile(0.5) - 50000) < 100
+    True
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self._means = []
+        self._weights = []
+        self._buffer = []
+        self._buffer_size = 10 * compression
+
+    def add(self, value):
+        """Adds one value"""
+        self._buffer.append(value)
+        self.count += 1
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        if len(self._buffer) >= self._buffer_size:
+            self._merge()
+
+    def _limit(self, q):
+        """Returns maximal quantile of centroid starting at quantile q"""
+        k = (self.compression / (2 * math.pi) *
+             math.asin(2 * min(q, 1.0) - 1) + 1)
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _merge(self):
+        if not self._buffer:
+            return
+        items = sorted(list(zip(self._means, self._weights)) +
+                       [(value, 1) for value in self._buffer])
+        self._buffer = []
+        means = []
+        weights = []
+        start = 0.0
+        limit = self._limit(start)
+        mean, weight = items[0]
+        for item_mean, item_weight in items[1:]:
+            if (start + weight + item_weight) / self.count <= limit:
+                weight += item_weight
+                mean += (item_mean - mean) * item_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                start += weight
+                limit = self._limit(start / self.count)
+                mean, weight = item_mean, item_weight
+        means.append(mean)
+        weights.append(weight)
+        self._means = means
+        self._weights = weights
+
+    def quantile(self, q):
+        """Returns approximate value of quantile q (between 0 and 1)"""
+        self._merge()
+        if not self.count:
+            return None
+        means = self._means
+        weights = self._weights
+        target = q * self.count
+        # centroid centers are interpolated, extremes are exact
+        if target < 1:
+            return self.minimum
+        if target > self.count - 1:
+            return self.maximum
+        if target <= weights[0] / 2:
+            if weights[0] == 1:
+                return means[0]
+            return self.minimum + (means[0] - self.minimum) * \
+                target / (weights[0] / 2)
+        cumulative = 0
+        for i in range(len(means) - 1):
+            left = cumulative + weights[i] / 2
+            right = cumulative + weights[i] + weights[i + 1] / 2
+            if target < right:
+                return means[i] + (means[i + 1] - means[i]) * \
+                    (target - left) / (right - left)
+            cumulative += weights[i]
+        left = self.count - weights[-1] / 2
+        if weights[-1] == 1 or target <= left:
+            return means[-1]
+        return means[-1] + (self.maximum - means[-1]) * \
+            (target - left) / (self.count - left)
+
+
+class Percentiles(object):
+    """Values at given positions in sorted values
+
+    Values are kept in a compact array up to *max_values* values,
+    then they are summarized by :class:`TDigest` and the results are
+    approximate.
+    """
+
+    def __init__(self, max_values=MAX_EXACT_VALUES, compression=200):
+        self.max_values = max_values
+        self.compression = compression
+        self.count = 0
+        self._values = array('d')
+        self._digest = None
+
+    @property
+    def exact(self):
+        """True when results are exact"""
+        return self._digest is None
+
+    def add(self, value):
+        """Adds one value"""
+        self.count += 1
+        if self._digest is not None:
+            self._digest.add(value)
+            return
+        self._values.append(value)
+        if len(self._values) > self.max_values:
+            self._digest = TDigest(self.compression)
+            for stored in self._values:
+                self._digest.add(stored)
+            self._values = None
+
+    def update(self, values):
+        """Adds values from iterable"""
+        for value in values:
+            self.add(value)
+
+    def values_at(self, positions):
+        """Returns dictionary of values at positions (starting with 1)"""
+        positions = sorted(set(positions))
+        if self._digest is not None:
+            return dict((position, self._digest.quantile(
+                (position - 0.5) / self.count)) for position in positions)
+        if np is not None:
+            values = np.frombuffer(self._values, dtype=np.float64)
+            values = np.partition(values, [position - 1
+                                           for position in positions])
+            return dict((position, float(values[position - 1]))
+                        for position in positions)
+        return pick_positions(sorted(self._values), positions)
+
+
+def pick_positions(values, positions):
+    """Returns values at positions (starting with 1) of sorted iterable
+
+    Values are read only up to the last position.
+
+    >>> pick_positions(iter([1.0, 2.0, 3.0, 4.0]), [3, 1])
+    {1: 1.0, 3: 3.0}
+    """
+    wanted = sorted(set(positions))
+    result = {}
+    if not wanted:
+        return result
+    current = 0
+    for index, value in enumerate(values, 1):
+        while current < len(wanted) and wanted[current] == index:
+            result[index] = value
+            current += 1
+        if current == len(wanted):
+            break
+    return result
+
+
+def get_connection(database=None, driver=None):
+    """Returns driver and database, the default ones when not given
+
+    Variables in the default SQLite database path are substituted.
+    """
+    if not driver or not database:
+        connection = db_connection() or {}
+        if not driver:
+            driver = connection.get('driver')
+        if not database and driver == connection.get('driver'):
+            database = connection.get('database')
+    if driver == 'sqlite' and database and '$' in database:
+        database = string.Template(database).safe_substitute(gisenv())
+    return driver, database
+
+
+def _select_statement(table, column, where, order):
+    sql = "SELECT %s FROM %s WHERE %s IS NOT NULL" % (column, table, column)
+    if where:
+        sql += " AND (%s)" % where
+    if order:
+        sql += " ORDER BY %s" % column
+    return sql
+
+
+def read_values(table, column, where=None, database=None, driver=None,
+                order=False, chunk_size=10000):
+    """Yields non-null values of a numeric column as floats
+
+    SQLite database is read directly by a cursor in chunks, other
+    databases by streaming output of db.select (no temporary file).
+
+    :param order: True to sort values (by the database)
+    """
+    driver, database = get_connection(database, driver)
+    sql = _select_statement(table, column, where, order)
+    if driver == 'sqlite' and database and os.path.isfile(database):
+        connection = sqlite3.connect(database)
+        try:
+            cursor = connection.execute(sql)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    if row[0] is not None and row[0] != '':
+                        yield float(row[0])
+        finally:
+            connection.close()
+        return
+    process = pipe_command('db.select', flags='c', sql=sql,
+                           database=database, driver=driver)
+    try:
+        for line in process.stdout:
+            line = decode(line).rstrip('\r\n')
+            if line:
+                yield float(line)
+    finally:
+        process.stdout.close()
+        process.wait()
+
+
+def aggregate(table, column, where=None, database=None, driver=None):
+    """Computes statistics by SQL aggregate functions in the database
+
+    :return: :class:`UnivarStats` or None when the driver is not
+             supported
+    """
+    driver, database = get_connection(database, driver)
+    if driver not in SQL_DRIVERS:
+        return None
+    where_clause = "%s IS NOT NULL" % column
+    if where:
+        where_clause += " AND (%s)" % where
+    if driver == 'sqlite':
+        if not database or not os.path.isfile(database):
+            return None
+        connection = sqlite3.connect(database)
+        try:
+            # total() is floating point (sum() of integers may overflow)
+            n, minimum, maximum, total, total_abs = connection.execute(
+                "SELECT count(%(c)s), min(%(c)s), max(%(c)s), total(%(c)s),"
+                " total(abs(%(c)s)) FROM %(t)s WHERE %(w)s" % {
+                    'c': column, 't': table, 'w': where_clause}).fetchone()
+            m2 = 0.0
+            if n:
+                # second pass for variance, which is exact unlike sum of
+                # squares
+                m2 = connection.execute(
+                    "SELECT total((%(c)s - ?) * (%(c)s - ?)) FROM %(t)s"
+                    " WHERE %(w)s" % {'c': column, 't': table,
+                                      'w': where_clause},
+                    (total / n, total / n)).fetchone()[0]
+        finally:
+            connection.close()
+        return UnivarStats.from_aggregates(
+            n, minimum, maximum, total, total_abs, m2)
+    sql = ("SELECT count(%(c)s), min(%(c)s), max(%(c)s), sum(%(c)s),"
+           " sum(abs(%(c)s)), var_pop(%(c)s) FROM %(t)s WHERE %(w)s" % {
+               'c': column, 't': table, 'w': where_clause})
+    process = pipe_command('db.select', flags='c', sql=sql,
+                           database=database, driver=driver)
+    output = decode(process.communicate()[0]).strip()
+    if process.returncode != 0 or not output:
+        return None
+    values = output.splitlines()[0].split('|')
+    n = int(values[0])
+    if not n:
+        return UnivarStats()
+    return UnivarStats.from_aggregates(
+        n, float(values[1]), float(values[2]), float(values[3]),
+        float(values[4]), float(values[5] or 0) * n)
@@ -23,6 +23,7 @@ import sys
 import shutil
 import locale
 import shlex
+import importlib
 import re
 
 
@@ -158,6 +159,71 @@ class KeyValue(dict):
         self[key] = value
 
 
+class LazyModule(object):
+    """A module which is imported when one of its attributes is accessed
+    for the first time.
+
+    Attributes are cached after the first access, so it should be used
+    only for modules which do not rebind their attributes, such as the
+    ctypes wrappers of GRASS libraries. Use :func:`lazy_import` to create
+    it. Example:
+
+    >>> json = LazyModule('json')
+    >>> json
+    <lazy module 'json'>
+    >>> json.dumps([1, 2])
+    '[1, 2]'
+    """
+
+    def __init__(self, name):
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+
+    def _lazy_load(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_lazy_name'])
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, key):
+        value = getattr(self._lazy_load(), key)
+        # next access does not go through __getattr__
+        self.__dict__[key] = value
+        return value
+
+    def __setattr__(self, key, value):
+        setattr(self._lazy_load(), key, value)
+        self.__dict__[key] = value
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self):
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            return "<lazy module '%s'>" % self.__dict__['_lazy_name']
+        return repr(module)
+
+
+def lazy_import(name):
+    """Return a module which is imported when it is used for the first time
+
+    The module is imported when an attribute of the returned object
+    is accessed. It can be used instead of an import at module level
+    to avoid slow imports of modules which are not always needed::
+
+        libgis = lazy_import('grass.lib.gis')
+
+    :param str name: full name of the module
+    :returns: :class:`LazyModule` object or the module itself
+              if it was already imported
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
 def _get_encoding():
     encoding = locale.getdefaultlocale()[1]
     if not encoding:
@@ -1,35 +1,211 @@
+"""Temporal GIS framework
+
+All public names of the submodules are available in this package.
+A submodule is imported when one of its names is used for the first time
+(with Python 3.7 and newer), so scripts load only the parts of the
+framework they use. Set GRASS_TGIS_EAGER_IMPORT to import all submodules
+at once.
+
+Usage:
+
+::
+
+    import grass.temporal as tgis
+
+    tgis.init()
+    strds = tgis.open_old_stds("precipitation", "strds")
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
 from __future__ import (absolute_import)
 
-from .core import *
-from .base import *
-from .spatial_extent import *
-from .metadata import *
-from .abstract_dataset import *
-from .abstract_map_dataset import *
-from .abstract_space_time_dataset import *
-from .space_time_datasets import *
-from .datetime_math import *
-from .open_stds import *
-from .factory import *
-from .gui_support import *
-from .list_stds import *
-from .register import *
-from .sampling import *
-from .aggregation import *
-from .extract import *
-from .stds_export import *
-from .stds_import import *
-from .mapcalc import *
-from .univar_statistics import *
-from .c_libraries_interface import *
-from .spatio_temporal_relationships import *
-from .spatial_topology_dataset_connector import *
-from .temporal_extent import *
-from .temporal_topology_dataset_connector import *
-from .temporal_granularity import *
-from .temporal_algebra import *
-from .temporal_vector_algebra import *
-from .temporal_raster_base_algebra import *
-from .temporal_raster_algebra import *
-from .temporal_raster3d_algebra import *
-from .temporal_operator import *
+import os
+import sys
+import importlib
+
+# Submodules with their public names in the order in which they were
+# imported by "from .<submodule> import *", a name defined in more
+# submodules belongs to the last one
+_SUBMODULE_NAMES = (
+    ('core', (
+        'profile_function', 'tgis_backend', 'get_tgis_backend',
+        'tgis_database', 'get_tgis_database', 'tgis_version',
+        'tgis_db_version', 'tgis_dbmi_paramstyle',
+        'get_tgis_dbmi_paramstyle', 'current_mapset', 'current_location',
+        'current_gisdbase', 'get_current_mapset', 'get_current_location',
+        'get_current_gisdbase', 'enable_mapset_check',
+        'enable_timestamp_write', 'get_enable_mapset_check',
+        'get_enable_timestamp_write', 'enable_concurrency', 'busy_timeout',
+        'write_batch_size', 'tgis_db_statistics', 'get_enable_concurrency',
+        'get_tgis_db_statistics', 'reset_tgis_db_statistics',
+        'message_interface', 'get_tgis_message_interface',
+        'c_library_interface', 'get_tgis_c_library_interface',
+        'raise_on_error', 'set_raise_on_error', 'get_raise_on_error',
+        'get_tgis_version', 'get_tgis_db_version', 'get_tgis_metadata',
+        'tgis_database_string', 'get_tgis_database_string',
+        'get_sql_template_path', 'stop_subprocesses',
+        'get_available_temporal_mapsets', 'init',
+        'get_database_info_string', 'create_temporal_database',
+        'spatial_index_map_types', 'sqlite_has_rtree', 'has_spatial_index',
+        'create_spatial_index', 'SQLDatabaseInterfaceConnection',
+        'pending_write_connections', 'DBConnection', 'create_sql_id_lists',
+        'init_dbif')),
+    ('base', (
+        'DictSQLSerializer', 'SQLDatabaseInterface', 'DatasetBase',
+        'RasterBase', 'Raster3DBase', 'VectorBase', 'STDSBase',
+        'STRDSBase', 'STR3DSBase', 'STVDSBase', 'AbstractSTDSRegister',
+        'RasterSTDSRegister', 'Raster3DSTDSRegister', 'VectorSTDSRegister')),
+    ('spatial_extent', (
+        'SpatialExtent', 'RasterSpatialExtent', 'Raster3DSpatialExtent',
+        'VectorSpatialExtent', 'STRDSSpatialExtent', 'STR3DSSpatialExtent',
+        'STVDSSpatialExtent')),
+    ('metadata', (
+        'RasterMetadataBase', 'RasterMetadata', 'Raster3DMetadata',
+        'VectorMetadata', 'STDSMetadataBase', 'STDSRasterMetadataBase',
+        'STRDSMetadata', 'STR3DSMetadata', 'STVDSMetadata')),
+    ('abstract_dataset', (
+        'AbstractDataset', 'AbstractDatasetComparisonKeyStartTime',
+        'AbstractDatasetComparisonKeyEndTime')),
+    ('abstract_map_dataset', ('AbstractMapDataset',)),
+    ('abstract_space_time_dataset', ('AbstractSpaceTimeDataset',)),
+    ('space_time_datasets', (
+        'garray', 'RasterDataset', 'Raster3DDataset', 'VectorDataset',
+        'SpaceTimeRasterDataset', 'SpaceTimeRaster3DDataset',
+        'SpaceTimeVectorDataset')),
+    ('datetime_math', (
+        'DAY_IN_SECONDS', 'SECOND_AS_DAY', 'relative_time_to_time_delta',
+        'time_delta_to_relative_time',
+        'relative_time_to_time_delta_seconds',
+        'time_delta_to_relative_time_seconds',
+        'decrement_datetime_by_string', 'increment_datetime_by_string',
+        'modify_datetime_by_string', 'modify_datetime',
+        'adjust_datetime_to_granularity', 'compute_datetime_delta',
+        'check_datetime_string', 'string_to_datetime',
+        'datetime_to_grass_datetime_string', 'suffix_units',
+        'create_suffix_from_datetime', 'create_time_suffix',
+        'create_numeric_suffix')),
+    ('open_stds', (
+        'open_old_stds', 'check_new_stds', 'open_new_stds',
+        'check_new_map_dataset', 'open_new_map_dataset')),
+    ('factory', ('dataset_factory',)),
+    ('gui_support', ('tlist_grouped', 'tlist')),
+    ('list_stds', ('get_dataset_list', 'list_maps_of_stds')),
+    ('register', (
+        'register_maps_in_space_time_dataset', 'assign_valid_time_to_map',
+        'register_map_object_list',
+        'unregister_maps_from_space_time_datasets',
+        'delete_maps_from_temporal_database')),
+    ('sampling', ('sample_stds_by_stds_topology',)),
+    ('aggregation', (
+        'collect_map_names', 'aggregate_raster_maps',
+        'aggregate_by_topology')),
+    ('extract', (
+        'extract_dataset', 'run_mapcalc2d', 'run_mapcalc3d',
+        'run_vector_extraction')),
+    ('stds_export', (
+        'proj_file_name', 'init_file_name', 'metadata_file_name',
+        'read_file_name', 'list_file_name', 'tmp_tar_file_name',
+        'exported_maps', 'export_stds')),
+    ('stds_import', (
+        'proj_file_name', 'init_file_name', 'list_file_name',
+        'imported_maps', 'import_stds')),
+    ('mapcalc', ('dataset_mapcalculator',)),
+    ('univar_statistics', (
+        'print_gridded_dataset_univar_statistics',
+        'print_vector_dataset_univar_statistics')),
+    ('c_libraries_interface', (
+        'libgis', 'libraster', 'libvector', 'libdate', 'libraster3d',
+        'libtgis', 'pygrass_raster', 'pygrass_vector', 'pygrass_utils',
+        'decode', 'RPCDefs', 'c_library_server', 'CLibrariesInterface')),
+    ('spatio_temporal_relationships', (
+        'vector', 'rtree', 'gis', 'SpatioTemporalTopologyBuilder',
+        'set_temoral_relationship', 'set_spatial_relationship',
+        'print_temporal_topology_relationships',
+        'print_spatio_temporal_topology_relationships',
+        'count_temporal_topology_relationships',
+        'create_temporal_relation_sql_where_statement')),
+    ('spatial_topology_dataset_connector', (
+        'SpatialTopologyDatasetConnector',)),
+    ('temporal_extent', (
+        'TemporalExtent', 'AbsoluteTemporalExtent', 'RasterAbsoluteTime',
+        'Raster3DAbsoluteTime', 'VectorAbsoluteTime', 'STDSAbsoluteTime',
+        'STRDSAbsoluteTime', 'STR3DSAbsoluteTime', 'STVDSAbsoluteTime',
+        'RelativeTemporalExtent', 'RasterRelativeTime',
+        'Raster3DRelativeTime', 'VectorRelativeTime', 'STDSRelativeTime',
+        'STRDSRelativeTime', 'STR3DSRelativeTime', 'STVDSRelativeTime')),
+    ('temporal_topology_dataset_connector', (
+        'TemporalTopologyDatasetConnector',)),
+    ('temporal_granularity', (
+        'SINGULAR_GRAN', 'PLURAL_GRAN', 'SUPPORTED_GRAN', 'CONVERT_GRAN',
+        'check_granularity_string', 'compute_relative_time_granularity',
+        'compute_absolute_time_granularity',
+        'compute_common_relative_time_granularity',
+        'compute_common_absolute_time_granularity',
+        'compute_common_absolute_time_granularity_simple',
+        'gran_singular_unit', 'gran_plural_unit', 'gran_to_gran', 'gcd',
+        'gcd_list')),
+    ('temporal_algebra', (
+        'TemporalAlgebraLexer', 'GlobalTemporalVar', 'FatalError',
+        'TemporalAlgebraParser')),
+    ('temporal_vector_algebra', (
+        'TemporalVectorAlgebraLexer', 'TemporalVectorAlgebraParser')),
+    ('temporal_raster_base_algebra', (
+        'TemporalRasterAlgebraLexer', 'TemporalRasterBaseAlgebraParser')),
+    ('temporal_raster_algebra', ('TemporalRasterAlgebraParser',)),
+    ('temporal_raster3d_algebra', ('TemporalRaster3DAlgebraParser',)),
+    ('temporal_operator', (
+        'TemporalOperatorLexer', 'TemporalOperatorParser')),
+)
+
+_SUBMODULES = tuple(submodule for submodule, names in _SUBMODULE_NAMES)
+_NAME_TO_SUBMODULE = {}
+for _submodule, _names in _SUBMODULE_NAMES:
+    for _name in _names:
+        _NAME_TO_SUBMODULE[_name] = _submodule
+del _submodule, _names, _name
+
+
+def _import_submodule(submodule):
+    """Import submodule and set its public names in this package"""
+    module = importlib.import_module('.' + submodule, __name__)
+    namespace = globals()
+    for name in dict(_SUBMODULE_NAMES)[submodule]:
+        if _NAME_TO_SUBMODULE[name] == submodule:
+            namespace[name] = getattr(module, name)
+    return module
+
+
+def _import_all():
+    """Import all submodules as "from .<submodule> import *" does"""
+    namespace = globals()
+    for submodule in _SUBMODULES:
+        module = importlib.import_module('.' + submodule, __name__)
+        namespace.update((name, value) for name, value in vars(module).items()
+                         if not name.startswith('_'))
+
+
+if sys.version_info >= (3, 7) and not os.getenv('GRASS_TGIS_EAGER_IMPORT'):
+    __all__ = sorted(_NAME_TO_SUBMODULE)
+
+    def __getattr__(name):
+        if name in _NAME_TO_SUBMODULE:
+            _import_submodule(_NAME_TO_SUBMODULE[name])
+            return globals()[name]
+        if name in _SUBMODULES:
+            return importlib.import_module('.' + name, __name__)
+        if not name.startswith('__'):
+            # other names imported by submodules, e.g. libgis
+            _import_all()
+            if name in globals():
+                return globals()[name]
+        raise AttributeError("module '%s' has no attribute '%s'"
+                             % (__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | set(_NAME_TO_SUBMODULE) |
+                      set(_SUBMODULES))
+else:
+    _import_all()
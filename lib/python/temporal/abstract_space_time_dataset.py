@@ -18,7 +18,7 @@ import copy
 from datetime import datetime
 from abc import ABCMeta, abstractmethod
 from .core import init_dbif, get_sql_template_path, get_tgis_metadata, get_current_mapset, \
-    get_enable_mapset_check
+    get_enable_mapset_check, has_spatial_index, create_sql_id_lists
 from .abstract_dataset import AbstractDataset, AbstractDatasetComparisonKeyStartTime
 from .temporal_granularity import check_granularity_string, compute_absolute_time_granularity,\
     compute_relative_time_granularity
@@ -986,6 +986,11 @@ class AbstractSpaceTimeDataset(AbstractDataset):
             where = create_temporal_relation_sql_where_statement(
                     start, end, use_start, use_during, use_overlap,
                     use_contain, use_equal, use_follows, use_precedes)
+            # Let the database preselect the spatially intersecting maps
+            if spatial:
+                where = "(%s) AND %s" % (
+                    where, self.get_spatial_where_statement(
+                        granule.spatial_extent, dbif=dbif))
 
             maps = self.get_registered_maps_as_objects(
                 where, "start_time", dbif)
@@ -1470,6 +1475,105 @@ class AbstractSpaceTimeDataset(AbstractDataset):
 
         return obj_list
 
+    def get_spatial_where_statement(self, extent, three_d=False, dbif=None):
+        """Return the SQL where statement that selects the registered maps
+           which spatial extent intersects or touches the provided extent
+
+           The spatial index of the temporal database (R*Tree in sqlite,
+           GiST in postgresql) is used to find the candidates in case
+           it is available. In case of LL projection the east and west
+           coordinates are not compared since they can wrap around.
+
+           .. code-block:: python
+
+               extent = SpatialExtent(north=80, south=20, east=60, west=10)
+               where = strds.get_spatial_where_statement(extent)
+               rows = strds.get_registered_maps("id", where, "start_time")
+
+           :param extent: The spatial extent object to intersect with
+           :param three_d: Compare the bottom and top of the extents too
+           :param dbif: The database interface to be used
+           :return: The SQL where statement without "WHERE"
+        """
+        map_type = self.get_new_map_instance(None).get_type()
+        bounds = [("west", "east", extent.get_west(), extent.get_east()),
+                  ("south", "north", extent.get_south(), extent.get_north())]
+        if extent.get_projection() == "LL":
+            bounds = bounds[1:]
+        if three_d:
+            bounds.append(("bottom", "top", extent.get_bottom(),
+                           extent.get_top()))
+
+        def compare(prefix=""):
+            conditions = []
+            for low, high, low_value, high_value in bounds:
+                conditions.append("%s%s <= %.17g" % (prefix, low,
+                                                     float(high_value)))
+                conditions.append("%s%s >= %.17g" % (prefix, high,
+                                                     float(low_value)))
+            return " AND ".join(conditions)
+
+        dbif, connected = init_dbif(dbif)
+        index = has_spatial_index(map_type, dbif, self.base.mapset)
+        if connected:
+            dbif.close()
+
+        where = compare()
+        if index == "rtree":
+            # The R*Tree selects the candidates, the comparison of the
+            # double precision extents is exact
+            where = "id IN (SELECT i.id FROM %(type)s_spatial_rtree_id AS i," \
+                    " %(type)s_spatial_rtree AS r WHERE r.rid = i.rid AND " \
+                    "%(rtree)s) AND %(where)s" % {"type": map_type,
+                                                 "rtree": compare("r."),
+                                                 "where": where}
+        elif index == "gist" and extent.get_projection() != "LL":
+            where = "id IN (SELECT id FROM %(type)s_spatial_extent WHERE " \
+                    "box(point(west, south), point(east, north)) && " \
+                    "box(point(%(w).17g, %(s).17g), point(%(e).17g, " \
+                    "%(n).17g))) AND %(where)s" % {
+                        "type": map_type, "where": where,
+                        "w": float(extent.get_west()),
+                        "e": float(extent.get_east()),
+                        "s": float(extent.get_south()),
+                        "n": float(extent.get_north())}
+        return where
+
+    def get_registered_maps_as_objects_by_extent(self, extent, where=None,
+                                                 order="start_time",
+                                                 three_d=False, dbif=None):
+        """Return the registered maps which spatial extent intersects or
+           touches the provided extent as ordered object list
+
+           The objects are initialized with their id's' and the
+           spatio-temporal extent, see get_registered_maps_as_objects().
+           The selection is done by the temporal database using its
+           spatial index, see get_spatial_where_statement().
+
+           :param extent: The spatial extent object to intersect with
+           :param where: An additional SQL where statement to select a subset
+                         of the registered maps without "WHERE"
+           :param order: The SQL order statement to be used to order the
+                         objects in the list without "ORDER BY"
+           :param three_d: Compare the bottom and top of the extents too
+           :param dbif: The database interface to be used
+           :return: The ordered map object list
+        """
+        dbif, connected = init_dbif(dbif)
+
+        spatial_where = self.get_spatial_where_statement(extent, three_d,
+                                                         dbif)
+        if where is not None and where != "":
+            spatial_where = "(%s) AND %s" % (where.split(";")[0],
+                                             spatial_where)
+
+        obj_list = self.get_registered_maps_as_objects(spatial_where, order,
+                                                       dbif)
+        if connected:
+            dbif.close()
+
+        return obj_list
+
     def _update_where_statement_by_band_reference(self, where):
         """Update given SQL WHERE statement by band reference.
 
@@ -2061,13 +2165,10 @@ class AbstractSpaceTimeDataset(AbstractDataset):
             self.msgr.debug(1, _("Drop map register table: %s") % (
                 self.get_map_register()))
             rows = self.get_registered_maps("id", None, None, dbif)
-            # Unregister each registered map in the table
-            if rows is not None:
-                for row in rows:
-                    # Unregister map
-                    map = self.get_new_map_instance(row["id"])
-                    statement += self.unregister_map(
-                        map=map, dbif=dbif, execute=False)
+            # Unregister all registered maps in the table
+            if rows:
+                statement += self.unregister_maps(
+                    [row["id"] for row in rows], dbif=dbif, execute=False)
 
             # Safe the DROP table statement
             statement += "DROP TABLE IF EXISTS " + self.get_map_register() + ";\n"
@@ -2352,6 +2453,112 @@ class AbstractSpaceTimeDataset(AbstractDataset):
 
         return statement
 
+    def unregister_maps(self, map_ids, dbif=None, execute=True):
+        """Unregister a list of maps from the space time dataset.
+
+           This is the set based variant of unregister_map(), the
+           maps are processed with a few SQL statements for chunks of
+           map ids. Maps which are not registered are reported and skipped.
+           The space time dataset is not updated, call
+           update_from_registered_maps() afterwards.
+
+           :param map_ids: The list of map ids to unregister
+           :param dbif: The database interface to be used
+           :param execute: If True the SQL DELETE statements will be
+                           executed.
+                           If False the prepared SQL statements are
+                           returned and must be executed by the caller.
+                           The dataset registers of the maps are
+                           updated immediately in both cases.
+
+           :return: The SQL statements if execute == False, else an empty
+                   string
+        """
+
+        if get_enable_mapset_check() is True and \
+           self.get_mapset() != get_current_mapset():
+            self.msgr.fatal(_("Unable to unregister maps from dataset "
+                              "<%(ds)s> of type %(type)s in the temporal "
+                              "database. The mapset of the dataset does not "
+                              "match the current mapset") % {
+                                  "ds": self.get_id(),
+                                  "type": self.get_type()})
+
+        statement = ""
+        stds_register_table = self.get_map_register()
+        if stds_register_table is None or not map_ids:
+            return statement
+
+        dbif, connected = init_dbif(dbif)
+
+        # Select the registered maps
+        registered = set()
+        for id_list in create_sql_id_lists(map_ids):
+            dbif.execute("SELECT id FROM %s WHERE id IN (%s)" % (
+                stds_register_table, id_list), mapset=self.base.mapset)
+            rows = dbif.fetchall(mapset=self.base.mapset)
+            registered.update(row[0] for row in rows)
+
+        for map_id in map_ids:
+            if map_id not in registered:
+                self.msgr.warning(_("Map <%(map)s> is not registered in space "
+                                    "time dataset <%(base)s>") %
+                                  {'map': map_id, 'base': self.base.get_id()})
+        map_ids = [map_id for map_id in map_ids if map_id in registered]
+
+        # Remove the space time dataset from the dataset register of the
+        # maps, maps with the same remaining datasets are updated at once
+        map_register_table = self.get_new_map_instance(
+            None).stds_register.get_table_name()
+        stds_id = self.base.get_id()
+        mapsets = {}
+        for map_id in map_ids:
+            mapsets.setdefault(map_id.split("@")[-1], []).append(map_id)
+
+        for mapset, ids in mapsets.items():
+            map_statement = ""
+            remaining = {}
+            for id_list in create_sql_id_lists(ids):
+                dbif.execute("SELECT id, registered_stds FROM %s WHERE id IN "
+                             "(%s)" % (map_register_table, id_list),
+                             mapset=mapset)
+                for row in dbif.fetchall(mapset=mapset):
+                    datasets = row[1]
+                    if not datasets or datasets.find("@") < 0:
+                        continue
+                    datasets = [dataset for dataset in datasets.split(",")
+                                if dataset != stds_id]
+                    remaining.setdefault(",".join(datasets),
+                                         []).append(row[0])
+            for datasets, ids in remaining.items():
+                for id_list in create_sql_id_lists(ids):
+                    map_statement += "UPDATE %s SET registered_stds = " \
+                                     "'%s' WHERE id IN (%s);\n" % (
+                                         map_register_table,
+                                         datasets.replace("'", "''"), id_list)
+            # We need to execute the statements here, otherwise the space
+            # time dataset will not be removed correctly
+            if map_statement:
+                dbif.execute_transaction(map_statement, mapset=mapset)
+
+        # Remove the maps from the space time dataset register
+        for id_list in create_sql_id_lists(map_ids):
+            statement += "DELETE FROM %s WHERE id IN (%s);\n" % (
+                stds_register_table, id_list)
+
+        if execute:
+            if statement:
+                dbif.execute_transaction(statement, mapset=self.base.mapset)
+            statement = ""
+
+        if connected:
+            dbif.close()
+
+        # decrease the counter
+        self.map_counter -= len(map_ids)
+
+        return statement
+
     def update_from_registered_maps(self, dbif=None):
         """This methods updates the modification time, the spatial and
            temporal extent as well as type specific metadata. It should always
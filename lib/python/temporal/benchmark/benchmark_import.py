@@ -0,0 +1,63 @@
+"""Benchmark of import time of GRASS Python packages
+
+Each import runs in a new Python interpreter, so nothing is cached
+between the runs. Startup of the interpreter itself is measured
+separately to make the differences easier to read.
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import subprocess
+import sys
+
+from grass.gunittest.benchmark import BenchmarkCase
+from grass.gunittest.main import test
+
+
+def run_python(code):
+    """Run Python code in a new interpreter"""
+    subprocess.check_call([sys.executable, '-c', code])
+
+
+class ImportBenchmark(BenchmarkCase):
+
+    repeat = 10
+
+    def benchmark_code(self, code):
+        self.benchmark(lambda: run_python(code))
+
+    def test_python_startup(self):
+        self.benchmark_code('pass')
+
+    def test_import_script(self):
+        self.benchmark_code('import grass.script')
+
+    def test_import_temporal(self):
+        self.benchmark_code('import grass.temporal')
+
+    def test_import_temporal_core(self):
+        """Names needed by most of temporal modules before any work"""
+        self.benchmark_code('import grass.temporal as tgis;'
+                            'tgis.init, tgis.open_old_stds')
+
+    def test_import_temporal_all(self):
+        self.benchmark_code('from grass.temporal import *')
+
+    def test_import_pygrass_modules(self):
+        self.benchmark_code('from grass.pygrass.modules import Module')
+
+    def test_import_pygrass_vector(self):
+        self.benchmark_code('from grass.pygrass.vector import VectorTopo')
+
+    def test_import_lib_gis(self):
+        self.benchmark_code('import grass.lib.gis')
+
+    def test_import_lib_vector(self):
+        self.benchmark_code('import grass.lib.vector')
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,106 @@
+"""Benchmark of temporal map registration, listing, sampling
+and algebra parsing
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import os
+
+import grass.temporal as tgis
+from grass.gunittest.benchmark import BenchmarkCase
+from grass.gunittest.main import test
+
+NUM_MAPS = 500
+
+
+class TemporalBenchmark(BenchmarkCase):
+
+    repeat = 3
+
+    @classmethod
+    def setUpClass(cls):
+        """Initiate the temporal GIS, create maps and datasets
+        """
+        super(TemporalBenchmark, cls).setUpClass()
+        os.putenv("GRASS_OVERWRITE", "1")
+        tgis.init(True)
+        cls.use_temp_region()
+        cls.runModule("g.region", n=80.0, s=0.0, e=120.0, w=0.0,
+                      t=1.0, b=0.0, res=10.0)
+        cls.maps = ["bench_map_%i" % i for i in range(1, NUM_MAPS + 1)]
+        for i, name in enumerate(cls.maps):
+            cls.runModule("r.mapcalc", overwrite=True, quiet=True,
+                          expression="%s = %i" % (name, i))
+        for name in ("bench_a", "bench_b"):
+            tgis.open_new_stds(name=name, type="strds",
+                               temporaltype="absolute", title=name,
+                               descr=name, semantic="field", overwrite=True)
+        tgis.register_maps_in_space_time_dataset(
+            type="raster", name="bench_a", maps=",".join(cls.maps),
+            start="2001-01-01", increment="1 day", interval=True)
+        tgis.register_maps_in_space_time_dataset(
+            type="raster", name="bench_b", maps=",".join(cls.maps[::10]),
+            start="2001-01-01", increment="10 days", interval=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove datasets, maps and the temporary region
+        """
+        cls.runModule("t.remove", type="strds",
+                      inputs="bench_a,bench_b")
+        cls.runModule("g.remove", flags="f", type="raster",
+                      name=cls.maps)
+        cls.del_temp_region()
+        super(TemporalBenchmark, cls).tearDownClass()
+
+    def test_register(self):
+        def create():
+            tgis.open_new_stds(name="bench_r", type="strds",
+                               temporaltype="absolute", title="bench_r",
+                               descr="bench_r", semantic="field",
+                               overwrite=True)
+
+        def register():
+            tgis.register_maps_in_space_time_dataset(
+                type="raster", name="bench_r", maps=",".join(self.maps),
+                start="2001-01-01", increment="1 day", interval=True)
+        self.benchmark(register, setup=create)
+        self.runModule("t.remove", type="strds", inputs="bench_r")
+
+    def test_list(self):
+        strds = tgis.open_old_stds("bench_a", type="strds")
+
+        def list_maps():
+            strds.get_registered_maps(columns="name,start_time,end_time",
+                                      order="start_time")
+        self.benchmark(list_maps)
+
+    def test_list_as_objects(self):
+        strds = tgis.open_old_stds("bench_a", type="strds")
+
+        def list_maps():
+            strds.get_registered_maps_as_objects(order="start_time")
+        self.benchmark(list_maps)
+
+    def test_sample(self):
+        strds_a = tgis.open_old_stds("bench_a", type="strds")
+        strds_b = tgis.open_old_stds("bench_b", type="strds")
+
+        def sample():
+            strds_a.sample_by_dataset(stds=strds_b, method=["during"])
+        self.benchmark(sample)
+
+    def test_algebra_parsing(self):
+        def parse():
+            ta = tgis.TemporalAlgebraParser(run=True, debug=False,
+                                            dry_run=True)
+            ta.parse(expression="R = bench_a {:,during} bench_b",
+                     stdstype="strds", basename="r", overwrite=True)
+        self.benchmark(parse)
+
+
+if __name__ == '__main__':
+    test()
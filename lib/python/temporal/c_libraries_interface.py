@@ -17,17 +17,25 @@ from multiprocessing import Process, Lock, Pipe
 import logging
 from ctypes import *
 from datetime import datetime
-import grass.lib.gis as libgis
-import grass.lib.raster as libraster
-import grass.lib.vector as libvector
-import grass.lib.date as libdate
-import grass.lib.raster3d as libraster3d
-import grass.lib.temporal as libtgis
 from grass.pygrass.rpc.base import RPCServerBase
-from grass.pygrass.raster import RasterRow
-from grass.pygrass.vector import VectorTopo
-from grass.script.utils import encode
-from grass.pygrass.utils import decode, set_path
+from grass.script.utils import encode, lazy_import
+
+# the libraries are loaded only by the server process
+libgis = lazy_import('grass.lib.gis')
+libraster = lazy_import('grass.lib.raster')
+libvector = lazy_import('grass.lib.vector')
+libdate = lazy_import('grass.lib.date')
+libraster3d = lazy_import('grass.lib.raster3d')
+libtgis = lazy_import('grass.lib.temporal')
+pygrass_raster = lazy_import('grass.pygrass.raster')
+pygrass_vector = lazy_import('grass.pygrass.vector')
+pygrass_utils = lazy_import('grass.pygrass.utils')
+
+
+def decode(obj, encoding=None):
+    """Decode string coming from C functions, see
+    :func:`grass.pygrass.utils.decode`"""
+    return pygrass_utils.decode(obj, encoding=encoding)
 
 ###############################################################################
 
@@ -93,7 +101,7 @@ def _read_raster_full_info(name, mapset):
     """
 
     info = {}
-    r = RasterRow(name=name, mapset=mapset)
+    r = pygrass_raster.RasterRow(name=name, mapset=mapset)
     if r.exist() is True:
         r.open("r")
 
@@ -132,7 +140,7 @@ def _read_vector_full_info(name, mapset, layer = None):
 
     info = {}
 
-    v = VectorTopo(name=name, mapset=mapset)
+    v = pygrass_vector.VectorTopo(name=name, mapset=mapset)
     if v.exist() is True:
         v.open("r")
         # Bounding box
@@ -53,6 +53,9 @@ except:
     pass
 
 import atexit
+import time
+import weakref
+from collections import deque
 from datetime import datetime
 
 ###############################################################################
@@ -234,6 +237,62 @@ def get_enable_timestamp_write():
 
 ###############################################################################
 
+# If this global variable is set True, the sqlite temporal database is
+# accessed in a way that is safe for several processes working with it
+# at the same time: the database uses write-ahead logging (WAL), writers
+# wait for the database lock, SELECT statements are read completely at once
+# to keep the read transactions short and small write transactions can be
+# coalesced into fewer commits.
+# Enable it by: export GRASS_TGIS_CONCURRENT=True
+enable_concurrency = False
+# Maximum time in seconds to wait for the database lock in concurrency mode
+# Overwrite it by: export GRASS_TGIS_BUSY_TIMEOUT=60
+busy_timeout = 60.0
+# Number of write transactions which are coalesced into one commit in
+# concurrency mode, 1 disables the coalescing
+# Overwrite it by: export GRASS_TGIS_WRITE_BATCH=50
+write_batch_size = 1
+
+# Contention statistics of the temporal database access of this process
+tgis_db_statistics = {"transactions": 0,  # Executed write transactions
+                      "coalesced": 0,  # Transactions merged into others
+                      "retries": 0,  # Retries because of a locked database
+                      "wait_time": 0.0}  # Seconds spent waiting for the lock
+
+
+def get_enable_concurrency():
+    """Return True if the temporal database is accessed in the
+       multi-process-safe concurrency mode
+
+       The concurrency mode is enabled by the environment variable
+       GRASS_TGIS_CONCURRENT=True, it affects sqlite databases only.
+    """
+    global enable_concurrency
+    return enable_concurrency
+
+
+def get_tgis_db_statistics():
+    """Return the contention statistics of the temporal database access
+       of this process as dictionary
+
+       - transactions: number of executed write transactions (commits)
+       - coalesced: number of write transactions which were merged into
+         other ones
+       - retries: number of retries because the database was locked
+       - wait_time: time in seconds spent waiting for the database lock
+
+       :returns: A copy of the statistics dictionary
+    """
+    return dict(tgis_db_statistics)
+
+
+def reset_tgis_db_statistics():
+    """Reset the contention statistics of the temporal database access"""
+    tgis_db_statistics.update(transactions=0, coalesced=0, retries=0,
+                              wait_time=0.0)
+
+###############################################################################
+
 # The global variable that stores the PyGRASS Messenger object that
 # provides a fast and exit safe interface to the C-library message functions
 message_interface = None
@@ -503,6 +562,9 @@ def init(raise_fatal_error=False):
 
         - GRASS_TGIS_PROFILE (True, False, 1, 0)
         - GRASS_TGIS_RAISE_ON_ERROR (True, False, 1, 0)
+        - GRASS_TGIS_CONCURRENT (True, False, 1, 0)
+        - GRASS_TGIS_BUSY_TIMEOUT (seconds)
+        - GRASS_TGIS_WRITE_BATCH (number of coalesced write transactions)
 
         ..warning::
 
@@ -529,6 +591,9 @@ def init(raise_fatal_error=False):
     global current_mapset
     global current_location
     global current_gisdbase
+    global enable_concurrency
+    global busy_timeout
+    global write_batch_size
 
     raise_on_error = raise_fatal_error
 
@@ -552,6 +617,15 @@ def init(raise_fatal_error=False):
     if gscript.get_raise_on_error() is True:
         raise_on_error = True
 
+    # Check environment variables of the concurrency mode
+    if os.getenv("GRASS_TGIS_CONCURRENT") == "True" or \
+       os.getenv("GRASS_TGIS_CONCURRENT") == "1":
+        enable_concurrency = True
+    if os.getenv("GRASS_TGIS_BUSY_TIMEOUT"):
+        busy_timeout = float(os.getenv("GRASS_TGIS_BUSY_TIMEOUT"))
+    if os.getenv("GRASS_TGIS_WRITE_BATCH"):
+        write_batch_size = max(1, int(os.getenv("GRASS_TGIS_WRITE_BATCH")))
+
     # Start the GRASS message interface server
     _init_tgis_message_interface(raise_on_error)
     # Start the C-library interface server
@@ -561,6 +635,9 @@ def init(raise_fatal_error=False):
                   #"\n  traceback:%s"%(str("  \n".join(traceback.format_stack()))))
 
     msgr.debug(1, ("Raise on error id: %s"%str(raise_on_error)))
+    if enable_concurrency:
+        msgr.debug(1, "Concurrency mode: busy timeout %s s, write batch %i" %
+                      (busy_timeout, write_batch_size))
 
     ciface = get_tgis_c_library_interface()
     driver_string = ciface.get_driver_name()
@@ -688,6 +765,11 @@ def init(raise_fatal_error=False):
                              "%(info)s") % ({"backup": backup_howto,
                                              "tdb": get_tgis_version(),
                                              "info": get_database_info_string()}))
+        # Databases created before the spatial index was introduced
+        # get it here, the database layout is unchanged otherwise
+        dbif.connect()
+        create_spatial_index(dbif)
+        dbif.close()
         return
 
     create_temporal_database(dbif)
@@ -829,6 +911,8 @@ def create_temporal_database(dbif):
     dbif.execute_transaction(delete_trigger_sql)
     # The indexes
     dbif.execute_transaction(indexes_sql)
+    # The spatial index of map extents
+    create_spatial_index(dbif)
 
     # Create the tgis metadata table to store the database
     # initial configuration
@@ -843,6 +927,112 @@ def create_temporal_database(dbif):
 
 ###############################################################################
 
+# The map types which extents are spatially indexed
+spatial_index_map_types = ["raster", "raster3d", "vector"]
+
+# Cached result of the check for the sqlite R*Tree module
+sqlite_has_rtree = None
+
+
+def _sqlite_has_rtree():
+    """Check if the sqlite library was compiled with the R*Tree module
+
+       :returns: True if R*Tree virtual tables can be created
+    """
+    global sqlite_has_rtree
+    if sqlite_has_rtree is None:
+        try:
+            connection = sqlite3.connect(":memory:")
+            connection.execute("CREATE VIRTUAL TABLE test_rtree "
+                               "USING rtree(id, west, east)")
+            connection.close()
+            sqlite_has_rtree = True
+        except sqlite3.Error:
+            sqlite_has_rtree = False
+    return sqlite_has_rtree
+
+
+def has_spatial_index(map_type, dbif, mapset=None):
+    """Check if the spatial extents of maps are indexed in the temporal
+       database
+
+       :param map_type: The map type: raster, raster3d or vector
+       :param dbif: The database interface to be used
+       :param mapset: The mapset of the temporal database, if None the
+                      current mapset will be used
+       :returns: "rtree" in case of the sqlite R*Tree index, "gist" in case
+                 of the postgresql GiST index, None if there is no index
+    """
+    if map_type not in spatial_index_map_types:
+        return None
+
+    if dbif.get_dbmi(mapset).__name__ == "sqlite3":
+        # The id table is created after the R*Tree virtual table
+        if dbif.check_table("%s_spatial_rtree_id" % map_type, mapset):
+            return "rtree"
+    else:
+        dbif.execute("SELECT EXISTS(SELECT * FROM pg_indexes "
+                     "WHERE indexname=%s)",
+                     ("%s_spatial_extent_gist_index" % map_type,),
+                     mapset=mapset)
+        if dbif.fetchone(mapset=mapset)[0]:
+            return "gist"
+    return None
+
+
+def create_spatial_index(dbif):
+    """Create the spatial index of the map extents in the temporal database
+       of the current mapset, in case it does not exist
+
+       The sqlite backend uses R*Tree virtual tables, which are maintained
+       by triggers on the spatial extent tables, the postgresql backend
+       uses GiST indexes. Extents of registered maps are indexed
+       at creation, hence this function is used to migrate existing
+       temporal databases too.
+
+       The index is optional, nothing is done in case the sqlite library
+       does not support R*Tree or the database is not writable.
+
+       :param dbif: The connected database interface to be used
+       :returns: True if the index exists, False otherwise
+    """
+    msgr = get_tgis_message_interface()
+
+    if tgis_backend == "sqlite":
+        if not _sqlite_has_rtree():
+            msgr.debug(1, "SQLite R*Tree module is not available, "
+                          "map extents are not spatially indexed")
+            return False
+        if not os.access(tgis_database_string, os.W_OK):
+            return False
+        template = "sqlite3_spatial_index_template.sql"
+    else:
+        template = "postgresql_spatial_index_template.sql"
+
+    map_types = [map_type for map_type in spatial_index_map_types
+                 if not has_spatial_index(map_type, dbif)]
+    if not map_types:
+        return True
+
+    spatial_index_sql = open(os.path.join(get_sql_template_path(),
+                                          template), 'r').read()
+
+    msgr.verbose(_("Creating spatial index of map extents in temporal "
+                   "database: %s") % tgis_database_string)
+
+    for map_type in map_types:
+        try:
+            dbif.execute_transaction(spatial_index_sql.replace("GRASS_MAP",
+                                                               map_type))
+        except Exception as e:
+            dbif.rollback()
+            msgr.warning(_("Unable to create spatial index of %(type)s map "
+                           "extents: %(ex)s") % {"type": map_type, "ex": e})
+            return False
+    return True
+
+###############################################################################
+
 
 def _create_tgis_metadata_table(content, dbif=None):
     """!Create the temporal gis metadata table which stores all metadata
@@ -904,6 +1094,10 @@ class SQLDatabaseInterfaceConnection(object):
         if mapset is None:
             mapset = self.current_mapset
 
+        mapset = decode(mapset)
+        if mapset in self.connections:
+            self.connections[mapset].rollback()
+
     def connect(self):
         """Connect to the DBMI to execute SQL statements
 
@@ -931,6 +1125,14 @@ class SQLDatabaseInterfaceConnection(object):
 
         self.connected = False
 
+    def flush(self):
+        """Commit the coalesced write transactions of all temporal databases,
+           see DBConnection.flush()
+        """
+        for key in self.unique_connections.keys():
+            if self.unique_connections[key].is_connected():
+                self.unique_connections[key].flush()
+
     def mogrify_sql_statement(self, content, mapset=None):
         """Return the SQL statement and arguments as executable SQL string
 
@@ -1044,6 +1246,19 @@ class SQLDatabaseInterfaceConnection(object):
 ###############################################################################
 
 
+# Connections with coalesced write transactions that are not yet committed
+pending_write_connections = weakref.WeakSet()
+
+
+def _flush_pending_writes():
+    """Commit the coalesced write transactions of all connections, so that
+       the following statements see all changes made by this process"""
+    for connection in list(pending_write_connections):
+        connection.flush()
+
+###############################################################################
+
+
 class DBConnection(object):
     """This class represents the database interface connection
        and provides access to the chosen backend modules.
@@ -1061,6 +1276,10 @@ class DBConnection(object):
             param dbstring: The database connection string
         """
         self.connected = False
+        # Coalesced write transactions and rows read at once
+        # in concurrency mode
+        self.pending = []
+        self.rows = None
         if backend is None:
             global tgis_backend
             if decode(tgis_backend) == "sqlite":
@@ -1119,14 +1338,27 @@ class DBConnection(object):
 
         try:
             if self.dbmi.__name__ == "sqlite3":
+                # In concurrency mode waiting for the lock is done by
+                # _retry() to measure the contention
                 self.connection = self.dbmi.connect(dbstring,
-                        detect_types=self.dbmi.PARSE_DECLTYPES | self.dbmi.PARSE_COLNAMES)
+                        detect_types=self.dbmi.PARSE_DECLTYPES | self.dbmi.PARSE_COLNAMES,
+                        timeout=0 if enable_concurrency else 5.0)
                 self.connection.row_factory = self.dbmi.Row
                 self.connection.isolation_level = None
                 self.connection.text_factory = str
                 self.cursor = self.connection.cursor()
-                self.cursor.execute("PRAGMA synchronous = OFF")
-                self.cursor.execute("PRAGMA journal_mode = MEMORY")
+                if enable_concurrency:
+                    self._retry(self.cursor.execute,
+                                "PRAGMA journal_mode = WAL")
+                    self.cursor.execute("PRAGMA synchronous = NORMAL")
+                else:
+                    self.cursor.execute("PRAGMA synchronous = OFF")
+                    # Switching a database from WAL mode requires
+                    # exclusive access, it stays in WAL mode once
+                    # a process in concurrency mode used it
+                    self.cursor.execute("PRAGMA journal_mode")
+                    if self.cursor.fetchone()[0] != "wal":
+                        self.cursor.execute("PRAGMA journal_mode = MEMORY")
             elif self.dbmi.__name__ == "psycopg2":
                 self.connection = self.dbmi.connect(dbstring)
                 #self.connection.set_isolation_level(dbmi.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
@@ -1148,9 +1380,81 @@ class DBConnection(object):
            close all temporal databases that have been opened. Use a dictionary
            to manage different connections.
         """
+        self.flush()
         self.connection.commit()
         self.cursor.close()
         self.connected = False
+        self.rows = None
+        if enable_concurrency:
+            self.msgr.debug(1, "Temporal database statistics: %s" %
+                               str(get_tgis_db_statistics()))
+
+    def _retry(self, func, *args):
+        """Call a function that accesses the database, in concurrency mode
+           the call is repeated while the sqlite database is locked by
+           another process, at most for busy_timeout seconds
+
+           :param func: The function to call
+           :param args: The arguments of the function
+           :returns: The return value of the function
+        """
+        if not enable_concurrency or self.dbmi.__name__ != "sqlite3":
+            return func(*args)
+
+        deadline = time.time() + busy_timeout
+        delay = 0.001
+        while True:
+            try:
+                return func(*args)
+            except self.dbmi.OperationalError as e:
+                # Roll back an interrupted transaction before retrying
+                if self.connection.in_transaction:
+                    self.connection.rollback()
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                if time.time() + delay > deadline:
+                    raise
+                time.sleep(delay)
+                tgis_db_statistics["retries"] += 1
+                tgis_db_statistics["wait_time"] += delay
+                delay = min(2 * delay, 0.5)
+
+    def flush(self):
+        """Commit the coalesced write transactions of this connection
+
+           Write transactions are coalesced in concurrency mode with
+           GRASS_TGIS_WRITE_BATCH > 1. They are committed when the batch is
+           full, before any other statement is executed and when the
+           connection is closed.
+
+           When the coalesced transaction fails, it is rolled back and
+           the statements are executed again one by one, so only the
+           failing statements are lost. The error of the first failing
+           statement is raised.
+        """
+        if not self.pending:
+            return
+        statements = self.pending
+        self.pending = []
+        pending_write_connections.discard(self)
+        if len(statements) == 1:
+            self._execute_transaction(statements[0])
+            return
+        try:
+            self._execute_transaction("\n".join(statements), report=False)
+            tgis_db_statistics["coalesced"] += len(statements) - 1
+            return
+        except self.dbmi.Error:
+            self.rollback()
+        error = None
+        for statement in statements:
+            try:
+                self._execute_transaction(statement)
+            except self.dbmi.Error as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            raise error
 
     def mogrify_sql_statement(self, content):
         """Return the SQL statement and arguments as executable SQL string
@@ -1257,11 +1561,15 @@ class DBConnection(object):
             self.connect()
             connected = True
 
+        _flush_pending_writes()
+        self.rows = None
+
         # Check if the database already exists
         if self.dbmi.__name__ == "sqlite3":
 
-            self.cursor.execute("SELECT name FROM sqlite_master WHERE "
-                                "type='table' AND name='%s';" % table_name)
+            self._retry(self.cursor.execute,
+                        "SELECT name FROM sqlite_master WHERE "
+                        "type='table' AND name='%s';" % table_name)
             name = self.cursor.fetchone()
             if name and name[0] == table_name:
                 table_exists = True
@@ -1286,11 +1594,16 @@ class DBConnection(object):
         if not self.connected:
             self.connect()
             connected = True
+        _flush_pending_writes()
+        self.rows = None
         try:
             if args:
-                self.cursor.execute(statement,  args)
+                self._retry(self.cursor.execute, statement, args)
             else:
-                self.cursor.execute(statement)
+                self._retry(self.cursor.execute, statement)
+            # Read all rows at once to keep the read transaction short
+            if enable_concurrency and self.dbmi.__name__ == "sqlite3":
+                self.rows = deque(self._retry(self.cursor.fetchall))
         except:
             if connected:
                 self.close()
@@ -1303,11 +1616,17 @@ class DBConnection(object):
 
     def fetchone(self):
         if self.connected:
+            if self.rows is not None:
+                return self.rows.popleft() if self.rows else None
             return self.cursor.fetchone()
         return None
 
     def fetchall(self):
         if self.connected:
+            if self.rows is not None:
+                rows = list(self.rows)
+                self.rows.clear()
+                return rows
             return self.cursor.fetchall()
         return None
 
@@ -1324,27 +1643,80 @@ class DBConnection(object):
             self.connect()
             connected = True
 
-        sql_script = ""
-        sql_script += "BEGIN TRANSACTION;\n"
-        sql_script += statement
-        sql_script += "END TRANSACTION;"
+        # Coalesce small write transactions into fewer commits
+        if enable_concurrency and write_batch_size > 1 and not connected:
+            self.pending.append(statement)
+            pending_write_connections.add(self)
+            if len(self.pending) >= write_batch_size:
+                self.flush()
+            return
+
+        _flush_pending_writes()
 
         try:
-            if self.dbmi.__name__ == "sqlite3":
-                self.cursor.executescript(statement)
-            else:
-                self.cursor.execute(statement)
-            self.connection.commit()
+            self._execute_transaction(statement)
         except:
             if connected:
                 self.close()
-            self.msgr.error(_("Unable to execute transaction:\n %(sql)s" %
-                            {"sql": statement}))
             raise
 
         if connected:
             self.close()
 
+    def _execute_transaction(self, statement, report=True):
+        """Execute and commit a SQL script, in concurrency mode the write
+           lock is acquired at the begin of the transaction
+
+           :param statement: The executable SQL statement or SQL script
+           :param report: Report the statement when it fails
+        """
+        self.rows = None
+        try:
+            if self.dbmi.__name__ == "sqlite3":
+                if enable_concurrency:
+                    self._retry(self.cursor.executescript,
+                                "BEGIN IMMEDIATE;\n%s\nCOMMIT;" % statement)
+                else:
+                    self.cursor.executescript(statement)
+            else:
+                self.cursor.execute(statement)
+            self.connection.commit()
+            tgis_db_statistics["transactions"] += 1
+        except:
+            if self.dbmi.__name__ == "sqlite3" and \
+               self.connection.in_transaction:
+                self.connection.rollback()
+            if report:
+                self.msgr.error(_("Unable to execute transaction:\n %(sql)s" %
+                                {"sql": statement}))
+            raise
+
+###############################################################################
+
+
+def create_sql_id_lists(ids, chunk_size=500):
+    """Create SQL lists of quoted identifiers for set based statements
+       like "DELETE FROM raster_base WHERE id IN (...)"
+
+       Long lists are split into chunks to respect the limits of the
+       SQL backends.
+
+       .. code-block:: python
+
+           >>> list(create_sql_id_lists(["a@PERMANENT", "it's@user1"]))
+           ["'a@PERMANENT','it''s@user1'"]
+           >>> list(create_sql_id_lists(["a", "b", "c"], chunk_size=2))
+           ["'a','b'", "'c'"]
+
+       :param ids: A list of identifiers (name@mapset)
+       :param chunk_size: The maximum number of identifiers in a list
+       :returns: A generator of SQL lists without parentheses
+    """
+    ids = list(ids)
+    for start in range(0, len(ids), chunk_size):
+        yield ",".join("'%s'" % str(ident).replace("'", "''")
+                       for ident in ids[start:start + chunk_size])
+
 ###############################################################################
 
 
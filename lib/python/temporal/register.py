@@ -18,7 +18,8 @@ for details.
 """
 from datetime import datetime
 import grass.script as gscript
-from .core import get_tgis_message_interface, init_dbif, get_current_mapset
+from .core import get_tgis_message_interface, init_dbif, get_current_mapset, \
+    get_enable_mapset_check, create_sql_id_lists
 from .open_stds import open_old_stds
 from .abstract_map_dataset import AbstractMapDataset
 from .factory import dataset_factory
@@ -563,6 +564,153 @@ def register_map_object_list(type,  map_list, output_stds,
     if connected:
         dbif.close()
 
+###############################################################################
+
+
+def unregister_maps_from_space_time_datasets(type, name, map_ids, dbif=None):
+    """Unregister maps from a space time dataset or from the temporal
+       database.
+
+       The maps are processed as a set with a few SQL statements
+       for chunks of map ids, the space time datasets are updated once
+       at the end.
+
+       :param type: The type of the maps raster, raster_3d or vector
+       :param name: The name of the space time dataset. Maps will be
+                    removed from the temporal database and all space time
+                    datasets if the name is None
+       :param map_ids: The list of map ids
+       :param dbif: The database interface to be used
+    """
+    msgr = get_tgis_message_interface()
+    dbif, connected = init_dbif(dbif)
+
+    if name:
+        sp = open_old_stds(name, type, dbif)
+        msgr.message(_("Unregister maps from space time dataset <%s>") %
+                     name)
+        sp.unregister_maps(map_ids, dbif=dbif)
+        sp.update_from_registered_maps(dbif)
+        sp.update_command_string(dbif=dbif)
+    else:
+        msgr.message(_("Unregister maps from the temporal database"))
+        delete_maps_from_temporal_database(type, map_ids, dbif=dbif)
+
+    if connected is True:
+        dbif.close()
+
+###############################################################################
+
+
+def delete_maps_from_temporal_database(type, map_ids, dbif=None, update=True,
+                                       remove_timestamps=True):
+    """Delete maps from the temporal database and unregister them from
+       all space time datasets.
+
+       This is the set based variant of AbstractMapDataset.delete(). The
+       maps and the space time datasets in which they are registered are
+       selected with one query and the maps are deleted from all tables
+       with DELETE ... WHERE id IN (...) statements for chunks of map ids.
+       Maps which are not in the temporal database are reported and skipped.
+
+       :param type: The type of the maps raster, raster_3d or vector
+       :param map_ids: The list of map ids
+       :param dbif: The database interface to be used
+       :param update: Update each affected space time dataset once
+                      from its remaining registered maps
+       :param remove_timestamps: Remove the timestamps of the maps from
+                                 the spatial database, not needed in case
+                                 the maps are removed too
+       :return: The list of ids of the affected space time datasets
+    """
+    msgr = get_tgis_message_interface()
+    dbif, connected = init_dbif(dbif)
+    mapset = get_current_mapset()
+
+    dummy = dataset_factory(type, None)
+
+    if get_enable_mapset_check() is True:
+        for map_id in map_ids:
+            if map_id.split("@")[-1] != mapset:
+                msgr.fatal(_("Unable to delete dataset <%(ds)s> of type "
+                             "%(type)s from the temporal database. The mapset"
+                             " of the dataset does not match the current "
+                             "mapset") % {"ds": map_id,
+                                          "type": dummy.get_type()})
+
+    # Select the existing maps and the space time datasets
+    # in which they are registered
+    base_table = dummy.base.get_table_name()
+    register_table = dummy.stds_register.get_table_name()
+    found = set()
+    datasets = {}
+    for id_list in create_sql_id_lists(map_ids):
+        dbif.execute("SELECT b.id, r.registered_stds FROM %s AS b LEFT JOIN "
+                     "%s AS r ON r.id = b.id WHERE b.id IN (%s)" % (
+                         base_table, register_table, id_list), mapset=mapset)
+        for row in dbif.fetchall(mapset=mapset):
+            found.add(row[0])
+            if row[1] and row[1].find("@") >= 0:
+                for dataset in row[1].split(","):
+                    datasets.setdefault(dataset, []).append(row[0])
+
+    for map_id in map_ids:
+        if map_id not in found:
+            msgr.warning(_("Unable to find %s map <%s> in temporal database") %
+                         (dummy.get_type(), map_id))
+    map_ids = [map_id for map_id in map_ids if map_id in found]
+
+    # Remove the maps from the registers of the space time datasets
+    stds_list = []
+    for dataset in sorted(datasets.keys()):
+        stds = dummy.get_new_stds_instance(dataset)
+        stds.metadata.select(dbif)
+        stds_list.append(stds)
+        stds_register_table = stds.get_map_register()
+        if stds_register_table is None:
+            continue
+        statement = ""
+        for id_list in create_sql_id_lists(datasets[dataset]):
+            statement += "DELETE FROM %s WHERE id IN (%s);\n" % (
+                stds_register_table, id_list)
+        dbif.execute_transaction(statement, mapset=stds.base.mapset)
+
+    # Delete the maps from all tables, the base table at last
+    tables = [dummy.absolute_time.get_table_name(),
+              dummy.relative_time.get_table_name(),
+              dummy.spatial_extent.get_table_name(),
+              dummy.metadata.get_table_name(),
+              register_table, base_table]
+    statement = ""
+    for id_list in create_sql_id_lists(map_ids):
+        for table in tables:
+            statement += "DELETE FROM %s WHERE id IN (%s);\n" % (table,
+                                                                 id_list)
+    if statement:
+        msgr.verbose(_("Delete %i %s datasets from temporal database") % (
+            len(map_ids), dummy.get_type()))
+        dbif.execute_transaction(statement, mapset=mapset)
+
+    if remove_timestamps:
+        num_maps = len(map_ids)
+        for count, map_id in enumerate(map_ids):
+            if count % 100 == 0:
+                msgr.percent(count, num_maps, 1)
+            dataset_factory(type, map_id).remove_timestamp_from_grass()
+        msgr.percent(num_maps, num_maps, 1)
+
+    if update:
+        num_stds = len(stds_list)
+        for count, stds in enumerate(stds_list):
+            msgr.percent(count, num_stds, 1)
+            stds.update_from_registered_maps(dbif)
+        msgr.percent(num_stds, num_stds, 1)
+
+    if connected is True:
+        dbif.close()
+
+    return [stds.get_id() for stds in stds_list]
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
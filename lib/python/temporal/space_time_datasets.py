@@ -22,10 +22,12 @@ from .spatial_extent import RasterSpatialExtent, Raster3DSpatialExtent, VectorSp
 from .temporal_extent import RasterAbsoluteTime, RasterRelativeTime, Raster3DAbsoluteTime, \
     Raster3DRelativeTime, VectorAbsoluteTime, VectorRelativeTime, STRDSAbsoluteTime,\
     STRDSRelativeTime, STR3DSAbsoluteTime, STR3DSRelativeTime, STVDSAbsoluteTime, STVDSRelativeTime
-import grass.script.array as garray
+from grass.script.utils import lazy_import
 from .core import init
 from datetime import datetime
 
+garray = lazy_import('grass.script.array')
+
 ###############################################################################
 
 
@@ -22,9 +22,12 @@ from datetime import datetime
 from .core import init_dbif
 from .abstract_dataset import AbstractDatasetComparisonKeyStartTime
 from .datetime_math import time_delta_to_relative_time_seconds
-import grass.lib.vector as vector
-import grass.lib.rtree as rtree
-import grass.lib.gis as gis
+from grass.script.utils import lazy_import
+
+# the libraries are loaded when a spatial index is built
+vector = lazy_import('grass.lib.vector')
+rtree = lazy_import('grass.lib.rtree')
+gis = lazy_import('grass.lib.gis')
 
 ###############################################################################
 
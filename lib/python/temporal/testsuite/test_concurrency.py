@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Tests of the concurrency mode of the temporal database (sqlite)"""
+
+import os
+import shutil
+import tempfile
+from multiprocessing import Pool
+
+import grass.temporal as tgis
+from grass.temporal import core
+from grass.pygrass import messages
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+
+PROCESSES = 8
+ROWS = 250
+
+
+def insert_rows(args):
+    """Insert rows into the database in a separate process"""
+    path, process = args
+    core.message_interface = messages.Messenger()
+    core.tgis_db_statistics["transactions"] = 0
+    dbif = core.DBConnection(backend="sqlite", dbstring=path)
+    dbif.connect()
+    for row in range(ROWS):
+        dbif.execute_transaction("INSERT INTO data VALUES (%d, %d);" %
+                                 (process, row))
+    dbif.close()
+    return core.get_tgis_db_statistics()["transactions"]
+
+
+class TestConcurrency(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        tgis.init()
+
+    def setUp(self):
+        self.settings = (core.enable_concurrency, core.write_batch_size)
+        core.enable_concurrency = True
+        core.write_batch_size = 20
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "concurrency.db")
+        self.dbif = core.DBConnection(backend="sqlite", dbstring=self.path)
+        self.dbif.connect()
+        self.dbif.execute_transaction(
+            "CREATE TABLE data (process INTEGER, row INTEGER);")
+        self.dbif.flush()
+
+    def tearDown(self):
+        self.dbif.close()
+        core.enable_concurrency, core.write_batch_size = self.settings
+        shutil.rmtree(self.tempdir)
+
+    def values(self, column):
+        self.dbif.execute("SELECT %s FROM data ORDER BY process, row;" %
+                          column)
+        return [row[0] for row in self.dbif.fetchall()]
+
+    def test_processes(self):
+        """All rows written by concurrent processes are in the database"""
+        pool = Pool(PROCESSES)
+        try:
+            transactions = pool.map(insert_rows,
+                                    [(self.path, process)
+                                     for process in range(PROCESSES)])
+        finally:
+            pool.close()
+            pool.join()
+        self.assertEqual(len(self.values("row")), PROCESSES * ROWS)
+        self.assertEqual(self.values("process"),
+                         sorted(list(range(PROCESSES)) * ROWS))
+        # statements were coalesced
+        self.assertLessEqual(max(transactions), ROWS // 20 + 1)
+
+    def test_failing_statement(self):
+        """Only the failing statement of a coalesced batch is lost"""
+        self.dbif.execute_transaction("INSERT INTO data VALUES (0, 1);")
+        self.dbif.execute_transaction("INSERT INTO data VALUES (0, 2);")
+        self.dbif.execute_transaction("INSERT INTO missing VALUES (0, 3);")
+        self.dbif.execute_transaction("INSERT INTO data VALUES (0, 4);")
+        with self.assertRaises(self.dbif.dbmi.Error):
+            self.dbif.flush()
+        self.assertEqual(self.values("row"), [1, 2, 4])
+
+    def test_fetchone(self):
+        for row in range(3):
+            self.dbif.execute_transaction(
+                "INSERT INTO data VALUES (0, %d);" % row)
+        self.dbif.execute("SELECT row FROM data ORDER BY row;")
+        self.assertEqual(self.dbif.fetchone()[0], 0)
+        self.assertEqual(self.dbif.fetchone()[0], 1)
+        self.assertEqual([row[0] for row in self.dbif.fetchall()], [2])
+        self.assertIsNone(self.dbif.fetchone())
+
+
+if __name__ == '__main__':
+    test()
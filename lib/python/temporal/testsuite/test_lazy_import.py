@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Tests of lazy import of the temporal framework and C libraries"""
+
+import ast
+import importlib
+import os
+import subprocess
+import sys
+import unittest
+
+import grass.temporal as tgis
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+
+
+def loaded_modules(code, modules):
+    """Return which of modules are imported after running code
+    in a new interpreter"""
+    script = ("import sys\n{code}\nprint(','.join(name for name in {modules}"
+              " if name in sys.modules))".format(code=code, modules=modules))
+    output = subprocess.check_output([sys.executable, '-c', script])
+    return [name for name in output.decode().strip().split(',') if name]
+
+
+@unittest.skipIf(sys.version_info < (3, 7),
+                 "lazy import requires Python 3.7 or newer")
+class TestLazyImport(TestCase):
+
+    heavy_modules = ['grass.lib.gis', 'grass.lib.raster', 'grass.lib.vector',
+                     'grass.lib.rtree', 'grass.pygrass.vector',
+                     'grass.pygrass.raster', 'grass.temporal.temporal_algebra']
+
+    def test_import_package(self):
+        """Importing the package does not import submodules"""
+        self.assertEqual(
+            loaded_modules('import grass.temporal', self.heavy_modules +
+                           ['grass.temporal.core']), [])
+
+    def test_import_core(self):
+        """Names used by most of the modules do not import C libraries"""
+        self.assertEqual(
+            loaded_modules('import grass.temporal as tgis\n'
+                           'tgis.init, tgis.open_old_stds, tgis.init_dbif',
+                           self.heavy_modules), [])
+
+    def test_all_names(self):
+        """All names in the table are defined by their submodules"""
+        for name, submodule in tgis._NAME_TO_SUBMODULE.items():
+            module = importlib.import_module('grass.temporal.' + submodule)
+            self.assertIs(getattr(tgis, name), getattr(module, name))
+
+    def test_table_complete(self):
+        """Public classes and functions of submodules are in the table"""
+        directory = os.path.dirname(tgis.__file__)
+        for submodule, names in tgis._SUBMODULE_NAMES:
+            path = os.path.join(directory, submodule + '.py')
+            with open(path) as source:
+                tree = ast.parse(source.read())
+            for node in tree.body:
+                if (isinstance(node, (ast.FunctionDef, ast.ClassDef)) and
+                        not node.name.startswith('_')):
+                    self.assertIn(node.name, names,
+                                  msg="%s.%s" % (submodule, node.name))
+
+    def test_submodule(self):
+        self.assertIs(tgis.core,
+                      importlib.import_module('grass.temporal.core'))
+
+    def test_imported_name(self):
+        """Names imported by submodules are available as before"""
+        self.assertTrue(hasattr(tgis, 'datetime'))
+        self.assertFalse(hasattr(tgis, 'no_such_name'))
+
+
+if __name__ == '__main__':
+    test()
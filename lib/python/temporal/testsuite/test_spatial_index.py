@@ -0,0 +1,106 @@
+"""Unit test of the spatial index of map extents in the temporal database
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import grass.temporal as tgis
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+import os
+
+
+class TestSpatialIndex(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Initiate the temporal GIS and create maps with distinct extents
+        """
+        os.putenv("GRASS_OVERWRITE", "1")
+        # Use always the current mapset as temporal database
+        cls.runModule("g.gisenv", set="TGIS_USE_CURRENT_MAPSET=1")
+        tgis.init()
+        cls.use_temp_region()
+        for i in range(4):
+            cls.runModule("g.region", n=10.0 * (i + 1), s=10.0 * i,
+                          e=10.0 * (i + 1), w=10.0 * i, res=1.0)
+            cls.runModule("r.mapcalc", overwrite=True, quiet=True,
+                          expression="spatial_index_map_%i = %i" % (i, i))
+
+        cls.strds = tgis.open_new_stds(name="spatial_index_test",
+                                       type="strds", temporaltype="absolute",
+                                       title="Test strds", descr="Test strds",
+                                       semantic="field", overwrite=True)
+        tgis.register_maps_in_space_time_dataset(
+            type="raster", name=cls.strds.get_name(),
+            maps=",".join("spatial_index_map_%i" % i for i in range(4)),
+            start="2001-01-01", increment="1 day", interval=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the maps and the temporary region
+        """
+        cls.strds.delete()
+        cls.runModule("t.unregister", type="raster", quiet=True,
+                      maps=",".join("spatial_index_map_%i" % i
+                                    for i in range(4)))
+        cls.runModule("g.remove", flags='f', type="raster", quiet=True,
+                      name=",".join("spatial_index_map_%i" % i
+                                    for i in range(4)))
+        cls.del_temp_region()
+
+    def get_names(self, extent, **kwargs):
+        maps = self.strds.get_registered_maps_as_objects_by_extent(extent,
+                                                                   **kwargs)
+        return sorted(map.get_name() for map in maps)
+
+    def test_index_exists(self):
+        dbif, connected = tgis.init_dbif(None)
+        index = tgis.has_spatial_index("raster", dbif)
+        self.assertIn(index, ("rtree", "gist"))
+        self.assertIsNone(tgis.has_spatial_index("strds", dbif))
+        if connected:
+            dbif.close()
+
+    def test_intersecting_maps(self):
+        extent = tgis.SpatialExtent(north=25, south=15, east=25, west=15)
+        self.assertEqual(self.get_names(extent),
+                         ["spatial_index_map_1", "spatial_index_map_2"])
+
+    def test_touching_maps(self):
+        extent = tgis.SpatialExtent(north=30, south=20, east=30, west=20)
+        self.assertEqual(self.get_names(extent), ["spatial_index_map_1",
+                                                  "spatial_index_map_2",
+                                                  "spatial_index_map_3"])
+
+    def test_disjoint_extent(self):
+        extent = tgis.SpatialExtent(north=100, south=90, east=100, west=90)
+        self.assertEqual(self.get_names(extent), [])
+
+    def test_where(self):
+        extent = tgis.SpatialExtent(north=40, south=0, east=40, west=0)
+        self.assertEqual(self.get_names(extent,
+                                        where="start_time >= '2001-01-03'"),
+                         ["spatial_index_map_2", "spatial_index_map_3"])
+
+    def test_updated_extent(self):
+        """The index follows the changes of map extents"""
+        map = tgis.RasterDataset("spatial_index_map_0@" +
+                                 tgis.get_current_mapset())
+        map.select()
+        map.set_spatial_extent_from_values(north=100, south=90, east=100,
+                                           west=90, top=0, bottom=0)
+        map.spatial_extent.update()
+        try:
+            extent = tgis.SpatialExtent(north=95, south=94, east=95, west=94)
+            self.assertEqual(self.get_names(extent), ["spatial_index_map_0"])
+        finally:
+            map.set_spatial_extent_from_values(north=10, south=0, east=10,
+                                               west=0, top=0, bottom=0)
+            map.spatial_extent.update()
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,136 @@
+"""Unit test to unregister raster maps from space time datasets and
+   from the temporal database
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import grass.temporal as tgis
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+import os
+
+MAPS = ["unregister_map_1", "unregister_map_2", "unregister_map_3"]
+
+
+class TestUnregister(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """Initiate the temporal GIS and set the region
+        """
+        os.putenv("GRASS_OVERWRITE", "1")
+        # Use always the current mapset as temporal database
+        cls.runModule("g.gisenv", set="TGIS_USE_CURRENT_MAPSET=1")
+        tgis.init()
+        cls.mapset = tgis.get_current_mapset()
+        cls.use_temp_region()
+        cls.runModule('g.region', n=80.0, s=0.0, e=120.0, w=0.0,
+                      t=1.0, b=0.0, res=10.0)
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary region
+        """
+        cls.del_temp_region()
+
+    def setUp(self):
+        """Create the test maps and register them in two space time
+           raster datasets
+        """
+        for i, name in enumerate(MAPS):
+            self.runModule("r.mapcalc", overwrite=True, quiet=True,
+                           expression="%s = %d" % (name, i + 1))
+        self.ids = [name + "@" + self.mapset for name in MAPS]
+        self.strds_a = tgis.open_new_stds(
+            name="unregister_test_a", type="strds", temporaltype="absolute",
+            title="Test strds", descr="Test strds", semantic="field",
+            overwrite=True)
+        self.strds_b = tgis.open_new_stds(
+            name="unregister_test_b", type="strds", temporaltype="absolute",
+            title="Test strds", descr="Test strds", semantic="field",
+            overwrite=True)
+        for strds in (self.strds_a, self.strds_b):
+            tgis.register_maps_in_space_time_dataset(
+                type="raster", name=strds.get_name(), maps=",".join(MAPS),
+                start="2001-01-01", increment="1 day", interval=True)
+
+    def tearDown(self):
+        """Remove the maps and the space time raster datasets
+        """
+        for strds in (self.strds_a, self.strds_b):
+            if strds.is_in_db():
+                strds.delete()
+        self.runModule("t.unregister", type="raster", maps=",".join(MAPS),
+                       quiet=True)
+        # the maps may be removed already by t.remove
+        self.runModule("g.remove", flags='f', type="raster",
+                       pattern="unregister_map_*", quiet=True)
+
+    def assertRegisteredMaps(self, strds, ids):
+        """Check the map register and the number of maps of a dataset"""
+        strds.select()
+        rows = strds.get_registered_maps(columns="id", order="id")
+        self.assertEqual([row["id"] for row in rows or []], ids)
+        self.assertEqual(strds.metadata.get_number_of_maps() or 0, len(ids))
+
+    def assertRegisteredStds(self, map_id, stds_ids):
+        """Check the dataset register of a map"""
+        map = tgis.RasterDataset(map_id)
+        self.assertTrue(map.is_in_db())
+        self.assertEqual(map.get_registered_stds(), stds_ids)
+
+    def test_unregister_from_stds(self):
+        """Unregister maps from one of two space time datasets"""
+        tgis.unregister_maps_from_space_time_datasets(
+            "raster", self.strds_a.get_id(), self.ids[:2])
+        self.assertRegisteredMaps(self.strds_a, self.ids[2:])
+        self.assertRegisteredMaps(self.strds_b, self.ids)
+        for map_id in self.ids[:2]:
+            self.assertRegisteredStds(map_id, [self.strds_b.get_id()])
+        self.assertRegisteredStds(self.ids[2], [self.strds_a.get_id(),
+                                                self.strds_b.get_id()])
+
+    def test_unregister_from_both_stds(self):
+        """Unregister maps from both space time datasets"""
+        for strds in (self.strds_a, self.strds_b):
+            tgis.unregister_maps_from_space_time_datasets(
+                "raster", strds.get_id(), self.ids[:2])
+        self.assertRegisteredMaps(self.strds_a, self.ids[2:])
+        self.assertRegisteredMaps(self.strds_b, self.ids[2:])
+        for map_id in self.ids[:2]:
+            # the maps stay in the temporal database
+            self.assertRegisteredStds(map_id, None)
+
+    def test_unregister_from_database(self):
+        """Unregister maps from the temporal database with t.unregister"""
+        self.assertModule("t.unregister", type="raster",
+                          maps=",".join(MAPS[:2]))
+        for map_id in self.ids[:2]:
+            self.assertFalse(tgis.RasterDataset(map_id).is_in_db())
+        self.assertRegisteredMaps(self.strds_a, self.ids[2:])
+        self.assertRegisteredMaps(self.strds_b, self.ids[2:])
+
+    def test_t_unregister_input(self):
+        """Unregister maps from one space time dataset with t.unregister"""
+        self.assertModule("t.unregister", type="raster",
+                          input=self.strds_a.get_name(), maps=MAPS[0])
+        self.assertRegisteredMaps(self.strds_a, self.ids[1:])
+        self.assertRegisteredMaps(self.strds_b, self.ids)
+        self.assertRegisteredStds(self.ids[0], [self.strds_b.get_id()])
+
+    def test_t_remove_recursive(self):
+        """Remove a space time dataset with its maps with t.remove -rf"""
+        self.assertModule("t.remove", flags="rf", type="strds",
+                          inputs=self.strds_a.get_name())
+        self.assertFalse(self.strds_a.is_in_db())
+        for name, map_id in zip(MAPS, self.ids):
+            self.assertFalse(tgis.RasterDataset(map_id).is_in_db())
+            self.assertRasterDoesNotExist(name)
+        self.assertRegisteredMaps(self.strds_b, [])
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,10 @@
+--#############################################################################
+-- This SQL script generates the postgresql GiST spatial index of the
+-- two dimensional spatial extents of raster, raster3d and vector maps
+--
+-- The index is maintained by postgresql, queries must use the same
+-- box expression to use it.
+--#############################################################################
+
+CREATE INDEX GRASS_MAP_spatial_extent_gist_index ON GRASS_MAP_spatial_extent
+  USING GIST (box(point(west, south), point(east, north)));
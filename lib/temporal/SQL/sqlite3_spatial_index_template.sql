@@ -0,0 +1,60 @@
+--#############################################################################
+-- This SQL script generates the sqlite3 R*Tree spatial index of the
+-- spatial extents of raster, raster3d and vector maps
+--
+-- The R*Tree uses integer keys, hence the map ids are mapped to
+-- integer keys in a separate table. The index is maintained by triggers
+-- and filled with the extents of already registered maps.
+--
+-- The R*Tree stores 32 bit floating point values rounded outwards,
+-- exact comparison must be done with the spatial extent table.
+--#############################################################################
+
+CREATE VIRTUAL TABLE GRASS_MAP_spatial_rtree USING rtree(
+  rid,                                  -- The integer key of the map from GRASS_MAP_spatial_rtree_id
+  west, east,
+  south, north,
+  bottom, top
+);
+
+CREATE TABLE GRASS_MAP_spatial_rtree_id (
+  rid INTEGER PRIMARY KEY,
+  id VARCHAR NOT NULL UNIQUE            -- The map id (name@mapset)
+);
+
+CREATE TRIGGER GRASS_MAP_spatial_rtree_insert AFTER INSERT ON GRASS_MAP_spatial_extent
+  BEGIN
+    INSERT INTO GRASS_MAP_spatial_rtree_id (id) VALUES (new.id);
+    INSERT INTO GRASS_MAP_spatial_rtree VALUES (
+      (SELECT rid FROM GRASS_MAP_spatial_rtree_id WHERE id = new.id),
+      min(new.west, new.east), max(new.west, new.east),
+      min(new.south, new.north), max(new.south, new.north),
+      min(new.bottom, new.top), max(new.bottom, new.top));
+  END;
+
+CREATE TRIGGER GRASS_MAP_spatial_rtree_update AFTER UPDATE OF id, north, south, east, west, top, bottom ON GRASS_MAP_spatial_extent
+  BEGIN
+    UPDATE GRASS_MAP_spatial_rtree_id SET id = new.id WHERE id = old.id;
+    UPDATE GRASS_MAP_spatial_rtree SET
+      west = min(new.west, new.east), east = max(new.west, new.east),
+      south = min(new.south, new.north), north = max(new.south, new.north),
+      bottom = min(new.bottom, new.top), top = max(new.bottom, new.top)
+      WHERE rid = (SELECT rid FROM GRASS_MAP_spatial_rtree_id WHERE id = new.id);
+  END;
+
+CREATE TRIGGER GRASS_MAP_spatial_rtree_delete AFTER DELETE ON GRASS_MAP_spatial_extent
+  BEGIN
+    DELETE FROM GRASS_MAP_spatial_rtree WHERE rid = (SELECT rid FROM GRASS_MAP_spatial_rtree_id WHERE id = old.id);
+    DELETE FROM GRASS_MAP_spatial_rtree_id WHERE id = old.id;
+  END;
+
+-- Index the maps which are already registered
+
+INSERT INTO GRASS_MAP_spatial_rtree_id (id) SELECT id FROM GRASS_MAP_spatial_extent;
+INSERT INTO GRASS_MAP_spatial_rtree
+  SELECT i.rid,
+    min(e.west, e.east), max(e.west, e.east),
+    min(e.south, e.north), max(e.south, e.north),
+    min(e.bottom, e.top), max(e.bottom, e.top)
+  FROM GRASS_MAP_spatial_rtree_id AS i, GRASS_MAP_spatial_extent AS e
+  WHERE e.id = i.id;
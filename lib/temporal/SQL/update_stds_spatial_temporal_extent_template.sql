@@ -3,6 +3,9 @@
 -- the modifcation time and revision of a space time dataset. This script
 -- should be called when maps inserted or deleted in a space time dataset.
 --
+-- Each extent is computed in a single query over the registered maps
+-- and written with a single UPDATE (row value assignment). The number
+-- of registered maps is updated with the type specific metadata.
 --
 -- Author: Soeren Gebbert soerengebbert <at> googlemail <dot> com
 --#############################################################################
@@ -14,54 +17,21 @@
 
 -- UPDATE STDS_base SET modification_time = datetime("NOW") WHERE id = 'SPACETIME_ID';
 -- UPDATE STDS_base SET revision = (revision + 1) WHERE id = 'SPACETIME_ID';
--- Number of registered maps
-UPDATE STDS_metadata SET number_of_maps = 
-       (SELECT count(id) FROM SPACETIME_REGISTER_TABLE)
-       WHERE id = 'SPACETIME_ID';
 -- Update the temporal extent
-UPDATE STDS_absolute_time SET start_time = 
-       (SELECT min(start_time) FROM GRASS_MAP_absolute_time WHERE GRASS_MAP_absolute_time.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
+UPDATE STDS_absolute_time SET (start_time, end_time) =
+       (SELECT min(t.start_time), max(t.end_time)
+        FROM SPACETIME_REGISTER_TABLE AS r, GRASS_MAP_absolute_time AS t
+        WHERE t.id = r.id
        ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_absolute_time SET end_time = 
-       (SELECT max(end_time) FROM GRASS_MAP_absolute_time WHERE GRASS_MAP_absolute_time.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_relative_time SET start_time =
-       (SELECT min(start_time) FROM GRASS_MAP_relative_time WHERE GRASS_MAP_relative_time.id IN
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_relative_time SET end_time =
-       (SELECT max(end_time) FROM GRASS_MAP_relative_time WHERE GRASS_MAP_relative_time.id IN
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
+UPDATE STDS_relative_time SET (start_time, end_time) =
+       (SELECT min(t.start_time), max(t.end_time)
+        FROM SPACETIME_REGISTER_TABLE AS r, GRASS_MAP_relative_time AS t
+        WHERE t.id = r.id
        ) WHERE id = 'SPACETIME_ID';
 -- Update the spatial extent
-UPDATE STDS_spatial_extent SET north = 
-       (SELECT max(north) FROM GRASS_MAP_spatial_extent WHERE GRASS_MAP_spatial_extent.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_spatial_extent SET south = 
-       (SELECT min(south) FROM GRASS_MAP_spatial_extent WHERE GRASS_MAP_spatial_extent.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_spatial_extent SET east = 
-       (SELECT max(east) FROM GRASS_MAP_spatial_extent WHERE GRASS_MAP_spatial_extent.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_spatial_extent SET west = 
-       (SELECT min(west) FROM GRASS_MAP_spatial_extent WHERE GRASS_MAP_spatial_extent.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
+UPDATE STDS_spatial_extent SET (north, south, east, west, top, bottom, proj) =
+       (SELECT max(e.north), min(e.south), max(e.east), min(e.west),
+               max(e.top), min(e.bottom), min(e.proj)
+        FROM SPACETIME_REGISTER_TABLE AS r, GRASS_MAP_spatial_extent AS e
+        WHERE e.id = r.id
        ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_spatial_extent SET top = 
-       (SELECT max(top) FROM GRASS_MAP_spatial_extent WHERE GRASS_MAP_spatial_extent.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_spatial_extent SET bottom = 
-       (SELECT min(bottom) FROM GRASS_MAP_spatial_extent WHERE GRASS_MAP_spatial_extent.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE STDS_spatial_extent SET proj = 
-       (SELECT min(proj) FROM GRASS_MAP_spatial_extent WHERE GRASS_MAP_spatial_extent.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-
@@ -1,49 +1,23 @@
 --#############################################################################
 -- This SQL is to update a space-time raster dataset metadata
 --
+-- All aggregates are computed in a single query over the registered maps
+-- and written with a single UPDATE (row value assignment)
+--
 -- Author: Soeren Gebbert soerengebbert <at> googlemail <dot> com
 --#############################################################################
 
 -- SPACETIME_REGISTER_TABLE is a placeholder for specific stds map register table name (SQL compliant)
 -- SPACETIME_ID is a placeholder for specific stds id: name@mapset
 
--- Update the min and max values
-UPDATE strds_metadata SET min_min = 
-       (SELECT min(min) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE strds_metadata SET min_max = 
-       (SELECT max(min) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE strds_metadata SET max_min = 
-       (SELECT min(max) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE strds_metadata SET max_max = 
-       (SELECT max(max) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
--- Update the resolution
-UPDATE strds_metadata SET nsres_min = 
-       (SELECT min(nsres) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE strds_metadata SET nsres_max = 
-       (SELECT max(nsres) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE strds_metadata SET ewres_min = 
-       (SELECT min(ewres) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE strds_metadata SET ewres_max = 
-       (SELECT max(ewres) FROM raster_metadata WHERE raster_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
--- Update the number of registered bands
-UPDATE strds_metadata SET number_of_bands =
-       (SELECT count(distinct band_reference) FROM raster_metadata WHERE
-       raster_metadata.id IN
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
+-- Update the number of registered maps and bands, the min and max values
+-- and the resolution
+UPDATE strds_metadata SET (number_of_maps, number_of_bands,
+                           min_min, min_max, max_min, max_max,
+                           nsres_min, nsres_max, ewres_min, ewres_max) =
+       (SELECT count(r.id), count(distinct m.band_reference),
+               min(m.min), max(m.min), min(m.max), max(m.max),
+               min(m.nsres), max(m.nsres), min(m.ewres), max(m.ewres)
+        FROM SPACETIME_REGISTER_TABLE AS r
+        LEFT JOIN raster_metadata AS m ON m.id = r.id
        ) WHERE id = 'SPACETIME_ID';
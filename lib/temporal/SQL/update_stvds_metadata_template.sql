@@ -1,6 +1,8 @@
 --#############################################################################
--- This SQL script is for now a placeholder, till the vector metadata
--- concept is clear
+-- This SQL script is to update a space-time vector dataset metadata
+--
+-- All aggregates are computed in a single query over the registered maps
+-- and written with a single UPDATE (row value assignment)
 --
 -- Author: Soeren Gebbert soerengebbert <at> googlemail <dot> com
 --#############################################################################
@@ -8,52 +10,16 @@
 -- SPACETIME_REGISTER_TABLE is a placeholder for specific stds map register table name (SQL compliant)
 -- SPACETIME_ID is a placeholder for specific stds id: name@mapset
 
--- Update the vector features and topology 
-UPDATE stvds_metadata SET points = 
-       (SELECT sum(points) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET lines = 
-       (SELECT sum(lines) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET boundaries = 
-       (SELECT sum(boundaries) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET centroids = 
-       (SELECT sum(centroids) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET faces = 
-       (SELECT sum(faces) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET kernels = 
-       (SELECT sum(kernels) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET primitives = 
-       (SELECT sum(primitives) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET nodes = 
-       (SELECT sum(nodes) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET areas = 
-       (SELECT sum(areas) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET islands = 
-       (SELECT sum(islands) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET holes = 
-       (SELECT sum(holes) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
-       ) WHERE id = 'SPACETIME_ID';
-UPDATE stvds_metadata SET volumes = 
-       (SELECT sum(volumes) FROM vector_metadata WHERE vector_metadata.id IN 
-    		(SELECT id FROM SPACETIME_REGISTER_TABLE)
+-- Update the number of registered maps, the vector features and topology
+UPDATE stvds_metadata SET (number_of_maps,
+                           points, lines, boundaries, centroids,
+                           faces, kernels, primitives, nodes,
+                           areas, islands, holes, volumes) =
+       (SELECT count(r.id),
+               sum(m.points), sum(m.lines), sum(m.boundaries),
+               sum(m.centroids), sum(m.faces), sum(m.kernels),
+               sum(m.primitives), sum(m.nodes), sum(m.areas),
+               sum(m.islands), sum(m.holes), sum(m.volumes)
+        FROM SPACETIME_REGISTER_TABLE AS r
+        LEFT JOIN vector_metadata AS m ON m.id = r.id
        ) WHERE id = 'SPACETIME_ID';
@@ -56,41 +56,12 @@
 #%end
 
 import sys
-import atexit
-import math
 
 import grass.script as gscript
-
-
-def cleanup():
-    for ext in ['', '.sort']:
-        gscript.try_remove(tmp + ext)
-
-
-def sortfile(infile, outfile):
-    inf = open(infile, 'r')
-    outf = open(outfile, 'w')
-
-    if gscript.find_program('sort', '--help'):
-        gscript.run_command('sort', flags='n', stdin=inf, stdout=outf)
-    else:
-        # FIXME: we need a large-file sorting function
-        gscript.warning(_("'sort' not found: sorting in memory"))
-        lines = inf.readlines()
-        for i in range(len(lines)):
-            lines[i] = float(lines[i].rstrip('\r\n'))
-        lines.sort()
-        for line in lines:
-            outf.write(str(line) + '\n')
-
-    inf.close()
-    outf.close()
+from grass.script import univar
 
 
 def main():
-    global tmp
-    tmp = gscript.tempfile()
-
     extend = flags['e']
     shellstyle = flags['g']
     table = options['table']
@@ -119,107 +90,68 @@ def main():
                           ) % (column, table))
         gscript.message(_("Reading column values..."))
 
-    sql = "SELECT %s FROM %s" % (column, table)
-    if where:
-        sql += " WHERE " + where
-
-    if not database:
-        database = None
-
-    if not driver:
-        driver = None
-
-    tmpf = open(tmp, 'w')
-    gscript.run_command('db.select', flags='c', table=table,
-                        database=database, driver=driver, sql=sql,
-                        stdout=tmpf)
-    tmpf.close()
-
-    # check if result is empty
-    tmpf = open(tmp)
-    if tmpf.read(1) == '':
-        gscript.fatal(_("Table <%s> contains no data.") % table)
-        tmpf.close()
+    driver, database = univar.get_connection(database or None,
+                                             driver or None)
+
+    # statistics are computed in one pass, by the database if possible,
+    # percentiles from values sorted by the database (no copy in memory)
+    # or kept in memory up to a limit
+    stats = univar.aggregate(table, column, where, database, driver)
+    percentiles = None
+    if stats is None:
+        stats = univar.UnivarStats()
+        if extend:
+            percentiles = univar.Percentiles()
+        for x in univar.read_values(table, column, where, database, driver):
+            stats.add(x)
+            if percentiles:
+                percentiles.add(x)
+
+    N = stats.n
+    if N <= 0:
+        gscript.fatal(_("No non-null values found"))
 
-    # calculate statistics
     if not shellstyle:
         gscript.verbose(_("Calculating statistics..."))
 
-    N = 0
-    sum = 0.0
-    sum2 = 0.0
-    sum3 = 0.0
-    minv = 1e300
-    maxv = -1e300
-
-    tmpf = open(tmp)
-    for line in tmpf:
-        if len(line.rstrip('\r\n')) == 0:
-            continue
-        x = float(line.rstrip('\r\n'))
-        N += 1
-        sum += x
-        sum2 += x * x
-        sum3 += abs(x)
-        maxv = max(maxv, x)
-        minv = min(minv, x)
-    tmpf.close()
-
-    if N <= 0:
-        gscript.fatal(_("No non-null values found"))
-
     if not shellstyle:
         sys.stdout.write("Number of values: %d\n" % N)
-        sys.stdout.write("Minimum: %.15g\n" % minv)
-        sys.stdout.write("Maximum: %.15g\n" % maxv)
-        sys.stdout.write("Range: %.15g\n" % (maxv - minv))
-        sys.stdout.write("Mean: %.15g\n" % (sum / N))
+        sys.stdout.write("Minimum: %.15g\n" % stats.minimum)
+        sys.stdout.write("Maximum: %.15g\n" % stats.maximum)
+        sys.stdout.write("Range: %.15g\n" % stats.range)
+        sys.stdout.write("Mean: %.15g\n" % stats.mean)
         sys.stdout.write(
-            "Arithmetic mean of absolute values: %.15g\n" %
-            (sum3 / N))
-        if not ((sum2 - sum * sum / N) / N) < 0:
-            sys.stdout.write("Variance: %.15g\n" % ((sum2 - sum * sum / N) / N))
+            "Arithmetic mean of absolute values: %.15g\n" % stats.mean_abs)
+        if stats.variance > 0:
+            sys.stdout.write("Variance: %.15g\n" % stats.variance)
+            sys.stdout.write("Standard deviation: %.15g\n" % stats.stddev)
             sys.stdout.write(
-                "Standard deviation: %.15g\n" %
-                (math.sqrt((sum2 - sum * sum / N) / N)))
-            sys.stdout.write(
-                "Coefficient of variation: %.15g\n" %
-                ((math.sqrt((sum2 - sum * sum / N) / N)) /
-                 (math.sqrt(sum * sum) / N)))
+                "Coefficient of variation: %.15g\n" % stats.coeff_var)
         else:
             sys.stdout.write("Variance: 0\n")
             sys.stdout.write("Standard deviation: 0\n")
             sys.stdout.write("Coefficient of variation: 0\n")
-        sys.stdout.write("Sum: %.15g\n" % sum)
+        sys.stdout.write("Sum: %.15g\n" % stats.sum)
     else:
         sys.stdout.write("n=%d\n" % N)
-        sys.stdout.write("min=%.15g\n" % minv)
-        sys.stdout.write("max=%.15g\n" % maxv)
-        sys.stdout.write("range=%.15g\n" % (maxv - minv))
-        sys.stdout.write("mean=%.15g\n" % (sum / N))
-        sys.stdout.write("mean_abs=%.15g\n" % (sum3 / N))
-        if not ((sum2 - sum * sum / N) / N) < 0:
-            sys.stdout.write("variance=%.15g\n" % ((sum2 - sum * sum / N) / N))
-            sys.stdout.write(
-                "stddev=%.15g\n" %
-                (math.sqrt(
-                    (sum2 - sum * sum / N) / N)))
-            sys.stdout.write(
-                "coeff_var=%.15g\n" %
-                ((math.sqrt((sum2 - sum * sum / N) / N)) /
-                 (math.sqrt(sum * sum) / N)))
+        sys.stdout.write("min=%.15g\n" % stats.minimum)
+        sys.stdout.write("max=%.15g\n" % stats.maximum)
+        sys.stdout.write("range=%.15g\n" % stats.range)
+        sys.stdout.write("mean=%.15g\n" % stats.mean)
+        sys.stdout.write("mean_abs=%.15g\n" % stats.mean_abs)
+        if stats.variance > 0:
+            sys.stdout.write("variance=%.15g\n" % stats.variance)
+            sys.stdout.write("stddev=%.15g\n" % stats.stddev)
+            sys.stdout.write("coeff_var=%.15g\n" % stats.coeff_var)
         else:
             sys.stdout.write("variance=0\n")
             sys.stdout.write("stddev=0\n")
             sys.stdout.write("coeff_var=0\n")
-        sys.stdout.write("sum=%.15g\n" % sum)
+        sys.stdout.write("sum=%.15g\n" % stats.sum)
 
     if not extend:
         return
 
-    # preparations:
-    sortfile(tmp, tmp + ".sort")
-
     odd = N % 2
     eostr = ['even', 'odd'][odd]
 
@@ -242,21 +174,22 @@ def main():
             ppos[i] = 1
         pval[i] = 0
 
-    inf = open(tmp + ".sort")
-    l = 1
-    for line in inf:
-        if l == q25pos:
-            q25 = float(line.rstrip('\r\n'))
-        if l == q50apos:
-            q50a = float(line.rstrip('\r\n'))
-        if l == q50bpos:
-            q50b = float(line.rstrip('\r\n'))
-        if l == q75pos:
-            q75 = float(line.rstrip('\r\n'))
-        for i in range(len(ppos)):
-            if l == ppos[i]:
-                pval[i] = float(line.rstrip('\r\n'))
-        l += 1
+    positions = [q25pos, q50apos, q50bpos, q75pos] + list(ppos.values())
+    if percentiles is None:
+        values = univar.pick_positions(
+            univar.read_values(table, column, where, database, driver,
+                               order=True), positions)
+    else:
+        if not percentiles.exact:
+            gscript.warning(_("Too many values, percentiles are approximate"))
+        values = percentiles.values_at(positions)
+
+    q25 = values[q25pos]
+    q50a = values[q50apos]
+    q50b = values[q50bpos]
+    q75 = values[q75pos]
+    for i in range(len(ppos)):
+        pval[i] = values[ppos[i]]
 
     q50 = (q50a + q50b) / 2
 
@@ -305,5 +238,4 @@ def main():
 
 if __name__ == "__main__":
     options, flags = gscript.parser()
-    atexit.register(cleanup)
     main()
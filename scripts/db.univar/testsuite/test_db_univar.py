@@ -9,6 +9,7 @@ from grass.gunittest.main import test
 from grass.gunittest.gmodules import SimpleModule
 
 from grass.script.core import run_command
+from grass.script.utils import parse_key_val
 
 
 class TestDbUnivar(TestCase):
@@ -44,5 +45,17 @@ class TestDbUnivar(TestCase):
                               column=self.columnName)
         self.assertModule(module)
 
+    def test_extended(self):
+        """run db.univar with extended statistics"""
+        module = SimpleModule('db.univar', table=self.mapName,
+                              column=self.columnName, flags='eg',
+                              percentile=[50, 100])
+        self.assertModule(module)
+        stats = parse_key_val(module.outputs.stdout, val_type=float)
+        self.assertLessEqual(stats['percentile_50'], stats['median'])
+        self.assertEqual(stats['max'], stats['percentile_100'])
+        self.assertLessEqual(stats['first_quartile'], stats['median'])
+        self.assertLessEqual(stats['median'], stats['third_quartile'])
+
 if __name__ == '__main__':
     test()
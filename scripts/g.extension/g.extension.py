@@ -155,6 +155,7 @@ import grass.script as gscript
 from grass.script.utils import try_rmdir
 from grass.script import core as grass
 from grass.script import task as gtask
+from grass.script.module_index import update_addon_index
 
 # temp dir
 REMOVE_TMPDIR = True
@@ -578,6 +579,15 @@ def cleanup():
         sys.stderr.write('%s\n' % os.path.join(TMPDIR, options['extension']))
 
 
+def update_module_index():
+    """Rebuild search index of installed extensions (see g.search.modules)
+    """
+    try:
+        update_addon_index(options['prefix'])
+    except (IOError, OSError) as error:
+        grass.warning(_("Unable to update index of modules: %s") % error)
+
+
 def write_xml_modules(name, tree=None):
     """Write element tree as a modules matadata file
 
@@ -1947,6 +1957,7 @@ def main():
         install_extension(source=source, url=url, xmlurl=xmlurl)
     else:  # remove
         remove_extension(force=flags['f'])
+    update_module_index()
 
     return 0
 
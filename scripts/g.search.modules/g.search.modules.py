@@ -47,6 +47,11 @@
 #% guisection: Output
 #%end
 #%flag
+#% key: r
+#% description: Sort modules by relevance instead of by name
+#% guisection: Output
+#%end
+#%flag
 #% key: c
 #% description: Use colorized (more readable) output to terminal
 #% guisection: Output
@@ -63,17 +68,10 @@
 #%end
 
 from __future__ import print_function
-import os
 import sys
 
-from grass.script.utils import diff_files, try_rmdir
 from grass.script import core as grass
-from grass.exceptions import CalledModuleError
-
-try:
-    import xml.etree.ElementTree as etree
-except ImportError:
-    import elementtree.ElementTree as etree  # Python <= 2.4
+from grass.script.module_index import get_index
 
 COLORIZE = False
 
@@ -97,7 +95,8 @@ def main():
     else:
         keywords = options['keyword'].lower().split(',')
 
-    modules = _search_module(keywords, AND, NOT, manpages, exact_keywords)
+    modules = _search_module(keywords, AND, NOT, manpages, exact_keywords,
+                             flags['r'])
 
     print_results(modules, out_format)
 
@@ -182,135 +181,66 @@ def colorize(text, attrs=None, pattern=None):
 
 
 def _search_module(keywords, logical_and=False, invert=False, manpages=False,
-                   exact_keywords=False):
+                   exact_keywords=False, by_relevance=False):
     """Search modules by given keywords
 
+    Modules are searched in the index of modules (see
+    :mod:`grass.script.module_index`).
+
     :param list.<str> keywords: list of keywords
     :param boolean logical_and: use AND (default OR)
     :param boolean manpages: search in manpages too
+    :param boolean by_relevance: sort modules by relevance (default by
+                                 name)
     :return dict: modules
     """
 
-    WXGUIDIR = os.path.join(os.getenv("GISBASE"), "gui", "wxpython")
-    filename = os.path.join(WXGUIDIR, 'xml', 'module_items.xml')
-    menudata_file = open(filename, 'r')
-
-    menudata = etree.parse(menudata_file)
-    menudata_file.close()
-
-    items = menudata.findall('module-item')
-
-    # add installed addons to modules list
-    if os.getenv("GRASS_ADDON_BASE"):
-        filename_addons = os.path.join(os.getenv("GRASS_ADDON_BASE"), 'modules.xml')
-        if os.path.isfile(filename_addons):
-            addon_menudata_file = open(filename_addons, 'r')
-            addon_menudata = etree.parse(addon_menudata_file)
-            addon_menudata_file.close()
-            addon_items = addon_menudata.findall('task')
-            items.extend(addon_items)
-
-    # add system-wide installed addons to modules list
-    filename_addons_s = os.path.join(os.getenv("GISBASE"), 'modules.xml')
-    if os.path.isfile(filename_addons_s):
-        addon_menudata_file_s = open(filename_addons_s, 'r')
-        addon_menudata_s = etree.parse(addon_menudata_file_s)
-        addon_menudata_file_s.close()
-        addon_items_s = addon_menudata_s.findall('task')
-        items.extend(addon_items_s)
+    index = get_index()
+    fields = ('name', 'description', 'keywords')
+    if manpages:
+        fields += ('manual', )
 
-    found_modules = []
-    for item in items:
-        name = item.attrib['name']
-        description = item.find('description').text
-        module_keywords = item.find('keywords').text
-
-        found = [False]
-        if logical_and:
-            found = [False] * len(keywords)
-
-        for idx in range(len(keywords)):
-            keyword = keywords[idx]
-            keyword_found = False
-
-            if exact_keywords:
-                keyword_found = _exact_search(keyword, module_keywords)
-            else:
-                keyword_found = _basic_search(keyword, name, description,
-                                              module_keywords)
-
-            # meta-modules (i.sentinel, r.modis, ...) do not have descriptions
-            # and keywords, but they have a manpage
-            # TODO change the handling of meta-modules
-            if (description and module_keywords) and not keyword_found and manpages:
-                keyword_found = _manpage_search(keyword, name)
-
-            if keyword_found:
-                if logical_and:
-                    found[idx] = True
-                else:
-                    found = [True]
-
-                description = colorize(description,
-                                       attrs=['underline'],
-                                       pattern=keyword)
-                module_keywords = colorize(module_keywords,
-                                           attrs=['underline'],
-                                           pattern=keyword)
-
-        add = False not in found
-        if invert:
-            add = not add
-        if add:
-            found_modules.append({
-                'name': name,
-                'attributes': {
-                    'keywords': module_keywords,
-                    'description': description
-                }
-            })
-
-    return sorted(found_modules, key=lambda k: k['name'])
-
-
-def _basic_search(pattern, name, description, module_keywords):
-    """Search for a string in all the provided strings.
-
-    This lowercases the strings before searching in them, so the pattern
-    string should be lowercased too.
-    """
-    if (name and description and module_keywords):
-        if name.lower().find(pattern) > -1 or\
-           description.lower().find(pattern) > -1 or\
-           module_keywords.lower().find(pattern) > -1:
-           return True
+    scores = {}
+    found = None
+    for keyword in keywords:
+        if exact_keywords:
+            keyword_scores = dict.fromkeys(index.search_keyword(keyword), 1)
         else:
-            return False
-    else:
-        return False
-
-
-def _exact_search(keyword, module_keywords):
-    """Compare exact keyword with module keywords
-
-    :param keyword: exact keyword to find in the list (not lowercased)
-    :param module_keywords: comma separated list of keywords
-    """
-    module_keywords = module_keywords.split(',')
-    for current in module_keywords:
-        if keyword == current:
-            return True
-    return False
-
+            keyword_scores = index.search(keyword, fields)
+        for name, score in keyword_scores.items():
+            scores[name] = scores.get(name, 0) + score
+        if found is None:
+            found = set(keyword_scores)
+        elif logical_and:
+            found &= set(keyword_scores)
+        else:
+            found |= set(keyword_scores)
+    found = found or set()
+    if invert:
+        found = set(index.modules) - found
 
-def _manpage_search(pattern, name):
-    try:
-        manpage = grass.read_command('g.manual', flags='m', entry=name)
-    except CalledModuleError:
-        # in case man page is missing
-        return False
+    found_modules = []
+    for name in found:
+        description = index.modules[name]['description']
+        module_keywords = index.modules[name]['keywords']
+        for keyword in keywords:
+            description = colorize(description, attrs=['underline'],
+                                   pattern=keyword)
+            module_keywords = colorize(module_keywords, attrs=['underline'],
+                                       pattern=keyword)
+        found_modules.append({
+            'name': name,
+            'attributes': {
+                'keywords': module_keywords,
+                'description': description
+            }
+        })
+
+    found_modules.sort(key=lambda k: k['name'])
+    if by_relevance:
+        found_modules.sort(key=lambda k: -scores.get(k['name'], 0))
+    return found_modules
 
-    return manpage.lower().find(pattern) > -1
 
 if __name__ == "__main__":
     options, flags = grass.parser()
@@ -39,106 +39,75 @@
 #% key: s
 #% description: Process bands serially (default: run in parallel)
 #% End
+#% option
+#% key: nprocs
+#% type: integer
+#% description: Number of processes reading bands in parallel (default: number of CPUs)
+#% required: no
+#% end
 
 import sys
 import os
-from grass.script.utils import parse_key_val
-from grass.script import core as grass
+from multiprocessing import cpu_count
 
+from grass.script import core as grass
 
-def oifcalc(sdev, corr, k1, k2, k3):
-    grass.debug(_("Calculating OIF for combination: %s, %s, %s" % (k1, k2,
-                                                                   k3)), 1)
-    # calculate SUM of Stddeviations:
-    ssdev = [sdev[k1], sdev[k2], sdev[k3]]
-    numer = sum(ssdev)
-
-    # calculate SUM of absolute(Correlation values):
-    scorr = [corr[k1, k2], corr[k1, k3], corr[k2, k3]]
-    denom = sum(map(abs, scorr))
 
-    # Calculate OIF index:
-    #     Divide (SUM of Stddeviations) and (SUM of Correlation)
-    return numer / denom
+def oif_table(stddev, correlation):
+    """Calculate OIF of all combinations of three bands
 
+    OIF is the sum of standard deviations divided by the sum of absolute
+    values of correlation coefficients of the three bands.
 
-def perms(bands):
-    n = len(bands)
-    for i in range(0, n - 2):
-        for j in range(i + 1, n - 1):
-            for k in range(j + 1, n):
-                yield (bands[i], bands[j], bands[k])
+    :param stddev: array of standard deviations of bands
+    :param correlation: correlation matrix of bands
+    :return: indices of bands in combinations (array of shape (n, 3)) and
+             their OIF
+    """
+    import numpy as np
+    count = len(stddev)
+    index = np.arange(count)
+    # all i < j < k in the order of nested loops
+    i, j, k = np.nonzero((index[:, None, None] < index[None, :, None]) &
+                         (index[None, :, None] < index[None, None, :]))
+    correlation = np.abs(correlation)
+    numer = stddev[i] + stddev[j] + stddev[k]
+    denom = correlation[i, j] + correlation[i, k] + correlation[j, k]
+    return np.column_stack((i, j, k)), numer / denom
 
 
 def main():
+    import numpy as np
+    from grass.pygrass.raster.covariance import covariance_statistics
+
     shell = flags['g']
-    serial = flags['s']
     bands = options['input'].split(',')
 
     if len(bands) < 4:
         grass.fatal(_("At least four input maps required"))
 
-    output = options['output']
-    # calculate the Stddev for TM bands
-    grass.message(_("Calculating standard deviations for all bands..."))
-    stddev = {}
-
-    if serial:
-        for band in bands:
-            grass.verbose("band %d" % band)
-            s = grass.read_command('r.univar', flags='g', map=band)
-            kv = parse_key_val(s)
-            stddev[band] = float(kv['stddev'])
+    if flags['s']:
+        nprocs = 1
+    elif options['nprocs']:
+        nprocs = int(options['nprocs'])
+    elif "WORKERS" in os.environ:
+        nprocs = int(os.environ["WORKERS"])
     else:
-        # run all bands in parallel
-        if "WORKERS" in os.environ:
-            workers = int(os.environ["WORKERS"])
-        else:
-            workers = len(bands)
-        proc = {}
-        pout = {}
-
-        # spawn jobs in the background
-        n = 0
-        for band in bands:
-            proc[band] = grass.pipe_command('r.univar', flags='g', map=band)
-            if n % workers is 0:
-                # wait for the ones launched so far to finish
-                for bandp in bands[:n]:
-                    if not proc[bandp].stdout.closed:
-                        pout[bandp] = proc[bandp].communicate()[0]
-                    proc[bandp].wait()
-            n = n + 1
-
-        # wait for jobs to finish, collect the output
-        for band in bands:
-            if not proc[band].stdout.closed:
-                pout[band] = proc[band].communicate()[0]
-            proc[band].wait()
-
-    # parse the results
-        for band in bands:
-            kv = parse_key_val(pout[band])
-            stddev[band] = float(kv['stddev'])
-
-    grass.message(_("Calculating Correlation Matrix..."))
-    correlation = {}
-    s = grass.read_command('r.covar', flags='r', map=[band for band in bands],
-                           quiet=True)
-
-    # We need to skip the first line, since r.covar prints the number of values
-    lines = s.splitlines()
-    for i, row in zip(bands, lines[1:]):
-        for j, cell in zip(bands, row.split(' ')):
-            correlation[i, j] = float(cell)
+        nprocs = cpu_count()
+
+    output = options['output']
+    # all bands are read at once for both standard deviations and
+    # correlation matrix
+    grass.message(_("Calculating standard deviations and correlation "
+                    "matrix for all bands..."))
+    stats = covariance_statistics(bands, nprocs=max(nprocs, 1))
 
     # Calculate all combinations
     grass.message(_("Calculating OIF for all band combinations..."))
-
-    oif = []
-    for p in perms(bands):
-        oif.append((oifcalc(stddev, correlation, *p), p))
-    oif.sort(reverse=True)
+    combinations, oif = oif_table(stats['stddev'], stats['correlation'])
+    # sort by OIF and then by names of bands (descending)
+    ranks = np.argsort(np.argsort(bands))[combinations]
+    order = np.lexsort((-ranks[:, 2], -ranks[:, 1], -ranks[:, 0], -oif))
 
     grass.verbose(_("The Optimum Index Factor analysis result "
                     "(best combination shown first):"))
@@ -149,12 +118,13 @@ def main():
         fmt = "%s, %s, %s:  %.4f\n"
 
     if not output or output == '-':
-        for v, p in oif:
-            sys.stdout.write(fmt % (p + (v,)))
+        outf = sys.stdout
     else:
         outf = open(output, 'w')
-        for v, p in oif:
-            outf.write(fmt % (p + (v,)))
+    for index in order:
+        i, j, k = combinations[index]
+        outf.write(fmt % (bands[i], bands[j], bands[k], oif[index]))
+    if outf is not sys.stdout:
         outf.close()
 
 if __name__ == "__main__":
@@ -65,6 +65,22 @@ COPYRIGHT: (c) 2006-2019 Hamish Bowman, and the GRASS Development Team
 #% required : no
 #% guisection: Projections
 #%end
+#%option
+#% key: method
+#% type: string
+#% description: Method used to transform coordinates
+#% options: auto,pyproj,gproj,cs2cs
+#% descriptions: auto;in-process transformation if available, cs2cs otherwise;pyproj;in-process transformation using pyproj;gproj;in-process transformation using GRASS projection library;cs2cs;external cs2cs program
+#% answer: auto
+#% guisection: Projections
+#%end
+#%option
+#% key: nprocs
+#% type: integer
+#% description: Number of processes transforming coordinates in-process
+#% required: no
+#% answer: 1
+#%end
 #%flag
 #% key: i
 #% description: Use LL WGS84 as input and current location as output projection
@@ -100,10 +116,30 @@ COPYRIGHT: (c) 2006-2019 Hamish Bowman, and the GRASS Development Team
 
 import sys
 import os
+import math
+import ctypes
 import threading
+from itertools import islice
+from multiprocessing import Pool
+
 from grass.script.utils import separator, parse_key_val, encode, decode
 from grass.script import core as gcore
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyproj
+except ImportError:
+    pyproj = None
+
+# number of lines transformed at once by in-process methods
+CHUNK_LINES = 50000
+# the transformation and output settings of the (worker) process
+_worker = {}
+
 
 class TrThread(threading.Thread):
 
@@ -126,6 +162,265 @@ class TrThread(threading.Thread):
         self.outf.close()
 
 
+def is_latlong(proj):
+    """Return True if PROJ.4 parameters define geographic coordinates"""
+    for param in proj.split():
+        if param.split('=')[0] == '+proj' and param.split('=')[-1] in (
+                'longlat', 'latlong', 'lonlat', 'latlon'):
+            return True
+    return False
+
+
+def parse_coordinate(text):
+    """Parse a coordinate as cs2cs does, also in DMS
+
+    >>> parse_coordinate('12.5')
+    12.5
+    >>> parse_coordinate("12d30'36S")
+    -12.51
+    >>> parse_coordinate('12:30:36W')
+    -12.51
+    """
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    sign = 1
+    if text and text[-1] in 'NSEWnsew':
+        if text[-1] in 'SWsw':
+            sign = -1
+        text = text[:-1]
+    if text.startswith('-'):
+        sign = -sign
+        text = text[1:]
+    for mark in ('d', 'D', "'", '"'):
+        text = text.replace(mark, ':')
+    value = 0.0
+    for power, part in enumerate(text.rstrip(':').split(':')):
+        value += float(part) / 60 ** power
+    return sign * value
+
+
+def format_dms(value, positive, negative, decimals=5):
+    """Format degrees as cs2cs -w does
+
+    >>> print(format_dms(-12.51, 'N', 'S'))
+    12d30'36"S
+    >>> format_dms(170.5, 'E', 'W')
+    "170d30'E"
+    >>> print(format_dms(1.000001, 'E', 'W'))
+    1d0'0.0036"E
+    """
+    resolution = 10 ** decimals
+    if value < 0:
+        value = -value
+        sign = negative
+    else:
+        sign = positive
+    value = math.floor(value * 3600 * resolution + 0.5)
+    seconds = math.fmod(value / resolution, 60.)
+    value = math.floor(value / (resolution * 60.))
+    minutes = int(math.fmod(value, 60.))
+    degrees = int(math.floor(value / 60.))
+    if seconds != 0:
+        seconds = ('%.*f' % (decimals, seconds)).rstrip('0').rstrip('.')
+        return "%dd%d'%s\"%s" % (degrees, minutes, seconds, sign)
+    if minutes:
+        return "%dd%d'%s" % (degrees, minutes, sign)
+    return "%dd%s" % (degrees, sign)
+
+
+def pyproj_transformer(in_proj, out_proj):
+    """Return function transforming coordinate arrays using pyproj"""
+    transformer = pyproj.Transformer.from_crs(
+        pyproj.CRS.from_user_input(in_proj),
+        pyproj.CRS.from_user_input(out_proj), always_xy=True)
+
+    def transform(x, y, z):
+        return transformer.transform(x, y, z, errcheck=False)
+    return transform
+
+
+def gproj_transformer(in_proj, out_proj):
+    """Return function transforming coordinate arrays using the GRASS
+    projection library (heights are not transformed)"""
+    import grass.lib.gis as libgis
+    import grass.lib.proj as libproj
+    libgis.G_gisinit('m.proj')
+    info_in = libproj.pj_info()
+    info_out = libproj.pj_info()
+    info_trans = libproj.pj_info()
+    if libproj.pj_get_string(ctypes.byref(info_in), encode(in_proj)) < 0:
+        raise ValueError(_("Invalid PROJ.4 input specification"))
+    if libproj.pj_get_string(ctypes.byref(info_out), encode(out_proj)) < 0:
+        raise ValueError(_("Invalid PROJ.4 output specification"))
+    if libproj.GPJ_init_transform(ctypes.byref(info_in),
+                                  ctypes.byref(info_out),
+                                  ctypes.byref(info_trans)) < 0:
+        raise ValueError(_("Unable to initialize coordinate transformation"))
+    c_double_p = ctypes.POINTER(ctypes.c_double)
+
+    def transform(x, y, z):
+        tx, ty, tz = x.copy(), y.copy(), z.copy()
+        if libproj.GPJ_transform_array(
+                ctypes.byref(info_in), ctypes.byref(info_out),
+                ctypes.byref(info_trans), libproj.PJ_FWD,
+                tx.ctypes.data_as(c_double_p), ty.ctypes.data_as(c_double_p),
+                tz.ctypes.data_as(c_double_p), len(tx)) >= 0:
+            return tx, ty, tz
+        # the transformation of the array stops at the first failed point
+        for i in range(len(x)):
+            px, py, pz = (ctypes.c_double(x[i]), ctypes.c_double(y[i]),
+                          ctypes.c_double(z[i]))
+            if libproj.GPJ_transform(
+                    ctypes.byref(info_in), ctypes.byref(info_out),
+                    ctypes.byref(info_trans), libproj.PJ_FWD,
+                    ctypes.byref(px), ctypes.byref(py),
+                    ctypes.byref(pz)) < 0:
+                tx[i] = ty[i] = np.nan
+            else:
+                tx[i], ty[i] = px.value, py.value
+        return tx, ty, z
+    return transform
+
+
+TRANSFORMERS = {'pyproj': pyproj_transformer, 'gproj': gproj_transformer}
+
+
+def get_method(method, in_proj, out_proj):
+    """Return method which can be used, the in-process methods are
+    checked by creating the transformation"""
+    if method == 'cs2cs':
+        return method
+    if np is None:
+        if method != 'auto':
+            gcore.fatal(_("NumPy is required by method <%s>") % method)
+        return 'cs2cs'
+    methods = [method] if method != 'auto' else ['pyproj', 'gproj']
+    for name in methods:
+        if name == 'pyproj' and pyproj is None:
+            if method != 'auto':
+                gcore.fatal(_("pyproj is required by method <pyproj>"))
+            continue
+        try:
+            TRANSFORMERS[name](in_proj, out_proj)
+        except (ImportError, OSError, AttributeError, ValueError,
+                RuntimeError) as error:
+            if method != 'auto':
+                gcore.fatal(_("Unable to use method <%s>: %s") %
+                            (name, error))
+            gcore.verbose(_("Method <%s> not available: %s") % (name, error))
+            continue
+        return name
+    return 'cs2cs'
+
+
+def init_worker(method, in_proj, out_proj, settings):
+    """Initialize transformation in a (worker) process"""
+    _worker.clear()
+    _worker.update(settings)
+    _worker['transform'] = TRANSFORMERS[method](in_proj, out_proj)
+
+
+def transform_lines(lines):
+    """Transform lines of input coordinates and return output text"""
+    ifs = _worker['ifs']
+    ofs = _worker['ofs']
+    output = []
+    rows = []
+    for line in lines:
+        if line.startswith('#'):
+            # passed through as by cs2cs
+            output.append((len(rows), line if line.endswith('\n')
+                           else line + '\n'))
+            continue
+        row = line.replace(ifs, ' ').split()
+        if not row:
+            continue
+        if len(row) < 2:
+            raise ValueError(line.strip())
+        rows.append(row)
+    x = np.empty(len(rows))
+    y = np.empty(len(rows))
+    z = np.zeros(len(rows))
+    rests = []
+    for i, row in enumerate(rows):
+        try:
+            x[i] = parse_coordinate(row[0])
+            y[i] = parse_coordinate(row[1])
+        except ValueError:
+            raise ValueError(' '.join(row))
+        rest = row[2:]
+        if rest:
+            try:
+                z[i] = float(rest[0])
+                rest = rest[1:]
+            except ValueError:
+                pass
+        rests.append(' ' + ' '.join(rest) if rest else '')
+    x, y, z = _worker['transform'](x, y, z)
+    failed = ~(np.isfinite(x) & np.isfinite(y))
+    if _worker['decimal']:
+        xs = ['%.8f' % value for value in x]
+        ys = ['%.8f' % value for value in y]
+        zs = ['%.8f' % value for value in z]
+    else:
+        if _worker['latlong']:
+            xs = [format_dms(value, 'E', 'W') if np.isfinite(value)
+                  else '*' for value in x]
+            ys = [format_dms(value, 'N', 'S') if np.isfinite(value)
+                  else '*' for value in y]
+        else:
+            xs = ['%.2f' % value for value in x]
+            ys = ['%.2f' % value for value in y]
+        zs = ['%.3f' % value for value in z]
+    for i in np.flatnonzero(failed):
+        xs[i] = ys[i] = '*'
+    if _worker['copy_input']:
+        lines = ['%s%s%s%s%s%s%s%s%s%s\n' % (
+            row[0], ofs, row[1], ofs, xs[i], ofs, ys[i], ofs, zs[i], rests[i])
+            for i, row in enumerate(rows)]
+    else:
+        lines = ['%s%s%s%s%s%s\n' % (xs[i], ofs, ys[i], ofs, zs[i], rests[i])
+                 for i in range(len(rows))]
+    # comment lines at their positions
+    for position, line in reversed(output):
+        lines.insert(position, line)
+    return ''.join(lines)
+
+
+def read_chunks(inf):
+    """Yield lists of lines of the input"""
+    while True:
+        lines = list(islice(inf, CHUNK_LINES))
+        if not lines:
+            return
+        yield lines
+
+
+def transform_in_process(method, in_proj, out_proj, inf, outf, settings,
+                         nprocs):
+    """Transform coordinates in chunks of lines, in parallel with more
+    processes"""
+    chunks = read_chunks(inf)
+    try:
+        if nprocs > 1:
+            pool = Pool(nprocs, initializer=init_worker,
+                        initargs=(method, in_proj, out_proj, settings))
+            try:
+                for text in pool.imap(transform_lines, chunks):
+                    outf.write(text)
+            finally:
+                pool.terminate()
+                pool.join()
+        else:
+            init_worker(method, in_proj, out_proj, settings)
+            for text in (transform_lines(chunk) for chunk in chunks):
+                outf.write(text)
+    except ValueError as error:
+        gcore.fatal(_("Unable to parse input coordinates: %s") % error)
+
+
 def main():
     coords = options['coordinates']
     input = options['input']
@@ -139,11 +434,8 @@ def main():
     copy_input = flags['e']
     include_header = flags['c']
 
-    # check for cs2cs
-    if not gcore.find_program('cs2cs'):
-        gcore.fatal(_(
-            "cs2cs program not found, install PROJ.4 first: \
-            http://proj.maptools.org"))
+    method = options['method']
+    nprocs = int(options['nprocs'])
 
     # parse field separator
     # FIXME: input_x,y needs to split on multiple whitespace between them
@@ -236,6 +528,31 @@ def main():
         outf = open(outfile, 'w')
         gcore.debug("output file=[%s]" % outfile)
 
+    method = get_method(method, in_proj, out_proj)
+    gcore.verbose(_("Using method <%s>") % method)
+
+    if method != 'cs2cs':
+        if not copy_input:
+            if include_header:
+                outf.write("x%sy%sz\n" % (ofs, ofs))
+        else:
+            if include_header:
+                outf.write("input_x%sinput_y%sx%sy%sz\n" %
+                           (ofs, ofs, ofs, ofs))
+        settings = dict(ifs=ifs, ofs=ofs, decimal=decimal,
+                        copy_input=copy_input, latlong=is_latlong(out_proj))
+        transform_in_process(method, in_proj, out_proj, inf, outf, settings,
+                             nprocs)
+        if outfile:
+            outf.close()
+        return
+
+    # check for cs2cs
+    if not gcore.find_program('cs2cs'):
+        gcore.fatal(_(
+            "cs2cs program not found, install PROJ.4 first: \
+            http://proj.maptools.org"))
+
     # set up output style
     if not decimal:
         outfmt = ["-w5"]
@@ -98,6 +98,22 @@
 #% guisection: Spline options
 #%end
 #%option
+#% key: nprocs
+#% type: integer
+#% required: no
+#% multiple: no
+#% description: Number of processes filling holes in parallel
+#% answer: 1
+#% guisection: RST options
+#%end
+#%option G_OPT_F_OUTPUT
+#% key: log
+#% required: no
+#% label: Name for output file with processing time of each hole
+#% description: Used with RST interpolation in parallel
+#% guisection: RST options
+#%end
+#%option
 #% key: memory
 #% type: integer
 #% required: no
@@ -112,6 +128,8 @@ import sys
 import os
 import atexit
 import subprocess
+import time
+from multiprocessing import Pool
 
 import grass.script as grass
 from grass.exceptions import CalledModuleError
@@ -121,6 +139,9 @@ tmp_vmaps = list()
 usermask = None
 mapset = None
 
+# number of maps patched by one r.patch run
+PATCH_MAPS = 100
+
 # what to do in case of user break:
 
 
@@ -135,6 +156,394 @@ def cleanup():
             grass.run_command('g.rename', quiet=True, raster=(usermask, 'MASK'), overwrite=True)
 
 
+def hole_extents(holes):
+    """Return list of holes (categories of areas) with their extents"""
+    output = grass.read_command('v.to.db', flags='p', map=holes,
+                                option='bbox', separator='pipe', quiet=True)
+    extents = []
+    for line in output.splitlines():
+        cat, north, south, east, west = line.split('|')
+        extents.append((cat, float(north), float(south), float(east),
+                        float(west)))
+    # holes close to each other are patched together
+    extents.sort(key=lambda extent: (-extent[1], extent[4]))
+    return extents
+
+
+def fill_hole(task):
+    """Interpolate one hole from its edge in its own region
+
+    This runs in a worker process, the region of the hole is set only
+    in the environment of modules (GRASS_REGION), so holes can be filled
+    concurrently.
+
+    :return: tuple of category of the hole, name of map with filled hole
+             (None if the hole was not filled), number of points,
+             processing time and whether a module failed
+    """
+    (cat, north, south, east, west), settings = task
+    start = time.time()
+    holes = settings['holes']
+    holename = settings['prefix'] + 'hole_' + cat
+    edge = settings['edge']
+    quiet = True
+    rmaps = [holename, holename + '_grown', holename + '_edges']
+    try:
+        # region of the hole with a buffer of two edges around
+        env = os.environ.copy()
+        env['GRASS_REGION'] = grass.region_env(
+            n=north + edge * 2 * settings['nsres'],
+            s=south - edge * 2 * settings['nsres'],
+            e=east + edge * 2 * settings['ewres'],
+            w=west - edge * 2 * settings['ewres'],
+            align=settings['input'])
+        grass.mapcalc("$out = if($inp == $catn, $inp, null())",
+                      out=holename, inp=holes, catn=cat, quiet=quiet,
+                      env=env)
+        grass.run_command('r.grow', input=holename, radius=edge + 0.01,
+                          old=-1, out=holename + '_grown', quiet=quiet,
+                          env=env)
+        grass.mapcalc("$out = if($inp == -1, null(), \"$dem\")",
+                      out=holename + '_edges', inp=holename + '_grown',
+                      dem=settings['input'], quiet=quiet, env=env)
+        grass.run_command('r.to.vect', input=holename + '_edges',
+                          output=holename, type='point', flags='z',
+                          quiet=quiet, env=env)
+        points = grass.vector_info_topo(map=holename)['points']
+        if points < 2:
+            grass.run_command('g.remove', quiet=quiet, flags='fb',
+                              type='vector', name=holename, env=env)
+            grass.run_command('g.remove', quiet=quiet, flags='fb',
+                              type='raster', name=rmaps, env=env)
+            return cat, None, points, time.time() - start, False
+        # Avoid v.surf.rst warnings
+        if points < settings['segmax']:
+            npmin = points
+            segmax = points * 2
+        else:
+            npmin = settings['npmin']
+            segmax = settings['segmax']
+        grass.run_command('v.surf.rst', quiet=quiet, input=holename,
+                          elev=holename + '_dem',
+                          tension=settings['tension'],
+                          smooth=settings['smooth'], segmax=segmax,
+                          npmin=npmin, env=env)
+        # v.surf.rst sometimes fails with exit code 0
+        # related bug #1813
+        if not grass.find_file(holename + '_dem')['file']:
+            # maps left for debugging
+            return cat, None, points, time.time() - start, False
+        grass.mapcalc("$out = if(isnull($inp), null(), $dem)",
+                      out=holename + '_fill', inp=holename,
+                      dem=holename + '_dem', quiet=quiet, env=env)
+        grass.run_command('g.remove', quiet=quiet, flags='fb',
+                          type='vector', name=holename, env=env)
+        grass.run_command('g.remove', quiet=quiet, flags='fb',
+                          type='raster', name=rmaps + [holename + '_dem'],
+                          env=env)
+    except CalledModuleError:
+        return cat, None, 0, time.time() - start, True
+    return cat, holename + '_fill', points, time.time() - start, False
+
+
+def remove_hole_maps(prefix, cat):
+    """Mark all temporary maps of a hole for removal by cleanup"""
+    holename = prefix + 'hole_' + cat
+    tmp_rmaps.extend(holename + suffix
+                     for suffix in ('', '_grown', '_edges', '_dem', '_fill'))
+    tmp_vmaps.append(holename)
+
+
+def patch_maps(maps, output, align, prefix):
+    """Patch (many) maps in batches, region is set to extent of the maps
+
+    Patched maps are removed.
+    """
+    level = 0
+    while len(maps) > 1:
+        patched = []
+        for start in range(0, len(maps), PATCH_MAPS):
+            batch = maps[start:start + PATCH_MAPS]
+            if len(maps) <= PATCH_MAPS:
+                name = output
+            else:
+                name = '%spatch_%d_%d' % (prefix, level, start // PATCH_MAPS)
+            tmp_rmaps.append(name)
+            env = os.environ.copy()
+            env['GRASS_REGION'] = grass.region_env(raster=batch, align=align)
+            grass.run_command('r.patch', input=batch, output=name,
+                              quiet=True, env=env)
+            grass.run_command('g.remove', quiet=True, flags='fb',
+                              type='raster', name=batch)
+            for name_ in batch:
+                tmp_rmaps.remove(name_)
+            patched.append(name)
+        maps = patched
+        level += 1
+    if maps and maps[0] != output:
+        grass.run_command('g.rename', raster=(maps[0], output), quiet=True)
+        tmp_rmaps.remove(maps[0])
+        tmp_rmaps.append(output)
+
+
+def fill_holes_parallel(input, holes, filling, prefix, nprocs, log,
+                        settings):
+    """Fill holes by RST interpolation in parallel and patch them to
+    the filling map
+
+    :return: list of names of holes which were not filled
+    """
+    settings = dict(settings, input=input, holes=holes, prefix=prefix)
+    extents = hole_extents(holes)
+    tasks = [(extent, settings) for extent in extents]
+    failed_list = []
+    filled = []
+    # holes which are being filled
+    pending = set(extent[0] for extent in extents)
+    logfile = open(log, 'w') if log else None
+    if logfile:
+        logfile.write("cat,points,seconds,filled\n")
+    pool = Pool(nprocs)
+    try:
+        for i, (cat, name, points, seconds, error) in enumerate(
+                pool.imap(fill_hole, tasks)):
+            pending.remove(cat)
+            grass.percent(i + 1, len(tasks), 1)
+            # GTC Hole is a NULL area in a raster map
+            grass.verbose(_("Hole %s (%d points) processed in %.2f s") %
+                          (cat, points, seconds))
+            if logfile:
+                logfile.write("%s,%d,%.3f,%d\n" % (cat, points, seconds,
+                                                   name is not None))
+            holename = prefix + 'hole_' + cat
+            if error:
+                remove_hole_maps(prefix, cat)
+                # GTC Hole is NULL area in a raster map
+                grass.fatal(_("Failed to fill hole %s") % cat)
+            if name:
+                filled.append(name)
+                tmp_rmaps.append(name)
+            elif points < 2:
+                grass.verbose(_("No points to interpolate"))
+                failed_list.append(holename)
+            else:
+                grass.warning(
+                    _("Filling has failed silently. Leaving temporary maps "
+                      "with prefix <%s> for debugging.") %
+                    holename)
+                failed_list.append(holename)
+    finally:
+        if pending:
+            # stopped by an error, maps of unfinished holes are removed
+            pool.terminate()
+            for cat in pending:
+                remove_hole_maps(prefix, cat)
+        else:
+            pool.close()
+        pool.join()
+        if logfile:
+            logfile.close()
+    if not filled:
+        grass.fatal(_("No hole was filled"))
+    grass.message(_("Patching %d filled holes...") % len(filled))
+    patch_maps(filled, filling, input, prefix)
+    return failed_list
+
+
+def fill_holes_serial(input, cat_list, filling, prefix, settings):
+    """Fill holes by RST interpolation one after another in the current
+    region and patch them to the filling map
+
+    :return: list of names of holes which were not filled
+    """
+    edge = settings['edge']
+    segmax = settings['segmax']
+    npmin = settings['npmin']
+    tension = settings['tension']
+    smooth = settings['smooth']
+    ns_res = settings['nsres']
+    ew_res = settings['ewres']
+    quiet = True
+    failed_list = []
+
+    first = True
+    hole_n = 1
+    for cat in cat_list:
+        holename = prefix + 'hole_' + cat
+        # GTC Hole is a NULL area in a raster map
+        grass.message(_("Filling hole %s of %s") % (hole_n, len(cat_list)))
+        hole_n = hole_n + 1
+        # cut out only CAT hole for processing
+        try:
+            grass.run_command('v.extract', input=prefix + 'holes',
+                              output=holename + '_pol',
+                              cats=cat, quiet=quiet)
+        except CalledModuleError:
+            grass.fatal(_("abandoned. Removing temporary maps, restoring "
+                          "user mask if needed:"))
+        tmp_vmaps.append(holename + '_pol')
+
+        # zoom to specific hole with a buffer of two cells around the hole to
+        # remove rest of data
+        try:
+            grass.run_command('g.region',
+                              vector=holename + '_pol', align=input,
+                              w='w-%d' % (edge * 2 * ew_res),
+                              e='e+%d' % (edge * 2 * ew_res),
+                              n='n+%d' % (edge * 2 * ns_res),
+                              s='s-%d' % (edge * 2 * ns_res),
+                              quiet=quiet)
+        except CalledModuleError:
+            grass.fatal(_("abandoned. Removing temporary maps, restoring "
+                          "user mask if needed:"))
+
+        # remove temporary map to not overfill disk
+        try:
+            grass.run_command('g.remove', flags='fb', type='vector',
+                              name=holename + '_pol', quiet=quiet)
+        except CalledModuleError:
+            grass.fatal(_("abandoned. Removing temporary maps, restoring "
+                          "user mask if needed:"))
+        tmp_vmaps.remove(holename + '_pol')
+
+        # copy only data around hole
+        grass.mapcalc("$out = if($inp == $catn, $inp, null())",
+                      out=holename, inp=prefix + 'holes', catn=cat)
+        tmp_rmaps.append(holename)
+
+        # If here loop is split into two, next part of loop can be run in parallel
+        # (except final result patching)
+        # Downside - on large maps such approach causes large disk usage
+
+        # grow hole border to get it's edge area
+        tmp_rmaps.append(holename + '_grown')
+        try:
+            grass.run_command('r.grow', input=holename, radius=edge + 0.01,
+                              old=-1, out=holename + '_grown', quiet=quiet)
+        except CalledModuleError:
+            grass.fatal(_("abandoned. Removing temporary map, restoring "
+                          "user mask if needed:"))
+
+        # no idea why r.grow old=-1 doesn't replace existing values with NULL
+        grass.mapcalc("$out = if($inp == -1, null(), \"$dem\")",
+                      out=holename + '_edges', inp=holename + '_grown', dem=input)
+        tmp_rmaps.append(holename + '_edges')
+
+        # convert to points for interpolation
+        tmp_vmaps.append(holename)
+        try:
+            grass.run_command('r.to.vect',
+                              input=holename + '_edges', output=holename,
+                              type='point', flags='z', quiet=quiet)
+        except CalledModuleError:
+            grass.fatal(_("abandoned. Removing temporary maps, restoring "
+                          "user mask if needed:"))
+
+        # count number of points to control segmax parameter for interpolation:
+        pointsnumber = grass.vector_info_topo(map=holename)['points']
+        grass.verbose(_("Interpolating %d points") % pointsnumber)
+
+        if pointsnumber < 2:
+            grass.verbose(_("No points to interpolate"))
+            failed_list.append(holename)
+            continue
+
+        # Avoid v.surf.rst warnings
+        if pointsnumber < segmax:
+            use_npmin = pointsnumber
+            use_segmax = pointsnumber * 2
+        else:
+            use_npmin = npmin
+            use_segmax = segmax
+
+        # launch v.surf.rst
+        tmp_rmaps.append(holename + '_dem')
+        try:
+            grass.run_command('v.surf.rst', quiet=quiet,
+                              input=holename, elev=holename + '_dem',
+                              tension=tension, smooth=smooth,
+                              segmax=use_segmax, npmin=use_npmin)
+        except CalledModuleError:
+            # GTC Hole is NULL area in a raster map
+            grass.fatal(_("Failed to fill hole %s") % cat)
+
+        # v.surf.rst sometimes fails with exit code 0
+        # related bug #1813
+        if not grass.find_file(holename + '_dem')['file']:
+            try:
+                tmp_rmaps.remove(holename)
+                tmp_rmaps.remove(holename + '_grown')
+                tmp_rmaps.remove(holename + '_edges')
+                tmp_rmaps.remove(holename + '_dem')
+                tmp_vmaps.remove(holename)
+            except:
+                pass
+            grass.warning(
+                _("Filling has failed silently. Leaving temporary maps "
+                  "with prefix <%s> for debugging.") %
+                holename)
+            failed_list.append(holename)
+            continue
+
+        # append hole result to interpolated version later used to patch into original DEM
+        if first:
+            tmp_rmaps.append(filling)
+            grass.run_command('g.region', align=input, raster=holename + '_dem', quiet=quiet)
+            grass.mapcalc("$out = if(isnull($inp), null(), $dem)",
+                          out=filling, inp=holename, dem=holename + '_dem')
+            first = False
+        else:
+            tmp_rmaps.append(filling + '_tmp')
+            grass.run_command(
+                'g.region', align=input, raster=(
+                    filling, holename + '_dem'), quiet=quiet)
+            grass.mapcalc(
+                "$out = if(isnull($inp), if(isnull($fill), null(), $fill), $dem)",
+                out=filling + '_tmp',
+                inp=holename,
+                dem=holename + '_dem',
+                fill=filling)
+            try:
+                grass.run_command('g.rename',
+                                  raster=(filling + '_tmp', filling),
+                                  overwrite=True, quiet=quiet)
+            except CalledModuleError:
+                grass.fatal(
+                    _("abandoned. Removing temporary maps, restoring user "
+                      "mask if needed:"))
+            # this map has been removed. No need for later cleanup.
+            tmp_rmaps.remove(filling + '_tmp')
+
+        # remove temporary maps to not overfill disk
+        try:
+            tmp_rmaps.remove(holename)
+            tmp_rmaps.remove(holename + '_grown')
+            tmp_rmaps.remove(holename + '_edges')
+            tmp_rmaps.remove(holename + '_dem')
+        except:
+            pass
+        try:
+            grass.run_command('g.remove', quiet=quiet,
+                              flags='fb', type='raster',
+                              name=(holename,
+                                    holename + '_grown',
+                                    holename + '_edges',
+                                    holename + '_dem'))
+        except CalledModuleError:
+            grass.fatal(_("abandoned. Removing temporary maps, restoring "
+                          "user mask if needed:"))
+        try:
+            tmp_vmaps.remove(holename)
+        except:
+            pass
+        try:
+            grass.run_command('g.remove', quiet=quiet, flags='fb',
+                              type='vector', name=holename)
+        except CalledModuleError:
+            grass.fatal(_("abandoned. Removing temporary maps, restoring user mask if needed:"))
+    return failed_list
+
+
 def main():
     global usermask, mapset, tmp_rmaps, tmp_vmaps
 
@@ -148,6 +557,7 @@ def main():
     npmin = int(options['npmin'])
     lambda_ = float(options['lambda'])
     memory = options['memory']
+    nprocs = int(options['nprocs'])
     quiet = True  # FIXME
     mapset = grass.gisenv()['MAPSET']
     unique = str(os.getpid())  # Shouldn't we use temp name?
@@ -266,181 +676,16 @@ def main():
 
         # GTC Hole is NULL area in a raster map
         grass.message(_("Processing %d map holes") % len(cat_list))
-        first = True
-        hole_n = 1
-        for cat in cat_list:
-            holename = prefix + 'hole_' + cat
-            # GTC Hole is a NULL area in a raster map
-            grass.message(_("Filling hole %s of %s") % (hole_n, len(cat_list)))
-            hole_n = hole_n + 1
-            # cut out only CAT hole for processing
-            try:
-                grass.run_command('v.extract', input=prefix + 'holes',
-                                  output=holename + '_pol',
-                                  cats=cat, quiet=quiet)
-            except CalledModuleError:
-                grass.fatal(_("abandoned. Removing temporary maps, restoring "
-                              "user mask if needed:"))
-            tmp_vmaps.append(holename + '_pol')
-
-            # zoom to specific hole with a buffer of two cells around the hole to
-            # remove rest of data
-            try:
-                grass.run_command('g.region',
-                                  vector=holename + '_pol', align=input,
-                                  w='w-%d' % (edge * 2 * ew_res),
-                                  e='e+%d' % (edge * 2 * ew_res),
-                                  n='n+%d' % (edge * 2 * ns_res),
-                                  s='s-%d' % (edge * 2 * ns_res),
-                                  quiet=quiet)
-            except CalledModuleError:
-                grass.fatal(_("abandoned. Removing temporary maps, restoring "
-                              "user mask if needed:"))
-
-            # remove temporary map to not overfill disk
-            try:
-                grass.run_command('g.remove', flags='fb', type='vector',
-                                  name=holename + '_pol', quiet=quiet)
-            except CalledModuleError:
-                grass.fatal(_("abandoned. Removing temporary maps, restoring "
-                              "user mask if needed:"))
-            tmp_vmaps.remove(holename + '_pol')
-
-            # copy only data around hole
-            grass.mapcalc("$out = if($inp == $catn, $inp, null())",
-                          out=holename, inp=prefix + 'holes', catn=cat)
-            tmp_rmaps.append(holename)
-
-            # If here loop is split into two, next part of loop can be run in parallel
-            # (except final result patching)
-            # Downside - on large maps such approach causes large disk usage
-
-            # grow hole border to get it's edge area
-            tmp_rmaps.append(holename + '_grown')
-            try:
-                grass.run_command('r.grow', input=holename, radius=edge + 0.01,
-                                  old=-1, out=holename + '_grown', quiet=quiet)
-            except CalledModuleError:
-                grass.fatal(_("abandoned. Removing temporary map, restoring "
-                              "user mask if needed:"))
-
-            # no idea why r.grow old=-1 doesn't replace existing values with NULL
-            grass.mapcalc("$out = if($inp == -1, null(), \"$dem\")",
-                          out=holename + '_edges', inp=holename + '_grown', dem=input)
-            tmp_rmaps.append(holename + '_edges')
-
-            # convert to points for interpolation
-            tmp_vmaps.append(holename)
-            try:
-                grass.run_command('r.to.vect',
-                                  input=holename + '_edges', output=holename,
-                                  type='point', flags='z', quiet=quiet)
-            except CalledModuleError:
-                grass.fatal(_("abandoned. Removing temporary maps, restoring "
-                              "user mask if needed:"))
-
-            # count number of points to control segmax parameter for interpolation:
-            pointsnumber = grass.vector_info_topo(map=holename)['points']
-            grass.verbose(_("Interpolating %d points") % pointsnumber)
-
-            if pointsnumber < 2:
-                grass.verbose(_("No points to interpolate"))
-                failed_list.append(holename)
-                continue
-
-            # Avoid v.surf.rst warnings
-            if pointsnumber < segmax:
-                use_npmin = pointsnumber
-                use_segmax = pointsnumber * 2
-            else:
-                use_npmin = npmin
-                use_segmax = segmax
-
-            # launch v.surf.rst
-            tmp_rmaps.append(holename + '_dem')
-            try:
-                grass.run_command('v.surf.rst', quiet=quiet,
-                                  input=holename, elev=holename + '_dem',
-                                  tension=tension, smooth=smooth,
-                                  segmax=use_segmax, npmin=use_npmin)
-            except CalledModuleError:
-                # GTC Hole is NULL area in a raster map
-                grass.fatal(_("Failed to fill hole %s") % cat)
-
-            # v.surf.rst sometimes fails with exit code 0
-            # related bug #1813
-            if not grass.find_file(holename + '_dem')['file']:
-                try:
-                    tmp_rmaps.remove(holename)
-                    tmp_rmaps.remove(holename + '_grown')
-                    tmp_rmaps.remove(holename + '_edges')
-                    tmp_rmaps.remove(holename + '_dem')
-                    tmp_vmaps.remove(holename)
-                except:
-                    pass
-                grass.warning(
-                    _("Filling has failed silently. Leaving temporary maps "
-                      "with prefix <%s> for debugging.") %
-                    holename)
-                failed_list.append(holename)
-                continue
-
-            # append hole result to interpolated version later used to patch into original DEM
-            if first:
-                tmp_rmaps.append(filling)
-                grass.run_command('g.region', align=input, raster=holename + '_dem', quiet=quiet)
-                grass.mapcalc("$out = if(isnull($inp), null(), $dem)",
-                              out=filling, inp=holename, dem=holename + '_dem')
-                first = False
-            else:
-                tmp_rmaps.append(filling + '_tmp')
-                grass.run_command(
-                    'g.region', align=input, raster=(
-                        filling, holename + '_dem'), quiet=quiet)
-                grass.mapcalc(
-                    "$out = if(isnull($inp), if(isnull($fill), null(), $fill), $dem)",
-                    out=filling + '_tmp',
-                    inp=holename,
-                    dem=holename + '_dem',
-                    fill=filling)
-                try:
-                    grass.run_command('g.rename',
-                                      raster=(filling + '_tmp', filling),
-                                      overwrite=True, quiet=quiet)
-                except CalledModuleError:
-                    grass.fatal(
-                        _("abandoned. Removing temporary maps, restoring user "
-                          "mask if needed:"))
-                # this map has been removed. No need for later cleanup.
-                tmp_rmaps.remove(filling + '_tmp')
-
-            # remove temporary maps to not overfill disk
-            try:
-                tmp_rmaps.remove(holename)
-                tmp_rmaps.remove(holename + '_grown')
-                tmp_rmaps.remove(holename + '_edges')
-                tmp_rmaps.remove(holename + '_dem')
-            except:
-                pass
-            try:
-                grass.run_command('g.remove', quiet=quiet,
-                                  flags='fb', type='raster',
-                                  name=(holename,
-                                        holename + '_grown',
-                                        holename + '_edges',
-                                        holename + '_dem'))
-            except CalledModuleError:
-                grass.fatal(_("abandoned. Removing temporary maps, restoring "
-                              "user mask if needed:"))
-            try:
-                tmp_vmaps.remove(holename)
-            except:
-                pass
-            try:
-                grass.run_command('g.remove', quiet=quiet, flags='fb',
-                                  type='vector', name=holename)
-            except CalledModuleError:
-                grass.fatal(_("abandoned. Removing temporary maps, restoring user mask if needed:"))
+        settings = dict(edge=edge, segmax=segmax, npmin=npmin,
+                        tension=tension, smooth=smooth, nsres=ns_res,
+                        ewres=ew_res)
+        if nprocs > 1:
+            failed_list = fill_holes_parallel(
+                input, prefix + 'holes', filling, prefix, nprocs,
+                options['log'], settings)
+        else:
+            failed_list = fill_holes_serial(input, cat_list, filling, prefix,
+                                            settings)
 
     # check if method is different from rst to use r.resamp.bspline
     if method != 'rst':
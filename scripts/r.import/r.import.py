@@ -97,6 +97,14 @@
 #% description: Title for resultant raster map
 #% guisection: Metadata
 #%end
+#%option
+#% key: nprocs
+#% type: integer
+#% required: no
+#% multiple: no
+#% description: Number of processes reprojecting tiles of the output in parallel
+#% answer: 1
+#%end
 #%flag
 #% key: e
 #% description: Estimate resolution only
@@ -124,6 +132,7 @@ import sys
 import os
 import atexit
 import math
+from multiprocessing import Pool
 
 import grass.script as grass
 from grass.exceptions import CalledModuleError
@@ -135,6 +144,12 @@ SRCGISRC = None
 TGTGISRC = None
 GISDBASE = None
 TMP_REG_NAME = None
+#: maximum number of rows and columns of a tile reprojected in parallel
+TILE_SIZE = 4096
+#: number of cells by which the tiles overlap
+TILE_OVERLAP = 2
+#: error of r.proj for a region which does not overlap with the input
+OUTSIDE_ERROR = 'Input raster map is outside current region'
 
 
 def cleanup():
@@ -151,6 +166,219 @@ def cleanup():
                           flags='f', quiet=True)
 
 
+def region_string(region, rows, cols):
+    """Return GRASS_REGION value of a part of region
+
+    :param region: region as returned by grass.region()
+    :param rows: first and last row of the part
+    :param cols: first and last column of the part
+    """
+    values = [
+        ('proj', region['projection']), ('zone', region['zone']),
+        ('north', region['n'] - rows[0] * region['nsres']),
+        ('south', region['n'] - rows[1] * region['nsres']),
+        ('east', region['w'] + cols[1] * region['ewres']),
+        ('west', region['w'] + cols[0] * region['ewres']),
+        ('cols', cols[1] - cols[0]), ('rows', rows[1] - rows[0]),
+        ('e-w resol', region['ewres']), ('n-s resol', region['nsres'])]
+    return ''.join('%s: %r;' % (key, value) for key, value in values)
+
+
+def region_cells(region, info):
+    """Return rows and columns of region covered by a raster map
+
+    :param region: region as returned by grass.region()
+    :param info: raster map info as returned by grass.raster_info()
+    """
+    rows = (int(round((region['n'] - info['north']) / region['nsres'])),
+            int(round((region['n'] - info['south']) / region['nsres'])))
+    cols = (int(round((info['west'] - region['w']) / region['ewres'])),
+            int(round((info['east'] - region['w']) / region['ewres'])))
+    return rows, cols
+
+
+def crop_region(region, rows, cols):
+    """Return part of region given by rows and columns"""
+    region = dict(region)
+    region['n'], region['s'] = (region['n'] - rows[0] * region['nsres'],
+                                region['n'] - rows[1] * region['nsres'])
+    region['w'], region['e'] = (region['w'] + cols[0] * region['ewres'],
+                                region['w'] + cols[1] * region['ewres'])
+    region['rows'] = rows[1] - rows[0]
+    region['cols'] = cols[1] - cols[0]
+    return region
+
+
+def set_resolution(region, res):
+    """Return region with resolution changed as g.region res= (or r.proj
+    resolution=) does, without running a module"""
+    region = dict(region)
+    region['rows'] = max(int((region['n'] - region['s'] + res / 2.0) / res),
+                         1)
+    region['cols'] = max(int((region['e'] - region['w'] + res / 2.0) / res),
+                         1)
+    region['nsres'] = (region['n'] - region['s']) / region['rows']
+    region['ewres'] = (region['e'] - region['w']) / region['cols']
+    return region
+
+
+def reprojected_bounds(outfile, memory):
+    """Return north, south, east and west of the input map reprojected to
+    the current location (r.proj -g)"""
+    try:
+        tgtextents = grass.read_command('r.proj', location=TMPLOC,
+                                        mapset='PERMANENT',
+                                        input=outfile, flags='g',
+                                        memory=memory, quiet=True)
+    except CalledModuleError:
+        grass.fatal(_("Unable to get reprojected map extent"))
+    try:
+        srcregion = grass.parse_key_val(tgtextents, val_type=float, vsep=' ')
+        n = srcregion['n']
+        s = srcregion['s']
+        e = srcregion['e']
+        w = srcregion['w']
+    except ValueError:  # import into latlong, expect 53:39:06.894826N
+        srcregion = grass.parse_key_val(tgtextents, vsep=' ')
+        n = grass.float_or_dms(srcregion['n'][:-1]) * \
+            (-1 if srcregion['n'][-1] == 'S' else 1)
+        s = grass.float_or_dms(srcregion['s'][:-1]) * \
+            (-1 if srcregion['s'][-1] == 'S' else 1)
+        e = grass.float_or_dms(srcregion['e'][:-1]) * \
+            (-1 if srcregion['e'][-1] == 'W' else 1)
+        w = grass.float_or_dms(srcregion['w'][:-1]) * \
+            (-1 if srcregion['w'][-1] == 'W' else 1)
+    return n, s, e, w
+
+
+def cropped_region(outfile, region, parameters):
+    """Return region cropped to the reprojected input map as r.proj crops
+    its output before applying the resolution
+
+    The cropping does not depend on the output resolution, so r.proj
+    is run to a single cell only.
+    """
+    probe = 'tmp_rimport_extent_%d' % os.getpid()
+    parameters = dict(parameters, method='nearest',
+                      resolution=max(region['n'] - region['s'],
+                                     region['e'] - region['w']))
+    env = os.environ.copy()
+    env['GRASS_REGION'] = region_string(region, (0, region['rows']),
+                                        (0, region['cols']))
+    try:
+        grass.run_command('r.proj', output=probe, quiet=True, env=env,
+                          **parameters)
+        info = grass.raster_info(probe)
+    except CalledModuleError:
+        grass.fatal(_("Unable to to reproject raster <%s>") % outfile)
+    finally:
+        grass.run_command('g.remove', type='raster', name=probe,
+                          flags='f', quiet=True)
+    return crop_region(region, *region_cells(region, info))
+
+
+def tile_regions(region, nprocs, bounds):
+    """Split region to overlapping tiles aligned with the region
+
+    :param region: region as returned by grass.region()
+    :param nprocs: number of processes (at least twice as many tiles are
+                   created if possible)
+    :param bounds: north, south, east and west of the reprojected input,
+                   tiles outside of it are left out
+
+    :return: list of GRASS_REGION values of the tiles
+    """
+    north, south, east, west = bounds
+    size = int(math.ceil(math.sqrt(region['rows'] * region['cols'] /
+                                   (2.0 * nprocs))))
+    size = max(1, min(size, TILE_SIZE))
+    tiles = []
+    for row in range(0, region['rows'], size):
+        rows = (max(row - TILE_OVERLAP, 0),
+                min(row + size + TILE_OVERLAP, region['rows']))
+        if (region['n'] - rows[1] * region['nsres'] >= north or
+                region['n'] - rows[0] * region['nsres'] <= south):
+            continue
+        for col in range(0, region['cols'], size):
+            cols = (max(col - TILE_OVERLAP, 0),
+                    min(col + size + TILE_OVERLAP, region['cols']))
+            if (region['w'] + cols[0] * region['ewres'] >= east or
+                    region['w'] + cols[1] * region['ewres'] <= west):
+                continue
+            tiles.append(region_string(region, rows, cols))
+    return tiles
+
+
+def reproject_tile(task):
+    """Reproject input map to a tile (runs in a worker process)
+
+    :return: name and extent of the reprojected tile and error output
+             of r.proj, extent is None when the tile does not overlap with
+             the reprojected input or r.proj failed, errors are None unless
+             r.proj failed for another reason
+    """
+    tile, output, parameters = task
+    env = os.environ.copy()
+    env['GRASS_REGION'] = tile
+    # the error message is checked below
+    env['LC_ALL'] = 'C'
+    process = grass.start_command('r.proj', output=output, quiet=True,
+                                  env=env, stderr=grass.PIPE, **parameters)
+    errors = grass.decode(process.communicate()[1])
+    if process.returncode != 0:
+        if OUTSIDE_ERROR in errors:
+            # within the bounding box, but not the footprint of the input
+            return output, None, None
+        return output, None, errors
+    return output, grass.raster_info(output), None
+
+
+def reproject_tiled(outfile, region, parameters, nprocs, bounds):
+    """Reproject input map in tiles in parallel and patch them to output
+
+    Tiles are reprojected to the given region (their GRASS_REGION is
+    set only for the r.proj processes). As r.proj, the output is cropped
+    to the extent of the reprojected input.
+    """
+    tiles = tile_regions(region, nprocs, bounds)
+    prefix = 'tmp_rimport_tile_%d_' % os.getpid()
+    tasks = [(tile, prefix + str(i), parameters)
+             for i, tile in enumerate(tiles)]
+    names = []
+    rows = [region['rows'], 0]
+    cols = [region['cols'], 0]
+    pool = Pool(nprocs)
+    try:
+        for i, result in enumerate(pool.imap(reproject_tile, tasks)):
+            grass.percent(i + 1, len(tasks), 1)
+            name, info, errors = result
+            if errors:
+                grass.fatal(_("Unable to to reproject raster <%s>: %s") %
+                            (outfile, errors))
+            if info is None:
+                continue
+            names.append(name)
+            # extent of tile in rows and columns of the region
+            tile_rows, tile_cols = region_cells(region, info)
+            rows[0] = min(rows[0], tile_rows[0])
+            rows[1] = max(rows[1], tile_rows[1])
+            cols[0] = min(cols[0], tile_cols[0])
+            cols[1] = max(cols[1], tile_cols[1])
+        pool.close()
+        pool.join()
+        if not names:
+            grass.fatal(_("Unable to to reproject raster <%s>") % outfile)
+        env = os.environ.copy()
+        env['GRASS_REGION'] = region_string(region, rows, cols)
+        grass.run_command('r.patch', input=names, output=outfile,
+                          quiet=True, env=env)
+    finally:
+        pool.terminate()
+        # also tiles of failed or interrupted processes
+        grass.run_command('g.remove', type='raster', pattern=prefix + '*',
+                          flags='f', quiet=True)
+
+
 def main():
     global TMPLOC, SRCGISRC, TGTGISRC, GISDBASE, TMP_REG_NAME
 
@@ -161,6 +389,7 @@ def main():
     bands = options['band']
     tgtres = options['resolution']
     title = options["title"]
+    nprocs = int(options['nprocs'])
     if flags['e'] and not output:
         output = 'rimport_tmp'  # will be removed with the entire tmp location
     if options['resolution_value']:
@@ -218,8 +447,6 @@ def main():
     f.write('GUI: text\n')
     f.close()
 
-    tgtsrs = grass.read_command('g.proj', flags='j', quiet=True)
-
     # create temp location from input without import
     grass.verbose(_("Creating temporary location for <%s>...") % GDALdatasource)
     parameters = dict(input=GDALdatasource, output=output,
@@ -273,77 +500,58 @@ def main():
     if flags['n']:
         rflags = 'n'
 
+    estimate = None
     for outfile in outfiles:
 
-        n = region['n']
-        s = region['s']
-        e = region['e']
-        w = region['w']
-
-        grass.use_temp_region()
+        # all bands have the same extent and resolution
+        if estimate is None:
+            n = region['n']
+            s = region['s']
+            e = region['e']
+            w = region['w']
 
-        if options['extent'] == 'input':
-            # r.proj -g
-            try:
-                tgtextents = grass.read_command('r.proj', location=TMPLOC,
-                                                mapset='PERMANENT',
-                                                input=outfile, flags='g',
-                                                memory=memory, quiet=True)
-            except CalledModuleError:
-                grass.fatal(_("Unable to get reprojected map extent"))
-            try:
-                srcregion = grass.parse_key_val(tgtextents, val_type=float, vsep=' ')
-                n = srcregion['n']
-                s = srcregion['s']
-                e = srcregion['e']
-                w = srcregion['w']
-            except ValueError:  # import into latlong, expect 53:39:06.894826N
-                srcregion = grass.parse_key_val(tgtextents, vsep=' ')
-                n = grass.float_or_dms(srcregion['n'][:-1]) * \
-                    (-1 if srcregion['n'][-1] == 'S' else 1)
-                s = grass.float_or_dms(srcregion['s'][:-1]) * \
-                    (-1 if srcregion['s'][-1] == 'S' else 1)
-                e = grass.float_or_dms(srcregion['e'][:-1]) * \
-                    (-1 if srcregion['e'][-1] == 'W' else 1)
-                w = grass.float_or_dms(srcregion['w'][:-1]) * \
-                    (-1 if srcregion['w'][-1] == 'W' else 1)
-
-            grass.run_command('g.region', n=n, s=s, e=e, w=w)
+            grass.use_temp_region()
 
-        # v.in.region in tgt
-        vreg = TMP_REG_NAME = 'vreg_tmp_' + str(os.getpid())
-        grass.run_command('v.in.region', output=vreg, quiet=True)
+            if options['extent'] == 'input':
+                n, s, e, w = reprojected_bounds(outfile, memory)
+                grass.run_command('g.region', n=n, s=s, e=e, w=w)
 
-        grass.del_temp_region()
+            # v.in.region in tgt
+            vreg = TMP_REG_NAME = 'vreg_tmp_' + str(os.getpid())
+            grass.run_command('v.in.region', output=vreg, quiet=True)
 
-        # reproject to src
-        # switch to temp location
-        os.environ['GISRC'] = str(SRCGISRC)
-        try:
-            grass.run_command('v.proj', input=vreg, output=vreg,
-                              location=tgtloc, mapset=tgtmapset, quiet=True)
-            # test if v.proj created a valid area
-            if grass.vector_info_topo(vreg)['areas'] != 1:
-                rass.fatal(_("Please check the 'extent' parameter"))
-        except CalledModuleError:
-            grass.fatal(_("Unable to reproject to source location"))
-
-        # set region from region vector
-        grass.run_command('g.region', raster=outfile)
-        grass.run_command('g.region', vector=vreg)
-        # align to first band
-        grass.run_command('g.region', align=outfile)
-        # get number of cells
-        cells = grass.region()['cells']
-
-        estres = math.sqrt((n - s) * (e - w) / cells)
-        # remove from source location for multi bands import
-        grass.run_command('g.remove', type='vector', name=vreg,
-                          flags='f', quiet=True)
+            grass.del_temp_region()
 
-        os.environ['GISRC'] = str(TGTGISRC)
-        grass.run_command('g.remove', type='vector', name=vreg,
-                          flags='f', quiet=True)
+            # reproject to src
+            # switch to temp location
+            os.environ['GISRC'] = str(SRCGISRC)
+            try:
+                grass.run_command('v.proj', input=vreg, output=vreg,
+                                  location=tgtloc, mapset=tgtmapset, quiet=True)
+                # test if v.proj created a valid area
+                if grass.vector_info_topo(vreg)['areas'] != 1:
+                    grass.fatal(_("Please check the 'extent' parameter"))
+            except CalledModuleError:
+                grass.fatal(_("Unable to reproject to source location"))
+
+            # set region from region vector
+            grass.run_command('g.region', raster=outfile)
+            grass.run_command('g.region', vector=vreg)
+            # align to first band
+            grass.run_command('g.region', align=outfile)
+            # get number of cells
+            cells = grass.region()['cells']
+
+            estres = math.sqrt((n - s) * (e - w) / cells)
+            # remove from source location for multi bands import
+            grass.run_command('g.remove', type='vector', name=vreg,
+                              flags='f', quiet=True)
+
+            os.environ['GISRC'] = str(TGTGISRC)
+            grass.run_command('g.remove', type='vector', name=vreg,
+                              flags='f', quiet=True)
+            estimate = (n, s, e, w, estres)
+        n, s, e, w, estres = estimate
 
         grass.message(
             _("Estimated target resolution for input band <{out}>: {res}").format(
@@ -373,13 +581,28 @@ def main():
 
         # r.proj
         grass.message(_("Reprojecting <%s>...") % outfile)
-        try:
-            grass.run_command('r.proj', location=TMPLOC,
-                              mapset='PERMANENT', input=outfile,
-                              method=method, resolution=res,
-                              memory=memory, flags=rflags, quiet=True)
-        except CalledModuleError:
-            grass.fatal(_("Unable to to reproject raster <%s>") % outfile)
+        if nprocs > 1:
+            # tiles have to be aligned with the whole output
+            tgtregion = grass.region()
+            parameters = dict(location=TMPLOC, mapset='PERMANENT',
+                              input=outfile, method=method, flags=rflags,
+                              memory=max(int(memory) // nprocs, 1))
+            if tgtres == 'estimated' and not flags['n']:
+                # r.proj crops the region to the input before it sets
+                # the resolution, which moves the grid
+                tgtregion = cropped_region(outfile, tgtregion, parameters)
+            if res:
+                tgtregion = set_resolution(tgtregion, res)
+            bounds = reprojected_bounds(outfile, memory)
+            reproject_tiled(outfile, tgtregion, parameters, nprocs, bounds)
+        else:
+            try:
+                grass.run_command('r.proj', location=TMPLOC,
+                                  mapset='PERMANENT', input=outfile,
+                                  method=method, resolution=res,
+                                  memory=memory, flags=rflags, quiet=True)
+            except CalledModuleError:
+                grass.fatal(_("Unable to to reproject raster <%s>") % outfile)
 
         if grass.raster_info(outfile)['min'] is None:
             grass.fatal(_("The reprojected raster <%s> is empty") % outfile)
@@ -1,5 +1,6 @@
 from grass.gunittest.case import TestCase
 from grass.gunittest.main import test
+from grass.script import raster_info
 
 
 class TestRImportRegion(TestCase):
@@ -45,6 +46,42 @@ class TestRImportRegion(TestCase):
         reference = dict(north=223655, south=223600)
         self.assertRasterFitsInfo(raster=self.imported, reference=reference, precision=1e-6)
 
+    def test_import_asc_parallel(self):
+        """Import ASC in different projection in parallel tiles"""
+        reference = 'test_r_import_reference'
+        self.assertModule('r.import', input='data/data2.asc', output=reference,
+                          resample='bilinear', resolution='value', resolution_value=10)
+        self.assertModule('r.import', input='data/data2.asc', output=self.imported,
+                          resample='bilinear', resolution='value', resolution_value=10,
+                          nprocs=2)
+        self.assertRastersNoDifference(actual=self.imported, reference=reference,
+                                       precision=0)
+        self.runModule('g.remove', flags='f', type='raster', name=reference)
+
+    def assertParallelImport(self, **parameters):
+        """Check that import in parallel tiles gives the same map"""
+        reference = 'test_r_import_reference'
+        self.assertModule('r.import', input='data/data2.asc', output=reference,
+                          **parameters)
+        self.assertModule('r.import', input='data/data2.asc', output=self.imported,
+                          nprocs=4, **parameters)
+        info = raster_info(reference)
+        grid = dict((key, info[key]) for key in ('north', 'south', 'east', 'west',
+                                                 'rows', 'cols', 'nsres', 'ewres'))
+        self.assertRasterFitsInfo(raster=self.imported, reference=grid, precision=1e-6)
+        self.assertRastersNoDifference(actual=self.imported, reference=reference,
+                                       precision=0)
+        self.runModule('g.remove', flags='f', type='raster', name=reference)
+
+    def test_import_asc_parallel_estimated(self):
+        """Import ASC in parallel tiles with estimated resolution"""
+        self.assertParallelImport(resample='bilinear', resolution='estimated')
+
+    def test_import_asc_parallel_region_extent(self):
+        """Import ASC in parallel tiles in region larger than the input"""
+        self.assertParallelImport(resample='nearest', extent='region',
+                                  resolution='value', resolution_value=10)
+
 
 if __name__ == '__main__':
     test()
@@ -60,6 +60,47 @@
 #%End
 #%option G_OPT_F_INPUT
 #% description: Name of SRTM input tile (file without .hgt.zip extension)
+#% required : no
+#%end
+#%option G_OPT_M_DIR
+#% key: directory
+#% label: Name of directory with SRTM tiles to be imported and mosaicked
+#% description: Tiles are files named as the tiles (e.g. N51E010.hgt.zip)
+#% required : no
+#% guisection: Batch
+#%end
+#%option
+#% key: tiles
+#% type: string
+#% required: no
+#% multiple: yes
+#% description: Names of tiles to be imported from directory (default: all)
+#% guisection: Batch
+#%end
+#%option
+#% key: bbox
+#% type: double
+#% required: no
+#% multiple: yes
+#% key_desc: west,south,east,north
+#% description: Import tiles from directory overlapping the bounding box (in degrees)
+#% guisection: Batch
+#%end
+#%option G_OPT_F_OUTPUT
+#% key: manifest
+#% label: Name of file recording imported tiles
+#% description: An interrupted import with the same manifest continues with the tiles not imported yet
+#% required : no
+#% guisection: Batch
+#%end
+#%option
+#% key: nprocs
+#% type: integer
+#% required: no
+#% multiple: no
+#% description: Number of processes importing tiles in parallel
+#% answer: 1
+#% guisection: Batch
 #%end
 #%option G_OPT_R_OUTPUT
 #% description: Name for output raster map (default: input tile)
@@ -69,6 +110,15 @@
 #% key: 1
 #% description: Input is a 1-arcsec tile (default: 3-arcsec)
 #%end
+#%rules
+#% required: input,directory
+#% exclusive: input,directory
+#% exclusive: tiles,bbox
+#% requires: tiles,directory
+#% requires: bbox,directory
+#% requires: manifest,directory
+#% requires: directory,output
+#%end
 
 tmpl1sec = """BYTEORDER M
 LAYOUT BIL
@@ -129,57 +179,105 @@ proj = ''.join([
     'UNIT["degree",0.0174532925199433]',
     ']'])
 
+import math
 import os
+import re
 import shutil
-import atexit
+from multiprocessing import Pool
+
 import grass.script as grass
 from grass.exceptions import CalledModuleError
 import zipfile as zfile
 
-
-def cleanup():
-    if not in_temp:
-        return
-    for ext in ['.bil', '.hdr', '.prj', '.hgt.zip']:
-        grass.try_remove(tile + ext)
-    os.chdir('..')
-    grass.try_rmdir(tmpdir)
+#: name of SRTM tile, coordinates of its lower left cell
+TILE_NAME = re.compile(r'^([NS])(\d{2})([EW])(\d{3})')
+#: suffixes of SRTM files (tiles, water bodies, zipped)
+TILE_SUFFIXES = ('.hgt', '.raw', '.zip')
 
 
-def main():
-    global tile, tmpdir, in_temp
+def split_name(input):
+    """Return directory, tile name and suffix of SRTM file
 
-    in_temp = False
-    
-    # to support SRTM water body
-    swbd = False
-
-    input = options['input']
-    output = options['output']
-    one = flags['1']
-
-    # are we in LatLong location?
-    s = grass.read_command("g.proj", flags='j')
-    kv = grass.parse_key_val(s)
-    if not '+proj' in kv.keys() or kv['+proj'] != 'longlat':
-        grass.fatal(_("This module only operates in LatLong locations"))
-
-    # use these from now on:
+    >>> split_name('/data/N51E010.hgt.zip')
+    ('/data', 'N51E010', '.hgt')
+    >>> split_name('S12W077.raw')
+    ('', 'S12W077', '.raw')
+    """
     infile = input
     while infile[-4:].lower() in ['.hgt', '.zip', '.raw']:
         infile = infile[:-4]
     (fdir, tile) = os.path.split(infile)
-
-    if not output:
-        tileout = tile
-    else:
-        tileout = output
-
     if '.hgt' in input:
         suff = '.hgt'
     else:
         suff = '.raw'
-        swbd = True
+    return fdir, tile, suff
+
+
+def tile_origin(tile):
+    """Return longitude and latitude of the lower left cell center of tile
+
+    >>> tile_origin('S12W077')
+    (-77, -12)
+    """
+    north = tile[0]
+    ll_latitude = int(tile[1:3])
+    east = tile[3]
+    ll_longitude = int(tile[4:7])
+
+    # are we on the southern hemisphere? If yes, make LATITUDE negative.
+    if north == "S":
+        ll_latitude *= -1
+
+    # are we west of Greenwich? If yes, make LONGITUDE negative.
+    if east == "W":
+        ll_longitude *= -1
+    return ll_longitude, ll_latitude
+
+
+def bbox_tiles(west, south, east, north):
+    """Return names of tiles overlapping the bounding box
+
+    >>> bbox_tiles(9.5, 50.2, 11, 51.5)
+    ['N50E009', 'N50E010', 'N51E009', 'N51E010']
+    """
+    names = []
+    for lat in range(int(math.floor(south)), int(math.ceil(north))):
+        for lon in range(int(math.floor(west)), int(math.ceil(east))):
+            names.append('%s%02d%s%03d' % ('S' if lat < 0 else 'N', abs(lat),
+                                         'W' if lon < 0 else 'E', abs(lon)))
+    return names
+
+
+def find_tiles(directory):
+    """Return paths of SRTM files in directory by tile names"""
+    files = {}
+    for name in sorted(os.listdir(directory)):
+        match = TILE_NAME.match(name)
+        if not match or not name.lower().endswith(TILE_SUFFIXES):
+            continue
+        files.setdefault(match.group(0), os.path.join(directory, name))
+    return files
+
+
+def import_tile(infile, output, one, batch=False):
+    """Unpack tile, create BIL header for it and import it
+
+    The tile is unpacked to its own temporary directory, so several
+    tiles can be imported in parallel.
+
+    :param infile: path to the tile (with or without suffixes)
+    :param output: name of output raster map
+    :param one: True for 1-arcsec tile
+    :param batch: True to report progress only in verbose mode
+
+    :return: error message or None when the tile was imported
+    """
+    message = grass.verbose if batch else grass.message
+    (fdir, tile, suff) = split_name(infile)
+    # to support SRTM water body
+    swbd = suff == '.raw'
+    infile = os.path.join(fdir, tile)
 
     zipfile = "{im}{su}.zip".format(im=infile, su=suff)
     hgtfile = "{im}{su}".format(im=infile, su=suff)
@@ -187,96 +285,209 @@ def main():
     if os.path.isfile(zipfile):
         # really a ZIP file?
         if not zfile.is_zipfile(zipfile):
-            grass.fatal(_("'%s' does not appear to be a valid zip file.") % zipfile)
+            return _("'%s' does not appear to be a valid zip file.") % zipfile
 
         is_zip = True
     elif os.path.isfile(hgtfile):
         # try and see if it's already unzipped
         is_zip = False
     else:
-        grass.fatal(_("File '%s' or '%s' not found") % (zipfile, hgtfile))
+        return _("File '%s' or '%s' not found") % (zipfile, hgtfile)
 
     # make a temporary directory
-    tmpdir = grass.tempfile()
-    grass.try_remove(tmpdir)
-    os.mkdir(tmpdir)
-    if is_zip:
-        shutil.copyfile(zipfile, os.path.join(tmpdir,
-                                              "{im}{su}.zip".format(im=tile,
-                                                                    su=suff)))
-    else:
-        shutil.copyfile(hgtfile, os.path.join(tmpdir,
-                                              "{im}{su}".format(im=tile[:7],
-                                                                su=suff)))
-    # change to temporary directory
-    os.chdir(tmpdir)
-    in_temp = True
-
-
-    zipfile = "{im}{su}.zip".format(im=tile, su=suff)
-    hgtfile = "{im}{su}".format(im=tile[:7], su=suff)
-
-    bilfile = tile + ".bil"
+    tmpdir = grass.tempdir()
+    try:
+        bilfile = os.path.join(tmpdir, tile + ".bil")
+        if is_zip:
+            # unzip & rename data file:
+            message(_("Extracting '%s'...") % infile)
+            try:
+                zf = zfile.ZipFile(zipfile)
+                zf.extractall(tmpdir)
+                zf.close()
+            except Exception:
+                return _("Unable to unzip file.")
+            hgtfile = os.path.join(tmpdir, "{im}{su}".format(im=tile[:7],
+                                                            su=suff))
+            message(_("Converting input file to BIL..."))
+            os.rename(hgtfile, bilfile)
+        else:
+            message(_("Converting input file to BIL..."))
+            shutil.copyfile(hgtfile, bilfile)
+
+        ll_longitude, ll_latitude = tile_origin(tile)
+
+        # Calculate Upper Left from Lower Left
+        ulxmap = "%.1f" % ll_longitude
+        # SRTM90 tile size is 1 deg:
+        ulymap = "%.1f" % (ll_latitude + 1)
+
+        if not one:
+            tmpl = tmpl3sec
+        elif swbd:
+            message(_("Attempting to import 1-arcsec SWBD data"))
+            tmpl = swbd1sec
+        else:
+            message(_("Attempting to import 1-arcsec data"))
+            tmpl = tmpl1sec
+
+        header = tmpl % (ulxmap, ulymap)
+        hdrfile = os.path.join(tmpdir, tile + '.hdr')
+        outf = open(hdrfile, 'w')
+        outf.write(header)
+        outf.close()
+
+        # create prj file: To be precise, we would need EGS96! But who really cares...
+        prjfile = os.path.join(tmpdir, tile + '.prj')
+        outf = open(prjfile, 'w')
+        outf.write(proj)
+        outf.close()
 
-    if is_zip:
-        # unzip & rename data file:
-        grass.message(_("Extracting '%s'...") % infile)
         try:
-            zf=zfile.ZipFile(zipfile)
-            zf.extractall()
-        except:
-            grass.fatal(_("Unable to unzip file."))
-
-    grass.message(_("Converting input file to BIL..."))
-    os.rename(hgtfile, bilfile)
+            grass.run_command('r.in.gdal', input=bilfile, out=output,
+                              quiet=batch, overwrite=batch)
+        except CalledModuleError:
+            return _("Unable to import data")
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
 
-    north = tile[0]
-    ll_latitude = int(tile[1:3])
-    east = tile[3]
-    ll_longitude = int(tile[4:7])
-
-    # are we on the southern hemisphere? If yes, make LATITUDE negative.
-    if north == "S":
-        ll_latitude *= -1
+    # nice color table
+    if not swbd and not batch:
+        grass.run_command('r.colors', map=output, color='srtm')
+    return None
 
-    # are we west of Greenwich? If yes, make LONGITUDE negative.
-    if east == "W":
-        ll_longitude *= -1
 
-    # Calculate Upper Left from Lower Left
-    ulxmap = "%.1f" % ll_longitude
-    # SRTM90 tile size is 1 deg:
-    ulymap = "%.1f" % (ll_latitude + 1)
+def _import_task(task):
+    """Import tile in a worker process"""
+    tile, infile, output, one = task
+    try:
+        return tile, output, import_tile(infile, output, one, batch=True)
+    except Exception as error:
+        return tile, output, str(error)
+
+
+def read_manifest(path):
+    """Return tiles and their raster maps recorded in manifest"""
+    imported = {}
+    if not path or not os.path.isfile(path):
+        return imported
+    with open(path) as manifest:
+        for line in manifest:
+            parts = line.split()
+            if len(parts) == 2:
+                imported[parts[0]] = parts[1]
+    return imported
+
+
+def import_batch(directory, names, output, one, nprocs, manifest):
+    """Import tiles from directory in parallel and mosaic them"""
+    files = find_tiles(directory)
+    if names is None:
+        names = sorted(files)
+    missing = [name for name in names if name not in files]
+    if missing:
+        # there are no tiles for the sea
+        grass.warning(_("No SRTM files found for tiles: %s")
+                      % ', '.join(missing))
+    names = [name for name in names if name in files]
+    if not names:
+        grass.fatal(_("No SRTM tiles found in <%s>") % directory)
+
+    # tiles imported by an interrupted run
+    mapset = grass.gisenv()['MAPSET']
+    existing = set(grass.list_strings('raster', mapset=mapset))
+    imported = dict((tile, name.split('@')[0])
+                    for tile, name in read_manifest(manifest).items()
+                    if tile in names and name in existing)
+    if imported:
+        grass.message(_("%d tiles already imported according to <%s>")
+                      % (len(imported), manifest))
+    prefix = 'tmp_r_in_srtm_%s_' % output
+    tasks = [(tile, files[tile], prefix + tile, one)
+             for tile in names if tile not in imported]
+
+    grass.message(_("Importing %d tiles...") % len(tasks))
+    failed = []
+    record = open(manifest, 'a') if manifest else None
+    pool = Pool(nprocs) if nprocs > 1 and len(tasks) > 1 else None
+    try:
+        results = pool.imap_unordered(_import_task, tasks) if pool else \
+            (_import_task(task) for task in tasks)
+        for i, (tile, name, error) in enumerate(results):
+            grass.percent(i + 1, len(tasks), 1)
+            if error:
+                failed.append(tile)
+                grass.warning(_("Tile <%s> not imported: %s") % (tile, error))
+                continue
+            imported[tile] = name
+            if record:
+                record.write('%s %s@%s\n' % (tile, name, mapset))
+                record.flush()
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if record:
+            record.close()
+    if failed:
+        grass.fatal(_("Unable to import tiles: %s") % ', '.join(failed))
+
+    # adjacent tiles share the edge rows and columns, r.patch fills
+    # nulls on the edges (seams) from the neighbouring tiles
+    grass.message(_("Patching %d tiles...") % len(imported))
+    maps = [imported[tile] for tile in sorted(imported)]
+    grass.use_temp_region()
+    try:
+        grass.run_command('g.region', raster=maps)
+        grass.run_command('r.patch', input=maps, output=output)
+    finally:
+        grass.del_temp_region()
+    grass.run_command('g.remove', type='raster', name=maps, flags='f',
+                      quiet=True)
+    if manifest:
+        grass.try_remove(manifest)
 
-    if not one:
-        tmpl = tmpl3sec
-    elif swbd:
-        grass.message(_("Attempting to import 1-arcsec SWBD data"))
-        tmpl = swbd1sec
-    else:
-        grass.message(_("Attempting to import 1-arcsec data"))
-        tmpl = tmpl1sec
+    # nice color table
+    if split_name(files[names[0]])[2] != '.raw':
+        grass.run_command('r.colors', map=output, color='srtm')
 
-    header = tmpl % (ulxmap, ulymap)
-    hdrfile = tile + '.hdr'
-    outf = open(hdrfile, 'w')
-    outf.write(header)
-    outf.close()
 
-    # create prj file: To be precise, we would need EGS96! But who really cares...
-    prjfile = tile + '.prj'
-    outf = open(prjfile, 'w')
-    outf.write(proj)
-    outf.close()
+def main():
+    input = options['input']
+    output = options['output']
+    one = flags['1']
+    nprocs = int(options['nprocs'])
 
-    try:
-        grass.run_command('r.in.gdal', input=bilfile, out=tileout)
-    except:
-        grass.fatal(_("Unable to import data"))
+    # are we in LatLong location?
+    s = grass.read_command("g.proj", flags='j')
+    kv = grass.parse_key_val(s)
+    if not '+proj' in kv.keys() or kv['+proj'] != 'longlat':
+        grass.fatal(_("This module only operates in LatLong locations"))
 
-    # nice color table
-    if not swbd:
-        grass.run_command('r.colors', map=tileout, color='srtm')
+    if options['directory']:
+        names = None
+        if options['tiles']:
+            names = [split_name(name)[1] for name in
+                     options['tiles'].split(',')]
+        elif options['bbox']:
+            bbox = options['bbox'].split(',')
+            if len(bbox) != 4:
+                grass.fatal(_("Option <%s> requires four values: "
+                              "west,south,east,north") % 'bbox')
+            names = bbox_tiles(*map(float, bbox))
+        import_batch(options['directory'], names, output, one, nprocs,
+                     options['manifest'])
+        tileout = output
+    else:
+        # use these from now on:
+        tile = split_name(input)[1]
+        if not output:
+            tileout = tile
+        else:
+            tileout = output
+        error = import_tile(input, tileout, one)
+        if error:
+            grass.fatal(error)
 
     # write cmd history:
     grass.raster_history(tileout)
@@ -286,5 +497,4 @@ def main():
 
 if __name__ == "__main__":
     options, flags = grass.parser()
-    atexit.register(cleanup)
     main()
@@ -33,20 +33,217 @@
 #%end
 #%option G_OPT_F_SEP
 #%end
+#%option
+#% key: format
+#% type: string
+#% required: no
+#% multiple: no
+#% options: text,npy,binary
+#% label: Output format
+#% description: Binary formats contain x, y and values of all maps as 64-bit floating point numbers, null values as NaN
+#% descriptions: text;Text file with a line for each cell;npy;NumPy array file with a row for each cell;binary;Raw numbers without any header, row by row
+#% answer: text
+#%end
+#%option
+#% key: step
+#% type: integer
+#% required: no
+#% multiple: no
+#% options: 1-
+#% description: Export only every n-th row and column of the current region
+#% answer: 1
+#%end
+#%option
+#% key: nprocs
+#% type: integer
+#% required: no
+#% multiple: no
+#% description: Number of processes exporting bands of rows in parallel
+#% answer: 1
+#%end
 #%flag
 #% key: i
 #% description: Include no data values
 #%end
 
+import struct
 import sys
+from multiprocessing import Pool
+
 from grass.script import core as grass
+from grass.script.utils import separator
 from grass.exceptions import CalledModuleError
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#: number of cells read in a band of rows (of all maps together)
+BAND_VALUES = 1000000
+#: size of the header of npy files (the shape is written at the end)
+NPY_HEADER_SIZE = 128
+#: null value in text output (as r.stats)
+NULL_TEXT = '*'
+#: null value of CELL maps
+CELL_NULL = -2 ** 31
+
+
+def npy_header(rows, columns):
+    """Return header of NumPy array file of float64 array of given shape
+
+    The header has always the same size, so it can be rewritten when
+    the number of rows is known.
+
+    >>> len(npy_header(10, 3)) == len(npy_header(10 ** 12, 3))
+    True
+    """
+    magic = b'\x93NUMPY\x01\x00'
+    header = ("{'descr': '<f8', 'fortran_order': False, "
+              "'shape': (%d, %d), }" % (rows, columns))
+    length = NPY_HEADER_SIZE - len(magic) - 2
+    header = header.ljust(length - 1) + '\n'
+    return magic + struct.pack('<H', length) + header.encode('ascii')
+
+
+def format_coordinate(value, latlong):
+    """Format coordinate of cell center as r.stats -g
+
+    >>> format_coordinate(638300.5, False), format_coordinate(1.0, False)
+    ('638300.5', '1')
+    """
+    if latlong:
+        return '%.15g' % value
+    return ('%.8f' % value).rstrip('0').rstrip('.')
+
+
+def null_mask(values):
+    """Return mask of null values of array read from raster map"""
+    if values.dtype.kind == 'f':
+        return np.isnan(values)
+    return values == CELL_NULL
+
+
+def export_band(task):
+    """Read rows of raster maps and return them formatted as text or
+    binary data"""
+    maps, rows, cols, region, output_format, fs, nulls, latlong = task
+    from grass.pygrass.raster import RasterRow
+
+    values = []
+    for name in maps:
+        raster = RasterRow(name)
+        raster.open('r')
+        try:
+            band = np.vstack([raster.get_row(row)[cols] for row in rows])
+        finally:
+            raster.close()
+        values.append(band.ravel())
+    null = null_mask(values[0])
+    for value in values[1:]:
+        null |= null_mask(value)
+    row_index = np.repeat(np.arange(len(rows)), len(cols))
+    col_index = np.tile(np.arange(len(cols)), len(rows))
+    if not nulls:
+        keep = ~null
+        values = [value[keep] for value in values]
+        row_index = row_index[keep]
+        col_index = col_index[keep]
+
+    if output_format != 'text':
+        northing = region['n'] - (np.array(rows) + 0.5) * region['nsres']
+        easting = region['w'] + (np.array(cols) + 0.5) * region['ewres']
+        data = np.empty((len(row_index), 2 + len(values)), dtype='<f8')
+        data[:, 0] = easting[col_index]
+        data[:, 1] = northing[row_index]
+        for i, value in enumerate(values):
+            data[:, 2 + i] = np.where(null_mask(value), np.nan, value)
+        return len(data), data.tobytes()
+
+    northing = [format_coordinate(region['n'] - (row + 0.5) *
+                                  region['nsres'], latlong)
+                for row in rows]
+    easting = [format_coordinate(region['w'] + (col + 0.5) *
+                                 region['ewres'], latlong)
+               for col in cols]
+    columns = [[easting[col] for col in col_index.tolist()],
+               [northing[row] for row in row_index.tolist()]]
+    for value in values:
+        if value.dtype == np.float32:
+            text = ['%.8g' % number for number in value.tolist()]
+        elif value.dtype.kind == 'f':
+            text = ['%.16g' % number for number in value.tolist()]
+        else:
+            text = ['%d' % number for number in value.tolist()]
+        if nulls:
+            for i in np.nonzero(null_mask(value))[0].tolist():
+                text[i] = NULL_TEXT
+        columns.append(text)
+    lines = ''.join(fs.join(line) + '\n' for line in zip(*columns))
+    return len(row_index), lines.encode('utf-8')
+
+
+def export_maps(maps, output, output_format, fs, nulls, step, nprocs):
+    """Export cells of raster maps in the current region by bands of
+    rows, which are processed in parallel and written in order"""
+    region = grass.region()
+    latlong = grass.locn_is_latlong()
+    rows = list(range(0, region['rows'], step))
+    cols = list(range(0, region['cols'], step))
+    band_rows = max(1, BAND_VALUES // max(len(cols) * len(maps), 1))
+    tasks = [(maps, rows[start:start + band_rows], cols, region,
+              output_format, fs, nulls, latlong)
+             for start in range(0, len(rows), band_rows)]
+
+    stdout = getattr(sys.stdout, 'buffer', sys.stdout)
+    if output and output != '-':
+        stream = open(output, 'wb')
+    else:
+        stream = stdout
+    pool = Pool(nprocs) if nprocs > 1 and len(tasks) > 1 else None
+    try:
+        if output_format == 'npy':
+            stream.write(npy_header(0, 2 + len(maps)))
+        results = pool.imap(export_band, tasks) if pool else \
+            (export_band(task) for task in tasks)
+        count = 0
+        for i, (number, data) in enumerate(results):
+            stream.write(data)
+            count += number
+            grass.percent(i + 1, len(tasks), 2)
+        if output_format == 'npy':
+            stream.seek(0)
+            stream.write(npy_header(count, 2 + len(maps)))
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if stream is stdout:
+            stream.flush()
+        else:
+            stream.close()
+    grass.verbose(_("%d cells exported") % count)
+
 
 def main():
     # if no output filename, output to stdout
     output = options['output']
     donodata = flags['i']
+    output_format = options['format']
+    step = int(options['step'])
+    nprocs = int(options['nprocs'])
+
+    if output_format == 'npy' and (not output or output == '-'):
+        grass.fatal(_("Output file is required for format <%s>")
+                    % output_format)
+    if output_format != 'text' or step > 1 or nprocs > 1:
+        if np is None:
+            grass.fatal(_("NumPy is required for format <%s>, step "
+                          "and nprocs options") % output_format)
+        export_maps(options['input'].split(','), output, output_format,
+                    separator(options['separator']), donodata, step,
+                    max(nprocs, 1))
+        return
 
     if donodata:
         statsflags="1g"
@@ -7,6 +7,7 @@ Created on Sun Jun 08 10:11:18 2018
 from grass.gunittest.case import TestCase
 from grass.gunittest.main import test
 from grass.gunittest.gmodules import SimpleModule
+import grass.script as gs
 
 import os
 
@@ -16,6 +17,8 @@ class TestROutXyz(TestCase):
 
     mapName = 'elev_lid792_1m'
     csvFile = 'elev_lid792_1m.csv'
+    parallelFile = 'elev_lid792_1m_parallel.csv'
+    npyFile = 'elev_lid792_1m.npy'
 
     @classmethod
     def setUpClass(cls):
@@ -28,8 +31,9 @@ class TestROutXyz(TestCase):
         """Remove temporary region"""
         cls.del_temp_region()
 
-        if (os.path.isfile(cls.csvFile)):
-            os.remove(cls.csvFile)
+        for name in (cls.csvFile, cls.parallelFile, cls.npyFile):
+            if (os.path.isfile(name)):
+                os.remove(name)
 
     def test_r_out_xyz(self):
         """ASCII text file test"""
@@ -39,5 +43,32 @@ class TestROutXyz(TestCase):
 
         self.assertFileExists(filename=self.csvFile)
 
+    def test_parallel_text(self):
+        """Text exported in parallel is the same as of r.stats"""
+        self.assertModule('r.out.xyz', input=self.mapName,
+                          output=self.csvFile, separator=",")
+        self.assertModule('r.out.xyz', input=self.mapName,
+                          output=self.parallelFile, separator=",",
+                          nprocs=3)
+        self.assertFilesEqualMd5(self.csvFile, self.parallelFile)
+
+    def test_npy_step(self):
+        """NumPy array of every second row and column"""
+        import numpy as np
+        self.assertModule('r.out.xyz', input=self.mapName,
+                          output=self.npyFile, format='npy', step=2,
+                          nprocs=2)
+        data = np.load(self.npyFile)
+        region = gs.region()
+        self.assertEqual(data.shape[1], 3)
+        self.assertLessEqual(data.shape[0], (region['rows'] + 1) // 2 *
+                             ((region['cols'] + 1) // 2))
+        # cell centers of even columns and rows
+        self.assertTrue(np.allclose(
+            (data[:, 0] - region['w']) / region['ewres'] % 2, 0.5))
+        self.assertTrue(np.allclose(
+            (region['n'] - data[:, 1]) / region['nsres'] % 2, 0.5))
+
+
 if __name__ == '__main__':
     test()
@@ -171,9 +171,28 @@
 import sys
 import os
 import atexit
+from itertools import islice
+from multiprocessing import Pool
+
 from grass.script import core as grass
+from grass.script.utils import separator
 from grass.exceptions import CalledModuleError
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# methods computed by binning all depths in one pass of the input
+SINGLE_PASS_METHODS = ('n', 'min', 'max', 'range', 'sum', 'mean', 'stddev',
+                       'variance', 'coeff_var')
+# number of lines parsed at once
+CHUNK_LINES = 500000
+# value used for null cells when writing the 3D raster (exact in float)
+NULL_VALUE = -2.0 ** 127
+# variance smaller than this is zero (as in r.in.xyz)
+GRASS_EPSILON = 1.0e-15
+
 
 def cleanup():
     grass.run_command('g.remove', flags='f',
@@ -181,6 +200,182 @@ def cleanup():
                       quiet=True)
 
 
+def parse_lines(task):
+    """Parse lines of the input file
+
+    :return: array of x, y, z (and value) columns, list of broken lines
+    """
+    lines, fs, columns = task
+    lines = [line for line in lines if line.strip() and line[0] != '#']
+    if not lines:
+        return np.empty((0, len(columns))), []
+    try:
+        data = np.loadtxt(lines, delimiter=fs, usecols=columns, ndmin=2)
+        return data.reshape(-1, len(columns)), []
+    except (ValueError, IndexError):
+        pass
+    # line by line to find broken lines
+    data = []
+    broken = []
+    for line in lines:
+        tokens = line.strip().split(fs)
+        if len(tokens) < 3 or max(columns) >= len(tokens):
+            broken.append(line)
+            continue
+        try:
+            data.append([float(tokens[column]) for column in columns])
+        except ValueError:
+            broken.append(line)
+    return np.array(data).reshape(-1, len(columns)), broken
+
+
+class VoxelStatistics(object):
+    """Univariate statistics of values of points in voxels of the 3D region
+
+    Statistics are accumulated for all depths at once, points can be
+    added in chunks.
+    """
+
+    def __init__(self, region, method, vrange=None):
+        self.region = region
+        self.method = method
+        self.vrange = vrange
+        self.shape = (region['depths'], region['rows3'], region['cols3'])
+        size = int(np.prod(self.shape))
+        self.n = np.zeros(size, dtype=np.int64)
+        if method in ('min', 'range'):
+            self.min = np.full(size, np.inf)
+        if method in ('max', 'range'):
+            self.max = np.full(size, -np.inf)
+        if method not in ('n', 'min', 'max', 'range'):
+            self.sum = np.zeros(size)
+        if method in ('stddev', 'variance', 'coeff_var'):
+            self.sumsq = np.zeros(size)
+
+    def voxels(self, x, y, z):
+        """Return indices of voxels of points and mask of points in region
+        (the same way as r.in.xyz with zrange of the slices)"""
+        region = self.region
+        depths, rows, cols = self.shape
+        inside = ((y > region['s']) & (y <= region['n']) &
+                  (x >= region['w']) & (x < region['e']) &
+                  (z >= region['b']) & (z <= region['t']))
+        row = ((region['n'] - y[inside]) / region['nsres3']).astype(np.int64)
+        col = ((x[inside] - region['w']) / region['ewres3']).astype(np.int64)
+        depth = np.floor((z[inside] - region['b']) /
+                         region['tbres']).astype(np.int64)
+        # points at the top belong to the top slice
+        depth = np.minimum(depth, depths - 1)
+        valid = (row >= 0) & (row < rows) & (col >= 0) & (col < cols)
+        index = (depth * rows + row) * cols + col
+        mask = np.zeros(len(x), dtype=bool)
+        mask[np.flatnonzero(inside)[valid]] = True
+        return index[valid], mask
+
+    def update(self, x, y, z, value):
+        """Add points with values"""
+        index, mask = self.voxels(x, y, z)
+        value = value[mask]
+        if self.vrange:
+            inside = (value >= self.vrange[0]) & (value <= self.vrange[1])
+            index = index[inside]
+            value = value[inside]
+        if not len(index):
+            return
+        voxels, inverse = np.unique(index, return_inverse=True)
+        self.n[voxels] += np.bincount(inverse)
+        if hasattr(self, 'min'):
+            np.minimum.at(self.min, index, value)
+        if hasattr(self, 'max'):
+            np.maximum.at(self.max, index, value)
+        if hasattr(self, 'sum'):
+            self.sum[voxels] += np.bincount(inverse, value)
+        if hasattr(self, 'sumsq'):
+            self.sumsq[voxels] += np.bincount(inverse, value * value)
+
+    def result(self):
+        """Return values of the method as 3D array (NaN for null)"""
+        n = self.n
+        empty = n == 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self.method == 'n':
+                result = n.astype(np.float64)
+            elif self.method == 'min':
+                result = self.min
+            elif self.method == 'max':
+                result = self.max
+            elif self.method == 'range':
+                result = self.max - self.min
+            elif self.method == 'sum':
+                result = self.sum.copy()
+            elif self.method == 'mean':
+                result = self.sum / n
+            else:
+                variance = (self.sumsq - self.sum * self.sum / n) / n
+                variance[variance < GRASS_EPSILON] = 0.0
+                if self.method == 'variance':
+                    result = variance
+                elif self.method == 'stddev':
+                    result = np.sqrt(variance)
+                else:
+                    result = 100 * np.sqrt(variance) / (self.sum / n)
+        if self.method != 'n':
+            result[empty] = np.nan
+        return result.reshape(self.shape)
+
+
+def read_chunks(infile):
+    """Yield lists of lines of the input file"""
+    with open(infile) as lines:
+        while True:
+            chunk = list(islice(lines, CHUNK_LINES))
+            if not chunk:
+                return
+            yield chunk
+
+
+def bin_points(infile, output, region, method, dtype, fs, columns, vrange,
+               vscale, ignore_broken, workers):
+    """Create 3D raster map of statistics of points in voxels, the input
+    file is read only once"""
+    from grass.script import array as garray
+
+    stats = VoxelStatistics(region, method, vrange)
+    tasks = ((chunk, fs, columns) for chunk in read_chunks(infile))
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        parsed = pool.imap(parse_lines, tasks) if pool else \
+            (parse_lines(task) for task in tasks)
+        count = 0
+        for data, broken in parsed:
+            if broken:
+                if not ignore_broken:
+                    grass.fatal(_("Not enough data columns or invalid "
+                                  "number. Incorrect delimiter or column "
+                                  "number? Found the following "
+                                  "character(s):\n[%s]") %
+                                broken[0].rstrip())
+                for line in broken:
+                    grass.warning(_("Line ignored as requested: [%s]") %
+                                  line.rstrip())
+            value = data[:, 3] * vscale if len(columns) > 3 else data[:, 2]
+            stats.update(data[:, 0], data[:, 1], data[:, 2], value)
+            count += len(data)
+            grass.verbose(_("%d points read") % count)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    grass.verbose(_("Writing 3D raster map ..."))
+    result = stats.result()
+    voxels = garray.array3d(dtype=np.float32 if dtype == 'float'
+                            else np.float64)
+    voxels[...] = np.where(np.isnan(result), NULL_VALUE, result)
+    if voxels.write(output, null=repr(NULL_VALUE), overwrite=True):
+        grass.fatal(_("Unable to create 3D raster map <%s>") % output)
+
+
 def main():
     infile = options['input']
     output = options['output']
@@ -245,6 +440,27 @@ def main():
     grass.verbose(_("Region bottom=%.15g  top=%.15g  vertical_cell_res=%.15g  (%d depths)")
                   % (region['b'], region['t'], region['tbres'], region['depths']))
 
+    if np is not None and method in SINGLE_PASS_METHODS:
+        grass.verbose(_("Binning points of all depths in one pass ..."))
+        fs = separator(fs)
+        if fs.isspace():
+            fs = None
+        columns = [int(x) - 1, int(y) - 1, int(z) - 1]
+        if value_column and int(value_column):
+            columns.append(int(value_column) - 1)
+        # value range and scale apply only to the value column
+        if len(columns) > 3:
+            vrange = sorted(float(value) for value in vrange.split(',')) \
+                if vrange else None
+            vscale = float(vscale)
+        else:
+            vrange = None
+            vscale = 1.0
+        bin_points(infile, output, region, method, dtype, fs, columns,
+                   vrange, vscale, ignore_broken, workers)
+        grass.message(_("Done. 3D raster map <%s> created.") % output)
+        return
+
     grass.verbose(_("Creating slices ..."))
 
     # to avoid a point which falls exactly on a top bound from being
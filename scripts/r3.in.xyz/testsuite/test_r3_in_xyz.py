@@ -0,0 +1,134 @@
+"""Tests of r3.in.xyz
+
+(C) 2020 by the GRASS Development Team
+This program is free software under the GNU General Public
+License (>=v2). Read the file COPYING that comes with GRASS
+for details.
+"""
+
+import os
+
+from grass.gunittest.case import TestCase
+from grass.gunittest.main import test
+import grass.script as gs
+
+# region of the tests: 3x3 cells, 3 depths of 10 from 0 to 30
+REGION = dict(n=3, s=0, e=3, w=0, res=1, b=0, t=30, tbres=10)
+
+# z is the value, points are at cell centers, some of them exactly
+# on the bounds of depths (0, 10, 20, 30)
+POINTS = """\
+0.5|2.5|5
+0.5|2.5|7
+0.5|2.5|10
+0.5|2.5|15
+0.5|2.5|16.5
+1.5|1.5|19
+1.5|1.5|20
+1.5|1.5|25
+1.5|1.5|30
+2.5|0.5|0
+2.5|0.5|1
+2.5|0.5|4
+2.5|0.5|12
+2.5|0.5|18
+1.5|2.5|29.5
+1.5|2.5|21
+1.5|2.5|30
+"""
+
+# number of points in depths, a point on a bound between depths belongs
+# to the upper depth, a point on the top bound to the top depth
+DEPTH_POINTS = [5, 6, 6]
+
+
+class TestR3InXyz(TestCase):
+
+    output = 'test_r3_in_xyz'
+    slices = 'test_r3_in_xyz_slice'
+    reference = 'test_r3_in_xyz_reference'
+
+    @classmethod
+    def setUpClass(cls):
+        cls.use_temp_region()
+        cls.runModule('g.region', **REGION)
+        cls.points = gs.tempfile()
+        with open(cls.points, 'w') as output:
+            output.write(POINTS)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.del_temp_region()
+        os.remove(cls.points)
+
+    def tearDown(self):
+        self.runModule('g.remove', flags='f', type='raster_3d',
+                       name=self.output)
+        self.runModule('g.remove', flags='f', type='raster',
+                       pattern=self.slices + '_*')
+        self.runModule('g.remove', flags='f', type='raster',
+                       pattern=self.reference + '_*')
+
+    def import_slices(self, method):
+        """Import depths by r.in.xyz with zrange like r3.in.xyz slices
+        (a point on a bound belongs to the upper depth)"""
+        names = []
+        depths = len(DEPTH_POINTS)
+        for depth in range(depths):
+            bottom = REGION['b'] + depth * REGION['tbres']
+            top = bottom + REGION['tbres']
+            if depth < depths - 1:
+                # no point is closer to the bound
+                top -= 0.001
+            name = '%s_%05d' % (self.reference, depth + 1)
+            self.assertModule('r.in.xyz', input=self.points, output=name,
+                              method=method, separator='pipe',
+                              zrange=(bottom, top))
+            names.append(name)
+        return names
+
+    def assertSameAsSlices(self, method, **parameters):
+        """Check r3.in.xyz against r.in.xyz run for each depth"""
+        self.assertModule('r3.in.xyz', input=self.points, output=self.output,
+                          method=method, separator='pipe', **parameters)
+        self.assertModule('r3.to.rast', input=self.output,
+                          output=self.slices)
+        for depth, reference in enumerate(self.import_slices(method)):
+            actual = '%s_%05d' % (self.slices, depth + 1)
+            self.assertRastersNoDifference(actual=actual, reference=reference,
+                                           precision=1e-5)
+            # null cells are the same
+            cells = gs.parse_command('r.univar', flags='g', map=reference)
+            self.assertRasterFitsUnivar(raster=actual,
+                                        reference=dict(n=int(cells['n'])))
+
+    def test_n(self):
+        """Number of points compared with r.in.xyz slices"""
+        self.assertSameAsSlices('n')
+
+    def test_mean(self):
+        """Mean compared with r.in.xyz slices"""
+        self.assertSameAsSlices('mean')
+
+    def test_stddev(self):
+        """Standard deviation compared with r.in.xyz slices"""
+        self.assertSameAsSlices('stddev')
+
+    def test_workers(self):
+        """Input parsed by more processes gives the same result"""
+        self.assertSameAsSlices('mean', workers=2)
+
+    def test_depth_bounds(self):
+        """Points on bounds of depths and on the top bound"""
+        self.assertModule('r3.in.xyz', input=self.points, output=self.output,
+                          method='n', separator='pipe')
+        self.assertModule('r3.to.rast', input=self.output,
+                          output=self.slices)
+        for depth, points in enumerate(DEPTH_POINTS):
+            self.assertRasterFitsUnivar(
+                raster='%s_%05d' % (self.slices, depth + 1),
+                reference=dict(sum=points), precision=1e-6)
+
+
+if __name__ == '__main__':
+    test()
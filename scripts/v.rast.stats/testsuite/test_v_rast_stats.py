@@ -64,6 +64,21 @@ class TestRastStats(TestCase):
         self.assertLooksLike(univar_string, str(v_db_select.outputs.stdout))
 
 
+    def test_parallel(self):
+        """Bands of rows processed in parallel give the same result"""
+        univar_string = """cat|value|label|a_minimum|a_maximum|a_sum|a_median|a_null_cells
+1|1||102|209|265905|155.5|0
+2|2||121|280|1281195|200.5|0
+"""
+        self.assertModule("v.rast.stats", map="zone_map", raster="map_a",
+                          method=["minimum", "maximum", "sum", "median",
+                                  "null_cells"],
+                          flags="c", column_prefix="a", nprocs=4)
+        v_db_select = SimpleModule("v.db.select", map="zone_map")
+
+        self.runModule(v_db_select)
+        self.assertLooksLike(univar_string, str(v_db_select.outputs.stdout))
+
     def test_line_d(self):
         output_str = """cat|name|a_median|a_number|a_range
 1|first|192|3|1
@@ -70,10 +70,18 @@
 #% answer: 90
 #% required : no
 #%end
+#%option
+#% key: nprocs
+#% type: integer
+#% description: Number of processes computing statistics in parallel
+#% required: no
+#% answer: 1
+#%end
 
 import sys
 import os
 import atexit
+import sqlite3
 import grass.script as grass
 from grass.script.utils import decode
 from grass.exceptions import CalledModuleError
@@ -87,6 +95,47 @@ def cleanup():
 #        grass.try_remove(f)
 
 
+def sql_value(value):
+    """Converts numpy value to Python number, nan and inf to None"""
+    value = value.item()
+    if isinstance(value, float) and (value != value or
+                                     value in (float('inf'), float('-inf'))):
+        return None
+    return value
+
+
+def update_table(fi, columns, rows):
+    """Updates columns of rows in one transaction
+
+    :param rows: list of lists of column values followed by key value
+    """
+    if fi['driver'] == 'sqlite':
+        connection = sqlite3.connect(fi['database'])
+        try:
+            with connection:
+                connection.executemany(
+                    "UPDATE %s SET %s WHERE %s=?" % (
+                        fi['table'], ", ".join("%s=?" % column
+                                               for column in columns),
+                        fi['key']), rows)
+        finally:
+            connection.close()
+        return
+    # other drivers are accessed by db.execute
+    with open(sqltmp, 'w') as f:
+        f.write("{0}\n".format(grass.db_begin_transaction(fi['driver'])))
+        for row in rows:
+            f.write("UPDATE %s SET %s WHERE %s=%s;\n" % (
+                fi['table'], " , ".join(
+                    "%s=%s" % (column, 'NULL' if value is None
+                               else '%.15g' % value)
+                    for column, value in zip(columns, row[:-1])),
+                fi['key'], row[-1]))
+        f.write("{0}\n".format(grass.db_commit_transaction(fi['driver'])))
+    grass.run_command('db.execute', input=sqltmp,
+                      database=fi['database'], driver=fi['driver'])
+
+
 def main():
     global tmp, sqltmp, tmpname, nuldev, vector, rastertmp
     rastertmp = False
@@ -210,6 +259,9 @@ def main():
     # replaced by user choiche
     #basecols = ['n', 'min', 'max', 'range', 'mean', 'stddev', 'variance', 'cf_var', 'sum']
 
+    # names of columns and statistics for each raster
+    uploads = []
+    extstat = False
     for i in range(len(rasters)):
         raster = rasters[i]
         colprefix = colprefixes[i]
@@ -217,7 +269,6 @@ def main():
         # so colprefix can't be longer than 6 chars with DBF driver
         if dbfdriver:
             colprefix = colprefix[:6]
-            variables_dbf = {}
 
         # by default perccol variable is used only for "variables" variable
         perccol = "percentile"
@@ -234,16 +285,20 @@ def main():
             percindex = basecols.index(perc)
             basecols[percindex] = perccol
 
-        # dictionary with name of methods and position in "r.univar -gt"  output
-        variables = {'number': 2, 'null_cells': 2, 'minimum': 4, 'maximum': 5, 'range': 6,
-                     'average': 7, 'stddev': 9, 'variance': 10, 'coeff_var': 11,
-                     'sum': 12, 'first_quartile': 14, 'median': 15,
-                     'third_quartile': 16, perccol: 17}
-        # this list is used to set the 'e' flag for r.univar
+        # dictionary with name of methods and names of statistics
+        variables = {'number': 'number', 'null_cells': 'null_cells',
+                     'minimum': 'minimum', 'maximum': 'maximum',
+                     'range': 'range', 'average': 'average',
+                     'stddev': 'stddev', 'variance': 'variance',
+                     'coeff_var': 'coeff_var', 'sum': 'sum',
+                     'first_quartile': 'first_quartile', 'median': 'median',
+                     'third_quartile': 'third_quartile',
+                     perccol: 'percentile_%d' % int(percentile)}
+        # this list is used to compute percentiles
         extracols = ['first_quartile', 'median', 'third_quartile', perccol]
         addcols = []
         colnames = []
-        extstat = ""
+        statnames = []
         for i in basecols:
             # this check the complete name of out input that should be truncated
             for k in variables.keys():
@@ -251,14 +306,14 @@ def main():
                     i = k
                     break
             if i in extracols:
-                extstat = 'e'
+                extstat = True
             # check if column already present
             currcolumn = ("%s_%s" % (colprefix, i))
             if dbfdriver:
                 currcolumn = currcolumn[:10]
-                variables_dbf[currcolumn.replace("%s_" % colprefix, '')] = i
 
             colnames.append(currcolumn)
+            statnames.append(variables[i])
             if currcolumn in grass.vector_columns(vector, layer).keys():
                 if not flags['c']:
                     grass.fatal((_("Cannot create column <%s> (already present). ") % currcolumn) +
@@ -278,67 +333,39 @@ def main():
             except CalledModuleError:
                 grass.fatal(_("Adding columns failed. Exiting."))
 
-        # calculate statistics:
-        grass.message(_("Processing input data (%d categories)...") % number)
-
-        # get rid of any earlier attempts
-        grass.try_remove(sqltmp)
-
-        f = open(sqltmp, 'w')
+        uploads.append((raster, colnames, statnames))
 
-        # do the stats
-        p = grass.pipe_command('r.univar', flags='t' + extstat, map=raster,
-                               zones=rastertmp, percentile=percentile, sep=';')
+    # calculate statistics of all rasters at once
+    grass.message(_("Processing input data (%d categories)...") % number)
 
-        first_line = 1
-
-        f.write("{0}\n".format(grass.db_begin_transaction(fi['driver'])))
-        for line in p.stdout:
-            if first_line:
-                first_line = 0
-                continue
-
-            vars = decode(line).rstrip('\r\n').split(';')
-
-            f.write("UPDATE %s SET" % fi['table'])
-            first_var = 1
-            for colname in colnames:
-                variable = colname.replace("%s_" % colprefix, '', 1)
-                if dbfdriver:
-                    variable = variables_dbf[variable]
-                i = variables[variable]
-                value = vars[i]
-                # convert nan, +nan, -nan, inf, +inf, -inf, Infinity, +Infinity,
-                # -Infinity to NULL
-                if value.lower().endswith('nan') or 'inf' in value.lower():
-                    value = 'NULL'
-                if not first_var:
-                    f.write(" , ")
-                else:
-                    first_var = 0
-                f.write(" %s=%s" % (colname, value))
+    # imported here to read rasters in the temporary region
+    from grass.pygrass.raster.zonal import zonal_statistics
+    stats = zonal_statistics(
+        rastertmp, rasters, nprocs=int(options['nprocs']),
+        percentiles=[int(percentile)] if extstat else None)
 
-            f.write(" WHERE %s=%s;\n" % (fi['key'], vars[0]))
-        f.write("{0}\n".format(grass.db_commit_transaction(fi['driver'])))
-        p.wait()
-        f.close()
+    columns = []
+    values = []
+    for raster, colnames, statnames in uploads:
+        columns.extend(colnames)
+        values.extend(stats[raster][statname] for statname in statnames)
+    rows = []
+    for j, zone in enumerate(stats[rasters[0]]['zone']):
+        rows.append([sql_value(value[j]) for value in values] + [int(zone)])
 
-        grass.message(_("Updating the database ..."))
-        exitcode = 0
-        try:
-            grass.run_command('db.execute', input=sqltmp,
-                              database=fi['database'], driver=fi['driver'])
+    grass.message(_("Updating the database ..."))
+    try:
+        update_table(fi, columns, rows)
+        for raster in rasters:
             grass.verbose((_("Statistics calculated from raster map <{raster}>"
                              " and uploaded to attribute table"
                              " of vector map <{vector}>."
                              ).format(raster=raster, vector=vector)))
-        except CalledModuleError:
-            grass.warning(
-                _("Failed to upload statistics to attribute table of vector map <%s>.") %
-                vector)
-            exitcode = 1
-
-            sys.exit(exitcode)
+    except (CalledModuleError, sqlite3.Error):
+        grass.warning(
+            _("Failed to upload statistics to attribute table of vector map <%s>.") %
+            vector)
+        sys.exit(1)
 
 if __name__ == "__main__":
     options, flags = grass.parser()
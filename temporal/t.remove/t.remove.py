@@ -116,47 +116,40 @@ def main():
     # Create the pygrass Module object for g.remove
     remove = pyg.Module("g.remove", quiet=True, flags='f', run_=False)
 
+    if type == "strds":
+        maptype = "raster"
+    elif type == "str3ds":
+        maptype = "raster_3d"
+    else:
+        maptype = "vector"
+
     for name in dataset_list:
         name = name.strip()
         sp = tgis.open_old_stds(name, type, dbif)
 
         if recursive and force:
             grass.message(_("Removing registered maps and %s" % type))
-            maps = sp.get_registered_maps_as_objects(dbif=dbif)
-            map_statement = ""
-            count = 1
+            rows = sp.get_registered_maps("id", None, None, dbif)
+            map_ids = [row["id"] for row in rows] if rows else []
+            # Unregister all maps at once and delete them from the
+            # temporal database, other datasets in which they are
+            # registered are updated once
+            sp.unregister_maps(map_ids, dbif=dbif)
+            tgis.delete_maps_from_temporal_database(
+                maptype, map_ids, dbif=dbif, remove_timestamps=False)
+            # We may have multiple layer for a single map, hence we need
+            # to avoid multiple deletation of the same map
             name_list = []
-            for map in maps:
-                map.select(dbif)
-                # We may have multiple layer for a single map, hence we need
-                # to avoid multiple deletation of the same map,
-                # but the database entries are still present and must be removed
-                if map.get_name() not in name_list:
-                    name_list.append(str(map.get_name()))
-                map_statement += map.delete(dbif=dbif, execute=False)
-
-                count += 1
-                # Delete every 100 maps
-                if count%100 == 0:
-                    dbif.execute_transaction(map_statement)
-                    if type == "strds":
-                        remove(type="raster", name=name_list, run_=True)
-                    if type == "stvds":
-                        remove(type="vector", name=name_list, run_=True)
-                    if type == "str3ds":
-                        remove(type="raster_3d", name=name_list, run_=True)
-                    map_statement = ""
-                    name_list = []
-
-            if map_statement:
-                dbif.execute_transaction(map_statement)
-            if name_list:
-                if type == "strds":
-                    remove(type="raster", name=name_list, run_=True)
-                if type == "stvds":
-                    remove(type="vector", name=name_list, run_=True)
-                if type == "str3ds":
-                    remove(type="raster_3d", name=name_list, run_=True)
+            name_set = set()
+            for map_id in map_ids:
+                map_name = map_id.split("@")[0].split(":")[0]
+                if map_name not in name_set:
+                    name_set.add(map_name)
+                    name_list.append(map_name)
+            # Remove the maps in chunks to limit the command line length
+            for start in range(0, len(name_list), 500):
+                remove(type=maptype, name=name_list[start:start + 500],
+                       run_=True)
         else:
             grass.message(_("Note: registered maps themselves have not been removed, only the %s" % type))
 
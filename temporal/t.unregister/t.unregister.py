@@ -78,10 +78,6 @@ def main():
     dbif = tgis.SQLDatabaseInterfaceConnection()
     dbif.connect()
 
-    # In case a space time dataset is specified
-    if input:
-        sp = tgis.open_old_stds(input, type, dbif)
-
     maplist = []
 
     dummy = tgis.RasterDataset(None)
@@ -113,68 +109,11 @@ def main():
             mapid = dummy.build_id(mapname, mapset)
             maplist.append(mapid)
 
-    num_maps = len(maplist)
-    update_dict = {}
-    count = 0
-
-    statement = ""
-
-    # Unregister already registered maps
+    # Unregister the maps from the space time dataset or the temporal
+    # database, all maps are processed at once
     grass.message(_("Unregister maps"))
-    for mapid in maplist:
-        if count%10 == 0:
-            grass.percent(count, num_maps, 1)
-
-        map = tgis.dataset_factory(type, mapid)
-
-        # Unregister map if in database
-        if map.is_in_db(dbif) == True:
-            # Unregister from a single dataset
-            if input:
-                # Collect SQL statements
-                statement += sp.unregister_map(
-                    map=map, dbif=dbif, execute=False)
-
-            # Unregister from temporal database
-            else:
-                # We need to update all datasets after the removement of maps
-                map.metadata.select(dbif)
-                datasets = map.get_registered_stds(dbif)
-                # Store all unique dataset ids in a dictionary
-                if datasets:
-                    for dataset in datasets:
-                        update_dict[dataset] = dataset
-                # Collect SQL statements
-                statement += map.delete(dbif=dbif, update=False, execute=False)
-        else:
-            grass.warning(_("Unable to find %s map <%s> in temporal database" %
-                            (map.get_type(), map.get_id())))
-
-        count += 1
-
-    # Execute the collected SQL statenents
-    if statement:
-        dbif.execute_transaction(statement)
-
-    grass.percent(num_maps, num_maps, 1)
-
-    # Update space time datasets
-    if input:
-        grass.message(_("Unregister maps from space time dataset <%s>"%(input)))
-    else:
-        grass.message(_("Unregister maps from the temporal database"))
-
-    if input:
-        sp.update_from_registered_maps(dbif)
-        sp.update_command_string(dbif=dbif)
-    elif len(update_dict) > 0:
-        count = 0
-        for key in update_dict.keys():
-            id = update_dict[key]
-            sp = tgis.open_old_stds(id, type, dbif)
-            sp.update_from_registered_maps(dbif)
-            grass.percent(count, len(update_dict), 1)
-            count += 1
+    tgis.unregister_maps_from_space_time_datasets(type, input, maplist,
+                                                 dbif=dbif)
 
     dbif.close()
 